@@ -9,6 +9,7 @@ from __future__ import annotations
 
 from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
 from prompture import (
@@ -54,6 +55,10 @@ class CachibotAgent:
     # Custom system prompt (overrides default CachiBot personality)
     system_prompt_override: str | None = None
 
+    # Message-dependent prompt context (RAG, history), appended after every
+    # stable section so the prompt prefix stays cacheable by providers.
+    system_prompt_suffix: str | None = None
+
     # Optional set of allowed tools (None = all tools allowed)
     # Acts as a secondary filter on top of capability-based plugin selection.
     allowed_tools: set[str] | None = None
@@ -103,6 +108,13 @@ class CachibotAgent:
     # Active workspace plugin name (enables workspace progress tools).
     workspace: str | None = None
 
+    # Token breakdown of the knowledge context packed into the system prompt
+    # (see ContextPacker); reported to clients with the usage stats.
+    context_usage: dict[str, Any] | None = None
+
+    # Instruction skill config built with the registry, reused for dynamic instructions
+    _skill_config: dict[str, Any] | None = None
+
     def __post_init__(self) -> None:
         """Initialize after dataclass creation."""
         self._setup_sandbox()
@@ -169,6 +181,7 @@ class CachibotAgent:
 
         # Build skill_config with llm_backend for instruction execution
         skill_config = self._build_skill_config()
+        self._skill_config = skill_config
 
         self.registry = build_registry(
             ctx,
@@ -514,6 +527,10 @@ class CachibotAgent:
         Always appends tool list, platform context, and usage guidelines
         so the agent is aware of its environment regardless of whether
         a system_prompt_override is set.
+
+        Sections are ordered from most to least stable (bot configuration,
+        then chat, then message) so consecutive turns share a byte-identical
+        prefix that providers can serve from their prompt cache.
         """
         base = self.system_prompt_override or self._build_default_prompt()
 
@@ -530,7 +547,8 @@ class CachibotAgent:
         if job_section:
             sections.append(job_section.rstrip())
 
-        # Platform context
+        # Platform context (stable per chat, so it follows the per-bot sections)
+        platform_section = ""
         if self.platform_metadata:
             platform = self.platform_metadata.get("platform", "unknown")
             chat_id = self.platform_metadata.get("platform_chat_id")
@@ -547,10 +565,10 @@ class CachibotAgent:
                         f"- You can send messages to this chat using the `{send_tool}` "
                         f'tool with chat_id="{chat_id}"'
                     )
-            sections.append("## Current Conversation Context\n" + "\n".join(ctx_lines))
+            platform_section = "## Current Conversation Context\n" + "\n".join(ctx_lines)
 
         # Brief tool guidelines (only when override is set — the default already has these)
-        if self.system_prompt_override and sections:
+        if self.system_prompt_override and (sections or platform_section):
             sections.append(
                 "## Tool Usage\n"
                 "- Use your tools proactively when the user's request can be fulfilled by them\n"
@@ -558,9 +576,15 @@ class CachibotAgent:
                 "- For scheduling, reminders, and todos, use the schedule/todo tools directly"
             )
 
+        if platform_section:
+            sections.append(platform_section)
+
+        prompt = base
         if sections:
-            return base + "\n\n---\n\n" + "\n\n".join(sections)
-        return base
+            prompt += "\n\n---\n\n" + "\n\n".join(sections)
+        if self.system_prompt_suffix:
+            prompt += "\n\n---\n\n" + self.system_prompt_suffix
+        return prompt
 
     def _build_default_prompt(self) -> str:
         """Build the default CachiBot system prompt (used when no override is set)."""
@@ -675,7 +699,8 @@ async def load_dynamic_instructions(agent: CachibotAgent) -> None:
     registered as tools alongside static plugin skills.
 
     No-ops gracefully if the bot has no custom instructions or if the
-    database is unavailable.
+    database is unavailable. Instruction records are cached per bot (see
+    ``cachibot.services.agent_cache``).
     """
     if not agent.bot_id:
         return
@@ -683,16 +708,23 @@ async def load_dynamic_instructions(agent: CachibotAgent) -> None:
     try:
         from tukuy.instruction import Instruction, InstructionDescriptor
 
+        from cachibot.services.agent_cache import get_agent_setup_cache
         from cachibot.storage.instruction_repository import InstructionRepository
 
         repo = InstructionRepository()
-        records = await repo.get_by_bot(agent.bot_id)
+        records = await get_agent_setup_cache().get_or_load(
+            ("instructions", agent.bot_id),
+            partial(repo.get_by_bot, agent.bot_id),
+            bot_id=agent.bot_id,
+        )
 
         if not records:
             return
 
         # Get the skill_config (with llm_backend) from the agent
-        skill_config = agent._build_skill_config()
+        skill_config = agent._skill_config
+        if skill_config is None:
+            skill_config = agent._build_skill_config()
 
         for record in records:
             if not record.is_active:
@@ -797,13 +829,18 @@ async def load_disabled_capabilities() -> set[str]:
     job runner, etc.) and pass the result as ``disabled_capabilities`` when
     constructing a ``CachibotAgent``.
 
-    Returns an empty set on any error (graceful degradation).
+    Cached platform-wide until the tool config changes. Returns an empty
+    set on any error (graceful degradation).
     """
     try:
+        from cachibot.services.agent_cache import get_agent_setup_cache
         from cachibot.storage.repository import PlatformToolConfigRepository
 
         repo = PlatformToolConfigRepository()
-        return set(await repo.get_disabled_capabilities())
+        disabled = await get_agent_setup_cache().get_or_load(
+            ("disabled_capabilities",), repo.get_disabled_capabilities
+        )
+        return set(disabled)
     except Exception:
         return set()
 
@@ -6,6 +6,15 @@ import os
 import re
 
 from cachibot.api.env import get_env_path
+from cachibot.config import invalidate_config_snapshots
+
+
+def _clear_environment_cache() -> None:
+    """Global keys feed every bot's resolved environment."""
+    # Imported lazily: bot_environment imports the providers routes, which import us
+    from cachibot.services.bot_environment import clear_environment_cache
+
+    clear_environment_cache()
 
 
 def read_env_file() -> str:
@@ -36,6 +45,8 @@ def set_env_value(key: str, value: str) -> None:
 
     write_env_file(content)
     os.environ[key] = value
+    invalidate_config_snapshots()
+    _clear_environment_cache()
 
 
 def remove_env_value(key: str) -> None:
@@ -45,3 +56,5 @@ def remove_env_value(key: str) -> None:
     content = pattern.sub(f"# {key}=", content)
     write_env_file(content)
     os.environ.pop(key, None)
+    invalidate_config_snapshots()
+    _clear_environment_cache()
@@ -4,7 +4,6 @@ Handles real-time multi-user, multi-bot room communication.
 """
 
 import asyncio
-import copy
 import logging
 import uuid
 from datetime import datetime, timezone
@@ -222,7 +221,7 @@ async def room_websocket_endpoint(
 
     # Get workspace and config
     workspace = websocket.app.state.workspace
-    config = Config.load(workspace=workspace)
+    config = Config.snapshot(workspace=workspace)
 
     try:
         while True:
@@ -1052,11 +1051,11 @@ async def run_room_bot(
             enhanced_prompt = (bot.system_prompt or "") + room_context
 
         # Create agent with bot config
-        agent_config = copy.deepcopy(config)
+        agent_config = config
         # Use bot's model if available
         effective_model = bot.model
         if effective_model:
-            agent_config.agent.model = effective_model
+            agent_config = config.with_agent(model=effective_model)
 
         # Build instruction delta sender for streaming instruction
         # LLM output to all room members in real time.
@@ -16,12 +16,15 @@ from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel
 from sqlalchemy import delete as sa_delete
 from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from cachibot.api.auth import get_admin_user, require_bot_access, require_bot_access_level
 from cachibot.api.helpers import require_found
 from cachibot.models.auth import User
 from cachibot.models.group import BotAccessLevel
+from cachibot.services.agent_cache import invalidate_agent_setup, invalidate_bot_agent
 from cachibot.services.encryption import get_encryption_service
+from cachibot.services.vector_store import invalidate_ann_settings
 from cachibot.storage import db
 from cachibot.storage.models.env_var import (
     BotEnvironment,
@@ -54,6 +57,18 @@ def _mask_value(value: str) -> str:
     return "*" * (len(value) - 4) + value[-4:]
 
 
+async def _bump_env_version(session: AsyncSession, bot_id: str | None) -> None:
+    """Record an environment change (all bots when *bot_id* is None).
+
+    Runs inside the caller's transaction so the version bump commits together
+    with the change and every worker's environment cache sees it.
+    """
+    # Imported lazily: bot_environment imports the routes package
+    from cachibot.services.bot_environment import BotEnvironmentService
+
+    await BotEnvironmentService(session, get_encryption_service()).invalidate(bot_id)
+
+
 async def _audit_log(
     action: str,
     key_name: str,
@@ -212,7 +227,9 @@ async def set_bot_env_var(
             session.add(new_var)
             action = "create"
 
+        await _bump_env_version(session, bot_id)
         await session.commit()
+    invalidate_bot_agent(bot_id)
 
     await _audit_log(
         action=action,
@@ -242,10 +259,12 @@ async def delete_bot_env_var(
                 BotEnvironment.key == key,
             )
         )
+        await _bump_env_version(session, bot_id)
         await session.commit()
         deleted = result.rowcount > 0  # type: ignore[attr-defined]
 
     require_found(deleted, "Environment variable")
+    invalidate_bot_agent(bot_id)
 
     await _audit_log(
         action="delete",
@@ -342,8 +361,10 @@ async def reset_bot_env(
         skill_result = await session.execute(
             sa_delete(BotSkillConfig).where(BotSkillConfig.bot_id == bot_id)
         )
+        await _bump_env_version(session, bot_id)
         await session.commit()
         total = env_result.rowcount + skill_result.rowcount  # type: ignore[attr-defined]
+    invalidate_bot_agent(bot_id)
 
     await _audit_log(
         action="reset_all",
@@ -438,7 +459,9 @@ async def set_platform_env_var(
             session.add(new_var)
             action = "create"
 
+        await _bump_env_version(session, None)
         await session.commit()
+    invalidate_agent_setup()
 
     await _audit_log(
         action=action,
@@ -467,10 +490,12 @@ async def delete_platform_env_var(
                 PlatformEnvironment.key == key,
             )
         )
+        await _bump_env_version(session, None)
         await session.commit()
         deleted = result.rowcount > 0  # type: ignore[attr-defined]
 
     require_found(deleted, "Platform env var")
+    invalidate_agent_setup()
 
     await _audit_log(
         action="delete",
@@ -553,8 +578,13 @@ async def set_skill_config(
             session.add(new_config)
             action = "create"
 
+        await _bump_env_version(session, bot_id)
         await session.commit()
 
+    invalidate_bot_agent(bot_id)
+    if skill_name == "knowledge":
+        invalidate_ann_settings(bot_id)
+
     await _audit_log(
         action=action,
         key_name=f"skill:{skill_name}",
@@ -582,11 +612,16 @@ async def delete_skill_config(
                 BotSkillConfig.skill_name == skill_name,
             )
         )
+        await _bump_env_version(session, bot_id)
         await session.commit()
         deleted = result.rowcount > 0  # type: ignore[attr-defined]
 
     require_found(deleted, "Skill config")
 
+    invalidate_bot_agent(bot_id)
+    if skill_name == "knowledge":
+        invalidate_ann_settings(bot_id)
+
     await _audit_log(
         action="delete",
         key_name=f"skill:{skill_name}",
@@ -22,6 +22,7 @@ from cachibot.models.group import (
     UpdateAccessRequest,
 )
 from cachibot.models.skill import BotSkillRequest, SkillResponse
+from cachibot.services.agent_cache import invalidate_bot_agent
 from cachibot.storage.group_repository import BotAccessRepository
 from cachibot.storage.repository import BotRepository, SkillsRepository
 from cachibot.storage.user_repository import OwnershipRepository
@@ -120,6 +121,7 @@ async def sync_bot(
     )
 
     await repo.upsert_bot(bot)
+    invalidate_bot_agent(bot_id)
     return BotResponse.from_bot(bot)
 
 
@@ -130,6 +132,7 @@ async def delete_bot(
 ) -> None:
     """Delete a bot."""
     require_found(await repo.delete_bot(bot_id), "Bot")
+    invalidate_bot_agent(bot_id)
 
 
 # =============================================================================
@@ -59,6 +59,7 @@ class ConnectionResponse(BaseModel):
     updated_at: str
     # Safe config values (excludes sensitive data like tokens)
     strip_markdown: bool = False
+    coalesce_messages: bool = False
     # Custom platform config (safe values only — no api_key)
     custom_config: dict[str, str | bool] | None = None
 
@@ -66,6 +67,7 @@ class ConnectionResponse(BaseModel):
     def from_connection(cls, connection: BotConnection) -> "ConnectionResponse":
         # Extract safe config values
         strip_markdown = connection.config.get("strip_markdown", "false").lower() == "true"
+        coalesce_messages = connection.config.get("coalesce_messages", "false").lower() == "true"
 
         # Expose safe custom config (base_url + capability toggles, NOT api_key)
         custom_config: dict[str, str | bool] | None = None
@@ -94,6 +96,7 @@ class ConnectionResponse(BaseModel):
             created_at=connection.created_at.isoformat(),
             updated_at=connection.updated_at.isoformat(),
             strip_markdown=strip_markdown,
+            coalesce_messages=coalesce_messages,
             custom_config=custom_config,
         )
 
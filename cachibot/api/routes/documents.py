@@ -12,7 +12,7 @@ from pathlib import Path
 from typing import Annotated
 
 import aiofiles
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from pydantic import BaseModel
 
 from cachibot.api.auth import require_bot_access, require_bot_access_level
@@ -20,7 +20,7 @@ from cachibot.api.helpers import require_bot_ownership, require_found
 from cachibot.models.auth import User
 from cachibot.models.group import BotAccessLevel
 from cachibot.models.knowledge import Document, DocumentStatus
-from cachibot.services.document_processor import get_document_processor
+from cachibot.services.ingestion_queue import PRIORITY_INTERACTIVE, get_ingestion_queue
 from cachibot.storage.repository import KnowledgeRepository
 
 logger = logging.getLogger(__name__)
@@ -68,25 +68,10 @@ def _doc_to_response(doc: Document) -> DocumentResponse:
     )
 
 
-async def _process_document_background(
-    document_id: str,
-    bot_id: str,
-    file_path: Path,
-    file_type: str,
-) -> None:
-    """Background task to process uploaded document."""
-    processor = get_document_processor()
-    try:
-        await processor.process_document(document_id, bot_id, file_path, file_type)
-    except Exception as e:
-        logger.error(f"Background processing failed for {document_id}: {e}")
-
-
 @router.post("/", response_model=UploadResponse)
 async def upload_document(
     bot_id: str,
     file: Annotated[UploadFile, File()],
-    background_tasks: BackgroundTasks,
     user: User = Depends(require_bot_access_level(BotAccessLevel.EDITOR)),
 ) -> UploadResponse:
     """
@@ -144,13 +129,9 @@ async def upload_document(
     )
     await repo.save_document(doc)
 
-    # Process in background
-    background_tasks.add_task(
-        _process_document_background,
-        document_id,
-        bot_id,
-        file_path,
-        ext[1:],
+    # Process in background (interactive uploads go ahead of bulk reindexes)
+    await get_ingestion_queue().enqueue(
+        document_id, bot_id, file_path, ext[1:], priority=PRIORITY_INTERACTIVE
     )
 
     return UploadResponse(
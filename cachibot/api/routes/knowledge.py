@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from cachibot.api.auth import require_bot_access, require_bot_access_level
 from cachibot.api.helpers import require_bot_ownership, require_found
@@ -27,7 +27,11 @@ from cachibot.models.knowledge import (
     SearchRequest,
     SearchResultResponse,
 )
-from cachibot.services.document_processor import get_document_processor
+from cachibot.services.ingestion_queue import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    get_ingestion_queue,
+)
 from cachibot.services.vector_store import get_vector_store
 from cachibot.storage.repository import KnowledgeRepository, NotesRepository
 
@@ -171,6 +175,9 @@ async def get_knowledge_stats(
     """Get knowledge base overview stats."""
     repo = KnowledgeRepository()
     stats = await repo.get_knowledge_stats(bot_id)
+    query_cache = get_vector_store().query_cache
+    if query_cache is not None:
+        stats["query_embedding_cache"] = query_cache.stats()
     return KnowledgeStats(**stats)
 
 
@@ -183,7 +190,7 @@ async def search_knowledge(
     """Search the knowledge base (documents + notes)."""
     results: list[SearchResultResponse] = []
 
-    # Search documents via vector store
+    # Search documents via vector store (hybrid with full-text when enabled)
     if data.include_documents:
         try:
             vector_store = get_vector_store()
@@ -207,7 +214,7 @@ async def search_knowledge(
         except Exception as e:
             logger.warning(f"Document search failed: {e}")
 
-    # Search notes via text matching
+    # Search notes via full-text index
     if data.include_notes:
         try:
             notes_repo = NotesRepository()
@@ -234,7 +241,6 @@ async def search_knowledge(
 @router.post("/reindex")
 async def reindex_documents(
     bot_id: str,
-    background_tasks: BackgroundTasks,
     user: User = Depends(require_bot_access_level(BotAccessLevel.OPERATOR)),
 ) -> dict[str, Any]:
     """Reprocess all documents for a bot: delete chunks and re-run pipeline."""
@@ -260,9 +266,8 @@ async def reindex_documents(
         await repo.reset_document_for_retry(doc.id)
 
         # Queue background processing
-        processor = get_document_processor()
-        background_tasks.add_task(
-            processor.process_document, doc.id, bot_id, file_path, doc.file_type
+        await get_ingestion_queue().enqueue(
+            doc.id, bot_id, file_path, doc.file_type, priority=PRIORITY_BULK
         )
         queued += 1
 
@@ -273,7 +278,6 @@ async def reindex_documents(
 async def retry_document(
     bot_id: str,
     document_id: str,
-    background_tasks: BackgroundTasks,
     user: User = Depends(require_bot_access_level(BotAccessLevel.OPERATOR)),
 ) -> dict[str, str]:
     """Retry processing a failed document."""
@@ -285,8 +289,8 @@ async def retry_document(
     if doc.status.value != "failed":
         raise HTTPException(400, "Only failed documents can be retried")
 
-    # Reset status
-    success = await repo.reset_document_for_retry(document_id)
+    # Reset status, keeping already-embedded chunks so processing resumes
+    success = await repo.reset_document_for_retry(document_id, keep_chunks=True)
     if not success:
         raise HTTPException(500, "Failed to reset document")
 
@@ -297,9 +301,8 @@ async def retry_document(
     if not file_path.exists():
         raise HTTPException(404, "Original file not found on disk")
 
-    processor = get_document_processor()
-    background_tasks.add_task(
-        processor.process_document, document_id, bot_id, file_path, doc.file_type
+    await get_ingestion_queue().enqueue(
+        document_id, bot_id, file_path, doc.file_type, priority=PRIORITY_INTERACTIVE
     )
 
     return {"status": "retrying", "document_id": document_id}
@@ -324,6 +327,9 @@ async def get_document_chunks(
             document_id=c["document_id"],
             chunk_index=c["chunk_index"],
             content=c["content"],
+            page_number=c["page_number"],
+            char_start=c["char_start"],
+            char_end=c["char_end"],
         )
         for c in chunks
     ]
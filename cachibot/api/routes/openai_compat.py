@@ -5,7 +5,6 @@ Provides /v1/chat/completions and /v1/models for external tool integration
 (Cursor, VS Code, custom apps). Authenticated via cb-* API keys.
 """
 
-import copy
 import json
 import logging
 import time
@@ -108,9 +107,8 @@ async def chat_completions(
     # Resolve public_id → real model_id (white-label support)
     effective_model = await _resolve_public_id(user_model)
 
-    config = Config.load(workspace=request.app.state.workspace)
-    agent_config = copy.deepcopy(config)
-    agent_config.agent.model = effective_model
+    config = Config.snapshot(workspace=request.app.state.workspace)
+    agent_config = config.with_agent(model=effective_model)
 
     resolved_env, per_bot_driver = await resolve_bot_env(
         bot_id, platform="api", effective_model=effective_model
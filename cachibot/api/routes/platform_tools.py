@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends
 from cachibot.api.auth import get_admin_user, get_current_user
 from cachibot.models.auth import User
 from cachibot.models.platform_tools import PlatformToolConfig, PlatformToolConfigUpdate
+from cachibot.services.agent_cache import invalidate_agent_setup
 from cachibot.storage.repository import PlatformToolConfigRepository
 
 router = APIRouter(prefix="/api/platform/tools", tags=["platform-tools"])
@@ -31,4 +32,6 @@ async def update_platform_tool_config(
     user: User = Depends(get_admin_user),
 ) -> PlatformToolConfig:
     """Update global tool visibility (admin only)."""
-    return await repo.update_config(body, user_id=user.id)
+    config = await repo.update_config(body, user_id=user.id)
+    invalidate_agent_setup()
+    return config
@@ -3,14 +3,19 @@ Platforms API Route
 
 Returns available platform adapter metadata from the AdapterRegistry.
 No authentication required -- this is static class metadata, not user data.
+The dispatch stats endpoint is the exception and is admin only.
 """
 
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 
+from cachibot.api.auth import get_admin_user
+from cachibot.models.auth import User
 from cachibot.services.adapters.registry import AdapterRegistry
+from cachibot.services.chat_dispatcher import get_chat_dispatcher
+from cachibot.services.inbound_queue import get_inbound_queue
 
 router = APIRouter(prefix="/api/platforms", tags=["platforms"])
 
@@ -25,6 +30,12 @@ async def list_platforms() -> JSONResponse:
     )
 
 
+@router.get("/dispatch")
+async def dispatch_stats(user: User = Depends(get_admin_user)) -> dict[str, Any]:
+    """Queue depth, wait times and active agent runs for platform messages."""
+    return {**get_chat_dispatcher().stats(), "inbound": get_inbound_queue().stats()}
+
+
 @router.get("/custom/spec")
 async def custom_platform_spec() -> dict[str, Any]:
     """Return the full API contract for the Custom platform adapter.
@@ -34,7 +45,10 @@ async def custom_platform_spec() -> dict[str, Any]:
     """
     return {
         "inbound": {
-            "description": "POST messages from your platform to CachiBot",
+            "description": (
+                "POST messages from your platform to CachiBot. The request is "
+                "acknowledged immediately; the reply arrives via POST {base_url}/messages"
+            ),
             "method": "POST",
             "url_template": "/api/webhooks/custom/{connection_id}",
             "headers": {
@@ -57,7 +71,10 @@ async def custom_platform_spec() -> dict[str, Any]:
                 "metadata": {
                     "type": "object",
                     "required": False,
-                    "description": "Additional metadata (passed through to the bot)",
+                    "description": (
+                        "Additional metadata (passed through to the bot). A message_id "
+                        "makes retried deliveries of the same message idempotent"
+                    ),
                 },
             },
             "example": {
@@ -65,7 +82,7 @@ async def custom_platform_spec() -> dict[str, Any]:
                 "message": "Hello, bot!",
                 "user_id": "user-123",
                 "display_name": "Alice",
-                "metadata": {"source": "my-app"},
+                "metadata": {"source": "my-app", "message_id": "msg-001"},
             },
         },
         "outbound": [
@@ -403,6 +403,10 @@ async def run_script(
     )
     await task_repo_local.save(task)
 
+    from cachibot.services.job_runner import notify_work_changed
+
+    notify_work_changed(work_id)
+
     return {"workId": work_id, "message": f"Script '{script.name}' queued for execution"}
 
 
@@ -5,12 +5,15 @@ Handles incoming webhook events from user-provided custom platforms.
 """
 
 import logging
+import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
 from cachibot.api.helpers import require_found
+from cachibot.services.adapters.base import WebhookEvent
+from cachibot.services.inbound_queue import get_inbound_queue
 from cachibot.services.platform_manager import get_platform_manager
 from cachibot.storage.repository import ConnectionRepository
 
@@ -39,8 +42,9 @@ async def handle_custom_webhook(
 ) -> dict[str, str]:
     """Handle incoming messages from a custom platform.
 
-    Validates the connection, optionally checks the API key, and routes the
-    message through the adapter's on_message callback.
+    Validates the connection, optionally checks the API key, and queues the
+    message for the inbound queue workers. The reply is POSTed to the
+    platform's base URL once the agent has answered.
 
     Args:
         connection_id: The CachiBot connection ID.
@@ -78,31 +82,16 @@ async def handle_custom_webhook(
         logger.warning(f"Custom webhook: no active adapter for connection {connection_id}")
         raise HTTPException(status_code=503, detail="Connection is not active")
 
-    # Build metadata
-    metadata: dict[str, Any] = {
-        "platform": "custom",
-        "chat_id": payload.chat_id,
-        "user_id": payload.user_id or payload.chat_id,
-        "display_name": payload.display_name or "",
-    }
-    if payload.metadata:
-        metadata.update(payload.metadata)
-
-    try:
-        # Route through the adapter's on_message callback
-        response = await adapter.on_message(
-            connection_id,
-            payload.chat_id,
-            payload.message,
-            metadata,
-        )
-
-        # Send the response back via the adapter
-        if response.text or response.media:
-            await adapter.send_response(payload.chat_id, response)
-
-    except Exception as e:
-        logger.error(f"Error processing custom webhook message: {e}")
-        raise HTTPException(status_code=500, detail="Failed to process message")
+    # Queue for the inbound workers; a metadata.message_id makes retries idempotent
+    message_id = (payload.metadata or {}).get("message_id")
+    await get_inbound_queue().enqueue(
+        connection_id,
+        "custom",
+        WebhookEvent(
+            chat_id=payload.chat_id,
+            event_key=str(message_id) if message_id else str(uuid.uuid4()),
+            payload=payload.model_dump(),
+        ),
+    )
 
     return {"status": "ok"}
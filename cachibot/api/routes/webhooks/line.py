@@ -10,6 +10,7 @@ from typing import Any
 from fastapi import APIRouter, Header, HTTPException, Request
 
 from cachibot.services.adapters.line import LineAdapter
+from cachibot.services.inbound_queue import get_inbound_queue
 from cachibot.services.platform_manager import get_platform_manager
 
 logger = logging.getLogger(__name__)
@@ -26,7 +27,8 @@ async def line_webhook(
     """Handle incoming LINE webhook events.
 
     LINE sends message events to this endpoint. The request is validated
-    using the X-Line-Signature header and forwarded to the adapter.
+    using the X-Line-Signature header and its text messages are queued for
+    the inbound queue workers, so LINE gets its 200 right away.
 
     Args:
         connection_id: The CachiBot connection ID.
@@ -60,12 +62,13 @@ async def line_webhook(
         raise HTTPException(status_code=400, detail="Connection is not a LINE adapter")
 
     try:
-        await adapter.process_webhook(body, raw_body, x_line_signature)
+        events = adapter.parse_webhook(body, raw_body, x_line_signature)
     except ValueError as e:
         logger.warning(f"LINE webhook validation failed for {connection_id}: {e}")
         raise HTTPException(status_code=403, detail="Invalid signature")
-    except Exception as e:
-        logger.error(f"Error processing LINE webhook for {connection_id}: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+
+    inbound_queue = get_inbound_queue()
+    for event in events:
+        await inbound_queue.enqueue(connection_id, "line", event)
 
     return {"status": "ok"}
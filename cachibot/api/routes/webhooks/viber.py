@@ -10,6 +10,7 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request
 
+from cachibot.services.inbound_queue import get_inbound_queue
 from cachibot.services.platform_manager import get_platform_manager
 
 logger = logging.getLogger(__name__)
@@ -21,8 +22,9 @@ router = APIRouter(prefix="/api/webhooks/viber", tags=["webhooks"])
 async def handle_webhook(connection_id: str, request: Request) -> dict[str, str]:
     """Handle incoming Viber webhook events.
 
-    Reads the raw body and X-Viber-Content-Signature header, then delegates
-    signature validation and event processing to the Viber adapter.
+    Reads the raw body and X-Viber-Content-Signature header, has the Viber
+    adapter validate the signature, and queues message events for the
+    inbound queue workers before acknowledging.
 
     Args:
         connection_id: The CachiBot connection ID.
@@ -63,8 +65,12 @@ async def handle_webhook(connection_id: str, request: Request) -> dict[str, str]
         raise HTTPException(status_code=400, detail="Connection is not a Viber adapter")
 
     try:
-        await adapter.process_webhook(body, raw_body, signature)
-    except Exception as e:
-        logger.error(f"Error processing Viber webhook for {connection_id}: {e}")
+        events = adapter.parse_webhook(body, raw_body, signature)
+    except ValueError:
+        raise HTTPException(status_code=403, detail="Invalid signature")
+
+    inbound_queue = get_inbound_queue()
+    for event in events:
+        await inbound_queue.enqueue(connection_id, "viber", event)
 
     return {"status": "ok"}
@@ -13,7 +13,8 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, Query, Request
 
 from cachibot.api.helpers import require_found
-from cachibot.services.platform_manager import get_platform_manager
+from cachibot.services.adapters.base import WebhookEvent
+from cachibot.services.inbound_queue import get_inbound_queue
 from cachibot.storage.repository import ConnectionRepository
 
 logger = logging.getLogger(__name__)
@@ -90,8 +91,9 @@ async def verify_webhook(
 async def handle_webhook(connection_id: str, request: Request) -> dict[str, str]:
     """Handle incoming WhatsApp webhook events.
 
-    Validates the request signature, parses the webhook payload, and routes
-    incoming messages to the appropriate adapter via the platform manager.
+    Validates the request signature and queues each incoming message for the
+    inbound queue workers, then acknowledges right away so Meta does not
+    time out and redeliver while the agent runs.
 
     Args:
         connection_id: The CachiBot connection ID.
@@ -121,77 +123,27 @@ async def handle_webhook(connection_id: str, request: Request) -> dict[str, str]
         logger.error(f"WhatsApp webhook: invalid JSON for {connection_id}")
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
-    # Process entries
-    manager = get_platform_manager()
-    adapter = manager.get_adapter(connection_id)
+    # Queue entries (status updates carry no messages and are skipped)
+    inbound_queue = get_inbound_queue()
 
     for entry in payload.get("entry", []):
         for change in entry.get("changes", []):
             value = change.get("value", {})
-            messages = value.get("messages", [])
-
-            for msg in messages:
-                try:
-                    sender = msg.get("from", "")
-                    msg_id = msg.get("id", "")
-                    msg_type = msg.get("type", "")
-
-                    # Extract text content based on message type
-                    text = ""
-                    if msg_type == "text":
-                        text = msg.get("text", {}).get("body", "")
-                    elif msg_type == "button":
-                        text = msg.get("button", {}).get("text", "")
-                    elif msg_type == "interactive":
-                        interactive = msg.get("interactive", {})
-                        if interactive.get("type") == "button_reply":
-                            text = interactive.get("button_reply", {}).get("title", "")
-                        elif interactive.get("type") == "list_reply":
-                            text = interactive.get("list_reply", {}).get("title", "")
-
-                    if not text:
-                        continue
-
-                    # Mark message as read (best-effort)
-                    if adapter and msg_id:
-                        from cachibot.services.adapters.whatsapp import WhatsAppAdapter
-
-                        if isinstance(adapter, WhatsAppAdapter):
-                            await adapter.mark_as_read(msg_id)
-
-                    # Build metadata
-                    metadata: dict[str, Any] = {
-                        "platform": "whatsapp",
-                        "chat_id": sender,
-                        "user_id": sender,
-                        "message_id": msg_id,
-                        "message_type": msg_type,
-                    }
-
-                    # Extract contact name if available
-                    contacts = value.get("contacts", [])
-                    if contacts:
-                        profile = contacts[0].get("profile", {})
-                        metadata["display_name"] = profile.get("name", "")
-
-                    # Route through the adapter's on_message callback
-                    if adapter and adapter.on_message:
-                        response = await adapter.on_message(
-                            connection_id,
-                            sender,
-                            text,
-                            metadata,
-                        )
-
-                        # Send the response back
-                        if response.text or response.media:
-                            await adapter.send_response(sender, response)
-                    else:
-                        logger.warning(
-                            f"WhatsApp webhook: no active adapter for connection {connection_id}"
-                        )
-
-                except Exception as e:
-                    logger.error(f"Error processing WhatsApp message: {e}")
+            contacts = value.get("contacts", [])
+
+            for msg in value.get("messages", []):
+                msg_id = msg.get("id", "")
+                sender = msg.get("from", "")
+                if not msg_id or not sender:
+                    continue
+                await inbound_queue.enqueue(
+                    connection_id,
+                    "whatsapp",
+                    WebhookEvent(
+                        chat_id=sender,
+                        event_key=msg_id,
+                        payload={"message": msg, "contacts": contacts},
+                    ),
+                )
 
     return {"status": "ok"}
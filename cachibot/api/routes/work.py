@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
 
 from cachibot.api.auth import require_bot_access, require_bot_access_level
@@ -32,6 +32,7 @@ from cachibot.models.work import (
     Work,
     WorkStatus,
 )
+from cachibot.services.job_runner import notify_work_changed
 from cachibot.storage.work_repository import (
     FunctionRepository,
     ScheduleRepository,
@@ -304,7 +305,11 @@ class JobLogResponse(BaseModel):
 
 
 class JobResponse(BaseModel):
-    """Response model for a job."""
+    """Response model for a job.
+
+    ``logs`` holds the newest 200 entries; GET /jobs/{job_id}/logs pages
+    through the full history.
+    """
 
     id: str
     botId: str
@@ -754,6 +759,7 @@ async def run_function(
 
     if tasks:
         await task_repo.save_batch(tasks)
+        notify_work_changed(work.id)
 
     return WorkResponse.from_work(work, task_count=len(tasks), completed_count=0)
 
@@ -973,6 +979,7 @@ async def create_work(
             tasks.append(task)
         await task_repo.save_batch(tasks)
         task_count = len(tasks)
+        notify_work_changed(work.id)
 
     return WorkResponse.from_work(work, task_count, 0)
 
@@ -1025,6 +1032,7 @@ async def update_work(
         work.tags = request.tags
 
     await work_repo.update(work)
+    notify_work_changed(work_id)
 
     tasks = await task_repo.get_by_work(work_id)
     completed = sum(1 for t in tasks if t.status == TaskStatus.COMPLETED)
@@ -1041,6 +1049,7 @@ async def start_work(
     work = require_bot_ownership(await work_repo.get(work_id), bot_id, "Work")
 
     await work_repo.update_status(work_id, WorkStatus.IN_PROGRESS)
+    notify_work_changed(work_id)
     work = require_found(await work_repo.get(work_id), "Work")
 
     tasks = await task_repo.get_by_work(work_id)
@@ -1064,6 +1073,7 @@ async def complete_work(
     if result:
         work.result = result
     await work_repo.update(work)
+    notify_work_changed(work_id)
 
     tasks = await task_repo.get_by_work(work_id)
     return WorkResponse.from_work(work, len(tasks), len(tasks))
@@ -1080,6 +1090,7 @@ async def fail_work(
     work = require_bot_ownership(await work_repo.get(work_id), bot_id, "Work")
 
     await work_repo.update_status(work_id, WorkStatus.FAILED, error)
+    notify_work_changed(work_id)
     work = require_found(await work_repo.get(work_id), "Work")
 
     tasks = await task_repo.get_by_work(work_id)
@@ -1120,6 +1131,7 @@ async def delete_work(
     """Delete work (cascades to tasks and jobs)."""
     require_bot_ownership(await work_repo.get(work_id), bot_id, "Work")
     await work_repo.delete(work_id)
+    notify_work_changed(work_id)
 
 
 # =============================================================================
@@ -1186,6 +1198,7 @@ async def create_task(
         created_at=now,
     )
     await task_repo.save(task)
+    notify_work_changed(work_id)
     return TaskResponse.from_task(task)
 
 
@@ -1234,6 +1247,7 @@ async def update_task(
         task.error = request.error
 
     await task_repo.update(task)
+    notify_work_changed(task.work_id)
     return TaskResponse.from_task(task)
 
 
@@ -1247,6 +1261,7 @@ async def start_task(
     task = require_bot_ownership(await task_repo.get(task_id), bot_id, "Task")
 
     await task_repo.update_status(task_id, TaskStatus.IN_PROGRESS)
+    notify_work_changed(task.work_id)
 
     # Get attempt number
     existing_jobs = await job_repo.get_by_task(task_id)
@@ -1281,6 +1296,7 @@ async def complete_task(
     task = require_bot_ownership(await task_repo.get(task_id), bot_id, "Task")
 
     await task_repo.update_status(task_id, TaskStatus.COMPLETED, result=result)
+    notify_work_changed(task.work_id)
 
     # Update latest job
     latest_job = await job_repo.get_latest_for_task(task_id)
@@ -1315,6 +1331,7 @@ async def fail_task(
         await task_repo.update_status(task_id, TaskStatus.PENDING, error=error)
     else:
         await task_repo.update_status(task_id, TaskStatus.FAILED, error=error)
+    notify_work_changed(task.work_id)
 
     # Update latest job
     latest_job = await job_repo.get_latest_for_task(task_id)
@@ -1332,8 +1349,9 @@ async def delete_task(
     user: User = Depends(require_bot_access_level(BotAccessLevel.EDITOR)),
 ) -> None:
     """Delete a task."""
-    require_bot_ownership(await task_repo.get(task_id), bot_id, "Task")
+    task = require_bot_ownership(await task_repo.get(task_id), bot_id, "Task")
     await task_repo.delete(task_id)
+    notify_work_changed(task.work_id)
 
 
 # =============================================================================
@@ -1388,6 +1406,21 @@ async def get_job(
     return JobResponse.from_job(job)
 
 
+@router.get("/jobs/{job_id}/logs")
+async def get_job_logs(
+    bot_id: str,
+    job_id: str,
+    limit: int = Query(default=100, le=1000),
+    offset: int = 0,
+    user: User = Depends(require_bot_access),
+) -> list[JobLogResponse]:
+    """Get paginated log entries for a job, oldest first."""
+    require_bot_ownership(await job_repo.get_by_id(job_id), bot_id, "Job")
+
+    logs = await job_repo.get_logs(job_id, limit=limit, offset=offset)
+    return [JobLogResponse(**log) for log in logs]
+
+
 @router.post("/jobs/{job_id}/log")
 async def append_job_log(
     bot_id: str,
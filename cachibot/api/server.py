@@ -65,12 +65,15 @@ from cachibot.api.routes.webhooks import viber as wh_viber
 from cachibot.api.routes.webhooks import whatsapp as wh_whatsapp
 from cachibot.api.voice_websocket import router as voice_ws_router
 from cachibot.api.websocket import router as ws_router
+from cachibot.services.inbound_queue import get_inbound_queue
+from cachibot.services.ingestion_queue import get_ingestion_queue
 from cachibot.services.job_runner import get_job_runner
 from cachibot.services.log_retention import get_log_retention_service
 from cachibot.services.message_processor import get_message_processor
 from cachibot.services.platform_manager import get_platform_manager
 from cachibot.services.scheduler_service import get_scheduler_service
 from cachibot.storage.db import close_db, init_db
+from cachibot.storage.write_buffer import get_message_buffer
 
 # Find the frontend dist directory
 # 1. Bundled in the package (pip install case): cachibot/frontend_dist/
@@ -193,6 +196,14 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     job_runner = get_job_runner()
     await job_runner.start()
 
+    # Start the ingestion queue (document processing workers; resumes pending docs)
+    ingestion_queue = get_ingestion_queue()
+    await ingestion_queue.start()
+
+    # Start the inbound queue (answers acknowledged webhook messages; resumes pending)
+    inbound_queue = get_inbound_queue()
+    await inbound_queue.start()
+
     # Start the log retention service (cleans up old execution logs)
     log_retention = get_log_retention_service()
     await log_retention.start()
@@ -229,11 +240,19 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     except Exception:
         pass
     await log_retention.stop()
+    await inbound_queue.stop()
+    await ingestion_queue.stop()
     await job_runner.stop()
     await scheduler.stop()
     await platform_manager.stop_health_monitor()
     # Disconnect all platform adapters
     await platform_manager.disconnect_all()
+    # Write buffered chat messages before the database closes (close() logs
+    # the rows it could not write)
+    try:
+        await get_message_buffer().close()
+    except Exception:
+        pass
     await close_db()
     remove_pid_file()
 
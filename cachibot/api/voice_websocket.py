@@ -6,7 +6,6 @@ Uses mixed binary/JSON protocol: JSON for control messages, binary for audio chu
 """
 
 import asyncio
-import copy
 import json
 import logging
 import uuid
@@ -23,6 +22,7 @@ from cachibot.config import Config
 from cachibot.models.auth import User
 from cachibot.models.knowledge import BotMessage
 from cachibot.models.voice import VoiceMessage, VoiceMessageType, VoiceSettings, VoiceStartPayload
+from cachibot.services.conversation_summarizer import schedule_chat_summary
 from cachibot.services.voice_session import VoiceSession
 from cachibot.storage.repository import KnowledgeRepository
 
@@ -214,6 +214,7 @@ async def _run_voice_pipeline(
             metadata={"source": "voice"},
         )
         await repo.save_bot_message(assistant_msg)
+        schedule_chat_summary(session.bot_id, session.chat_id)
 
     await _send_json(websocket, VoiceMessage.turn_complete())
 
@@ -244,7 +245,7 @@ async def voice_websocket_endpoint(
     await websocket.accept()
 
     workspace = websocket.app.state.workspace
-    config = Config.load(workspace=workspace)
+    config = Config.snapshot(workspace=workspace)
 
     session: VoiceSession | None = None
     agent: CachibotAgent | None = None
@@ -292,8 +293,7 @@ async def voice_websocket_endpoint(
                     if start_payload.models and start_payload.models.get("default"):
                         effective_model = start_payload.models["default"]
                     if effective_model:
-                        agent_config = copy.deepcopy(config)
-                        agent_config.agent.model = effective_model
+                        agent_config = config.with_agent(model=effective_model)
 
                     # Build instruction delta sender for streaming instruction
                     # LLM output to the voice client in real time.
@@ -31,6 +31,7 @@ from cachibot.services.command_registry import (
     ParsedCommand,
     get_command_registry,
 )
+from cachibot.services.conversation_summarizer import schedule_chat_summary
 from cachibot.storage.repository import KnowledgeRepository, SkillsRepository
 
 logger = logging.getLogger(__name__)
@@ -160,7 +161,7 @@ async def websocket_endpoint(
     # Get workspace from app state
     workspace = websocket.app.state.workspace
 
-    config = Config.load(workspace=workspace)
+    config = Config.snapshot(workspace=workspace)
 
     async def on_approval(tool_name: str, action: str, details: dict[str, Any]) -> bool:
         """Handle approval request - sends to client and waits for response."""
@@ -626,6 +627,7 @@ async def run_agent(
                 metadata={"model": actual_model},
             )
             await repo.save_bot_message(assistant_msg)
+            schedule_chat_summary(bot_id, chat_id, bot_models)
 
             # Emit webhook event for new message
             try:
@@ -653,12 +655,15 @@ async def run_agent(
                 iterations=len(agent_result.steps) if agent_result else 0,
                 prompt_tokens=run_usage.get("prompt_tokens", 0),
                 completion_tokens=run_usage.get("completion_tokens", 0),
+                cached_prompt_tokens=run_usage.get("cached_prompt_tokens", 0),
+                cache_creation_tokens=run_usage.get("cache_creation_tokens", 0),
                 elapsed_ms=run_usage.get("total_elapsed_ms", 0.0),
                 tokens_per_second=run_usage.get("tokens_per_second", 0.0),
                 call_count=run_usage.get("call_count", 0),
                 errors=run_usage.get("errors", 0),
                 per_model=run_usage.get("per_model", {}),
                 latency_stats=run_usage.get("latency_stats", {}),
+                context=agent.context_usage,
             ),
         )
 
@@ -6,7 +6,7 @@ Handles loading and managing configuration from files and environment.
 
 import logging
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any
 
@@ -83,6 +83,9 @@ class AgentConfig:
     max_tokens: int = 4096  # Max output tokens per LLM call
     max_tool_result_length: int = 2000  # Truncate large tool results sent to the LLM
     max_depth: int = 5  # Max nested agent depth (Prompture recursion limit)
+    # Seconds per-bot setup (resolved environment, instructions, disabled
+    # capabilities) is reused between messages; edits invalidate it at once.
+    setup_cache_ttl: int = 300  # 0 = disabled
 
 
 @dataclass
@@ -131,6 +134,40 @@ class KnowledgeConfig:
     min_similarity: float = 0.3  # Minimum cosine similarity threshold
     embedding_model: str = "openai/text-embedding-3-small"  # provider/model or fastembed name
     max_history_messages: int = 10  # Context history limit
+    embed_batch_size: int = 64  # Chunks per embedding request during ingestion
+    embed_concurrency: int = 4  # Embedding requests in flight per document
+    embed_max_retries: int = 3  # Retries per batch (exponential backoff) before failing
+    embedding_cache_max_entries: int = 100000  # Shared chunk embedding cache rows (0 = no cap)
+    ingest_workers: int = 2  # Documents processed concurrently by the ingestion queue
+    ingest_processes: int = 2  # Processes for PDF/DOCX extraction (0 = thread executor)
+    ingest_embed_concurrency: int = 8  # Embedding requests in flight across all documents
+    # Approximate nearest-neighbour search ("exact", "hnsw", or "ivfflat").
+    # PostgreSQL builds the matching pgvector index; SQLite uses a local IVF index.
+    ann_mode: str = "exact"
+    ann_min_chunks: int = 20000  # Bots with fewer chunks keep exact search
+    hnsw_m: int = 16  # PostgreSQL HNSW graph degree
+    hnsw_ef_construction: int = 64  # PostgreSQL HNSW build-time candidate list
+    ef_search: int = 40  # HNSW query-time candidate list (per bot overridable)
+    ivf_lists: int = 0  # IVF cluster count (0 = auto: sqrt(chunks), 100 on PostgreSQL)
+    nprobe: int = 10  # IVF clusters scanned per query (per bot overridable)
+    query_cache_size: int = 1024  # Cached query embeddings (0 = disabled)
+    query_cache_ttl: int = 3600  # Seconds before a cached query embedding expires (0 = never)
+    query_cache_persist: bool = False  # Also keep the cache in ~/.cachibot/embedding_cache.db
+    hybrid_search: bool = True  # Fuse full-text (keyword) hits with vector results
+    rrf_k: int = 60  # Reciprocal rank fusion constant (higher = flatter rank weighting)
+    context_concurrent: bool = True  # Fetch prompt context sources concurrently
+    context_timeout: float = 2.0  # Seconds before a slow context source is skipped (0 = none)
+    context_documents_timeout: float = 5.0  # Same, for document retrieval (embedding + search)
+    # Token budget for injected context: min(context_max_tokens, model window * ratio).
+    # Over budget, the lowest-value items (contacts, old notes, oldest history) go first.
+    context_max_tokens: int = 6000  # 0 = no budget (include everything)
+    context_window_ratio: float = 0.25
+    # Rolling per-chat summary of messages older than max_history_messages,
+    # updated in the background with the utility model after each reply.
+    conversation_summary: bool = True
+    summary_min_messages: int = 6  # Older unsummarized messages needed before folding
+    summary_batch_size: int = 30  # Messages folded per utility model call
+    summary_max_chars: int = 2000  # Summary length cap
 
 
 @dataclass
@@ -165,6 +202,25 @@ class PlatformConfig:
     website_url: str = ""  # e.g. "https://cachibot.ai"
 
 
+@dataclass
+class MessagingConfig:
+    """Inbound platform message handling (Telegram, Discord, webhooks...)."""
+
+    # Agent runs in flight; each chat's messages are still handled one at a time
+    max_concurrent_runs: int = 8  # Across all bots (0 = unlimited)
+    max_concurrent_runs_per_bot: int = 4  # Per bot (0 = unlimited)
+    slow_wait_warning: float = 10.0  # Log messages queued longer than this (seconds)
+    # Connections with coalesce_messages enabled merge messages from a chat that
+    # arrive within coalesce_window seconds of each other into one turn.
+    coalesce_window: float = 1.5  # Per connection override: "coalesce_window" config key
+    coalesce_max_wait: float = 6.0  # A burst never stays open longer than this
+    # Webhook platforms (WhatsApp, LINE, Viber, custom) acknowledge deliveries
+    # immediately; a worker pool drains the persisted inbound queue.
+    inbound_workers: int = 4
+    inbound_max_attempts: int = 3  # Tries per event before it is marked failed
+    inbound_retention_hours: int = 24  # Keep handled events (redelivery dedup window)
+
+
 @dataclass
 class DatabaseConfig:
     """Database configuration.
@@ -179,6 +235,15 @@ class DatabaseConfig:
     max_overflow: int = 20
     pool_recycle: int = 3600  # seconds
     echo: bool = False
+    # SQLite: read-only connections that SELECTs run on while the single writer
+    # connection is busy (WAL allows concurrent readers). 0 = one shared connection.
+    # Pays off on multi-core hosts; see scripts/benchmark_sqlite_pool.py.
+    sqlite_readers: int = 0
+    sqlite_synchronous: str = "NORMAL"  # PRAGMA synchronous for the writer connection
+    # Chat messages are written in batches: after this many seconds or once
+    # write_behind_max_rows rows are pending. 0 = write each message immediately.
+    write_behind_interval: float = 0.005
+    write_behind_max_rows: int = 100
 
 
 @dataclass
@@ -207,6 +272,15 @@ class TelemetryConfig:
     last_sent: str = ""  # ISO timestamp of last telemetry batch
 
 
+# Process-wide snapshots: (workspace, config_file) -> (fingerprint, Config)
+_snapshots: dict[tuple[Path, Path | None], tuple[tuple[Any, ...], "Config"]] = {}
+
+
+def invalidate_config_snapshots() -> None:
+    """Drop cached ``Config.snapshot()`` results (after changing settings)."""
+    _snapshots.clear()
+
+
 @dataclass
 class Config:
     """
@@ -218,6 +292,10 @@ class Config:
     3. User's ~/.cachibot.toml
     4. Environment variables
     5. Defaults
+
+    ``load()`` builds a fresh, mutable instance every call. Hot paths that
+    only read settings use ``snapshot()`` instead, which shares one instance
+    per workspace until a TOML file changes or the snapshots are invalidated.
     """
 
     agent: AgentConfig = field(default_factory=AgentConfig)
@@ -230,6 +308,7 @@ class Config:
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
     smtp: SmtpConfig = field(default_factory=SmtpConfig)
     platform: PlatformConfig = field(default_factory=PlatformConfig)
+    messaging: MessagingConfig = field(default_factory=MessagingConfig)
     telemetry: TelemetryConfig = field(default_factory=TelemetryConfig)
     timezone: str = "UTC"
 
@@ -292,6 +371,78 @@ class Config:
 
         return config
 
+    @classmethod
+    def snapshot(
+        cls,
+        workspace: Path | str | None = None,
+        config_file: Path | str | None = None,
+    ) -> "Config":
+        """
+        Get the shared configuration for a workspace, reloading only on change.
+
+        The result is reused by every caller in the process and must be
+        treated as read-only; use ``with_agent()`` for per-request overrides
+        or ``load()`` for a private, mutable copy. It is rebuilt when the
+        user/workspace/explicit TOML files change (mtime and size) or after
+        ``invalidate_config_snapshots()``, which the settings routes call when
+        they write TOML or ``.env`` values. Environment variables are not
+        polled (reading ``os.environ`` costs as much as a reload), so code
+        that changes ``CACHIBOT_*`` variables directly must invalidate.
+
+        Args:
+            workspace: Working directory for the agent
+            config_file: Explicit config file path (optional)
+
+        Returns:
+            Shared Config instance
+        """
+        workspace_path = Path(workspace).resolve() if workspace else Path.cwd()
+        config_path = Path(config_file) if config_file else None
+        key = (workspace_path, config_path)
+        fingerprint = cls._snapshot_fingerprint(workspace_path, config_path)
+
+        cached = _snapshots.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        config = cls.load(workspace=workspace_path, config_file=config_path)
+        _snapshots[key] = (fingerprint, config)
+        return config
+
+    @staticmethod
+    def _snapshot_fingerprint(workspace_path: Path, config_path: Path | None) -> tuple[Any, ...]:
+        """Cheap change detector for the TOML files ``load()`` reads."""
+        paths = [
+            os.path.expanduser("~/.cachibot.toml"),
+            os.path.join(workspace_path, "cachibot.toml"),
+        ]
+        if config_path is not None:
+            paths.append(os.fspath(config_path))
+        stamps: list[tuple[int, int] | None] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def with_agent(self, **changes: Any) -> "Config":
+        """
+        Copy of this config with some ``agent`` settings replaced.
+
+        Copy-on-write: only the ``agent`` section is duplicated, every other
+        section is shared with ``self``, so both must be treated as
+        read-only. Replaces ``copy.deepcopy(config)`` for per-bot overrides.
+
+        Args:
+            **changes: ``AgentConfig`` fields to override (e.g. ``model``)
+
+        Returns:
+            New Config instance
+        """
+        return replace(self, agent=replace(self.agent, **changes))
+
     def _load_from_env(self) -> None:
         """Load configuration from environment variables."""
 
@@ -439,6 +590,8 @@ class Config:
                 self.agent.max_tokens = agent_data["max_tokens"]
             if "utility_model" in agent_data:
                 self.agent.utility_model = agent_data["utility_model"]
+            if "setup_cache_ttl" in agent_data:
+                self.agent.setup_cache_ttl = agent_data["setup_cache_ttl"]
 
         if sandbox_data := data.get("sandbox"):
             if "allowed_imports" in sandbox_data:
@@ -475,6 +628,66 @@ class Config:
                 self.knowledge.embedding_model = knowledge_data["embedding_model"]
             if "max_history_messages" in knowledge_data:
                 self.knowledge.max_history_messages = knowledge_data["max_history_messages"]
+            if "embed_batch_size" in knowledge_data:
+                self.knowledge.embed_batch_size = knowledge_data["embed_batch_size"]
+            if "embed_concurrency" in knowledge_data:
+                self.knowledge.embed_concurrency = knowledge_data["embed_concurrency"]
+            if "embed_max_retries" in knowledge_data:
+                self.knowledge.embed_max_retries = knowledge_data["embed_max_retries"]
+            if "embedding_cache_max_entries" in knowledge_data:
+                self.knowledge.embedding_cache_max_entries = knowledge_data[
+                    "embedding_cache_max_entries"
+                ]
+            if "ingest_workers" in knowledge_data:
+                self.knowledge.ingest_workers = knowledge_data["ingest_workers"]
+            if "ingest_processes" in knowledge_data:
+                self.knowledge.ingest_processes = knowledge_data["ingest_processes"]
+            if "ingest_embed_concurrency" in knowledge_data:
+                self.knowledge.ingest_embed_concurrency = knowledge_data["ingest_embed_concurrency"]
+            if "ann_mode" in knowledge_data:
+                self.knowledge.ann_mode = knowledge_data["ann_mode"]
+            if "ann_min_chunks" in knowledge_data:
+                self.knowledge.ann_min_chunks = knowledge_data["ann_min_chunks"]
+            if "hnsw_m" in knowledge_data:
+                self.knowledge.hnsw_m = knowledge_data["hnsw_m"]
+            if "hnsw_ef_construction" in knowledge_data:
+                self.knowledge.hnsw_ef_construction = knowledge_data["hnsw_ef_construction"]
+            if "ef_search" in knowledge_data:
+                self.knowledge.ef_search = knowledge_data["ef_search"]
+            if "ivf_lists" in knowledge_data:
+                self.knowledge.ivf_lists = knowledge_data["ivf_lists"]
+            if "nprobe" in knowledge_data:
+                self.knowledge.nprobe = knowledge_data["nprobe"]
+            if "query_cache_size" in knowledge_data:
+                self.knowledge.query_cache_size = knowledge_data["query_cache_size"]
+            if "query_cache_ttl" in knowledge_data:
+                self.knowledge.query_cache_ttl = knowledge_data["query_cache_ttl"]
+            if "query_cache_persist" in knowledge_data:
+                self.knowledge.query_cache_persist = knowledge_data["query_cache_persist"]
+            if "hybrid_search" in knowledge_data:
+                self.knowledge.hybrid_search = knowledge_data["hybrid_search"]
+            if "rrf_k" in knowledge_data:
+                self.knowledge.rrf_k = knowledge_data["rrf_k"]
+            if "context_concurrent" in knowledge_data:
+                self.knowledge.context_concurrent = knowledge_data["context_concurrent"]
+            if "context_timeout" in knowledge_data:
+                self.knowledge.context_timeout = knowledge_data["context_timeout"]
+            if "context_documents_timeout" in knowledge_data:
+                self.knowledge.context_documents_timeout = knowledge_data[
+                    "context_documents_timeout"
+                ]
+            if "context_max_tokens" in knowledge_data:
+                self.knowledge.context_max_tokens = knowledge_data["context_max_tokens"]
+            if "context_window_ratio" in knowledge_data:
+                self.knowledge.context_window_ratio = knowledge_data["context_window_ratio"]
+            if "conversation_summary" in knowledge_data:
+                self.knowledge.conversation_summary = knowledge_data["conversation_summary"]
+            if "summary_min_messages" in knowledge_data:
+                self.knowledge.summary_min_messages = knowledge_data["summary_min_messages"]
+            if "summary_batch_size" in knowledge_data:
+                self.knowledge.summary_batch_size = knowledge_data["summary_batch_size"]
+            if "summary_max_chars" in knowledge_data:
+                self.knowledge.summary_max_chars = knowledge_data["summary_max_chars"]
 
         if ca_data := data.get("coding_agents"):
             if "default_agent" in ca_data:
@@ -510,6 +723,26 @@ class Config:
             if "website_url" in platform_data:
                 self.platform.website_url = platform_data["website_url"]
 
+        if messaging_data := data.get("messaging"):
+            if "max_concurrent_runs" in messaging_data:
+                self.messaging.max_concurrent_runs = messaging_data["max_concurrent_runs"]
+            if "max_concurrent_runs_per_bot" in messaging_data:
+                self.messaging.max_concurrent_runs_per_bot = messaging_data[
+                    "max_concurrent_runs_per_bot"
+                ]
+            if "slow_wait_warning" in messaging_data:
+                self.messaging.slow_wait_warning = messaging_data["slow_wait_warning"]
+            if "coalesce_window" in messaging_data:
+                self.messaging.coalesce_window = messaging_data["coalesce_window"]
+            if "coalesce_max_wait" in messaging_data:
+                self.messaging.coalesce_max_wait = messaging_data["coalesce_max_wait"]
+            if "inbound_workers" in messaging_data:
+                self.messaging.inbound_workers = messaging_data["inbound_workers"]
+            if "inbound_max_attempts" in messaging_data:
+                self.messaging.inbound_max_attempts = messaging_data["inbound_max_attempts"]
+            if "inbound_retention_hours" in messaging_data:
+                self.messaging.inbound_retention_hours = messaging_data["inbound_retention_hours"]
+
         if smtp_data := data.get("smtp"):
             if "host" in smtp_data:
                 self.smtp.host = smtp_data["host"]
@@ -535,6 +768,14 @@ class Config:
                 self.database.pool_recycle = db_data["pool_recycle"]
             if "echo" in db_data:
                 self.database.echo = db_data["echo"]
+            if "sqlite_readers" in db_data:
+                self.database.sqlite_readers = db_data["sqlite_readers"]
+            if "sqlite_synchronous" in db_data:
+                self.database.sqlite_synchronous = db_data["sqlite_synchronous"]
+            if "write_behind_interval" in db_data:
+                self.database.write_behind_interval = db_data["write_behind_interval"]
+            if "write_behind_max_rows" in db_data:
+                self.database.write_behind_max_rows = db_data["write_behind_max_rows"]
 
         if telemetry_data := data.get("telemetry"):
             if "enabled" in telemetry_data:
@@ -596,6 +837,7 @@ class Config:
                 tomli_w.dump(data, f)
         except Exception as exc:
             logger.debug("Failed to write telemetry config: %s", exc)
+        invalidate_config_snapshots()
 
     def save_database_config(self) -> None:
         """Persist database settings to the user config file (~/.cachibot.toml)."""
@@ -628,6 +870,7 @@ class Config:
                 tomli_w.dump(data, f)
         except Exception as exc:
             logger.debug("Failed to write database config: %s", exc)
+        invalidate_config_snapshots()
 
     def save_smtp_config(self) -> None:
         """Persist SMTP settings to the user config file (~/.cachibot.toml)."""
@@ -672,6 +915,7 @@ class Config:
                 tomli_w.dump(data, f)
         except Exception as exc:
             logger.debug("Failed to write SMTP config: %s", exc)
+        invalidate_config_snapshots()
 
     def _save_section_manual(self, path: Path, section: str, values: dict[str, Any]) -> None:
         """Write a config section without tomli_w (plain-text TOML append)."""
@@ -703,6 +947,7 @@ class Config:
             path.write_text(content, encoding="utf-8")
         except Exception as exc:
             logger.debug("Failed to write %s config (manual): %s", section, exc)
+        invalidate_config_snapshots()
 
     def _save_telemetry_manual(self, path: Path) -> None:
         """Write telemetry config without tomli_w (plain-text TOML append)."""
@@ -736,6 +981,7 @@ class Config:
             path.write_text(content, encoding="utf-8")
         except Exception as exc:
             logger.debug("Failed to write telemetry config (manual): %s", exc)
+        invalidate_config_snapshots()
 
     def is_path_allowed(self, path: Path | str) -> bool:
         """
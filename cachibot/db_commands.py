@@ -1018,14 +1018,13 @@ BLOB_EMBEDDING_COLUMNS = {
 KEY_TABLES = ["users", "bots", "chats", "messages", "bot_messages", "bot_documents"]
 
 
-def _convert_blob_to_vector(blob: bytes | None) -> str | None:
-    """Convert SQLite BLOB (float32 array) to pgvector string literal."""
-    import struct as _struct
+def _convert_blob_to_vector(blob: bytes | str | None) -> str | None:
+    """Convert a SQLite embedding (binary BLOB or legacy JSON) to a pgvector literal."""
+    from cachibot.storage.embedding_codec import decode_embedding
 
     if blob is None:
         return None
-    num_floats = len(blob) // 4
-    floats = _struct.unpack(f"<{num_floats}f", blob)
+    floats = decode_embedding(blob)
     return "[" + ",".join(f"{f:.8f}" for f in floats) + "]"
 
 
@@ -32,6 +32,18 @@ class BotMessage(BaseModel):
     reply_to_id: str | None = None
 
 
+class ChatSummary(BaseModel):
+    """Rolling summary of a chat's messages up to a watermark."""
+
+    chat_id: str
+    bot_id: str
+    content: str
+    last_message_id: str
+    last_message_at: datetime
+    message_count: int = 0
+    updated_at: datetime
+
+
 class BotInstruction(BaseModel):
     """Custom instructions for a bot."""
 
@@ -54,6 +66,7 @@ class Document(BaseModel):
     status: DocumentStatus = DocumentStatus.PROCESSING
     uploaded_at: datetime
     processed_at: datetime | None = None
+    embedding_model: str | None = None
 
 
 class DocChunk(BaseModel):
@@ -65,6 +78,9 @@ class DocChunk(BaseModel):
     chunk_index: int
     content: str
     embedding: list[float] | None = None  # pgvector-compatible float list
+    page_number: int | None = None  # 1-based source page (paginated formats only)
+    char_start: int | None = None  # Offsets into the extracted document text
+    char_end: int | None = None
 
 
 class DocumentCreate(BaseModel):
@@ -147,6 +163,10 @@ class KnowledgeStats(BaseModel):
     total_chunks: int = 0
     total_notes: int = 0
     has_instructions: bool = False
+    embeddings_reused: int = 0  # This bot's chunks embedded from the content-hash cache
+    embedding_cache_entries: int = 0  # Shared content-hash cache size (all bots)
+    embedding_cache_hits: int = 0  # Shared content-hash cache hits (all bots)
+    query_embedding_cache: dict[str, Any] | None = None  # Process-wide cache counters
 
 
 class SearchRequest(BaseModel):
@@ -176,3 +196,6 @@ class ChunkResponse(BaseModel):
     document_id: str
     chunk_index: int
     content: str
+    page_number: int | None = None
+    char_start: int | None = None
+    char_end: int | None = None
@@ -84,6 +84,8 @@ class UsagePayload(BaseModel):
     total_tokens: int = Field(default=0)
     prompt_tokens: int = Field(default=0)
     completion_tokens: int = Field(default=0)
+    cached_prompt_tokens: int = Field(default=0)
+    cache_creation_tokens: int = Field(default=0)
     total_cost: float = Field(default=0.0)
     iterations: int = Field(default=0)
     elapsed_ms: float = Field(default=0.0)
@@ -92,6 +94,7 @@ class UsagePayload(BaseModel):
     errors: int = Field(default=0)
     per_model: dict[str, Any] = Field(default_factory=dict)
     latency_stats: dict[str, Any] = Field(default_factory=dict)
+    context: dict[str, Any] = Field(default_factory=dict)
 
 
 class ErrorPayload(BaseModel):
@@ -176,20 +179,31 @@ class WSMessage(BaseModel):
         iterations: int,
         prompt_tokens: int = 0,
         completion_tokens: int = 0,
+        cached_prompt_tokens: int = 0,
+        cache_creation_tokens: int = 0,
         elapsed_ms: float = 0.0,
         tokens_per_second: float = 0.0,
         call_count: int = 0,
         errors: int = 0,
         per_model: dict[str, Any] | None = None,
         latency_stats: dict[str, Any] | None = None,
+        context: dict[str, Any] | None = None,
     ) -> "WSMessage":
-        """Create a usage message."""
+        """Create a usage message.
+
+        ``cached_prompt_tokens`` / ``cache_creation_tokens`` are the prompt
+        tokens read from / written to the provider's prompt cache.
+        ``context`` is the token breakdown of the knowledge context packed
+        into the system prompt (budget, per-section tokens, dropped items).
+        """
         return cls(
             type=WSMessageType.USAGE,
             payload={
                 "totalTokens": tokens,
                 "promptTokens": prompt_tokens,
                 "completionTokens": completion_tokens,
+                "cachedPromptTokens": cached_prompt_tokens,
+                "cacheCreationTokens": cache_creation_tokens,
                 "totalCost": cost,
                 "iterations": iterations,
                 "elapsedMs": elapsed_ms,
@@ -198,6 +212,7 @@ class WSMessage(BaseModel):
                 "errors": errors,
                 "perModel": per_model or {},
                 "latencyStats": latency_stats or {},
+                "context": context or {},
             },
         )
 
@@ -266,8 +281,9 @@ class WSMessage(BaseModel):
         status: str,
         chunk_count: int | None = None,
         filename: str | None = None,
+        progress: int | None = None,
     ) -> "WSMessage":
-        """Create a document processing status event."""
+        """Create a document processing status event (progress is a percentage)."""
         payload: dict[str, Any] = {
             "botId": bot_id,
             "documentId": document_id,
@@ -275,6 +291,8 @@ class WSMessage(BaseModel):
         }
         if chunk_count is not None:
             payload["chunkCount"] = chunk_count
+        if progress is not None:
+            payload["progress"] = progress
         if filename:
             payload["filename"] = filename
         return cls(type=WSMessageType.DOCUMENT_STATUS, payload=payload)
@@ -124,6 +124,10 @@ class JobToolsPlugin(CachibotPlugin):
                         await task_repo.save(task)
                         created_tasks.append({"id": task.id, "title": task.title})
 
+                    from cachibot.services.job_runner import notify_work_changed
+
+                    notify_work_changed(work.id)
+
                 return json.dumps(
                     {
                         "id": work.id,
@@ -2,7 +2,7 @@
 Knowledge Base plugin — kb_search, kb_list.
 
 Gives bots the ability to search and list their knowledge base
-(documents and notes) using vector similarity and text search.
+(documents and notes) using hybrid vector + full-text search.
 """
 
 from tukuy.manifest import PluginManifest
@@ -36,8 +36,8 @@ class KnowledgePlugin(CachibotPlugin):
         @skill(  # type: ignore[untyped-decorator]
             name="kb_search",
             description="Search your knowledge base for relevant information. "
-            "Searches both uploaded documents (via vector similarity) and saved notes "
-            "(via text search). Use this when you need to find specific information "
+            "Searches both uploaded documents (by meaning and exact keywords) and saved "
+            "notes (via full-text search). Use this when you need to find specific information "
             "from your knowledge base to answer user questions.",
             category="knowledge",
             tags=["knowledge", "search", "rag", "documents"],
@@ -67,7 +67,7 @@ class KnowledgePlugin(CachibotPlugin):
             try:
                 results_parts: list[str] = []
 
-                # Search documents via vector similarity
+                # Search documents (vector similarity fused with keyword matches)
                 from cachibot.services.vector_store import get_vector_store
 
                 vector_store = get_vector_store()
@@ -85,7 +85,7 @@ class KnowledgePlugin(CachibotPlugin):
                             f"**[{i}] {source}** (relevance: {score})\n{content}\n"
                         )
 
-                # Search notes via text search
+                # Search notes via full-text search
                 from cachibot.storage.repository import NotesRepository
 
                 notes_repo = NotesRepository()
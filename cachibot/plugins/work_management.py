@@ -144,6 +144,10 @@ class WorkManagementPlugin(CachibotPlugin):
                         await task_repo.save(task)
                         created_tasks.append({"id": task.id, "title": task.title})
 
+                    from cachibot.services.job_runner import notify_work_changed
+
+                    notify_work_changed(work.id)
+
                 return json.dumps(
                     {
                         "id": work.id,
@@ -255,6 +259,10 @@ class WorkManagementPlugin(CachibotPlugin):
                 if status:
                     await work_repo.update_status(work_id, WorkStatus(status), error)
 
+                    from cachibot.services.job_runner import notify_work_changed
+
+                    notify_work_changed(work_id)
+
                 if progress is not None:
                     await work_repo.update_progress(work_id, float(progress))
 
@@ -32,6 +32,24 @@ class AdapterHealth:
     details: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class WebhookEvent:
+    """A verified webhook event, queued for processing by the inbound queue."""
+
+    chat_id: str
+    event_key: str  # Platform message/event ID; redeliveries share it
+    payload: dict[str, Any]
+
+
+@dataclass
+class InboundReply:
+    """The answer to a queued webhook event, waiting to be delivered."""
+
+    chat_id: str
+    response: PlatformResponse
+    metadata: dict[str, Any] = field(default_factory=dict)  # Platform extras (e.g. reply token)
+
+
 class BasePlatformAdapter(ABC):
     """Abstract base class for platform adapters."""
 
@@ -247,6 +265,29 @@ class BasePlatformAdapter(ABC):
         """
         pass
 
+    async def handle_inbound_event(self, payload: dict[str, Any]) -> InboundReply | None:
+        """Process one queued webhook event (see services/inbound_queue.py).
+
+        Webhook-based adapters override this to run the message through
+        on_message and return the reply without sending it; the inbound
+        queue delivers it through ``deliver_inbound_reply``. The turn is never
+        run twice, so raising here marks the event failed.
+
+        Args:
+            payload: The WebhookEvent payload stored by the webhook route.
+
+        Returns:
+            The reply to deliver, or None if there is nothing to send.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not handle queued webhook events")
+
+    async def deliver_inbound_reply(self, reply: InboundReply) -> None:
+        """Send a reply computed by ``handle_inbound_event``.
+
+        Raising retries only this delivery, with backoff.
+        """
+        await self.send_response(reply.chat_id, reply.response)
+
     async def send_and_get_id(self, chat_id: str, message: str) -> str | None:
         """Send a message and return its platform message ID.
 
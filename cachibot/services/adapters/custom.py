@@ -16,6 +16,7 @@ from cachibot.models.connection import BotConnection, ConnectionPlatform
 from cachibot.services.adapters.base import (
     AdapterHealth,
     BasePlatformAdapter,
+    InboundReply,
     MessageHandler,
     StatusChangeHandler,
 )
@@ -178,6 +179,30 @@ class CustomAdapter(BasePlatformAdapter):
         except Exception as e:
             logger.debug(f"Custom adapter send_message_status error: {e}")
 
+    async def handle_inbound_event(self, payload: dict[str, Any]) -> InboundReply | None:
+        """Answer one queued webhook message.
+
+        Args:
+            payload: The CustomWebhookPayload fields posted to the webhook.
+        """
+        if not self.on_message:
+            return None
+
+        chat_id = payload["chat_id"]
+        metadata: dict[str, Any] = {
+            "platform": "custom",
+            "chat_id": chat_id,
+            "user_id": payload.get("user_id") or chat_id,
+            "display_name": payload.get("display_name") or "",
+        }
+        if payload.get("metadata"):
+            metadata.update(payload["metadata"])
+
+        response = await self.on_message(self.connection_id, chat_id, payload["message"], metadata)
+        if response.text or response.media:
+            return InboundReply(chat_id, response)
+        return None
+
     async def health_check(self) -> AdapterHealth:
         """HEAD to base_url and return latency."""
         if not self._session or not self._running:
@@ -25,7 +25,10 @@ class DiscordAdapter(BasePlatformAdapter):
     platform_name: ClassVar[str] = "discord"
     display_name: ClassVar[str] = "Discord"
     required_config: ClassVar[list[str]] = ["token"]
-    optional_config: ClassVar[dict[str, str]] = {"strip_markdown": "Strip markdown from responses"}
+    optional_config: ClassVar[dict[str, str]] = {
+        "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
+    }
 
     def __init__(
         self,
@@ -15,7 +15,13 @@ import aiohttp
 
 from cachibot.models.connection import BotConnection, ConnectionPlatform
 from cachibot.models.platform import PlatformResponse
-from cachibot.services.adapters.base import BasePlatformAdapter, MessageHandler, StatusChangeHandler
+from cachibot.services.adapters.base import (
+    BasePlatformAdapter,
+    InboundReply,
+    MessageHandler,
+    StatusChangeHandler,
+    WebhookEvent,
+)
 from cachibot.services.adapters.registry import AdapterRegistry
 
 logger = logging.getLogger(__name__)
@@ -33,6 +39,7 @@ class LineAdapter(BasePlatformAdapter):
     required_config: ClassVar[list[str]] = ["channel_access_token", "channel_secret"]
     optional_config: ClassVar[dict[str, str]] = {
         "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
     }
 
     def __init__(
@@ -243,33 +250,69 @@ class LineAdapter(BasePlatformAdapter):
             logger.error(f"Failed to reply LINE message: {e}")
             return False
 
-    async def process_webhook(self, body: dict[str, Any], raw_body: bytes, signature: str) -> None:
-        """Process an incoming LINE webhook request.
-
-        Validates the signature, parses events, and dispatches messages
-        to the on_message handler.
+    def parse_webhook(
+        self, body: dict[str, Any], raw_body: bytes, signature: str
+    ) -> list[WebhookEvent]:
+        """Validate an incoming LINE webhook request and extract its text messages.
 
         Args:
             body: The parsed JSON request body.
             raw_body: The raw request body bytes for signature validation.
             signature: The X-Line-Signature header value.
+
+        Returns:
+            The text message events, ready for the inbound queue.
+
+        Raises:
+            ValueError: If the signature is invalid.
         """
         # Validate signature
         if not self._validate_signature(raw_body, signature):
             logger.warning(f"Invalid LINE webhook signature for connection {self.connection_id}")
             raise ValueError("Invalid signature")
 
-        events = body.get("events", [])
-        if not events:
+        events: list[WebhookEvent] = []
+        for event in body.get("events", []):
+            message = event.get("message", {})
+            if event.get("type") != "message" or message.get("type") != "text":
+                continue
+            event_key = event.get("webhookEventId") or message.get("id")
+            if not event_key:
+                continue
+            events.append(
+                WebhookEvent(
+                    chat_id=self._chat_id(event.get("source", {})),
+                    event_key=event_key,
+                    payload=event,
+                )
+            )
+        return events
+
+    async def handle_inbound_event(self, payload: dict[str, Any]) -> InboundReply | None:
+        """Answer one queued LINE message event."""
+        return await self._handle_event(payload)
+
+    async def deliver_inbound_reply(self, reply: InboundReply) -> None:
+        """Send a reply, through the reply token while it is still unused."""
+        reply_token = reply.metadata.pop("reply_token", "")
+        # Try reply first (faster, uses reply token); the token is single-use,
+        # so a retried delivery goes straight to a push message
+        if reply_token and await self.reply_message(reply_token, reply.response.text):
             return
+        await self.send_response(reply.chat_id, reply.response)
 
-        for event in events:
-            try:
-                await self._handle_event(event)
-            except Exception as e:
-                logger.error(f"Error handling LINE event: {e}")
+    @staticmethod
+    def _chat_id(source: dict[str, Any]) -> str:
+        """Group or room ID for group chats, otherwise the user ID."""
+        user_id: str = source.get("userId", "")
+        source_type = source.get("type", "user")
+        if source_type == "group":
+            return str(source.get("groupId", user_id))
+        if source_type == "room":
+            return str(source.get("roomId", user_id))
+        return user_id
 
-    async def _handle_event(self, event: dict[str, Any]) -> None:
+    async def _handle_event(self, event: dict[str, Any]) -> InboundReply | None:
         """Handle a single LINE webhook event.
 
         Args:
@@ -277,32 +320,25 @@ class LineAdapter(BasePlatformAdapter):
         """
         event_type = event.get("type")
         if event_type != "message":
-            return
+            return None
 
         message = event.get("message", {})
         if message.get("type") != "text":
-            return
+            return None
 
         text = message.get("text", "")
         if not text:
-            return
+            return None
 
         if not self.on_message:
-            return
+            return None
 
         # Extract source info
         source = event.get("source", {})
         user_id = source.get("userId", "")
         source_type = source.get("type", "user")
         reply_token = event.get("replyToken", "")
-
-        # Determine chat_id based on source type
-        if source_type == "group":
-            chat_id = source.get("groupId", user_id)
-        elif source_type == "room":
-            chat_id = source.get("roomId", user_id)
-        else:
-            chat_id = user_id
+        chat_id = self._chat_id(source)
 
         metadata: dict[str, Any] = {
             "platform": "line",
@@ -321,13 +357,6 @@ class LineAdapter(BasePlatformAdapter):
             metadata,
         )
 
-        # Send response back
         if response.text:
-            # Try reply first (faster, uses reply token)
-            if reply_token:
-                sent = await self.reply_message(reply_token, response.text)
-                if sent:
-                    return
-
-            # Fall back to push message
-            await self.send_response(chat_id, response)
+            return InboundReply(chat_id, response, {"reply_token": reply_token})
+        return None
@@ -29,7 +29,10 @@ class SlackAdapter(BasePlatformAdapter):
     platform_name: ClassVar[str] = "slack"
     display_name: ClassVar[str] = "Slack"
     required_config: ClassVar[list[str]] = ["bot_token", "app_token", "signing_secret"]
-    optional_config: ClassVar[dict[str, str]] = {"strip_markdown": "Strip markdown from responses"}
+    optional_config: ClassVar[dict[str, str]] = {
+        "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
+    }
 
     def __init__(
         self,
@@ -31,6 +31,7 @@ class TeamsAdapter(BasePlatformAdapter):
     optional_config: ClassVar[dict[str, str]] = {
         "tenant_id": "Tenant ID for single-tenant apps",
         "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
     }
 
     def __init__(
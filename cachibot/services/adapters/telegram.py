@@ -33,7 +33,10 @@ class TelegramAdapter(BasePlatformAdapter):
     platform_name: ClassVar[str] = "telegram"
     display_name: ClassVar[str] = "Telegram"
     required_config: ClassVar[list[str]] = ["token"]
-    optional_config: ClassVar[dict[str, str]] = {"strip_markdown": "Strip markdown from responses"}
+    optional_config: ClassVar[dict[str, str]] = {
+        "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
+    }
 
     def __init__(
         self,
@@ -11,11 +11,14 @@ import time
 from typing import Any, ClassVar
 
 from cachibot.models.connection import BotConnection, ConnectionPlatform
+from cachibot.models.platform import PlatformResponse
 from cachibot.services.adapters.base import (
     AdapterHealth,
     BasePlatformAdapter,
+    InboundReply,
     MessageHandler,
     StatusChangeHandler,
+    WebhookEvent,
 )
 from cachibot.services.adapters.registry import AdapterRegistry
 
@@ -35,6 +38,7 @@ class ViberAdapter(BasePlatformAdapter):
     optional_config: ClassVar[dict[str, str]] = {
         "bot_avatar": "URL for bot avatar",
         "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
     }
 
     def __init__(
@@ -251,87 +255,106 @@ class ViberAdapter(BasePlatformAdapter):
         ).hexdigest()
         return hmac.compare_digest(expected, signature)
 
-    async def process_webhook(self, body: dict[str, Any], raw_body: bytes, signature: str) -> None:
-        """Process an incoming Viber webhook event.
+    def parse_webhook(
+        self, body: dict[str, Any], raw_body: bytes, signature: str
+    ) -> list[WebhookEvent]:
+        """Validate an incoming Viber webhook event.
 
-        Validates the signature and routes the event to the appropriate handler.
+        Message and conversation_started events are returned for the inbound
+        queue; informational events are only logged.
 
         Args:
             body: The parsed JSON body of the webhook request.
             raw_body: The raw request body bytes for signature validation.
             signature: The X-Viber-Content-Signature header value.
+
+        Returns:
+            The events to queue (at most one).
+
+        Raises:
+            ValueError: If the signature is invalid.
         """
         # Validate signature
         if not self._validate_signature(raw_body, signature):
             logger.warning(f"Invalid Viber webhook signature for connection {self.connection_id}")
-            return
+            raise ValueError("Invalid signature")
 
         event_type = body.get("event")
+        event_key = str(body.get("message_token", ""))
 
         if event_type == "message":
-            await self._handle_message_event(body)
+            chat_id = body.get("sender", {}).get("id", "")
         elif event_type == "conversation_started":
-            await self._handle_conversation_started(body)
+            chat_id = body.get("user", {}).get("id", "")
         elif event_type in ("subscribed", "unsubscribed"):
             user = body.get("user", {})
             user_name = user.get("name", "Unknown")
             logger.info(f"Viber user {user_name} {event_type} for connection {self.connection_id}")
+            return []
         elif event_type == "webhook":
             # Viber sends this as confirmation when webhook is set
             logger.info(f"Viber webhook confirmed for connection {self.connection_id}")
+            return []
         else:
             logger.debug(f"Unhandled Viber event type: {event_type}")
+            return []
+
+        if not chat_id or not event_key:
+            return []
+        return [WebhookEvent(chat_id=chat_id, event_key=event_key, payload=body)]
+
+    async def handle_inbound_event(self, payload: dict[str, Any]) -> InboundReply | None:
+        """Handle one queued Viber event."""
+        if payload.get("event") == "conversation_started":
+            return self._handle_conversation_started(payload)
+        return await self._handle_message_event(payload)
 
-    async def _handle_message_event(self, body: dict[str, Any]) -> None:
+    async def _handle_message_event(self, body: dict[str, Any]) -> InboundReply | None:
         """Handle a Viber 'message' event.
 
         Args:
             body: The parsed webhook body containing sender and message data.
         """
         if not self.on_message:
-            return
+            return None
+
+        sender = body.get("sender", {})
+        message = body.get("message", {})
+
+        user_id = sender.get("id", "")
+        username = sender.get("name", "")
+        avatar = sender.get("avatar", "")
+        text = message.get("text", "")
+
+        # Skip empty messages
+        if not text:
+            return None
+
+        metadata: dict[str, Any] = {
+            "platform": "viber",
+            "user_id": user_id,
+            "username": username,
+            "avatar": avatar,
+            "event_type": "message",
+            "message_token": body.get("message_token"),
+        }
 
-        try:
-            sender = body.get("sender", {})
-            message = body.get("message", {})
-
-            user_id = sender.get("id", "")
-            username = sender.get("name", "")
-            avatar = sender.get("avatar", "")
-            text = message.get("text", "")
-
-            # Skip empty messages
-            if not text:
-                return
-
-            metadata: dict[str, Any] = {
-                "platform": "viber",
-                "user_id": user_id,
-                "username": username,
-                "avatar": avatar,
-                "event_type": "message",
-                "message_token": body.get("message_token"),
-            }
-
-            # Call the message handler
-            response = await self.on_message(
-                self.connection_id,
-                user_id,
-                text,
-                metadata,
-            )
-
-            # Send response back
-            if response.text or response.media:
-                await self.send_response(user_id, response)
+        # Call the message handler
+        response = await self.on_message(
+            self.connection_id,
+            user_id,
+            text,
+            metadata,
+        )
 
-        except Exception as e:
-            logger.error(f"Error handling Viber message: {e}")
+        if response.text or response.media:
+            return InboundReply(user_id, response)
+        return None
 
-    async def _handle_conversation_started(self, body: dict[str, Any]) -> None:
+    def _handle_conversation_started(self, body: dict[str, Any]) -> InboundReply | None:
         """Handle a Viber 'conversation_started' event (new user).
 
-        Sends a welcome message to the new user.
+        Returns a welcome message for the new user.
 
         Args:
             body: The parsed webhook body.
@@ -345,8 +368,8 @@ class ViberAdapter(BasePlatformAdapter):
         )
 
         # Send a welcome message
-        if user_id:
-            await self.send_message(
-                user_id,
-                f"Hello {user_name}! How can I help you today?",
-            )
+        if not user_id:
+            return None
+        return InboundReply(
+            user_id, PlatformResponse(text=f"Hello {user_name}! How can I help you today?")
+        )
@@ -16,6 +16,7 @@ from cachibot.models.connection import BotConnection, ConnectionPlatform
 from cachibot.services.adapters.base import (
     AdapterHealth,
     BasePlatformAdapter,
+    InboundReply,
     MessageHandler,
     StatusChangeHandler,
 )
@@ -41,6 +42,7 @@ class WhatsAppAdapter(BasePlatformAdapter):
     ]
     optional_config: ClassVar[dict[str, str]] = {
         "strip_markdown": "Strip markdown from responses",
+        "coalesce_messages": "Merge quick consecutive messages into one reply",
     }
 
     def __init__(
@@ -170,6 +172,56 @@ class WhatsAppAdapter(BasePlatformAdapter):
         except Exception as e:
             logger.warning(f"Failed to mark WhatsApp message as read: {e}")
 
+    async def handle_inbound_event(self, payload: dict[str, Any]) -> InboundReply | None:
+        """Answer one queued webhook message.
+
+        Args:
+            payload: {"message": <webhook message>, "contacts": <webhook contacts>}.
+        """
+        msg = payload.get("message", {})
+        sender = msg.get("from", "")
+        msg_id = msg.get("id", "")
+        msg_type = msg.get("type", "")
+
+        # Extract text content based on message type
+        text = ""
+        if msg_type == "text":
+            text = msg.get("text", {}).get("body", "")
+        elif msg_type == "button":
+            text = msg.get("button", {}).get("text", "")
+        elif msg_type == "interactive":
+            interactive = msg.get("interactive", {})
+            if interactive.get("type") == "button_reply":
+                text = interactive.get("button_reply", {}).get("title", "")
+            elif interactive.get("type") == "list_reply":
+                text = interactive.get("list_reply", {}).get("title", "")
+
+        if not text or not self.on_message:
+            return None
+
+        # Mark message as read (best-effort)
+        if msg_id:
+            await self.mark_as_read(msg_id)
+
+        metadata: dict[str, Any] = {
+            "platform": "whatsapp",
+            "chat_id": sender,
+            "user_id": sender,
+            "message_id": msg_id,
+            "message_type": msg_type,
+        }
+
+        # Extract contact name if available
+        contacts = payload.get("contacts", [])
+        if contacts:
+            profile = contacts[0].get("profile", {})
+            metadata["display_name"] = profile.get("name", "")
+
+        response = await self.on_message(self.connection_id, sender, text, metadata)
+        if response.text or response.media:
+            return InboundReply(sender, response)
+        return None
+
     async def health_check(self) -> AdapterHealth:
         """Check connectivity to the WhatsApp Graph API.
 
@@ -0,0 +1,140 @@
+"""
+Agent Setup Cache
+
+Every message builds a fresh ``CachibotAgent``, but most of the inputs to
+that build do not depend on the message: the platform's disabled
+capabilities, public model aliases and the bot's custom instruction records.
+This cache keeps those per bot so agent setup costs a few milliseconds
+instead of a round of database queries. (The resolved environment has its
+own cache in ``bot_environment``, revalidated against ``bots.env_version``.)
+
+Entries are stamped with a version. Changing a bot, its skill configs or
+instructions bumps that bot's version; platform wide changes (provider keys,
+platform environment, tool config) bump the global version. A TTL bounds
+staleness for changes made outside this process (e.g. another worker or
+direct database edits).
+
+The compiled tool registry is deliberately not cached: plugins capture the
+chat ID and per-connection callbacks, so sharing a registry between turns
+would leak one request's state into another.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AgentSetupCache:
+    """Versioned LRU + TTL cache of request-independent agent setup.
+
+    Args:
+        ttl_seconds: Entry lifetime (0 = caching disabled).
+        max_entries: Capacity; least recently used entries are evicted.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        # key -> (version, created_at, value)
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, int], float, Any]] = OrderedDict()
+        self._global_version = 0
+        self._bot_versions: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, bot_id: str | None = None) -> tuple[int, int]:
+        """Current version stamp for *bot_id* (or for platform-wide entries)."""
+        bot_version = self._bot_versions.get(bot_id, 0) if bot_id else 0
+        return self._global_version, bot_version
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        bot_id: str | None = None,
+    ) -> T:
+        """Return the cached value for *key*, calling *loader* on a miss.
+
+        Entries scoped to a bot must pass its *bot_id* so per-bot
+        invalidation reaches them. Loader exceptions propagate and nothing
+        is cached.
+        """
+        if not self.ttl_seconds:
+            return await loader()
+
+        version = self.version(bot_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, created_at, value = entry
+            if entry_version == version and time.monotonic() - created_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value  # type: ignore[no-any-return]
+            del self._entries[key]
+
+        self.misses += 1
+        value = await loader()
+        # Stored under the version seen before loading: if an invalidation
+        # raced the load, the entry is already stale and reloads next time.
+        self._entries[key] = (version, time.monotonic(), value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate_bot(self, bot_id: str) -> None:
+        """Drop everything cached for one bot."""
+        self._bot_versions[bot_id] = self._bot_versions.get(bot_id, 0) + 1
+
+    def invalidate_all(self) -> None:
+        """Drop everything (platform-wide setting changed)."""
+        self._global_version += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton
+_agent_setup_cache: AgentSetupCache | None = None
+
+
+def get_agent_setup_cache() -> AgentSetupCache:
+    """Get the shared agent setup cache (config-aware)."""
+    global _agent_setup_cache
+    if _agent_setup_cache is None:
+        ttl = 300
+        try:
+            from cachibot.config import Config
+
+            ttl = Config.snapshot().agent.setup_cache_ttl
+        except Exception:
+            logger.debug("Using default agent setup cache TTL", exc_info=True)
+        _agent_setup_cache = AgentSetupCache(ttl_seconds=ttl)
+    return _agent_setup_cache
+
+
+def invalidate_bot_agent(bot_id: str) -> None:
+    """Forget cached agent setup for a bot after its configuration changed."""
+    if _agent_setup_cache is not None:
+        _agent_setup_cache.invalidate_bot(bot_id)
+
+
+def invalidate_agent_setup() -> None:
+    """Forget all cached agent setup after a platform-wide change."""
+    if _agent_setup_cache is not None:
+        _agent_setup_cache.invalidate_all()
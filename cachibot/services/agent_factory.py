@@ -9,9 +9,9 @@ merging, context building, and dynamic instructions.
 
 from __future__ import annotations
 
-import copy
 import logging
 from collections.abc import Callable
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -19,6 +19,7 @@ if TYPE_CHECKING:
 
 from cachibot.agent import CachibotAgent, load_disabled_capabilities, load_dynamic_instructions
 from cachibot.config import Config
+from cachibot.services.agent_cache import get_agent_setup_cache
 from cachibot.services.context_builder import get_context_builder
 from cachibot.services.driver_factory import build_driver_with_key
 
@@ -30,28 +31,36 @@ async def _resolve_public_id(model: str) -> str:
 
     Uses a raw query against the shared model_toggles table (managed by the
     CachiBotWebsite codebase) so we don't need a full ORM model here.
-    Returns *model* unchanged when there is no match.
+    Returns *model* unchanged when there is no match. Lookups are cached
+    (the table is edited outside this process, so only the TTL applies).
     """
     try:
-        from sqlalchemy import text as sa_text
-
-        from cachibot.storage.db import ensure_initialized
-
-        session_maker = ensure_initialized()
-        async with session_maker() as session:
-            result = await session.execute(
-                sa_text("SELECT model_id FROM model_toggles WHERE public_id = :pid"),
-                {"pid": model},
-            )
-            row = result.first()
-            if row:
-                logger.debug("Resolved public_id %r → %r", model, row[0])
-                return str(row[0])
+        return await get_agent_setup_cache().get_or_load(
+            ("public_id", model), partial(_lookup_public_id, model)
+        )
     except Exception:
         logger.debug("public_id resolution skipped for %r", model, exc_info=True)
     return model
 
 
+async def _lookup_public_id(model: str) -> str:
+    from sqlalchemy import text as sa_text
+
+    from cachibot.storage.db import ensure_initialized
+
+    session_maker = ensure_initialized()
+    async with session_maker() as session:
+        result = await session.execute(
+            sa_text("SELECT model_id FROM model_toggles WHERE public_id = :pid"),
+            {"pid": model},
+        )
+        row = result.first()
+    if row:
+        logger.debug("Resolved public_id %r → %r", model, row[0])
+        return str(row[0])
+    return model
+
+
 # Instruction block appended to the system prompt when the codingAgent
 # capability is enabled, telling the LLM how to handle @agent mentions.
 CODING_AGENT_MENTION_INSTRUCTIONS = """
@@ -73,20 +82,27 @@ async def resolve_bot_env(
 ) -> tuple[Any, Any]:
     """Resolve per-bot environment and build a driver.
 
+    The request-independent layers are served from the shared
+    ``EnvironmentCache`` while the bot's ``env_version`` is unchanged.
+    Drivers are cheap to construct but stateful, so each call gets its own.
+
     Returns:
         A tuple of (ResolvedEnvironment | None, driver | None).
         On failure (DB unreachable, missing master key), returns (None, None)
         and logs a warning so the agent falls back to global keys.
     """
     try:
-        from cachibot.services.bot_environment import BotEnvironmentService
+        from cachibot.services.bot_environment import (
+            BotEnvironmentService,
+            get_environment_cache,
+        )
         from cachibot.services.encryption import get_encryption_service
         from cachibot.storage.db import ensure_initialized
 
         session_maker = ensure_initialized()
         async with session_maker() as session:
             encryption = get_encryption_service()
-            env_service = BotEnvironmentService(session, encryption)
+            env_service = BotEnvironmentService(session, encryption, cache=get_environment_cache())
             resolved = await env_service.resolve(
                 bot_id, platform=platform, request_overrides=request_overrides
             )
@@ -181,8 +197,7 @@ async def build_bot_agent(
         effective_model = await _resolve_public_id(effective_model)
 
     if effective_model:
-        agent_config = copy.deepcopy(config)
-        agent_config.agent.model = effective_model
+        agent_config = config.with_agent(model=effective_model)
 
     # 3. Environment resolution — if not pre-passed and bot_id exists
     resolved_env = provider_environment
@@ -201,19 +216,29 @@ async def build_bot_agent(
         for skill_name, skill_cfg in resolved_env.skill_configs.items():
             merged_tool_configs.setdefault(skill_name, {}).update(skill_cfg)
 
-    # 5. Context building — if user_message is provided
+    # 5. Context building — if user_message is provided. Stable sections
+    # (skills, instructions, contacts) extend the prompt prefix; the
+    # message-dependent ones become the suffix, placed after every other
+    # section so the prefix stays cacheable by the provider.
     enhanced_prompt = base_system_prompt
+    prompt_suffix: str | None = None
+    context_usage: dict[str, Any] | None = None
     if user_message and bot_id:
         try:
             context_builder = get_context_builder()
-            enhanced_prompt = await context_builder.build_enhanced_system_prompt(
+            parts = await context_builder.build_prompt_parts(
                 base_prompt=base_system_prompt,
                 bot_id=bot_id,
                 user_message=user_message,
                 chat_id=chat_id,
                 include_contacts=include_contacts,
                 enabled_skills=enabled_skills,
+                model=agent_config.agent.model,
             )
+            enhanced_prompt = parts.prefix
+            prompt_suffix = parts.suffix or None
+            if parts.context.packing is not None:
+                context_usage = parts.context.packing.to_dict()
         except Exception as e:
             logger.warning(
                 "Context building failed for bot %s chat %s: %s",
@@ -222,6 +247,7 @@ async def build_bot_agent(
                 e,
             )
             enhanced_prompt = base_system_prompt
+            prompt_suffix = None
 
     # 6. Coding agent injection
     if inject_coding_agent:
@@ -259,6 +285,7 @@ async def build_bot_agent(
     agent = CachibotAgent(
         config=agent_config,
         system_prompt_override=enhanced_prompt,
+        system_prompt_suffix=prompt_suffix,
         capabilities=capabilities,
         bot_id=bot_id,
         chat_id=chat_id,
@@ -273,6 +300,7 @@ async def build_bot_agent(
         on_artifact=on_artifact,
         platform_metadata=platform_metadata,
         workspace=workspace,
+        context_usage=context_usage,
     )
 
     # 8. Dynamic instructions
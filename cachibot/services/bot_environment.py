@@ -3,22 +3,31 @@ Per-bot environment resolution service.
 
 Merges five configuration layers (Global -> Platform -> Bot -> Skill -> Request)
 to produce a fully-resolved environment for a single bot request. API keys are
-decrypted from the database per-request and NEVER placed in ``os.environ``.
+decrypted from the database and NEVER placed in ``os.environ``.
+
+Resolutions can be cached per (bot, platform) in an ``EnvironmentCache``.
+Each cache hit is revalidated against the bot's ``env_version`` column (one
+primary-key read), which every environment change bumps, so edits made by
+any worker are seen on the next request.
 """
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
 import os
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from cachibot.api.routes.providers import PROVIDERS
 from cachibot.services.encryption import EncryptionService
+from cachibot.storage.models.bot import Bot
 from cachibot.storage.models.env_var import BotEnvironment as BotEnvironmentModel
 from cachibot.storage.models.env_var import BotSkillConfig, PlatformEnvironment
 
@@ -60,16 +69,87 @@ class ResolvedEnvironment:
     budget_fallback_models: list[str] = field(default_factory=list)
 
 
+class EnvironmentCache:
+    """In-process cache of resolved environments, keyed by (bot_id, platform).
+
+    Entries carry the bot's ``env_version`` at load time and are only served
+    while that still matches. The TTL bounds staleness of the global layer
+    (``os.environ`` and config), which has no version.
+
+    Args:
+        ttl_seconds: Entry lifetime (0 = caching disabled).
+        max_entries: Capacity; least recently used entries are evicted.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        # (bot_id, platform) -> (env_version, created_at, env)
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[int | None, float, ResolvedEnvironment]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bot_id: str, platform: str, version: int | None) -> ResolvedEnvironment | None:
+        """Return a copy of the cached environment if it is still current."""
+        key = (bot_id, platform)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, created_at, env = entry
+            if entry_version == version and time.monotonic() - created_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(env)
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(
+        self, bot_id: str, platform: str, version: int | None, env: ResolvedEnvironment
+    ) -> None:
+        """Store a copy of *env* under the version read before it was loaded."""
+        self._entries[(bot_id, platform)] = (version, time.monotonic(), copy.deepcopy(env))
+        self._entries.move_to_end((bot_id, platform))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, bot_id: str | None = None) -> None:
+        """Drop entries for one bot, or all entries when *bot_id* is None."""
+        if bot_id is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == bot_id]:
+            del self._entries[key]
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
 class BotEnvironmentService:
     """Resolves the effective environment for a bot by merging all 5 layers.
 
-    v1 design: per-request DB lookup, no caching. The overhead is <2ms
-    compared to 200-5000ms LLM API calls.
+    Without a cache every call performs a full DB lookup and decrypts every
+    key. With one, layers 1-4 are reused while the bot's ``env_version`` is
+    unchanged; request overrides are always applied to a fresh copy.
     """
 
-    def __init__(self, db_session: AsyncSession, encryption_service: EncryptionService) -> None:
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        encryption_service: EncryptionService,
+        cache: EnvironmentCache | None = None,
+    ) -> None:
         self._db = db_session
         self._encryption = encryption_service
+        self._cache = cache
 
     async def resolve(
         self,
@@ -87,6 +167,47 @@ class BotEnvironmentService:
         Returns:
             A ``ResolvedEnvironment`` with all layers merged.
         """
+        cache = self._cache if self._cache is not None and self._cache.ttl_seconds else None
+        version: int | None = None
+        env: ResolvedEnvironment | None = None
+        if cache is not None:
+            version = await self._get_env_version(bot_id)
+            env = cache.get(bot_id, platform, version)
+
+        if env is None:
+            env = await self._resolve_layers(bot_id, platform)
+            if cache is not None:
+                cache.put(bot_id, platform, version, env)
+
+        # Layer 5: Request overrides
+        if request_overrides:
+            env = self.apply_request_overrides(env, request_overrides)
+
+        return env
+
+    async def invalidate(self, bot_id: str | None = None) -> None:
+        """Mark a bot's environment as changed (all bots when *bot_id* is None).
+
+        Bumps ``bots.env_version`` in the current session, so the caller's
+        commit makes the change visible to every worker, and drops this
+        process's cached entries right away.
+        """
+        stmt = update(Bot).values(env_version=Bot.env_version + 1)
+        if bot_id is not None:
+            stmt = stmt.where(Bot.id == bot_id)
+        await self._db.execute(stmt)
+
+        cache = self._cache if self._cache is not None else _environment_cache
+        if cache is not None:
+            cache.invalidate(bot_id)
+
+    async def _get_env_version(self, bot_id: str) -> int | None:
+        """Current ``env_version`` of a bot (None if the bot is not synced)."""
+        result = await self._db.execute(select(Bot.env_version).where(Bot.id == bot_id))
+        return result.scalar_one_or_none()
+
+    async def _resolve_layers(self, bot_id: str, platform: str) -> ResolvedEnvironment:
+        """Load and merge layers 1-4 from the environment and the DB."""
         # Layer 1: Global (os.environ / Config defaults)
         env = self._load_global_defaults()
 
@@ -101,19 +222,8 @@ class BotEnvironmentService:
         # Layer 4: Skill configs
         env.skill_configs = await self._load_skill_configs(bot_id)
 
-        # Layer 5: Request overrides
-        if request_overrides:
-            env = self._apply_request_overrides(env, request_overrides)
-
         return env
 
-    def invalidate(self, bot_id: str) -> None:
-        """Invalidate cache when admin updates a bot's environment.
-
-        v1: no-op (per-request DB lookup, no cache).
-        v2: will implement TTL-based cache invalidation.
-        """
-
     # ── Layer loaders ─────────────────────────────────────────────────────
 
     def _load_global_defaults(self) -> ResolvedEnvironment:
@@ -138,7 +248,7 @@ class BotEnvironmentService:
         try:
             from cachibot.config import Config
 
-            config = Config.load()
+            config = Config.snapshot()
             env.model = config.agent.model
             env.temperature = config.agent.temperature
             env.max_tokens = config.agent.max_tokens
@@ -160,16 +270,16 @@ class BotEnvironmentService:
             select(PlatformEnvironment).where(PlatformEnvironment.platform == platform)
         )
         rows = result.scalars().all()
+        values = self._encryption.decrypt_many(
+            ((row.value_encrypted, row.nonce, row.salt) for row in rows), bot_id=None
+        )
 
         overrides: dict[str, Any] = {}
-        for row in rows:
-            try:
-                value = self._encryption.decrypt_value(
-                    row.value_encrypted, row.nonce, row.salt, bot_id=None
-                )
-                overrides[row.key] = value
-            except Exception:
+        for row, value in zip(rows, values):
+            if value is None:
                 logger.warning("Failed to decrypt platform env key '%s'", row.key)
+            else:
+                overrides[row.key] = value
 
         return overrides
 
@@ -179,16 +289,16 @@ class BotEnvironmentService:
             select(BotEnvironmentModel).where(BotEnvironmentModel.bot_id == bot_id)
         )
         rows = result.scalars().all()
+        values = self._encryption.decrypt_many(
+            ((row.value_encrypted, row.nonce, row.salt) for row in rows), bot_id=bot_id
+        )
 
         overrides: dict[str, Any] = {}
-        for row in rows:
-            try:
-                value = self._encryption.decrypt_value(
-                    row.value_encrypted, row.nonce, row.salt, bot_id=bot_id
-                )
-                overrides[row.key] = value
-            except Exception:
+        for row, value in zip(rows, values):
+            if value is None:
                 logger.warning("Failed to decrypt bot env key '%s' for bot %s", row.key, bot_id)
+            else:
+                overrides[row.key] = value
 
         return overrides
 
@@ -305,8 +415,8 @@ class BotEnvironmentService:
 
         return base
 
-    def _apply_request_overrides(
-        self,
+    @staticmethod
+    def apply_request_overrides(
         env: ResolvedEnvironment,
         overrides: dict[str, Any],
     ) -> ResolvedEnvironment:
@@ -419,3 +529,28 @@ class BotEnvironmentContext:
         if self._resolved is None:
             raise RuntimeError("BotEnvironmentContext is not active — use 'async with'")
         return self._resolved
+
+
+# Singleton
+_environment_cache: EnvironmentCache | None = None
+
+
+def get_environment_cache() -> EnvironmentCache:
+    """Get the shared environment cache (config-aware)."""
+    global _environment_cache
+    if _environment_cache is None:
+        ttl = 300
+        try:
+            from cachibot.config import Config
+
+            ttl = Config.snapshot().agent.setup_cache_ttl
+        except Exception:
+            logger.debug("Using default environment cache TTL", exc_info=True)
+        _environment_cache = EnvironmentCache(ttl_seconds=ttl)
+    return _environment_cache
+
+
+def clear_environment_cache() -> None:
+    """Drop this process's cached environments (e.g. after ``os.environ`` changed)."""
+    if _environment_cache is not None:
+        _environment_cache.invalidate()
@@ -0,0 +1,209 @@
+"""
+Chat Dispatcher
+
+Schedules agent runs for incoming platform messages. Without it every
+Telegram/Discord/webhook message ran its agent turn as soon as it arrived,
+so a burst from a large group could start dozens of LLM runs at once and
+two quick messages from one user could be answered out of order.
+
+Runs are serialized per ``(connection_id, chat_id)`` lane, so a chat's
+messages are handled one at a time in arrival order, while different chats
+run in parallel up to a global limit and a per-bot limit. Queue depth, wait
+times and active runs are tracked for ``stats()``.
+
+Callers that serialize a chat themselves (the inbound webhook queue) can
+let the chat's next message go as soon as this one has its place in the
+order, via ``chat_handoff`` and ``hand_off_chat``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Recent wait times kept for the stats window
+_WAIT_SAMPLES = 256
+
+# Set by a caller that holds the chat's next message until this one is ordered
+chat_handoff: ContextVar[asyncio.Event | None] = ContextVar("chat_handoff", default=None)
+
+
+def hand_off_chat() -> None:
+    """Signal that the current message is about to take its place in its chat.
+
+    Call right before entering the coalescer or ``ChatDispatcher.run``, with
+    no await in between: both fix a message's position before they suspend.
+    """
+    handoff = chat_handoff.get()
+    if handoff is not None:
+        handoff.set()
+
+
+@dataclass
+class _Lane:
+    """Per-chat FIFO: asyncio.Lock wakes waiters in arrival order."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class ChatDispatcher:
+    """Bounded, per-chat ordered execution of platform agent runs."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_per_bot: int = 4,
+        slow_wait_warning: float = 10.0,
+    ) -> None:
+        """
+        Initialize the dispatcher.
+
+        Args:
+            max_concurrent: Agent runs in flight across all bots (0 = unlimited)
+            max_per_bot: Agent runs in flight per bot (0 = unlimited)
+            slow_wait_warning: Log a warning when a message waits longer than
+                this many seconds before its run starts (0 = never)
+        """
+        self.max_concurrent = max(0, max_concurrent)
+        self.max_per_bot = max(0, max_per_bot)
+        self.slow_wait_warning = slow_wait_warning
+        self._global = asyncio.Semaphore(self.max_concurrent) if self.max_concurrent else None
+        self._bot_limits: dict[str, asyncio.Semaphore] = {}
+        self._lanes: dict[tuple[str, str], _Lane] = {}
+
+        self._queued: dict[str, int] = {}
+        self._active: dict[str, int] = {}
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._dispatched = 0
+
+    def _bot_limit(self, bot_id: str) -> asyncio.Semaphore | None:
+        if not self.max_per_bot:
+            return None
+        semaphore = self._bot_limits.get(bot_id)
+        if semaphore is None:
+            semaphore = self._bot_limits[bot_id] = asyncio.Semaphore(self.max_per_bot)
+        return semaphore
+
+    @staticmethod
+    def _hold(semaphore: asyncio.Semaphore | None) -> contextlib.AbstractAsyncContextManager[Any]:
+        return semaphore if semaphore is not None else contextlib.nullcontext()
+
+    async def run(
+        self,
+        connection_id: str,
+        chat_id: str,
+        bot_id: str,
+        fn: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Run *fn* once earlier messages of the chat are done and a slot is free."""
+        key = (connection_id, chat_id)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        lane.users += 1
+        self._queued[bot_id] = self._queued.get(bot_id, 0) + 1
+        enqueued = time.monotonic()
+        started = False
+        try:
+            # Lane first: a chat waiting behind its own earlier message must
+            # not hold a bot or global slot meanwhile.
+            async with lane.lock:
+                async with self._hold(self._bot_limit(bot_id)), self._hold(self._global):
+                    started = True
+                    self._start(bot_id, connection_id, chat_id, time.monotonic() - enqueued)
+                    try:
+                        return await fn()
+                    finally:
+                        self._active[bot_id] -= 1
+                        if not self._active[bot_id]:
+                            del self._active[bot_id]
+        finally:
+            if not started:
+                self._dequeue(bot_id)
+            lane.users -= 1
+            if not lane.users:
+                self._lanes.pop(key, None)
+
+    def _dequeue(self, bot_id: str) -> None:
+        self._queued[bot_id] -= 1
+        if not self._queued[bot_id]:
+            del self._queued[bot_id]
+
+    def _start(self, bot_id: str, connection_id: str, chat_id: str, waited: float) -> None:
+        """Move a message from queued to active, recording how long it waited."""
+        self._dequeue(bot_id)
+        self._active[bot_id] = self._active.get(bot_id, 0) + 1
+        self._waits.append(waited)
+        self._dispatched += 1
+        if self.slow_wait_warning and waited > self.slow_wait_warning:
+            logger.warning(
+                f"Message for bot {bot_id} (connection {connection_id}, chat {chat_id}) "
+                f"waited {waited:.1f}s to start; queued={self.queued} active={self.active}"
+            )
+
+    @property
+    def queued(self) -> int:
+        """Messages waiting for their chat, bot or global slot."""
+        return sum(self._queued.values())
+
+    @property
+    def active(self) -> int:
+        """Agent runs in progress."""
+        return sum(self._active.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, wait times and active runs (camelCase, for the API)."""
+        waits = sorted(self._waits)
+        return {
+            "maxConcurrent": self.max_concurrent,
+            "maxPerBot": self.max_per_bot,
+            "queued": self.queued,
+            "active": self.active,
+            "chats": len(self._lanes),
+            "dispatched": self._dispatched,
+            "waitMsAvg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "waitMsP95": (
+                round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1)
+                if waits
+                else 0.0
+            ),
+            "waitMsMax": round(waits[-1] * 1000, 1) if waits else 0.0,
+            "bots": {
+                bot_id: {
+                    "queued": self._queued.get(bot_id, 0),
+                    "active": self._active.get(bot_id, 0),
+                }
+                for bot_id in sorted(set(self._queued) | set(self._active))
+            },
+        }
+
+
+# Singleton instance
+_dispatcher: ChatDispatcher | None = None
+
+
+def get_chat_dispatcher() -> ChatDispatcher:
+    """Get the shared ChatDispatcher instance (config-aware)."""
+    global _dispatcher
+    if _dispatcher is None:
+        from cachibot.config import Config
+
+        config = Config.snapshot()
+        _dispatcher = ChatDispatcher(
+            max_concurrent=config.messaging.max_concurrent_runs,
+            max_per_bot=config.messaging.max_concurrent_runs_per_bot,
+            slow_wait_warning=config.messaging.slow_wait_warning,
+        )
+    return _dispatcher
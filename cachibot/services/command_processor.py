@@ -426,7 +426,7 @@ class CommandProcessor:
             # Create the bot
             now = datetime.now(timezone.utc)
             try:
-                default_model = Config.load().agent.model or ""
+                default_model = Config.snapshot().agent.model or ""
             except Exception:
                 default_model = ""
             bot = Bot(
@@ -3,11 +3,35 @@ Context Builder Service for Knowledge Base.
 
 Combines conversation history, custom instructions, and relevant document chunks
 into context that gets injected into the LLM system prompt.
+
+The sources are independent lookups, so by default they run concurrently,
+each under its own timeout. A slow or failing source is left out of the
+prompt instead of delaying the reply, and per-source timings are recorded
+on the returned ``KnowledgeContext``.
+
+Sources return lists of items which ``ContextPacker`` fits into a token
+budget derived from the model's context window, dropping the lowest-value
+items first.
+
+The prompt is split into a stable part (skills, custom instructions,
+contacts) that only changes with the bot's configuration and a volatile part
+(notes, documents, history) that depends on the message. Stable sections come
+first so providers with prompt caching can reuse the prefix across turns.
+
+Conversation history is the chat's rolling summary (maintained in the
+background by ``ConversationSummarizer``) plus the raw messages after its
+watermark, so its cost does not grow with the length of the chat.
 """
 
+import asyncio
 import logging
-from dataclasses import dataclass
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import partial
 
+from cachibot.services.agent_cache import AgentSetupCache, get_agent_setup_cache
+from cachibot.services.context_packer import ContextPacker, PackResult, context_budget
 from cachibot.services.vector_store import VectorStore, get_vector_store
 from cachibot.storage.repository import (
     ContactsRepository,
@@ -18,6 +42,9 @@ from cachibot.storage.repository import (
 
 logger = logging.getLogger(__name__)
 
+# Cap on raw messages after the summary watermark (while the summarizer lags)
+_MAX_UNSUMMARIZED_HISTORY = 100
+
 
 @dataclass
 class KnowledgeContext:
@@ -29,9 +56,21 @@ class KnowledgeContext:
     contacts: str | None
     skills: str | None
     notes: str | None = None
+    conversation_summary: str | None = None
+    # Milliseconds spent on each source, and sources dropped after timing out
+    timings: dict[str, float] = field(default_factory=dict)
+    timed_out: list[str] = field(default_factory=list)
+    # Token budget, per-section token counts and dropped items
+    packing: PackResult | None = None
 
     def to_prompt_section(self) -> str:
-        """Convert to prompt-ready string."""
+        """Convert to prompt-ready string (stable sections first)."""
+        return "\n\n---\n\n".join(
+            part for part in (self.stable_prompt_section(), self.volatile_prompt_section()) if part
+        )
+
+    def stable_prompt_section(self) -> str:
+        """Sections that only change with the bot's configuration."""
         sections = []
 
         # Skills go first (high priority instructions)
@@ -41,24 +80,49 @@ class KnowledgeContext:
         if self.instructions:
             sections.append(f"## Custom Instructions\n{self.instructions}")
 
-        if self.notes:
-            sections.append(f"## Notes\n{self.notes}")
-
         if self.contacts:
             sections.append(f"## Known Contacts\n{self.contacts}")
 
+        return "\n\n---\n\n".join(sections)
+
+    def volatile_prompt_section(self) -> str:
+        """Sections that depend on the current message and chat."""
+        sections = []
+
+        if self.notes:
+            sections.append(f"## Notes\n{self.notes}")
+
         if self.relevant_docs:
             sections.append(f"## Relevant Knowledge\n{self.relevant_docs}")
 
+        if self.conversation_summary:
+            sections.append(f"## Earlier Conversation Summary\n{self.conversation_summary}")
+
         if self.recent_history:
             sections.append(f"## Recent Conversation Summary\n{self.recent_history}")
 
-        if not sections:
-            return ""
-
         return "\n\n---\n\n".join(sections)
 
 
+@dataclass
+class PromptParts:
+    """System prompt split for provider-side prefix caching.
+
+    ``prefix`` is byte-identical across turns while the bot's configuration is
+    unchanged; ``suffix`` carries the per-message context.
+    """
+
+    prefix: str
+    suffix: str
+    context: KnowledgeContext
+
+    @property
+    def prompt(self) -> str:
+        if not self.suffix:
+            return self.prefix
+        return f"{self.prefix}\n\n---\n\n{self.suffix}"
+
+
 class ContextBuilder:
     """
     Builds context from knowledge base for LLM injection.
@@ -66,7 +130,8 @@ class ContextBuilder:
     Combines:
     1. Custom instructions (always included if set)
     2. Relevant document chunks (RAG based on user message)
-    3. Recent conversation history (for continuity)
+    3. Recent conversation history (for continuity), preceded by the chat's
+       rolling summary of older messages
     """
 
     def __init__(
@@ -75,6 +140,13 @@ class ContextBuilder:
         max_document_chunks: int = 3,
         min_similarity_score: float = 0.3,
         vector_store: VectorStore | None = None,
+        concurrent: bool = True,
+        source_timeout: float = 2.0,
+        documents_timeout: float = 5.0,
+        max_context_tokens: int = 6000,
+        context_window_ratio: float = 0.25,
+        setup_cache: AgentSetupCache | None = None,
+        conversation_summary: bool = True,
     ):
         """
         Initialize the context builder.
@@ -84,10 +156,27 @@ class ContextBuilder:
             max_document_chunks: Maximum document chunks to retrieve
             min_similarity_score: Minimum similarity for document retrieval
             vector_store: VectorStore instance (uses singleton if not provided)
+            concurrent: Fetch all sources at once instead of one after another
+            source_timeout: Seconds before a database-only source is skipped (0 = no limit)
+            documents_timeout: Seconds before document retrieval (embedding + search)
+                is skipped (0 = no limit)
+            max_context_tokens: Token cap for the whole context (0 = no packing)
+            context_window_ratio: Share of the model's context window the context may use
+            setup_cache: Cache for the stable sources (skills, instructions, contacts);
+                None fetches them on every call
+            conversation_summary: Include the chat's rolling summary of older messages
         """
         self.max_history_messages = max_history_messages
         self.max_document_chunks = max_document_chunks
         self.min_similarity_score = min_similarity_score
+        self.concurrent = concurrent
+        self.source_timeout = source_timeout
+        self.documents_timeout = documents_timeout
+        self.max_context_tokens = max_context_tokens
+        self.context_window_ratio = context_window_ratio
+        self.conversation_summary = conversation_summary
+        self._packer = ContextPacker()
+        self._setup_cache = setup_cache
         self._vector_store = vector_store
         self._repo = KnowledgeRepository()
         self._contacts_repo = ContactsRepository()
@@ -108,6 +197,7 @@ class ContextBuilder:
         chat_id: str | None = None,
         include_contacts: bool = False,
         enabled_skills: list[str] | None = None,
+        model: str | None = None,
     ) -> KnowledgeContext:
         """
         Build context from all knowledge sources.
@@ -118,106 +208,165 @@ class ContextBuilder:
             chat_id: Current chat ID (for history retrieval)
             include_contacts: Whether to include contacts (contacts capability)
             enabled_skills: List of enabled skill IDs (or None to auto-fetch from bot)
+            model: Effective ``provider/model``, used to size the token budget
 
         Returns:
             KnowledgeContext with assembled sections
         """
         logger.debug(f"Building context for bot {bot_id}")
+        started = time.perf_counter()
+
+        skills_key = tuple(enabled_skills) if enabled_skills is not None else None
+        sources: dict[str, Callable[[], Awaitable[list[str] | None]]] = {
+            "skills": self._cached(
+                bot_id,
+                ("context_skills", bot_id, skills_key),
+                partial(self._get_skills_instructions, bot_id, enabled_skills),
+            ),
+            "instructions": self._cached(
+                bot_id, ("context_instructions", bot_id), partial(self._get_instructions, bot_id)
+            ),
+            "contacts": self._cached(
+                bot_id,
+                ("context_contacts", bot_id, include_contacts),
+                partial(self._get_contacts, bot_id, include_contacts),
+            ),
+            "notes": partial(self._get_relevant_notes, bot_id, user_message),
+            "documents": partial(self._get_relevant_docs, bot_id, user_message),
+            "history": partial(self._get_recent_history, bot_id, chat_id),
+        }
+        if self.conversation_summary:
+            sources["summary"] = partial(self._get_conversation_summary, chat_id)
+        context = KnowledgeContext(
+            instructions=None,
+            relevant_docs=None,
+            recent_history=None,
+            contacts=None,
+            skills=None,
+        )
 
-        # 1. Get skill instructions
-        skills = await self._get_skills_instructions(bot_id, enabled_skills)
-
-        # 2. Get custom instructions
-        instructions = await self._get_instructions(bot_id)
-
-        # 3. Get contacts if enabled
-        contacts = await self._get_contacts(bot_id, include_contacts)
-
-        # 4. Get relevant notes
-        notes = await self._get_relevant_notes(bot_id, user_message)
-
-        # 5. Get relevant document chunks
-        relevant_docs = await self._get_relevant_docs(bot_id, user_message)
-
-        # 6. Get recent conversation history
-        recent_history = await self._get_recent_history(bot_id, chat_id)
-
-        return KnowledgeContext(
-            instructions=instructions,
-            relevant_docs=relevant_docs,
-            recent_history=recent_history,
-            contacts=contacts,
-            skills=skills,
-            notes=notes,
+        if self.concurrent:
+            values = await asyncio.gather(
+                *(self._run_source(name, fetch, context) for name, fetch in sources.items())
+            )
+        else:
+            values = [
+                await self._run_source(name, fetch, context) for name, fetch in sources.items()
+            ]
+        budget = context_budget(model, self.max_context_tokens, self.context_window_ratio)
+        packed = self._packer.pack(dict(zip(sources, values)), budget)
+
+        context.skills = packed.sections["skills"]
+        context.instructions = packed.sections["instructions"]
+        context.contacts = packed.sections["contacts"]
+        context.notes = packed.sections["notes"]
+        context.relevant_docs = packed.sections["documents"]
+        context.recent_history = packed.sections["history"]
+        context.conversation_summary = packed.sections["summary"]
+        context.packing = packed
+
+        total_ms = (time.perf_counter() - started) * 1000
+        logger.debug(
+            f"Context for bot {bot_id} built in {total_ms:.1f}ms "
+            + " ".join(f"{name}={ms:.1f}ms" for name, ms in context.timings.items())
+            + f" tokens={packed.total_tokens}/{budget or 'unlimited'}"
         )
+        if packed.dropped or packed.truncated:
+            changes = [f"dropped {count} {name}" for name, count in packed.dropped.items()]
+            changes += [f"truncated {count} {name}" for name, count in packed.truncated.items()]
+            logger.info(
+                f"Context for bot {bot_id} over budget ({budget} tokens): " + ", ".join(changes)
+            )
+        return context
 
-    async def _get_skills_instructions(
+    def _cached(
         self,
         bot_id: str,
-        enabled_skills: list[str] | None = None,
-    ) -> str | None:
-        """Get combined instructions from enabled skills."""
+        key: tuple[object, ...],
+        fetch: Callable[[], Awaitable[list[str] | None]],
+    ) -> Callable[[], Awaitable[list[str] | None]]:
+        """Serve a stable source from the setup cache when one is configured."""
+        cache = self._setup_cache
+        if cache is None:
+            return fetch
+        return partial(cache.get_or_load, key, fetch, bot_id)
+
+    async def _run_source(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[list[str] | None]],
+        context: KnowledgeContext,
+    ) -> list[str] | None:
+        """Fetch one context source under its timeout, recording how long it took."""
+        timeout = self.documents_timeout if name == "documents" else self.source_timeout
+        started = time.perf_counter()
         try:
-            # If skill IDs provided, fetch those skills
-            # Otherwise, get skills activated for this bot
-            if enabled_skills is not None:
-                # Fetch skill definitions for the provided IDs
-                skill_defs = []
-                for skill_id in enabled_skills:
-                    skill = await self._skills_repo.get_skill(skill_id)
-                    if skill:
-                        skill_defs.append(skill)
-            else:
-                # Get all enabled skills for this bot
-                skill_defs = await self._skills_repo.get_bot_skill_definitions(bot_id)
-
-            if not skill_defs:
-                return None
+            return await asyncio.wait_for(fetch(), timeout or None)
+        except asyncio.TimeoutError:
+            logger.warning(f"Context source '{name}' timed out after {timeout}s; skipping it")
+            context.timed_out.append(name)
+            return None
+        except Exception as e:
+            logger.warning(f"Context source '{name}' failed: {e}")
+            return None
+        finally:
+            context.timings[name] = round((time.perf_counter() - started) * 1000, 2)
 
-            # Format skill instructions
-            instructions = []
-            for skill in skill_defs:
-                instructions.append(f"### {skill.name}\n{skill.instructions}")
+    async def _get_skills_instructions(
+        self,
+        bot_id: str,
+        enabled_skills: list[str] | None = None,
+    ) -> list[str] | None:
+        """Get instructions from enabled skills, one item per skill.
 
-            return "\n\n".join(instructions)
+        Errors propagate to ``_run_source`` so a failed lookup is not cached.
+        """
+        # If skill IDs provided, fetch those skills
+        # Otherwise, get skills activated for this bot
+        if enabled_skills is not None:
+            # Fetch skill definitions for the provided IDs
+            fetched = await asyncio.gather(
+                *(self._skills_repo.get_skill(skill_id) for skill_id in enabled_skills)
+            )
+            skill_defs = [skill for skill in fetched if skill]
+        else:
+            # Get all enabled skills for this bot
+            skill_defs = await self._skills_repo.get_bot_skill_definitions(bot_id)
 
-        except Exception as e:
-            logger.warning(f"Skills retrieval failed: {e}")
+        if not skill_defs:
             return None
 
-    async def _get_instructions(self, bot_id: str) -> str | None:
+        # Format skill instructions
+        return [f"### {skill.name}\n{skill.instructions}" for skill in skill_defs]
+
+    async def _get_instructions(self, bot_id: str) -> list[str] | None:
         """Get custom instructions for bot."""
         instructions = await self._repo.get_instructions(bot_id)
         if instructions and instructions.content.strip():
-            return instructions.content
+            return [instructions.content]
         return None
 
-    async def _get_contacts(self, bot_id: str, include_contacts: bool) -> str | None:
+    async def _get_contacts(self, bot_id: str, include_contacts: bool) -> list[str] | None:
         """Get contacts for bot if capability is enabled."""
         if not include_contacts:
             return None
 
-        try:
-            contacts = await self._contacts_repo.get_contacts_by_bot(bot_id)
-            if not contacts:
-                return None
-
-            # Format contacts for prompt
-            formatted = []
-            for contact in contacts:
-                entry = f"- {contact.name}"
-                if contact.details:
-                    entry += f": {contact.details}"
-                formatted.append(entry)
+        contacts = await self._contacts_repo.get_contacts_by_bot(bot_id)
+        if not contacts:
+            return None
 
-            return "\n".join(formatted)
+        # Format contacts for prompt
+        formatted = []
+        for contact in contacts:
+            entry = f"- {contact.name}"
+            if contact.details:
+                entry += f": {contact.details}"
+            formatted.append(entry)
 
-        except Exception as e:
-            logger.warning(f"Contacts retrieval failed: {e}")
-            return None
+        return formatted
 
-    async def _get_relevant_notes(self, bot_id: str, query: str) -> str | None:
-        """Get relevant notes for the bot."""
+    async def _get_relevant_notes(self, bot_id: str, query: str) -> list[str] | None:
+        """Get relevant notes for the bot (query matches first, then recent)."""
         try:
             # Get recent notes, optionally filtered by query relevance
             if query.strip():
@@ -245,14 +394,14 @@ class ContextBuilder:
                 content = note.content[:500] + "..." if len(note.content) > 500 else note.content
                 formatted.append(f"### {note.title}{tags_str}\n{content}")
 
-            return "\n\n".join(formatted)
+            return formatted
 
         except Exception as e:
             logger.warning(f"Notes retrieval failed: {e}")
             return None
 
-    async def _get_relevant_docs(self, bot_id: str, query: str) -> str | None:
-        """Search for relevant document chunks."""
+    async def _get_relevant_docs(self, bot_id: str, query: str) -> list[str] | None:
+        """Search for relevant document chunks (best match first)."""
         if not query.strip():
             return None
 
@@ -273,7 +422,7 @@ class ContextBuilder:
                 source = result.document_filename or "Unknown document"
                 formatted.append(f"[From: {source}]\n{result.chunk.content}")
 
-            return "\n\n".join(formatted)
+            return formatted
 
         except Exception as e:
             logger.warning(f"Document search failed: {e}")
@@ -283,17 +432,30 @@ class ContextBuilder:
         self,
         bot_id: str,
         chat_id: str | None,
-    ) -> str | None:
-        """Get recent conversation history."""
+    ) -> list[str] | None:
+        """Get recent conversation history (oldest first)."""
         if not chat_id:
             return None
 
         try:
-            messages = await self._repo.get_bot_messages(
-                bot_id=bot_id,
-                chat_id=chat_id,
-                limit=self.max_history_messages,
-            )
+            summary = None
+            if self.conversation_summary:
+                summary = await self._repo.get_chat_summary(chat_id)
+            if summary is not None:
+                # Start right after the summary's watermark so messages the
+                # summarizer has not folded yet are not left out
+                messages = await self._repo.get_bot_messages(
+                    bot_id=bot_id,
+                    chat_id=chat_id,
+                    limit=max(self.max_history_messages, _MAX_UNSUMMARIZED_HISTORY),
+                    after=summary,
+                )
+            else:
+                messages = await self._repo.get_bot_messages(
+                    bot_id=bot_id,
+                    chat_id=chat_id,
+                    limit=self.max_history_messages,
+                )
 
             if not messages:
                 return None
@@ -306,12 +468,22 @@ class ContextBuilder:
                 content = msg.content[:300] + "..." if len(msg.content) > 300 else msg.content
                 formatted.append(f"[{msg.id}] {role}: {content}")
 
-            return "\n".join(formatted)
+            return formatted
 
         except Exception as e:
             logger.warning(f"History retrieval failed: {e}")
             return None
 
+    async def _get_conversation_summary(self, chat_id: str | None) -> list[str] | None:
+        """Get the rolling summary of the chat's older messages."""
+        if not chat_id:
+            return None
+
+        summary = await self._repo.get_chat_summary(chat_id)
+        if summary is None or not summary.content.strip():
+            return None
+        return [summary.content]
+
     async def build_enhanced_system_prompt(
         self,
         base_prompt: str | None,
@@ -320,6 +492,7 @@ class ContextBuilder:
         chat_id: str | None = None,
         include_contacts: bool = False,
         enabled_skills: list[str] | None = None,
+        model: str | None = None,
     ) -> str:
         """
         Build a complete system prompt with knowledge context.
@@ -331,30 +504,78 @@ class ContextBuilder:
             chat_id: Current chat ID
             include_contacts: Whether to include contacts (contacts capability)
             enabled_skills: List of enabled skill IDs (or None to auto-fetch from bot)
+            model: Effective ``provider/model``, used to size the token budget
 
         Returns:
             Enhanced system prompt with knowledge context
         """
+        prompt, _context = await self.build_prompt_and_context(
+            base_prompt, bot_id, user_message, chat_id, include_contacts, enabled_skills, model
+        )
+        return prompt
+
+    async def build_prompt_and_context(
+        self,
+        base_prompt: str | None,
+        bot_id: str,
+        user_message: str,
+        chat_id: str | None = None,
+        include_contacts: bool = False,
+        enabled_skills: list[str] | None = None,
+        model: str | None = None,
+    ) -> tuple[str, KnowledgeContext]:
+        """
+        Like ``build_enhanced_system_prompt``, also returning the context.
+
+        The ``KnowledgeContext`` carries timings and the token breakdown
+        (``packing``) for usage reporting.
+        """
+        parts = await self.build_prompt_parts(
+            base_prompt, bot_id, user_message, chat_id, include_contacts, enabled_skills, model
+        )
+        return parts.prompt, parts.context
+
+    async def build_prompt_parts(
+        self,
+        base_prompt: str | None,
+        bot_id: str,
+        user_message: str,
+        chat_id: str | None = None,
+        include_contacts: bool = False,
+        enabled_skills: list[str] | None = None,
+        model: str | None = None,
+    ) -> PromptParts:
+        """
+        Build the system prompt as a stable prefix and a volatile suffix.
+
+        The prefix is the base prompt plus the stable context sections; the
+        suffix holds the message-dependent sections and citation guidance.
+        """
         if not base_prompt:
             base_prompt = "You are a helpful AI assistant."
 
         # Build context
         context = await self.build_context(
-            bot_id, user_message, chat_id, include_contacts, enabled_skills
+            bot_id, user_message, chat_id, include_contacts, enabled_skills, model
         )
-        context_section = context.to_prompt_section()
-
-        if context_section:
-            citation_instructions = (
-                "\n\n---\n\n## Message Citations\n"
-                "When referencing a specific earlier message from the conversation, use "
-                "[cite:MESSAGE_ID] where MESSAGE_ID is the ID in brackets before each message "
-                "in the history. This creates a visual reply link in the chat. Only cite when "
-                "it genuinely clarifies which message you're referring to — don't overuse."
-            )
-            return f"{base_prompt}\n\n---\n\n{context_section}{citation_instructions}"
-
-        return base_prompt
+        stable = context.stable_prompt_section()
+        volatile = context.volatile_prompt_section()
+
+        prefix = f"{base_prompt}\n\n---\n\n{stable}" if stable else base_prompt
+        if not (stable or volatile):
+            return PromptParts(prefix=prefix, suffix="", context=context)
+
+        citation_instructions = (
+            "## Message Citations\n"
+            "When referencing a specific earlier message from the conversation, use "
+            "[cite:MESSAGE_ID] where MESSAGE_ID is the ID in brackets before each message "
+            "in the history. This creates a visual reply link in the chat. Only cite when "
+            "it genuinely clarifies which message you're referring to — don't overuse."
+        )
+        suffix = (
+            f"{volatile}\n\n---\n\n{citation_instructions}" if volatile else citation_instructions
+        )
+        return PromptParts(prefix=prefix, suffix=suffix, context=context)
 
 
 # Singleton instance
@@ -367,10 +588,17 @@ def get_context_builder() -> ContextBuilder:
     if _builder is None:
         from cachibot.config import Config
 
-        config = Config.load()
+        config = Config.snapshot()
         _builder = ContextBuilder(
             max_history_messages=config.knowledge.max_history_messages,
             max_document_chunks=config.knowledge.top_k,
             min_similarity_score=config.knowledge.min_similarity,
+            concurrent=config.knowledge.context_concurrent,
+            source_timeout=config.knowledge.context_timeout,
+            documents_timeout=config.knowledge.context_documents_timeout,
+            max_context_tokens=config.knowledge.context_max_tokens,
+            context_window_ratio=config.knowledge.context_window_ratio,
+            setup_cache=get_agent_setup_cache(),
+            conversation_summary=config.knowledge.conversation_summary,
         )
     return _builder
@@ -0,0 +1,279 @@
+"""
+Token-budgeted packing of prompt context.
+
+The knowledge context injected into the system prompt (skills, instructions,
+documents, conversation summary and history, notes, contacts) used to be concatenated with fixed
+character limits, so a bot with hundreds of contacts or many skills could
+silently spend most of the model's window. The packer gives every section a
+priority and a share of a token budget derived from the model's context
+window, counts tokens with a fast tokenizer, and drops the lowest-value items
+first.
+
+Token counting uses ``tiktoken`` (``cl100k_base``) when it is installed and a
+~4 characters per token estimate otherwise. Counts for static sections
+(skills, instructions, contacts), which repeat on every message, are cached.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Tokens reserved per included section for its "## Heading" and separator
+SECTION_OVERHEAD_TOKENS = 8
+
+# Items are only truncated to fit when at least this many tokens are left
+_MIN_TRUNCATED_TOKENS = 32
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Any:
+    """Load the tiktoken encoding once (None when tiktoken is unavailable)."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            logger.debug("tiktoken unavailable, estimating tokens from length")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the tokens in *text*."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
+
+
+@lru_cache(maxsize=4096)
+def count_tokens_cached(text: str) -> int:
+    """``count_tokens`` memoized for text that repeats across requests."""
+    return count_tokens(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut *text* down to at most *max_tokens* tokens, marking the cut."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return str(encoding.decode(tokens[: max(0, max_tokens - 2)])) + "..."
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - 3)] + "..."
+
+
+@lru_cache(maxsize=256)
+def context_window_for(model: str) -> int | None:
+    """Context window of a ``provider/model`` string, if Prompture knows it."""
+    provider, _, model_id = model.partition("/")
+    if not model_id:
+        return None
+    try:
+        from prompture import get_model_capabilities
+
+        caps = get_model_capabilities(provider, model_id)
+    except Exception:
+        logger.debug("Could not look up capabilities for %s", model, exc_info=True)
+        return None
+    window = getattr(caps, "context_window", None) if caps else None
+    return int(window) if window else None
+
+
+def context_budget(model: str | None, max_tokens: int, window_ratio: float) -> int:
+    """Token budget for prompt context.
+
+    Args:
+        model: Effective ``provider/model`` (None = unknown).
+        max_tokens: Hard cap for the context (0 = unlimited).
+        window_ratio: Fraction of the model's context window the context may use.
+
+    Returns:
+        The budget in tokens; 0 means packing is disabled.
+    """
+    if max_tokens <= 0:
+        return 0
+    window = context_window_for(model) if model else None
+    if window and window_ratio > 0:
+        return max(1, min(max_tokens, int(window * window_ratio)))
+    return max_tokens
+
+
+@dataclass(frozen=True)
+class SectionSpec:
+    """How one context section competes for the budget.
+
+    Attributes:
+        name: Section key (matches the ``ContextBuilder`` source name).
+        priority: Lower is packed first and keeps its items longer.
+        share: Fraction of the budget reserved for the section in the first pass.
+        separator: Joins the section's items.
+        drop_oldest: Items are chronological, so the first ones are dropped first
+            (otherwise items arrive best-first and the last ones go first).
+        static: Text repeats across requests; token counts are cached.
+        truncate: When even the most valuable item does not fit in the budget
+            left after the reserved shares, cut it down instead of dropping it.
+    """
+
+    name: str
+    priority: int
+    share: float
+    separator: str = "\n\n"
+    drop_oldest: bool = False
+    static: bool = False
+    truncate: bool = False
+
+
+DEFAULT_SECTIONS: tuple[SectionSpec, ...] = (
+    SectionSpec("skills", 0, 0.20, static=True, truncate=True),
+    SectionSpec("instructions", 0, 0.15, static=True, truncate=True),
+    SectionSpec("documents", 1, 0.30, truncate=True),
+    SectionSpec("summary", 2, 0.05, truncate=True),
+    SectionSpec("history", 2, 0.10, separator="\n", drop_oldest=True),
+    SectionSpec("notes", 3, 0.10),
+    SectionSpec("contacts", 4, 0.10, separator="\n", static=True),
+)
+
+
+@dataclass
+class PackResult:
+    """Packed section texts plus the token breakdown."""
+
+    sections: dict[str, str | None]
+    budget: int
+    tokens: dict[str, int] = field(default_factory=dict)
+    dropped: dict[str, int] = field(default_factory=dict)
+    truncated: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Breakdown for clients (camelCase, like other WS payloads)."""
+        return {
+            "budget": self.budget,
+            "totalTokens": self.total_tokens,
+            "sections": dict(self.tokens),
+            "droppedItems": dict(self.dropped),
+            "truncatedItems": dict(self.truncated),
+        }
+
+
+class ContextPacker:
+    """Fits context sections into a token budget, dropping low-value items first.
+
+    Packing runs in two passes. First every section, in priority order, fills
+    its reserved share. Then whatever budget is left goes to the items that
+    did not fit, again in priority order. Within a section items are kept
+    best-first and the remaining ones are dropped from the low-value end.
+    An item is only cut down (``truncate``) in a section's last pass, once
+    the budget left to it is known.
+
+    Static sections never compete with message-dependent ones: in the second
+    pass they only grow into budget no dynamic section has reserved. Their
+    packed text therefore depends only on their own items and the budget,
+    which keeps the stable system prompt prefix byte-identical across turns.
+    """
+
+    def __init__(self, sections: tuple[SectionSpec, ...] = DEFAULT_SECTIONS) -> None:
+        self.sections = sorted(sections, key=lambda s: s.priority)
+
+    def pack(self, items: dict[str, list[str] | None], budget: int) -> PackResult:
+        """Pack *items* (per section, in display order) into *budget* tokens.
+
+        A budget of 0 keeps everything and only reports token counts.
+        """
+        specs = [s for s in self.sections if items.get(s.name)]
+        counted: dict[str, list[tuple[int, str, int]]] = {}
+        for spec in specs:
+            counter = count_tokens_cached if spec.static else count_tokens
+            entries = [(i, text, counter(text)) for i, text in enumerate(items[spec.name] or [])]
+            # Best-first order: chronological sections keep their newest items
+            counted[spec.name] = entries[::-1] if spec.drop_oldest else entries
+
+        kept: dict[str, list[tuple[int, str, int]]] = {s.name: [] for s in specs}
+        pending: dict[str, list[tuple[int, str, int]]] = {
+            name: list(entries) for name, entries in counted.items()
+        }
+        truncated: set[str] = set()
+        used = 0
+
+        def take(spec: SectionSpec, limit: int, last_pass: bool = False) -> int:
+            """Move pending items into ``kept`` while they fit in *limit* tokens."""
+            spent = 0
+            queue = pending[spec.name]
+            while queue:
+                overhead = 0 if kept[spec.name] else SECTION_OVERHEAD_TOKENS
+                index, text, tokens = queue[0]
+                if spent + overhead + tokens <= limit:
+                    kept[spec.name].append(queue.pop(0))
+                    spent += overhead + tokens
+                    continue
+                room = limit - spent - overhead
+                if (
+                    last_pass
+                    and spec.truncate
+                    and not kept[spec.name]
+                    and room >= _MIN_TRUNCATED_TOKENS
+                ):
+                    cut = truncate_to_tokens(text, room)
+                    cut_tokens = count_tokens(cut)
+                    queue.pop(0)
+                    kept[spec.name].append((index, cut, cut_tokens))
+                    truncated.add(spec.name)
+                    spent += overhead + cut_tokens
+                break
+            return spent
+
+        if budget > 0:
+            for spec in specs:
+                used += take(spec, min(int(budget * spec.share), budget - used))
+            # Budget reserved by dynamic sections, whether or not they have items
+            reserved = sum(int(budget * s.share) for s in self.sections if not s.static)
+            static_used = sum(
+                SECTION_OVERHEAD_TOKENS + sum(t for _, _, t in kept[s.name])
+                for s in specs
+                if s.static and kept[s.name]
+            )
+            for spec in specs:
+                if spec.static:
+                    spent = take(spec, budget - reserved - static_used, last_pass=True)
+                    static_used += spent
+                    used += spent
+            for spec in specs:
+                if not spec.static:
+                    used += take(spec, budget - used, last_pass=True)
+        else:
+            for spec in specs:
+                kept[spec.name] = pending[spec.name]
+                pending[spec.name] = []
+
+        result = PackResult(sections={s.name: None for s in self.sections}, budget=budget)
+        for spec in specs:
+            entries = sorted(kept[spec.name])
+            if entries:
+                result.sections[spec.name] = spec.separator.join(text for _, text, _ in entries)
+                result.tokens[spec.name] = SECTION_OVERHEAD_TOKENS + sum(t for _, _, t in entries)
+            if pending[spec.name]:
+                result.dropped[spec.name] = len(pending[spec.name])
+            if spec.name in truncated:
+                result.truncated[spec.name] = 1
+        return result
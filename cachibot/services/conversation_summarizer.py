@@ -0,0 +1,208 @@
+"""
+Conversation Summarizer Service
+
+Keeps a rolling summary of each chat's older messages so prompt context can
+cover the whole conversation at constant cost: one summary row plus the last
+few raw turns, however long the chat gets.
+
+After each assistant turn a background task folds the oldest unsummarized
+messages (everything except the newest ``keep_recent``, which the context
+builder includes verbatim) into the persisted summary with the utility model
+and advances the summary's watermark. At most one task runs per chat; turns
+that arrive while it runs trigger a follow-up pass.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from cachibot.models.knowledge import BotMessage, ChatSummary
+from cachibot.storage.repository import KnowledgeRepository
+
+logger = logging.getLogger(__name__)
+
+# Characters of each message shown to the summarizer
+_MAX_MESSAGE_CHARS = 2000
+
+# Batches folded per background run; a long backlog catches up over later turns
+_MAX_BATCHES_PER_RUN = 5
+
+
+class _SummaryResult(BaseModel):
+    summary: str = Field(description="The updated running summary of the conversation")
+
+
+class ConversationSummarizer:
+    """Folds older chat messages into a persisted per-chat summary."""
+
+    def __init__(
+        self,
+        keep_recent: int = 10,
+        min_batch: int = 6,
+        batch_size: int = 30,
+        max_chars: int = 2000,
+    ) -> None:
+        """
+        Initialize the summarizer.
+
+        Args:
+            keep_recent: Newest messages left out of the summary (sent raw instead)
+            min_batch: Unsummarized older messages needed before a fold runs
+            batch_size: Maximum messages folded per utility model call
+            max_chars: Target (and hard cap) for the summary length
+        """
+        self.keep_recent = max(0, keep_recent)
+        self.min_batch = max(1, min_batch)
+        self.batch_size = max(self.min_batch, batch_size)
+        self.max_chars = max_chars
+        self._repo = KnowledgeRepository()
+        self._running: dict[str, asyncio.Task[None]] = {}
+        self._dirty: set[str] = set()
+
+    def schedule(
+        self,
+        bot_id: str,
+        chat_id: str,
+        bot_models: dict[str, Any] | None = None,
+    ) -> None:
+        """Fire-and-forget a summary update for a chat.
+
+        Silently does nothing if no event loop is running (e.g., CLI mode).
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        if chat_id in self._running:
+            self._dirty.add(chat_id)
+            return
+
+        task = loop.create_task(self._run(bot_id, chat_id, bot_models))
+        self._running[chat_id] = task
+        task.add_done_callback(lambda _task: self._running.pop(chat_id, None))
+
+    async def _run(self, bot_id: str, chat_id: str, bot_models: dict[str, Any] | None) -> None:
+        """Background task: summarize until no new turns arrived meanwhile."""
+        from cachibot.services.model_resolver import NoModelConfiguredError, resolve_utility_model
+
+        try:
+            model = resolve_utility_model(bot_models=bot_models)
+        except NoModelConfiguredError:
+            logger.debug("No utility model configured; skipping conversation summary")
+            return
+
+        while True:
+            self._dirty.discard(chat_id)
+            try:
+                await self.summarize(bot_id, chat_id, model)
+            except Exception as e:
+                logger.warning(f"Conversation summary for chat {chat_id} failed: {e}")
+                return
+            if chat_id not in self._dirty:
+                return
+
+    async def summarize(self, bot_id: str, chat_id: str, model: str) -> bool:
+        """Fold pending older messages into the chat's summary.
+
+        Returns:
+            True if the summary was updated.
+        """
+        updated = False
+        for _ in range(_MAX_BATCHES_PER_RUN):
+            summary = await self._repo.get_chat_summary(chat_id)
+            pending = await self._repo.count_unsummarized_messages(bot_id, chat_id, summary)
+            foldable = pending - self.keep_recent
+            if foldable < self.min_batch:
+                break
+
+            messages = await self._repo.get_unsummarized_messages(
+                bot_id, chat_id, summary, limit=min(foldable, self.batch_size)
+            )
+            if not messages:
+                break
+
+            content = await self._fold(summary.content if summary else None, messages, model)
+            last = messages[-1]
+            await self._repo.save_chat_summary(
+                ChatSummary(
+                    chat_id=chat_id,
+                    bot_id=bot_id,
+                    content=content[: self.max_chars],
+                    last_message_id=last.id,
+                    last_message_at=last.timestamp,
+                    message_count=(summary.message_count if summary else 0) + len(messages),
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+            updated = True
+            logger.debug(f"Folded {len(messages)} messages into summary of chat {chat_id}")
+        return updated
+
+    async def _fold(self, previous: str | None, messages: list[BotMessage], model: str) -> str:
+        """Ask the utility model for the previous summary extended with *messages*."""
+        from prompture.aio import extract_with_model
+
+        lines = []
+        for msg in messages:
+            role = "User" if msg.role == "user" else "Assistant"
+            content = msg.content
+            if len(content) > _MAX_MESSAGE_CHARS:
+                content = content[:_MAX_MESSAGE_CHARS] + "..."
+            lines.append(f"{role}: {content}")
+
+        new_messages = "\n".join(lines)
+        prompt = f"Current summary:\n{previous or '(none yet)'}\n\nNew messages:\n{new_messages}"
+        result = await extract_with_model(
+            _SummaryResult,
+            prompt,
+            model,
+            instruction_template=(
+                "You maintain a running summary of a conversation between a user and an AI "
+                "assistant. Rewrite the current summary so it also covers the new messages. "
+                "Keep facts, decisions, names, open questions and user preferences; drop "
+                f"small talk. Stay under {self.max_chars} characters."
+            ),
+        )
+        parsed: _SummaryResult = result["model"]
+        summary = parsed.summary.strip()
+        if not summary:
+            # Keep the watermark where it is rather than losing these messages
+            raise RuntimeError("Utility model returned an empty summary")
+        return summary
+
+
+# Singleton instance
+_summarizer: ConversationSummarizer | None = None
+
+
+def get_conversation_summarizer() -> ConversationSummarizer:
+    """Get the shared ConversationSummarizer instance (config-aware)."""
+    global _summarizer
+    if _summarizer is None:
+        from cachibot.config import Config
+
+        config = Config.snapshot()
+        _summarizer = ConversationSummarizer(
+            keep_recent=config.knowledge.max_history_messages,
+            min_batch=config.knowledge.summary_min_messages,
+            batch_size=config.knowledge.summary_batch_size,
+            max_chars=config.knowledge.summary_max_chars,
+        )
+    return _summarizer
+
+
+def schedule_chat_summary(
+    bot_id: str,
+    chat_id: str,
+    bot_models: dict[str, Any] | None = None,
+) -> None:
+    """Queue a background summary update after an assistant turn (if enabled)."""
+    from cachibot.config import Config
+
+    if not Config.snapshot().knowledge.conversation_summary:
+        return
+    get_conversation_summarizer().schedule(bot_id, chat_id, bot_models)
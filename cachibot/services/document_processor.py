@@ -5,10 +5,22 @@ Extracts text from documents, chunks it, generates embeddings, and stores in dat
 """
 
 import asyncio
+import hashlib
+import itertools
 import logging
+import queue
+import re
+import threading
 import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from multiprocessing.managers import SyncManager
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pymupdf
 
 from cachibot.models.knowledge import DocChunk, DocumentStatus
@@ -17,16 +29,124 @@ from cachibot.storage.repository import KnowledgeRepository
 
 logger = logging.getLogger(__name__)
 
+# Base delay (seconds) for exponential backoff between embedding retries
+_RETRY_BASE_DELAY = 1.0
+
+# Separator between pages / paragraphs in extracted text
+_SEGMENT_SEPARATOR = "\n\n"
+
+_WORD_RE = re.compile(r"\S+")
+
+# Chunk batches extracted ahead of the embedder (bounds memory per document)
+_STREAM_DEPTH = 4
+
+# Seconds between checks for a cancelled stream while the hand-off queue waits
+_STREAM_POLL = 0.2
+
+
+@dataclass
+class TextChunk:
+    """A chunk of document text with its source location.
+
+    ``char_start``/``char_end`` index into ``DocumentProcessor.extract_text``
+    output; ``page_number`` is 1-based and only set for paginated formats.
+    """
+
+    content: str
+    page_number: int | None
+    char_start: int
+    char_end: int
+
+
+def _window_chunk(window: deque[tuple[str, int, int | None]], size: int) -> TextChunk:
+    """Build a chunk from the first *size* words of the window."""
+    words = list(itertools.islice(window, size))
+    last_word, last_offset, _ = words[-1]
+    return TextChunk(
+        content=" ".join(word for word, _, _ in words),
+        page_number=words[0][2],
+        char_start=words[0][1],
+        char_end=last_offset + len(last_word),
+    )
+
+
+def _open_pdf(file_path: Path) -> Any:
+    """Open a PDF with PyMuPDF, whose API is untyped."""
+    return pymupdf.open(file_path)  # type: ignore[no-untyped-call]
+
+
+def _put(out: Any, item: Any, stop: Any) -> bool:
+    """Put *item* on the hand-off queue; False if the consumer stopped first."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=_STREAM_POLL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _take(out: Any, stop: Any) -> Any:
+    """Get the next item from the hand-off queue (None once stopped)."""
+    while not stop.is_set():
+        try:
+            return out.get(timeout=_STREAM_POLL)
+        except queue.Empty:
+            continue
+    return None
+
+
+def _produce_chunk_batches(
+    file_path: Path,
+    file_type: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    batch_size: int,
+    out: Any,
+    stop: Any,
+) -> None:
+    """Extraction worker: put ``(batch, fraction read)`` on *out*, then None.
+
+    Runs in the extraction executor (a thread, or a process with Manager
+    proxies for *out* and *stop*) and gives up once *stop* is set.
+    """
+    read = 0.0
+
+    def on_progress(fraction: float) -> None:
+        nonlocal read
+        read = fraction
+
+    chunks = DocumentProcessor.iter_chunks(
+        DocumentProcessor.iter_segments(file_path, file_type, on_progress),
+        chunk_size,
+        chunk_overlap,
+    )
+    try:
+        while batch := list(itertools.islice(chunks, batch_size)):
+            if not _put(out, (batch, read), stop):
+                return
+    finally:
+        _put(out, None, stop)
+
+
+class _StaleChunksError(Exception):
+    """Chunks stored by a previous attempt do not match the document."""
+
 
 class DocumentProcessor:
     """
     Processes documents into searchable chunks with embeddings.
 
     Pipeline:
-    1. Extract text from document (PDF, TXT, MD, DOCX)
-    2. Split text into overlapping chunks
-    3. Generate embeddings for each chunk
-    4. Store chunks with embeddings in database
+    1. Stream text from the document page by page (PDF, TXT, MD, DOCX)
+    2. Split it into overlapping chunks, recording page and character offsets
+    3. Generate embeddings in batches as the chunks arrive (bounded
+       concurrency, retry with backoff), reusing cached embeddings for chunk
+       text seen before
+    4. Store each batch of chunks as soon as it is embedded
+
+    Because batches are persisted incrementally, a failed document resumes
+    from the chunks already stored instead of re-embedding everything.
     """
 
     def __init__(
@@ -34,6 +154,10 @@ class DocumentProcessor:
         chunk_size: int = 500,
         chunk_overlap: int = 50,
         vector_store: VectorStore | None = None,
+        embed_batch_size: int = 64,
+        embed_concurrency: int = 4,
+        embed_max_retries: int = 3,
+        embedding_cache_max_entries: int = 100000,
     ):
         """
         Initialize the document processor.
@@ -42,11 +166,26 @@ class DocumentProcessor:
             chunk_size: Target number of words per chunk
             chunk_overlap: Number of overlapping words between chunks
             vector_store: VectorStore instance (uses singleton if not provided)
+            embed_batch_size: Chunks sent to the embedding provider per request
+            embed_concurrency: Maximum embedding requests in flight per document
+            embed_max_retries: Retries per batch before the document fails
+            embedding_cache_max_entries: Cap on the shared embedding cache,
+                enforced after each document (0 = no cap)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.embed_batch_size = max(1, embed_batch_size)
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.embed_max_retries = max(0, embed_max_retries)
+        self.embedding_cache_max_entries = max(0, embedding_cache_max_entries)
         self._vector_store = vector_store
         self._repo = KnowledgeRepository()
+        # Set by the ingestion queue: process pool for text extraction, the
+        # manager whose queues carry chunks out of it, and a limit on
+        # embedding requests in flight across all documents
+        self.extraction_executor: Executor | None = None
+        self.extraction_manager: SyncManager | None = None
+        self.embed_limiter: asyncio.Semaphore | None = None
 
     async def _broadcast_status(
         self,
@@ -54,6 +193,7 @@ class DocumentProcessor:
         document_id: str,
         status: str,
         chunk_count: int | None = None,
+        progress: int | None = None,
     ) -> None:
         """Broadcast document status change via WebSocket."""
         try:
@@ -67,6 +207,7 @@ class DocumentProcessor:
                     document_id=document_id,
                     status=status,
                     chunk_count=chunk_count,
+                    progress=progress,
                 )
             )
         except Exception as e:
@@ -80,10 +221,15 @@ class DocumentProcessor:
             self._vector_store = get_vector_store()
         return self._vector_store
 
-    def extract_text(self, file_path: Path, file_type: str) -> str:
+    @staticmethod
+    def extract_text(file_path: Path, file_type: str) -> str:
         """
         Extract text content from a document.
 
+        Materializes the whole document; the ingestion pipeline streams via
+        ``iter_segments`` instead. Chunk ``char_start``/``char_end`` offsets
+        index into the string returned here.
+
         Args:
             file_path: Path to the document file
             file_type: Type of file ('pdf', 'txt', 'md', 'docx')
@@ -91,49 +237,185 @@ class DocumentProcessor:
         Returns:
             Extracted text content
         """
-        if file_type == "pdf":
-            return self._extract_pdf(file_path)
-        elif file_type == "docx":
-            return self._extract_docx(file_path)
-        else:
+        if file_type not in ("pdf", "docx"):
             # txt, md - read as plain text
             return file_path.read_text(encoding="utf-8")
+        return _SEGMENT_SEPARATOR.join(
+            text for _page, _offset, text in DocumentProcessor.iter_segments(file_path, file_type)
+        )
 
-    def _extract_pdf(self, file_path: Path) -> str:
-        """Extract text from PDF using PyMuPDF."""
-        doc = pymupdf.open(file_path)
+    @staticmethod
+    def iter_segments(
+        file_path: Path,
+        file_type: str,
+        on_progress: Callable[[float], None] | None = None,
+    ) -> Iterator[tuple[int | None, int, str]]:
+        """
+        Stream a document as ``(page_number, char_offset, text)`` segments.
+
+        PDFs yield one segment per non-empty page (1-based page numbers),
+        DOCX one per paragraph / table row, and plain text one per line, so
+        only a single segment is held in memory at a time.
+
+        Args:
+            file_path: Path to the document file
+            file_type: Type of file ('pdf', 'txt', 'md', 'docx')
+            on_progress: Called before each segment with the fraction of the
+                document read so far (pages, paragraphs / rows, or bytes)
+        """
+        progress = on_progress or (lambda _fraction: None)
+        if file_type == "pdf":
+            yield from DocumentProcessor._iter_pdf(file_path, progress)
+        elif file_type == "docx":
+            yield from DocumentProcessor._iter_docx(file_path, progress)
+        else:
+            offset = 0
+            size = max(1, file_path.stat().st_size)
+            read = 0
+            with file_path.open(encoding="utf-8") as f:
+                for line in f:
+                    read += len(line.encode("utf-8"))
+                    progress(min(1.0, read / size))
+                    yield None, offset, line
+                    offset += len(line)
+
+    @staticmethod
+    def _iter_pdf(
+        file_path: Path, progress: Callable[[float], None]
+    ) -> Iterator[tuple[int | None, int, str]]:
+        """Stream non-empty pages from a PDF using PyMuPDF."""
+        doc = _open_pdf(file_path)
         try:
-            # Join pages with form feed character (standard page separator)
-            pages = []
-            for page in doc:
+            offset = 0
+            pages = max(1, doc.page_count)
+            for page_number, page in enumerate(doc, start=1):
                 text = page.get_text()
+                progress(page_number / pages)
                 if text.strip():
-                    pages.append(text)
-            return "\n\n".join(pages)
+                    yield page_number, offset, text
+                    offset += len(text) + len(_SEGMENT_SEPARATOR)
         finally:
             doc.close()
 
-    def _extract_docx(self, file_path: Path) -> str:
-        """Extract text from DOCX using python-docx."""
+    @staticmethod
+    def _iter_docx(
+        file_path: Path, progress: Callable[[float], None]
+    ) -> Iterator[tuple[int | None, int, str]]:
+        """Stream paragraphs, then table rows, from a DOCX using python-docx."""
         import docx
 
         doc = docx.Document(str(file_path))
-        parts: list[str] = []
+        offset = 0
+        items = max(1, len(doc.paragraphs) + sum(len(table.rows) for table in doc.tables))
+        done = 0
 
         # Extract text from paragraphs
         for paragraph in doc.paragraphs:
+            done += 1
+            progress(done / items)
             text = paragraph.text.strip()
             if text:
-                parts.append(text)
+                yield None, offset, text
+                offset += len(text) + len(_SEGMENT_SEPARATOR)
 
         # Extract text from tables
         for table in doc.tables:
             for row in table.rows:
+                done += 1
+                progress(done / items)
                 cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
                 if cells:
-                    parts.append(" | ".join(cells))
+                    text = " | ".join(cells)
+                    yield None, offset, text
+                    offset += len(text) + len(_SEGMENT_SEPARATOR)
+
+    @staticmethod
+    def iter_chunks(
+        segments: Iterable[tuple[int | None, int, str]],
+        chunk_size: int,
+        chunk_overlap: int,
+    ) -> Iterator[TextChunk]:
+        """
+        Sliding-window word chunker over streamed segments.
+
+        Holds at most ``chunk_size + 1`` words at a time. Each chunk records
+        the page its first word is on and the character span it covers.
+        """
+        chunk_size = max(1, chunk_size)
+        step = max(1, chunk_size - chunk_overlap)
+        window: deque[tuple[str, int, int | None]] = deque()  # (word, offset, page)
+        emitted = False
+
+        for page, base, text in segments:
+            for match in _WORD_RE.finditer(text):
+                window.append((match.group(), base + match.start(), page))
+                # Only emit a full window once we know more words follow, so a
+                # document of exactly chunk_size words stays a single chunk
+                if len(window) > chunk_size:
+                    yield _window_chunk(window, chunk_size)
+                    emitted = True
+                    for _ in range(step):
+                        window.popleft()
+
+        if not emitted:
+            if window:
+                yield _window_chunk(window, chunk_size)
+            return
+
+        while window:
+            yield _window_chunk(window, chunk_size)
+            for _ in range(min(step, len(window))):
+                window.popleft()
+
+    @staticmethod
+    def iter_document_chunks(
+        file_path: Path, file_type: str, chunk_size: int, chunk_overlap: int
+    ) -> Iterator[TextChunk]:
+        """Extract and chunk a document in one streaming pass."""
+        return DocumentProcessor.iter_chunks(
+            DocumentProcessor.iter_segments(file_path, file_type), chunk_size, chunk_overlap
+        )
 
-        return "\n\n".join(parts)
+    async def iter_chunk_batches(
+        self, file_path: Path, file_type: str
+    ) -> AsyncIterator[tuple[list[TextChunk], float]]:
+        """Stream a document's chunks in batches of ``embed_batch_size``.
+
+        Extraction runs in ``extraction_executor`` (a thread without the
+        ingestion queue) and hands batches over a bounded queue, so only a few
+        batches are held at a time and embedding starts with the first one.
+        Each batch comes with the fraction of the document read so far.
+        """
+        loop = asyncio.get_running_loop()
+        manager = self.extraction_manager
+        out: Any
+        stop: Any
+        if manager is not None:
+            out, stop = manager.Queue(_STREAM_DEPTH), manager.Event()
+            executor = self.extraction_executor
+        else:
+            out, stop = queue.Queue(_STREAM_DEPTH), threading.Event()
+            executor = None
+        producer = loop.run_in_executor(
+            executor,
+            _produce_chunk_batches,
+            file_path,
+            file_type,
+            self.chunk_size,
+            self.chunk_overlap,
+            self.embed_batch_size,
+            out,
+            stop,
+        )
+        try:
+            while (batch := await loop.run_in_executor(None, _take, out, stop)) is not None:
+                yield batch
+            await producer  # re-raises extraction errors
+        finally:
+            stop.set()
+            if not producer.done():
+                # Exits at its next hand-off; nothing is waiting for it any more
+                producer.add_done_callback(lambda f: f.cancelled() or f.exception())
 
     def chunk_text(self, text: str) -> list[str]:
         """
@@ -148,34 +430,10 @@ class DocumentProcessor:
         Returns:
             List of text chunks
         """
-        # Normalize whitespace
-        text = " ".join(text.split())
-
-        if not text:
-            return []
-
-        words = text.split()
-
-        if len(words) <= self.chunk_size:
-            return [text]
-
-        chunks = []
-        i = 0
-
-        while i < len(words):
-            # Get chunk_size words starting at position i
-            chunk_words = words[i : i + self.chunk_size]
-            chunk_text = " ".join(chunk_words)
-            chunks.append(chunk_text)
-
-            # Move forward by (chunk_size - overlap)
-            i += self.chunk_size - self.chunk_overlap
-
-            # If remaining words are less than overlap, stop
-            if i >= len(words):
-                break
-
-        return chunks
+        return [
+            chunk.content
+            for chunk in self.iter_chunks([(None, 0, text)], self.chunk_size, self.chunk_overlap)
+        ]
 
     async def process_document(
         self,
@@ -205,73 +463,44 @@ class DocumentProcessor:
             # Broadcast processing start
             await self._broadcast_status(bot_id, document_id, "processing")
 
-            # Step 1: Extract text
-            logger.debug(f"Extracting text from {file_path}")
-            text = await asyncio.get_event_loop().run_in_executor(
-                None, self.extract_text, file_path, file_type
-            )
-
-            if not text.strip():
-                logger.warning(f"No text extracted from document {document_id}")
-                await self._repo.update_document_status(
-                    document_id, DocumentStatus.READY, chunk_count=0
+            # Steps 1-5: Stream-extract and chunk the text, embedding and
+            # storing each batch as it arrives
+            logger.debug(f"Streaming {file_path} in batches of {self.embed_batch_size}")
+            try:
+                chunk_count, reused = await self._embed_and_store(
+                    document_id, bot_id, file_path, file_type
+                )
+            except _StaleChunksError:
+                logger.info(f"Discarding stale chunks for document {document_id}")
+                await self._repo.delete_chunks_by_document(document_id)
+                chunk_count, reused = await self._embed_and_store(
+                    document_id, bot_id, file_path, file_type, resume=False
                 )
-                return 0
-
-            # Step 2: Chunk text
-            logger.debug("Chunking text")
-            chunks_text = self.chunk_text(text)
-            logger.info(f"Created {len(chunks_text)} chunks")
 
-            if not chunks_text:
+            if not chunk_count:
+                logger.warning(f"No text extracted from document {document_id}")
                 await self._repo.update_document_status(
                     document_id, DocumentStatus.READY, chunk_count=0
                 )
                 return 0
+            if reused:
+                logger.info(f"Reused {reused} cached embeddings for document {document_id}")
+                await self._repo.update_document_embeddings_reused(document_id, reused)
+            await self._prune_embedding_cache()
 
-            # Step 3: Generate embeddings
-            logger.debug("Generating embeddings")
-            embeddings = await self.vector_store.embed_texts(chunks_text)
-
-            # Step 4: Create chunk records
-            doc_chunks = [
-                DocChunk(
-                    id=str(uuid.uuid4()),
-                    document_id=document_id,
-                    bot_id=bot_id,
-                    chunk_index=i,
-                    content=chunk_text,
-                    embedding=self.vector_store.serialize_embedding(embedding),
-                )
-                for i, (chunk_text, embedding) in enumerate(zip(chunks_text, embeddings))
-            ]
-
-            # Step 5: Store chunks
-            logger.debug(f"Storing {len(doc_chunks)} chunks")
-            await self._repo.save_chunks(doc_chunks)
-
-            # Step 6: Track embedding model on the document
-            try:
-                vs = self.vector_store
-                await self._repo.update_document_embedding_info(
-                    document_id,
-                    embedding_model=vs.model_name,
-                    embedding_dimensions=vs.get_dimensions(),
-                )
-            except Exception as e:
-                logger.debug(f"Could not save embedding info on document: {e}")
-
-            # Step 7: Update document status
+            # Step 6: Update document status
             await self._repo.update_document_status(
-                document_id, DocumentStatus.READY, chunk_count=len(doc_chunks)
+                document_id, DocumentStatus.READY, chunk_count=chunk_count
             )
 
-            logger.info(f"Document {document_id} processed: {len(doc_chunks)} chunks")
+            logger.info(f"Document {document_id} processed: {chunk_count} chunks")
 
             # Broadcast ready status
-            await self._broadcast_status(bot_id, document_id, "ready", chunk_count=len(doc_chunks))
+            await self._broadcast_status(
+                bot_id, document_id, "ready", chunk_count=chunk_count, progress=100
+            )
 
-            return len(doc_chunks)
+            return chunk_count
 
         except Exception as e:
             logger.error(f"Failed to process document {document_id}: {e}")
@@ -282,6 +511,184 @@ class DocumentProcessor:
 
             raise
 
+    async def _stored_chunks(self, document_id: str) -> dict[int, str]:
+        """Return the chunks stored by a previous attempt (index -> text).
+
+        Raises:
+            _StaleChunksError: If they were embedded with another model.
+        """
+        stored = await self._repo.get_chunks_by_document_light(document_id)
+        if not stored:
+            return {}
+        doc = await self._repo.get_document(document_id)
+        if doc is not None and doc.embedding_model not in (None, self.vector_store.model_name):
+            raise _StaleChunksError
+        logger.info(f"Resuming document {document_id}: {len(stored)} chunks already stored")
+        return {row["chunk_index"]: row["content"] for row in stored}
+
+    async def _record_embedding_model(self, document_id: str) -> None:
+        """Track the embedding model on the document (used to validate resumes)."""
+        try:
+            vs = self.vector_store
+            await self._repo.update_document_embedding_info(
+                document_id,
+                embedding_model=vs.model_name,
+                embedding_dimensions=vs.get_dimensions(),
+            )
+        except Exception as e:
+            logger.debug(f"Could not save embedding info on document: {e}")
+
+    async def _embed_with_retry(self, texts: list[str]) -> list[np.ndarray]:
+        """Embed one batch, retrying transient failures with exponential backoff."""
+        for attempt in range(self.embed_max_retries + 1):
+            try:
+                if self.embed_limiter is None:
+                    return await self.vector_store.embed_texts(texts)
+                async with self.embed_limiter:
+                    return await self.vector_store.embed_texts(texts)
+            except Exception as e:
+                if attempt >= self.embed_max_retries:
+                    raise
+                delay = _RETRY_BASE_DELAY * (2**attempt)
+                logger.warning(
+                    f"Embedding batch failed (attempt {attempt + 1}), retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+        return []  # unreachable
+
+    async def _embed_cached(self, texts: list[str]) -> tuple[list[Any], int]:
+        """Embed *texts*, serving repeats from the content-hash embedding cache.
+
+        Returns:
+            ``(embeddings, reused)`` where *reused* counts texts that were not
+            sent to the provider (cached, or a duplicate within the batch).
+        """
+        model = self.vector_store.model_name
+        hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        try:
+            known = await self._repo.get_cached_embeddings(model, list(set(hashes)))
+        except Exception as e:
+            logger.debug(f"Embedding cache lookup failed: {e}")
+            known = {}
+
+        # Embed each distinct uncached text once
+        missing = {h: text for h, text in zip(hashes, texts) if h not in known}
+        if missing:
+            fresh = await self._embed_with_retry(list(missing.values()))
+            new_entries = dict(zip(missing, fresh))
+            try:
+                await self._repo.save_cached_embeddings(model, new_entries)
+            except Exception as e:
+                logger.debug(f"Embedding cache write failed: {e}")
+            known = {**known, **new_entries}
+
+        # Everything beyond the distinct uncached texts avoided a provider call
+        return [known[h] for h in hashes], len(texts) - len(missing)
+
+    async def _prune_embedding_cache(self) -> None:
+        """Evict the least used cache entries beyond the configured cap."""
+        if not self.embedding_cache_max_entries:
+            return
+        try:
+            removed = await self._repo.prune_embedding_cache(self.embedding_cache_max_entries)
+        except Exception as e:
+            logger.debug(f"Embedding cache pruning failed: {e}")
+            return
+        if removed:
+            logger.debug(f"Evicted {removed} embedding cache entries")
+
+    async def _embed_and_store(
+        self,
+        document_id: str,
+        bot_id: str,
+        file_path: Path,
+        file_type: str,
+        resume: bool = True,
+    ) -> tuple[int, int]:
+        """Stream the document's chunks, embedding and saving them batch by batch.
+
+        With *resume*, chunks stored by a previous attempt are skipped;
+        ``_StaleChunksError`` is raised if they no longer match the document.
+
+        Returns:
+            ``(chunk_count, reused)``: chunks in the document, and chunks whose
+            embedding was reused from the cache.
+        """
+        stored: dict[int, str] | None = None
+        total = completed = reused = 0
+        read = 0.0  # fraction of the document extracted so far
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        tasks: list[asyncio.Task[None]] = []
+
+        async def run_batch(batch: list[tuple[int, TextChunk]]) -> None:
+            nonlocal completed, reused
+            try:
+                embeddings, batch_reused = await self._embed_cached(
+                    [chunk.content for _, chunk in batch]
+                )
+                await self._repo.save_chunks(
+                    [
+                        DocChunk(
+                            id=str(uuid.uuid4()),
+                            document_id=document_id,
+                            bot_id=bot_id,
+                            chunk_index=i,
+                            content=chunk.content,
+                            embedding=self.vector_store.serialize_embedding(embedding),
+                            page_number=chunk.page_number,
+                            char_start=chunk.char_start,
+                            char_end=chunk.char_end,
+                        )
+                        for (i, chunk), embedding in zip(batch, embeddings)
+                    ]
+                )
+            finally:
+                semaphore.release()
+            completed += len(batch)
+            reused += batch_reused
+            # The chunk total is only known at the end; estimate it from the
+            # chunks extracted so far and the share of the document they cover
+            estimated = total / read if read > 0 else 0.0
+            progress = min(99, int(completed * 100 / estimated)) if estimated else 0
+            await self._broadcast_status(
+                bot_id, document_id, "processing", chunk_count=completed, progress=progress
+            )
+
+        try:
+            async for chunks, read in self.iter_chunk_batches(file_path, file_type):
+                if stored is None:
+                    stored = await self._stored_chunks(document_id) if resume else {}
+                    await self._record_embedding_model(document_id)
+                    completed = len(stored)
+
+                batch: list[tuple[int, TextChunk]] = []
+                for index, chunk in enumerate(chunks, start=total):
+                    if index not in stored:
+                        batch.append((index, chunk))
+                    elif stored[index] != chunk.content:
+                        raise _StaleChunksError
+                total += len(chunks)
+                if not batch:
+                    continue
+
+                # Wait for an embedding slot before taking more of the document
+                await semaphore.acquire()
+                for task in [t for t in tasks if t.done()]:
+                    tasks.remove(task)
+                    task.result()  # re-raises a failed batch
+                tasks.append(asyncio.create_task(run_batch(batch)))
+
+            if stored and max(stored) >= total:
+                raise _StaleChunksError
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the remaining batches; completed ones stay stored for resume
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return total, reused
+
 
 # Singleton instance
 _processor: DocumentProcessor | None = None
@@ -297,5 +704,9 @@ def get_document_processor() -> DocumentProcessor:
         _processor = DocumentProcessor(
             chunk_size=config.knowledge.chunk_size,
             chunk_overlap=config.knowledge.chunk_overlap,
+            embed_batch_size=config.knowledge.embed_batch_size,
+            embed_concurrency=config.knowledge.embed_concurrency,
+            embed_max_retries=config.knowledge.embed_max_retries,
+            embedding_cache_max_entries=config.knowledge.embedding_cache_max_entries,
         )
     return _processor
@@ -0,0 +1,226 @@
+"""
+Query Embedding Cache.
+
+Bounded LRU + TTL cache for query embeddings, keyed by
+``(model_name, sha256(normalized text))``. Repeated or whitespace-variant
+queries (e.g. a ``kb_search`` tool call repeating the user's question) skip
+the embedding provider round-trip entirely.
+
+Entries can optionally be persisted to a small local SQLite side table so the
+cache survives restarts. Hit/miss counters and an estimate of the provider
+latency saved are exposed through ``stats()``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from cachibot.storage.embedding_codec import decode_embedding, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERSIST_PATH = Path.home() / ".cachibot" / "embedding_cache.db"
+
+# Persisted rows kept per in-memory slot before the oldest are pruned
+_PERSIST_FACTOR = 8
+
+# The persisted table is pruned after every max_rows / _PRUNE_DIVISOR inserts,
+# so it never grows past about 110% of max_rows
+_PRUNE_DIVISOR = 10
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different queries share a key."""
+    return " ".join(text.split())
+
+
+def make_key(model_name: str, text: str) -> str:
+    """Cache key for *text* embedded with *model_name*."""
+    digest = hashlib.sha256(normalize_query(text).encode("utf-8")).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+class _PersistentStore:
+    """SQLite side table holding encoded embeddings (blocking; run in executor)."""
+
+    def __init__(self, path: Path, ttl_seconds: float, max_rows: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._ttl = ttl_seconds
+        self._max_rows = max_rows
+        self._prune_every = max(1, max_rows // _PRUNE_DIVISOR)
+        self._puts_since_prune = 0
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, embedding BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_query_embeddings_created "
+                "ON query_embeddings (created_at)"
+            )
+        self.prune()
+
+    def get(self, key: str) -> tuple[np.ndarray, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT embedding, created_at FROM query_embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if self._ttl and time.time() - row[1] > self._ttl:
+            return None
+        return decode_embedding(row[0]), row[1]
+
+    def put(self, key: str, vector: np.ndarray, created_at: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, embedding, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, encode_embedding(vector), created_at),
+            )
+            self._puts_since_prune += 1
+            due = self._puts_since_prune >= self._prune_every
+        if due:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired rows and keep at most ``max_rows`` of the newest."""
+        with self._lock, self._conn:
+            self._puts_since_prune = 0
+            if self._ttl:
+                self._conn.execute(
+                    "DELETE FROM query_embeddings WHERE created_at < ?",
+                    (time.time() - self._ttl,),
+                )
+            self._conn.execute(
+                "DELETE FROM query_embeddings WHERE key NOT IN ("
+                "SELECT key FROM query_embeddings ORDER BY created_at DESC LIMIT ?)",
+                (self._max_rows,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """LRU + TTL cache of query embeddings with optional SQLite persistence.
+
+    Args:
+        max_entries: In-memory capacity; least recently used entries are evicted.
+        ttl_seconds: Entry lifetime (0 = never expire).
+        persist_path: If set, entries are also written to this SQLite file.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        persist_path: Path | None = None,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[np.ndarray, float]] = OrderedDict()
+        self._store: _PersistentStore | None = None
+        if persist_path is not None:
+            try:
+                self._store = _PersistentStore(
+                    persist_path, ttl_seconds, self.max_entries * _PERSIST_FACTOR
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Query embedding cache persistence disabled: {e}")
+
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._miss_ms_total = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, model_name: str, text: str) -> np.ndarray | None:
+        """Return the cached embedding for *text*, or None (counted as a miss)."""
+        key = make_key(model_name, text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            vector, created_at = entry
+            if not self._expired(created_at):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            del self._entries[key]
+
+        if self._store is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                found = await loop.run_in_executor(None, self._store.get, key)
+            except sqlite3.Error as e:
+                logger.debug(f"Query embedding cache read failed: {e}")
+                found = None
+            if found is not None:
+                vector, created_at = found
+                self._remember(key, vector, created_at)
+                self.hits += 1
+                self.persistent_hits += 1
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def put(
+        self, model_name: str, text: str, vector: np.ndarray, elapsed_ms: float = 0.0
+    ) -> None:
+        """Store an embedding; *elapsed_ms* is the provider latency it cost."""
+        key = make_key(model_name, text)
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        created_at = time.time()
+        self._remember(key, vector, created_at)
+        self._miss_ms_total += elapsed_ms
+
+        if self._store is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._store.put, key, vector, created_at)
+            except sqlite3.Error as e:
+                logger.debug(f"Query embedding cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (persisted rows expire on their own)."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Counters plus the estimated embedding latency saved by hits."""
+        avg_miss_ms = self._miss_ms_total / self.misses if self.misses else 0.0
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_miss_ms": round(avg_miss_ms, 2),
+            "saved_ms": round(self.hits * avg_miss_ms, 2),
+        }
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, vector: np.ndarray, created_at: float) -> None:
+        self._entries[key] = (vector, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
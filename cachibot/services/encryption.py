@@ -3,6 +3,12 @@ Encryption Service for Cachibot
 
 AES-256-GCM encryption with HKDF per-bot key derivation.
 Master key sourced from CACHIBOT_MASTER_KEY env var or auto-generated.
+
+Every stored value has its own random salt, so each one needs its own HKDF
+derivation. Derived ciphers are kept in a small in-memory LRU keyed by
+(bot_id, salt): secrets that are decrypted again and again (connection
+configs, provider keys) pay for the KDF once per process. Derived keys are
+never persisted.
 """
 
 import base64
@@ -10,6 +16,9 @@ import json
 import logging
 import os
 import secrets
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 
@@ -25,10 +34,18 @@ _PLATFORM_INFO = b"cachibot-platform-env"
 
 
 class EncryptionService:
-    """AES-256-GCM encryption with per-bot HKDF key derivation."""
+    """AES-256-GCM encryption with per-bot HKDF key derivation.
+
+    Args:
+        master_key: 32-byte master key (loaded or generated when omitted).
+        key_cache_size: Derived ciphers kept in memory (0 = derive every time).
+    """
 
-    def __init__(self, master_key: bytes | None = None) -> None:
+    def __init__(self, master_key: bytes | None = None, key_cache_size: int = 256) -> None:
         self._master_key = master_key or self._load_master_key()
+        self._key_cache_size = key_cache_size
+        self._key_cache: OrderedDict[tuple[str, bytes], AESGCM] = OrderedDict()
+        self._key_cache_lock = threading.Lock()
 
     @staticmethod
     def _load_master_key() -> bytes:
@@ -67,6 +84,28 @@ class EncryptionService:
         )
         return hkdf.derive(master_key)
 
+    def _cipher(self, bot_id: str | None, salt: bytes) -> AESGCM:
+        """Return the AES-GCM cipher for (bot_id, salt), deriving it on a miss."""
+        key = (bot_id or "", salt)
+        with self._key_cache_lock:
+            cipher = self._key_cache.get(key)
+            if cipher is not None:
+                self._key_cache.move_to_end(key)
+                return cipher
+
+        cipher = AESGCM(self.derive_bot_key(self._master_key, bot_id or "", salt))
+        if self._key_cache_size > 0:
+            with self._key_cache_lock:
+                self._key_cache[key] = cipher
+                while len(self._key_cache) > self._key_cache_size:
+                    self._key_cache.popitem(last=False)
+        return cipher
+
+    def clear_key_cache(self) -> None:
+        """Forget all derived keys held in memory."""
+        with self._key_cache_lock:
+            self._key_cache.clear()
+
     def encrypt_value(self, plaintext: str, bot_id: str | None = None) -> tuple[str, str, str]:
         """Encrypt a plaintext string.
 
@@ -110,12 +149,39 @@ class EncryptionService:
         ciphertext = base64.b64decode(ciphertext_b64)
         nonce = base64.b64decode(nonce_b64)
         salt = base64.b64decode(salt_b64)
-        derived = self.derive_bot_key(self._master_key, bot_id or "", salt)
-        aesgcm = AESGCM(derived)
         aad = (bot_id or "platform").encode()
-        plaintext = aesgcm.decrypt(nonce, ciphertext, aad)
+        plaintext = self._cipher(bot_id, salt).decrypt(nonce, ciphertext, aad)
         return plaintext.decode()
 
+    def decrypt_many(
+        self,
+        values: Iterable[tuple[str, str, str]],
+        bot_id: str | None = None,
+    ) -> list[str | None]:
+        """Decrypt several values that belong to the same bot (or the platform).
+
+        Args:
+            values: ``(ciphertext_b64, nonce_b64, salt_b64)`` tuples.
+            bot_id: Bot ID for key derivation. None for platform-level.
+
+        Returns:
+            Plaintexts in input order; ``None`` for any value that failed to
+            decrypt (wrong key, tampered data, bad encoding), so one corrupt
+            row does not hide the others.
+        """
+        aad = (bot_id or "platform").encode()
+        results: list[str | None] = []
+        for ciphertext_b64, nonce_b64, salt_b64 in values:
+            try:
+                salt = base64.b64decode(salt_b64)
+                plaintext = self._cipher(bot_id, salt).decrypt(
+                    base64.b64decode(nonce_b64), base64.b64decode(ciphertext_b64), aad
+                )
+                results.append(plaintext.decode())
+            except Exception:
+                results.append(None)
+        return results
+
     def encrypt_connection_config(self, config: dict[str, Any], bot_id: str) -> dict[str, str]:
         """Encrypt a connection config dict for DB storage.
 
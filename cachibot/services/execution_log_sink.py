@@ -0,0 +1,199 @@
+"""
+Execution Log Sink
+
+Buffered writer for the structured log lines of one running execution.
+``ExecutionLogRepository.append_line`` costs a ``SELECT max(seq)``, an
+``INSERT`` and a commit per line, and two concurrent writers can pick the same
+``seq``. A sink owns its execution's sequence counter in memory instead:
+
+- ``write`` is synchronous and thread-safe (usable from agent tool
+  callbacks), assigns the next ``seq`` and returns immediately
+- every line is pushed live over ``WSMessage.execution_log`` in ``seq``
+  order, also when lines are written from several threads at once
+- lines are stored with one multi-row INSERT per batch, once ``max_lines``
+  lines are pending or ``flush_interval`` seconds after the first one
+- ``close`` flushes the rest; call it before broadcasting the execution end
+
+Used by ``JobRunnerService`` for agent and script jobs.
+"""
+
+import asyncio
+import logging
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from cachibot.storage.automations_repository import ExecutionLogLineRepository
+
+logger = logging.getLogger(__name__)
+
+# Seconds a line may wait before its batch is written
+_FLUSH_INTERVAL = 0.5
+
+# Lines per INSERT; reaching it flushes right away
+_MAX_BATCH = 200
+
+
+class ExecutionLogSink:
+    """Sequence-allocating, batching log line writer for one execution."""
+
+    def __init__(
+        self,
+        execution_log_id: str,
+        next_seq: int = 1,
+        flush_interval: float = _FLUSH_INTERVAL,
+        max_lines: int = _MAX_BATCH,
+        broadcast: bool = True,
+    ) -> None:
+        self.execution_log_id = execution_log_id
+        self.flush_interval = flush_interval
+        self.max_lines = max(1, max_lines)
+        self.broadcast = broadcast
+        self._repo = ExecutionLogLineRepository()
+
+        # write() may be called from tool threads; the rest runs on this loop
+        self._loop = asyncio.get_running_loop()
+        self._seq_lock = threading.Lock()
+        self._next_seq = next_seq
+        # Lines written but not yet handed to the loop, in seq order
+        self._incoming: deque[dict[str, Any]] = deque()
+        self._pending: list[dict[str, Any]] = []
+        self._unsent: deque[dict[str, Any]] = deque()
+        self._timer: asyncio.Task[None] | None = None
+        self._sender: asyncio.Task[None] | None = None
+        self._flushes: set[asyncio.Task[None]] = set()
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @classmethod
+    async def resume(cls, execution_log_id: str, **kwargs: Any) -> "ExecutionLogSink":
+        """Open a sink for an execution that may already have stored lines."""
+        last_seq = await ExecutionLogLineRepository().get_last_seq(execution_log_id)
+        return cls(execution_log_id, next_seq=last_seq + 1, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write(self, level: str, content: str, data: dict[str, Any] | None = None) -> int:
+        """Queue a log line and return its sequence number."""
+        if self._closed:
+            logger.debug(f"Log line for closed execution {self.execution_log_id} dropped")
+            return 0
+
+        # seq is assigned and the line queued under one lock, so the loop
+        # always takes lines in seq order, whichever thread wrote them
+        with self._seq_lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._incoming.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "execution_log_id": self.execution_log_id,
+                    "seq": seq,
+                    "timestamp": datetime.now(timezone.utc),
+                    "level": level,
+                    "content": content,
+                    "data": data,
+                }
+            )
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._drain()
+        else:
+            self._loop.call_soon_threadsafe(self._drain)
+        return seq
+
+    def _drain(self) -> None:
+        """Move written lines to the store and broadcast queues (on the loop)."""
+        with self._seq_lock:
+            lines = list(self._incoming)
+            self._incoming.clear()
+        if not lines:
+            return
+        self._pending.extend(lines)
+
+        if self.broadcast:
+            self._unsent.extend(lines)
+            if self._sender is None or self._sender.done():
+                self._sender = asyncio.create_task(self._send_live())
+
+        if len(self._pending) >= self.max_lines:
+            task = asyncio.create_task(self.flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    def write_output(self, output: str, level: str = "stdout") -> None:
+        """Write captured multi-line output as one log line per line."""
+        for text in output.splitlines():
+            self.write(level, text)
+
+    async def flush(self) -> None:
+        """Store all pending lines."""
+        async with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            for start in range(0, len(pending), self.max_lines):
+                batch = pending[start : start + self.max_lines]
+                try:
+                    await self._repo.append_many(batch)
+                except Exception as e:
+                    logger.warning(
+                        f"Could not store {len(batch)} log line(s) for execution "
+                        f"{self.execution_log_id}: {e}"
+                    )
+
+    async def close(self) -> None:
+        """Flush and deliver everything written so far. Safe to call twice."""
+        self._closed = True
+        self._drain()
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        if self._sender is not None:
+            await asyncio.gather(self._sender, return_exceptions=True)
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    # ------------------------------------------------------------------
+    # Live tailing
+    # ------------------------------------------------------------------
+
+    async def _send_live(self) -> None:
+        """Broadcast queued lines one by one, in sequence order."""
+        try:
+            from cachibot.api.websocket import get_ws_manager
+            from cachibot.models.websocket import WSMessage
+
+            ws = get_ws_manager()
+        except Exception:
+            self._unsent.clear()
+            return
+
+        while self._unsent:
+            line = self._unsent.popleft()
+            try:
+                await ws.broadcast(
+                    WSMessage.execution_log(
+                        execution_log_id=self.execution_log_id,
+                        seq=line["seq"],
+                        level=line["level"],
+                        content=line["content"],
+                        timestamp=line["timestamp"].isoformat(),
+                    )
+                )
+            except Exception:
+                logger.debug("Could not broadcast execution log line")
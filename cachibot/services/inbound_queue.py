@@ -0,0 +1,314 @@
+"""
+Inbound Queue Service
+
+Durable queue for webhook-delivered platform messages (WhatsApp, LINE, Viber,
+custom). The webhook routes used to run the whole agent turn and send the
+reply before answering the HTTP request, so a slow LLM call made the platform
+time out and redeliver the same message, which was then answered twice.
+
+Routes now only verify the request, store each event in ``inbound_events``
+and return 200. A fixed pool of workers drains the queue:
+
+- redeliveries are dropped on insert (unique per connection and platform
+  message ID), so a retried webhook costs one INSERT
+- events of the same chat enter the message pipeline one at a time, in
+  arrival order; the next one starts once the previous event has its place
+  in the chat (``hand_off_chat``), not when its turn ends, so the coalescer
+  can merge a burst and the chat dispatcher keeps the replies in order
+- an event's turn runs once: the event is marked done as soon as the
+  adapter has its reply, and only delivering that reply is retried with
+  backoff (a failed turn, or a reply that still cannot be sent, marks the
+  event failed); events whose connection is not active yet are retried too
+- pending events survive a restart; handled rows are pruned after a
+  retention window (which is also the redelivery dedup window)
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from cachibot.services.adapters.base import BasePlatformAdapter, InboundReply, WebhookEvent
+from cachibot.services.chat_dispatcher import chat_handoff
+from cachibot.services.platform_manager import get_platform_manager
+from cachibot.storage.repository import ConnectionRepository
+
+logger = logging.getLogger(__name__)
+
+# First retry delay (seconds); doubles on every further attempt
+_RETRY_DELAY = 2.0
+
+# How often handled events older than the retention window are deleted (seconds)
+_PRUNE_INTERVAL = 3600.0
+
+
+@dataclass
+class _QueueItem:
+    event_id: str
+    connection_id: str
+    platform: str
+    chat_id: str
+    payload: dict[str, Any]
+    attempts: int = 0
+
+
+class InboundQueueService:
+    """Background workers that answer queued webhook events."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_attempts: int = 3,
+        retention_hours: int = 24,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retention = timedelta(hours=retention_hours)
+        self._repo = ConnectionRepository()
+
+        self._queue: asyncio.Queue[_QueueItem] = asyncio.Queue()
+        # (connection_id, chat_id) being handed off -> its events, in order
+        self._chats: dict[tuple[str, str], deque[_QueueItem]] = {}
+        # Events handed off whose turn is still running
+        self._handling: set[asyncio.Task[None]] = set()
+
+        self._worker_tasks: list[asyncio.Task[None]] = []
+        self._prune_task: asyncio.Task[None] | None = None
+        self._running = False
+
+        self._received = 0
+        self._duplicates = 0
+        self._failed = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Restore pending events and start the worker pool."""
+        if self._running:
+            return
+        self._running = True
+
+        try:
+            pending = await self._repo.get_pending_inbound_events()
+        except Exception:
+            logger.exception("Could not restore inbound queue")
+            pending = []
+        for row in pending:
+            self._queue.put_nowait(
+                _QueueItem(
+                    event_id=row["id"],
+                    connection_id=row["connection_id"],
+                    platform=row["platform"],
+                    chat_id=row["chat_id"],
+                    payload=row["payload"],
+                    attempts=row["attempts"],
+                )
+            )
+        if pending:
+            logger.info("Resuming %d queued webhook event(s)", len(pending))
+
+        self._worker_tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.workers)]
+        self._prune_task = asyncio.create_task(self._prune_loop())
+        logger.info("Inbound queue started (%d workers)", self.workers)
+
+    async def stop(self) -> None:
+        """Stop the workers. Unfinished events stay persisted for next start."""
+        self._running = False
+        tasks = list(self._worker_tasks)
+        if self._prune_task is not None:
+            tasks.append(self._prune_task)
+        tasks.extend(self._handling)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._handling.clear()
+        self._prune_task = None
+        logger.info("Inbound queue stopped")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def enqueue(self, connection_id: str, platform: str, event: WebhookEvent) -> bool:
+        """Persist a verified webhook event and queue it for processing.
+
+        Returns:
+            False if the event was already received (a redelivery), else True.
+        """
+        event_id = await self._repo.enqueue_inbound_event(
+            connection_id, platform, event.chat_id, event.event_key, event.payload
+        )
+        if event_id is None:
+            self._duplicates += 1
+            logger.debug(
+                f"Dropped redelivered {platform} event {event.event_key} "
+                f"for connection {connection_id}"
+            )
+            return False
+
+        self._received += 1
+        self._queue.put_nowait(
+            _QueueItem(event_id, connection_id, platform, event.chat_id, event.payload)
+        )
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and counters since startup."""
+        return {
+            "queued": self._queue.qsize() + sum(len(b) - 1 for b in self._chats.values()),
+            "active": len(self._handling),
+            "received": self._received,
+            "duplicates": self._duplicates,
+            "failed": self._failed,
+        }
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _worker_loop(self) -> None:
+        while self._running:
+            item = await self._queue.get()
+            key = (item.connection_id, item.chat_id)
+            backlog = self._chats.get(key)
+            if backlog is not None:
+                # Another worker is handling this chat; it picks this up next
+                backlog.append(item)
+                continue
+
+            backlog = self._chats[key] = deque([item])
+            try:
+                while backlog:
+                    await self._hand_off(backlog[0])
+                    backlog.popleft()
+            finally:
+                self._chats.pop(key, None)
+
+    async def _hand_off(self, item: _QueueItem) -> None:
+        """Start handling an event; return once it is ordered in its chat or done.
+
+        The turn itself (coalesce window, agent run, reply) continues in the
+        background, so it does not hold up the chat's next event.
+        """
+        handoff = asyncio.Event()
+        token = chat_handoff.set(handoff)
+        try:
+            task = asyncio.create_task(self._run(item))
+        finally:
+            chat_handoff.reset(token)
+        self._handling.add(task)
+        task.add_done_callback(self._handling.discard)
+
+        waiter = asyncio.create_task(handoff.wait())
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+
+    async def _run(self, item: _QueueItem) -> None:
+        try:
+            await self._handle(item)
+        except Exception:
+            logger.exception("Inbound worker error for event %s", item.event_id)
+        finally:
+            self._queue.task_done()
+
+    async def _handle(self, item: _QueueItem) -> None:
+        attempt = item.attempts
+        while True:
+            attempt += 1
+            adapter = get_platform_manager().get_adapter(item.connection_id)
+            if adapter is not None:
+                break
+            # Nothing has run yet, so waiting for the connection is safe
+            if not await self._retry_or_fail(item, attempt, "Connection is not active"):
+                return
+
+        try:
+            reply = await adapter.handle_inbound_event(item.payload)
+        except Exception as e:
+            # The turn may already have saved messages or replied; running
+            # it again would do that twice
+            await self._fail(item, attempt, e)
+            return
+        await self._repo.update_inbound_event(item.event_id, "done", attempt)
+        if reply is not None:
+            await self._deliver(item, adapter, reply)
+
+    async def _deliver(
+        self, item: _QueueItem, adapter: BasePlatformAdapter, reply: InboundReply
+    ) -> None:
+        """Send an event's reply, retrying only the delivery."""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await adapter.deliver_inbound_reply(reply)
+                return
+            except Exception as e:
+                # The row stays "done": a restart must not run the turn again
+                error = f"Delivery failed: {e}"
+                if not await self._retry_or_fail(item, attempt, error, pending=False):
+                    return
+
+    async def _retry_or_fail(
+        self, item: _QueueItem, attempt: int, error: str, pending: bool = True
+    ) -> bool:
+        """Back off before another attempt; False (event marked failed) once out of attempts.
+
+        With *pending*, the row is marked for a retry, so a restart picks it up.
+        """
+        if attempt >= self.max_attempts:
+            await self._fail(item, attempt, error)
+            return False
+        logger.warning(
+            f"{item.platform} event {item.event_id} failed (attempt {attempt}), retrying: {error}"
+        )
+        if pending:
+            await self._repo.update_inbound_event(item.event_id, "pending", attempt, error)
+        await asyncio.sleep(_RETRY_DELAY * 2 ** (attempt - 1))
+        return True
+
+    async def _fail(self, item: _QueueItem, attempt: int, error: Exception | str) -> None:
+        self._failed += 1
+        logger.error(
+            f"Giving up on {item.platform} event {item.event_id} for connection "
+            f"{item.connection_id} after {attempt} attempt(s): {error}"
+        )
+        await self._repo.update_inbound_event(item.event_id, "failed", attempt, str(error))
+
+    async def _prune_loop(self) -> None:
+        while self._running:
+            try:
+                removed = await self._repo.prune_inbound_events(
+                    datetime.now(timezone.utc) - self.retention
+                )
+                if removed:
+                    logger.debug("Pruned %d handled webhook event(s)", removed)
+            except Exception as e:
+                logger.warning(f"Failed to prune inbound events: {e}")
+            await asyncio.sleep(_PRUNE_INTERVAL)
+
+
+# Singleton
+_inbound_queue: InboundQueueService | None = None
+
+
+def get_inbound_queue() -> InboundQueueService:
+    """Get the singleton inbound queue service (config-aware)."""
+    global _inbound_queue
+    if _inbound_queue is None:
+        from cachibot.config import Config
+
+        config = Config.snapshot()
+        _inbound_queue = InboundQueueService(
+            workers=config.messaging.inbound_workers,
+            max_attempts=config.messaging.inbound_max_attempts,
+            retention_hours=config.messaging.inbound_retention_hours,
+        )
+    return _inbound_queue
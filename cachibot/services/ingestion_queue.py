@@ -0,0 +1,234 @@
+"""
+Ingestion Queue Service
+
+Durable, prioritized queue for document processing. Uploads, retries and
+reindexes enqueue documents here instead of running as FastAPI background
+tasks, so that:
+
+- a fixed pool of workers bounds how many documents are processed at once
+- PDF/DOCX extraction runs in a process pool, off the event loop's executor,
+  and streams chunks back through a manager queue as they are produced
+- embedding requests are capped globally, across all documents
+- interactive single-file uploads jump ahead of bulk reindexes
+- pending documents survive a restart (persisted in ``ingestion_jobs``)
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.managers import SyncManager
+from pathlib import Path
+from typing import Any
+
+from cachibot.services.document_processor import DocumentProcessor, get_document_processor
+from cachibot.storage.repository import KnowledgeRepository
+
+logger = logging.getLogger(__name__)
+
+# Lower value = processed first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+# Delay before retrying a document that is already being processed (seconds)
+_BUSY_REQUEUE_DELAY = 1.0
+
+
+@dataclass(order=True)
+class _QueueItem:
+    priority: int
+    seq: int
+    document_id: str = field(compare=False)
+    bot_id: str = field(compare=False)
+    file_path: Path = field(compare=False)
+    file_type: str = field(compare=False)
+
+
+class IngestionQueueService:
+    """Background workers that process queued documents in priority order."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        extraction_processes: int = 2,
+        embed_concurrency: int = 8,
+        processor: DocumentProcessor | None = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.extraction_processes = extraction_processes
+        self.embed_concurrency = max(1, embed_concurrency)
+        self._processor = processor
+        self._repo = KnowledgeRepository()
+
+        self._queue: asyncio.PriorityQueue[_QueueItem] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        # document_id -> (priority, seq) of its live queue entry; others are stale
+        self._queued: dict[str, tuple[int, int]] = {}
+        self._active: set[str] = set()
+
+        self._worker_tasks: list[asyncio.Task[None]] = []
+        self._pool: ProcessPoolExecutor | None = None
+        self._manager: SyncManager | None = None
+        self._running = False
+
+    @property
+    def processor(self) -> DocumentProcessor:
+        if self._processor is None:
+            self._processor = get_document_processor()
+        return self._processor
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Restore persisted requests and start the worker pool."""
+        if self._running:
+            return
+        self._running = True
+
+        processor = self.processor
+        if self.extraction_processes > 0:
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.extraction_processes, mp_context=context
+            )
+            self._manager = context.Manager()
+            processor.extraction_executor = self._pool
+            processor.extraction_manager = self._manager
+        processor.embed_limiter = asyncio.Semaphore(self.embed_concurrency)
+
+        try:
+            pending = await self._repo.get_pending_ingestion_jobs()
+        except Exception:
+            logger.exception("Could not restore ingestion queue")
+            pending = []
+        for row in pending:
+            self._push(
+                row["document_id"],
+                row["bot_id"],
+                Path(row["file_path"]),
+                row["file_type"],
+                row["priority"],
+            )
+        if pending:
+            logger.info("Resuming %d queued document(s)", len(pending))
+
+        self._worker_tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.workers)]
+        logger.info(
+            "Ingestion queue started (%d workers, %d extraction processes)",
+            self.workers,
+            self.extraction_processes,
+        )
+
+    async def stop(self) -> None:
+        """Stop the workers. Unfinished documents stay persisted for next start."""
+        self._running = False
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        processor = self.processor
+        processor.extraction_executor = None
+        processor.extraction_manager = None
+        processor.embed_limiter = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+        logger.info("Ingestion queue stopped")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def enqueue(
+        self,
+        document_id: str,
+        bot_id: str,
+        file_path: Path,
+        file_type: str,
+        priority: int = PRIORITY_BULK,
+    ) -> None:
+        """Queue a document for processing (persisted before returning)."""
+        await self._repo.save_ingestion_job(
+            document_id, bot_id, str(file_path), file_type, priority
+        )
+        self._push(document_id, bot_id, file_path, file_type, priority)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and in-flight documents."""
+        return {"queued": len(self._queued), "active": len(self._active)}
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _push(
+        self, document_id: str, bot_id: str, file_path: Path, file_type: str, priority: int
+    ) -> None:
+        current = self._queued.get(document_id)
+        if current is not None and current[0] <= priority:
+            return  # Already queued at the same or a higher priority
+        seq = next(self._seq)
+        self._queued[document_id] = (priority, seq)
+        self._queue.put_nowait(_QueueItem(priority, seq, document_id, bot_id, file_path, file_type))
+
+    async def _worker_loop(self) -> None:
+        while self._running:
+            item = await self._queue.get()
+            try:
+                await self._handle(item)
+            except Exception:
+                logger.exception("Ingestion worker error for document %s", item.document_id)
+            finally:
+                self._queue.task_done()
+
+    async def _handle(self, item: _QueueItem) -> None:
+        if self._queued.get(item.document_id) != (item.priority, item.seq):
+            return  # Superseded by a higher-priority entry
+
+        if item.document_id in self._active:
+            # Re-enqueued while running; process again once the current run ends
+            loop = asyncio.get_running_loop()
+            loop.call_later(_BUSY_REQUEUE_DELAY, self._queue.put_nowait, item)
+            return
+
+        del self._queued[item.document_id]
+        self._active.add(item.document_id)
+        try:
+            await self.processor.process_document(
+                item.document_id, item.bot_id, item.file_path, item.file_type
+            )
+        except Exception as e:
+            # process_document already marked the document as failed
+            logger.error(f"Ingestion failed for document {item.document_id}: {e}")
+        finally:
+            self._active.discard(item.document_id)
+
+        if item.document_id not in self._queued:
+            await self._repo.delete_ingestion_job(item.document_id)
+
+
+# Singleton
+_ingestion_queue: IngestionQueueService | None = None
+
+
+def get_ingestion_queue() -> IngestionQueueService:
+    """Get the singleton ingestion queue service (config-aware)."""
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        from cachibot.config import Config
+
+        config = Config.snapshot()
+        _ingestion_queue = IngestionQueueService(
+            workers=config.knowledge.ingest_workers,
+            extraction_processes=config.knowledge.ingest_processes,
+            embed_concurrency=config.knowledge.ingest_embed_concurrency,
+        )
+    return _ingestion_queue
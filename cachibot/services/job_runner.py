@@ -1,14 +1,27 @@
 """
 Job Runner Service
 
-Background async loop that polls for pending Work items, resolves ready tasks,
-creates Job execution records, runs them through CachibotAgent, and broadcasts
-progress via WebSocket.
+Background service that dispatches ready Work tasks as Jobs, runs them through
+CachibotAgent (or the script sandbox), and broadcasts progress via WebSocket.
+
+Scheduling is event-driven. At startup one query loads every active work item
+with its tasks into a ``TaskScheduler`` dependency index. After that:
+
+- a finished task unblocks its dependents in memory and frees its job slot
+- routes and tools that create or change work call ``notify_work_changed``,
+  which reloads just those work items
+- a full reload every ``_RESYNC_INTERVAL`` seconds picks up changes made
+  outside this process
+- a failed task that will be retried is deferred in the scheduler for an
+  exponential backoff (``_RETRY_BASE_DELAY``, capped at ``_RETRY_MAX_DELAY``)
+  and the loop wakes when it is due
+
+Job slots are shared fairly between bots (see ``TaskScheduler.take``).
 """
 
 import asyncio
-import copy
 import logging
+import time
 import uuid
 from typing import Any
 
@@ -22,6 +35,8 @@ from cachibot.models.work import (
     Work,
     WorkStatus,
 )
+from cachibot.services.execution_log_sink import ExecutionLogSink
+from cachibot.services.task_scheduler import TaskScheduler
 from cachibot.storage.automations_repository import (
     ExecutionLogRepository,
     TimelineEventRepository,
@@ -35,10 +50,14 @@ from cachibot.storage.work_repository import (
 
 logger = logging.getLogger(__name__)
 
-# How often the runner checks for pending work (seconds)
-_POLL_INTERVAL = 10
+# How often the runner reloads all active work as a safety net (seconds)
+_RESYNC_INTERVAL = 300
 
-# Maximum concurrent job executions
+# Backoff before a failed task is retried: doubles per attempt (seconds)
+_RETRY_BASE_DELAY = 10.0
+_RETRY_MAX_DELAY = 300.0
+
+# Job slots shared by all bots; each bot gets a fair share of them
 _MAX_CONCURRENT_JOBS = 5
 
 
@@ -57,6 +76,12 @@ class JobRunnerService:
         self._exec_log_repo = ExecutionLogRepository()
         self._timeline_repo = TimelineEventRepository()
 
+        # Dependency index and ready queues
+        self._scheduler = TaskScheduler(max_jobs=_MAX_CONCURRENT_JOBS)
+        # Work items to reload before the next dispatch
+        self._dirty: set[str] = set()
+        self._wake = asyncio.Event()
+
         # Track running asyncio.Tasks keyed by job_id for cancellation
         self._running_jobs: dict[str, asyncio.Task[None]] = {}
 
@@ -69,8 +94,9 @@ class JobRunnerService:
         if self._running:
             return
         self._running = True
+        self._wake = asyncio.Event()
         self._task = asyncio.create_task(self._run_loop())
-        logger.info("Job runner service started (poll every %ds)", _POLL_INTERVAL)
+        logger.info("Job runner service started (resync every %ds)", _RESYNC_INTERVAL)
 
     async def stop(self) -> None:
         """Stop the job runner background loop and cancel all running jobs."""
@@ -90,15 +116,28 @@ class JobRunnerService:
             self._task = None
         logger.info("Job runner service stopped")
 
+    def notify_work(self, work_id: str) -> None:
+        """Reload a work item's tasks and dispatch whatever became ready."""
+        self._dirty.add(work_id)
+        self._wake.set()
+
     # ------------------------------------------------------------------
     # Main Loop
     # ------------------------------------------------------------------
 
     async def _run_loop(self) -> None:
-        """Main polling loop."""
+        """Wait for events, refresh the dependency index and dispatch ready tasks."""
+        resync = True
+        next_resync = 0.0
         while self._running:
+            self._wake.clear()
             try:
-                await self._process_pending_work()
+                if resync:
+                    next_resync = time.monotonic() + _RESYNC_INTERVAL
+                    await self._load_all()
+                else:
+                    await self._load_dirty()
+                await self._dispatch()
             except Exception:
                 logger.exception("Error in job runner loop")
 
@@ -107,41 +146,39 @@ class JobRunnerService:
             for jid in finished:
                 self._running_jobs.pop(jid, None)
 
-            await asyncio.sleep(_POLL_INTERVAL)
-
-    async def _process_pending_work(self) -> None:
-        """Find all active work and dispatch ready tasks."""
-        from cachibot.storage.repository import BotRepository
-
-        bot_repo = BotRepository()
-
-        # Get all bots, then collect active work across all of them
-        all_bots = await bot_repo.get_all_bots()
-        for bot in all_bots:
-            active_work = await self._work_repo.get_active(bot.id)
-            for work in active_work:
-                try:
-                    await self._process_work(work)
-                except Exception:
-                    logger.exception("Error processing work %s", work.id)
-
-    async def _process_work(self, work: Work) -> None:
-        """Process a single work item: find ready tasks and dispatch them."""
-        ready_tasks = await self._task_repo.get_ready_tasks(work.id)
-        if not ready_tasks:
+            # Sleep until woken, the next deferred retry is due, or the resync
+            timeout = max(0.0, next_resync - time.monotonic())
+            due = self._scheduler.next_due()
+            if due is not None:
+                timeout = min(timeout, due)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            resync = time.monotonic() >= next_resync
+
+    async def _load_all(self) -> None:
+        """Rebuild the dependency index from all active work (one query)."""
+        self._dirty.clear()
+        graphs = await self._task_repo.get_schedulable()
+        self._scheduler.reset()
+        for work, tasks in graphs:
+            self._scheduler.load(work, tasks)
+
+    async def _load_dirty(self) -> None:
+        """Reload the work items that changed since the last dispatch (one query)."""
+        if not self._dirty:
             return
-
-        for task in ready_tasks:
-            # Enforce concurrency limit
-            if len(self._running_jobs) >= _MAX_CONCURRENT_JOBS:
-                logger.debug(
-                    "Concurrency limit reached (%d), deferring task %s",
-                    _MAX_CONCURRENT_JOBS,
-                    task.id,
-                )
-                return
-
-            # Create a Job record
+        work_ids, self._dirty = list(self._dirty), set()
+        graphs = await self._task_repo.get_schedulable(work_ids)
+        for work_id in work_ids:
+            self._scheduler.drop(work_id)
+        for work, tasks in graphs:
+            self._scheduler.load(work, tasks)
+
+    async def _dispatch(self) -> None:
+        """Create and launch a Job for every ready task that gets a job slot."""
+        for work, task in self._scheduler.take():
             job = Job(
                 id=str(uuid.uuid4()),
                 bot_id=task.bot_id,
@@ -151,7 +188,12 @@ class JobRunnerService:
                 status=JobStatus.PENDING,
                 attempt=task.retry_count + 1,
             )
-            await self._job_repo.save(job)
+            try:
+                await self._job_repo.save(job)
+            except Exception:
+                logger.exception("Could not create job for task %s", task.id)
+                self._scheduler.release(task.bot_id, task.id)
+                continue
 
             # Launch execution
             exec_task = asyncio.create_task(
@@ -185,11 +227,15 @@ class JobRunnerService:
             await self._exec_log_repo.save(exec_log)
         except Exception:
             logger.debug("Could not create execution log entry")
+        # New execution: sequence numbers start at 1, no lookup needed
+        log_sink = ExecutionLogSink(exec_log_id)
+        completed = False
 
         try:
             # Mark job as RUNNING
             await self._job_repo.update_status(job.id, JobStatus.RUNNING)
             await self._job_repo.append_log(job.id, "info", "Job started")
+            log_sink.write("info", "Job started")
 
             # Mark task as IN_PROGRESS
             await self._task_repo.update_status(task.id, TaskStatus.IN_PROGRESS)
@@ -197,6 +243,7 @@ class JobRunnerService:
             # Mark work as IN_PROGRESS if still pending
             if work.status == WorkStatus.PENDING:
                 await self._work_repo.update_status(work.id, WorkStatus.IN_PROGRESS)
+                work.status = WorkStatus.IN_PROGRESS
 
             # Broadcast status
             await self._broadcast_update(
@@ -218,14 +265,19 @@ class JobRunnerService:
                 and getattr(function, "execution_type", "agent") == "script"
                 and getattr(function, "script_id", None)
             ):
-                result_text, usage_data = await self._run_script_for_task(job, task, work, function)
+                result_text, usage_data = await self._run_script_for_task(
+                    job, task, work, function, log_sink
+                )
             else:
-                result_text, usage_data = await self._run_agent_for_task(job, task)
+                result_text, usage_data = await self._run_agent_for_task(job, task, log_sink)
 
             # Job completed successfully
             await self._job_repo.update_status(job.id, JobStatus.COMPLETED, result=result_text)
             await self._job_repo.append_log(job.id, "info", "Job completed")
+            log_sink.write("info", "Job completed")
             await self._task_repo.update_status(task.id, TaskStatus.COMPLETED, result=result_text)
+            self._scheduler.complete(work.id, task.id)
+            completed = True
 
             # Complete execution log with usage data
             try:
@@ -267,12 +319,14 @@ class JobRunnerService:
                 status="completed",
                 progress=updated_work.progress if updated_work else 1.0,
             )
+            await log_sink.close()
             await self._broadcast_execution_end(exec_log_id, "success", usage_data)
 
         except asyncio.CancelledError:
             # Job was cancelled externally
             await self._job_repo.update_status(job.id, JobStatus.CANCELLED, error="Cancelled")
             await self._job_repo.append_log(job.id, "warn", "Job cancelled")
+            log_sink.write("warn", "Job cancelled")
             await self._task_repo.update_status(
                 task.id, TaskStatus.PENDING, error="Cancelled, will retry"
             )
@@ -287,6 +341,7 @@ class JobRunnerService:
                 status="cancelled",
                 progress=work.progress,
             )
+            await log_sink.close()
             await self._broadcast_execution_end(exec_log_id, "cancelled")
 
         except asyncio.TimeoutError:
@@ -294,17 +349,20 @@ class JobRunnerService:
             error_msg = f"Timeout after {timeout} seconds"
             await self._job_repo.update_status(job.id, JobStatus.FAILED, error=error_msg)
             await self._job_repo.append_log(job.id, "error", error_msg)
+            log_sink.write("error", error_msg)
             try:
                 await self._exec_log_repo.complete(exec_log_id, status="timeout", error=error_msg)
             except Exception:
                 pass
             await self._handle_task_failure(task, work, job.id, error_msg)
+            await log_sink.close()
             await self._broadcast_execution_end(exec_log_id, "timeout", error=error_msg)
 
         except BudgetExceededError as exc:
             error_msg = f"Budget limit reached: {exc}"
             await self._job_repo.update_status(job.id, JobStatus.FAILED, error=error_msg)
             await self._job_repo.append_log(job.id, "error", error_msg)
+            log_sink.write("error", error_msg)
             try:
                 await self._exec_log_repo.complete(exec_log_id, status="error", error=error_msg)
                 await self._timeline_repo.save(
@@ -332,12 +390,14 @@ class JobRunnerService:
                 progress=work.progress,
                 error=error_msg,
             )
+            await log_sink.close()
             await self._broadcast_execution_end(exec_log_id, "error", error=error_msg)
 
         except Exception as exc:
             error_msg = str(exc)
             await self._job_repo.update_status(job.id, JobStatus.FAILED, error=error_msg)
             await self._job_repo.append_log(job.id, "error", f"Job failed: {error_msg}")
+            log_sink.write("error", f"Job failed: {error_msg}")
             try:
                 await self._exec_log_repo.complete(exec_log_id, status="error", error=error_msg)
                 await self._timeline_repo.save(
@@ -355,14 +415,27 @@ class JobRunnerService:
             except Exception:
                 pass
             await self._handle_task_failure(task, work, job.id, error_msg)
+            await log_sink.close()
             await self._broadcast_execution_end(exec_log_id, "error", error=error_msg)
 
         finally:
+            await log_sink.close()
             self._running_jobs.pop(job.id, None)
-
-    async def _run_agent_for_task(self, job: Job, task: Any) -> tuple[str, dict[str, Any]]:
+            # Free the job slot for the next ready task. Only then reload a
+            # work item whose task did not complete: while the slot is held
+            # the scheduler treats the task as running and would skip a retry.
+            self._scheduler.release(task.bot_id, task.id)
+            if not completed:
+                self.notify_work(work.id)
+            self._wake.set()
+
+    async def _run_agent_for_task(
+        self, job: Job, task: Any, log_sink: ExecutionLogSink
+    ) -> tuple[str, dict[str, Any]]:
         """Create a CachibotAgent and run the task action through it.
 
+        Tool calls are written to the execution log as they happen.
+
         Returns:
             Tuple of (result_text, usage_data dict).
         """
@@ -375,12 +448,11 @@ class JobRunnerService:
         if not bot:
             raise RuntimeError(f"Bot {task.bot_id} not found")
 
-        config = Config.load()
+        config = Config.snapshot()
 
         # Apply bot model override
         if bot.default_model:
-            config = copy.deepcopy(config)
-            config.agent.model = bot.default_model
+            config = config.with_agent(model=bot.default_model)
 
         # Resolve per-bot environment (API keys, temperature, etc.)
         driver = None
@@ -398,6 +470,12 @@ class JobRunnerService:
         except Exception:
             logger.debug("Could not resolve per-bot environment for bot %s", task.bot_id)
 
+        def on_tool_start(name: str, args: dict[str, Any]) -> None:
+            log_sink.write("info", f"Tool call: {name}", {"tool": name})
+
+        def on_tool_end(name: str, result: Any) -> None:
+            log_sink.write("info", f"Tool finished: {name}", {"tool": name})
+
         disabled_caps = await load_disabled_capabilities()
         agent = CachibotAgent(
             config=config,
@@ -409,6 +487,8 @@ class JobRunnerService:
             driver=driver,
             provider_environment=provider_environment,
             disabled_capabilities=disabled_caps,
+            on_tool_start=on_tool_start,
+            on_tool_end=on_tool_end,
         )
 
         # Load custom instructions from DB
@@ -442,10 +522,12 @@ class JobRunnerService:
         return result.output_text or "", usage_data
 
     async def _run_script_for_task(
-        self, job: Job, task: Any, work: Work, function: Any
+        self, job: Job, task: Any, work: Work, function: Any, log_sink: ExecutionLogSink
     ) -> tuple[str, dict[str, Any]]:
         """Execute a script in the sandbox.
 
+        Captured stdout is written to the execution log one line per entry.
+
         Returns:
             Tuple of (result_text, usage_data dict).
         """
@@ -474,6 +556,10 @@ class JobRunnerService:
         }
 
         result = await sandbox.execute(script.source_code, context)
+        if result.output:
+            log_sink.write_output(result.output)
+        if result.error:
+            log_sink.write_output(result.error, level="stderr")
 
         # Update script run stats
         await script_repo.increment_run_count(script.id, success=result.success)
@@ -491,17 +577,25 @@ class JobRunnerService:
         job_id: str,
         error_msg: str,
     ) -> None:
-        """Handle a failed task: retry or mark as permanently failed."""
+        """Handle a failed task: retry or mark as permanently failed.
+
+        Either way ``_execute_job`` reloads the work item into the scheduler
+        once the job slot is free: a retried task is queued again after its
+        backoff, a failed work item is dropped.
+        """
         new_count = await self._task_repo.increment_retry(task.id)
 
         if new_count < task.max_retries:
-            # Leave as PENDING for next poll to pick up
+            # Back to PENDING; queued again once the backoff has passed
+            delay = min(_RETRY_BASE_DELAY * 2 ** max(0, new_count - 1), _RETRY_MAX_DELAY)
+            self._scheduler.defer(task.id, delay)
             await self._task_repo.update_status(task.id, TaskStatus.PENDING, error=error_msg)
             logger.info(
-                "Task %s failed (attempt %d/%d), will retry",
+                "Task %s failed (attempt %d/%d), will retry in %.0fs",
                 task.id,
                 new_count,
                 task.max_retries,
+                delay,
             )
             await self._broadcast_update(
                 work_id=work.id,
@@ -551,6 +645,7 @@ class JobRunnerService:
         # If all tasks are done, mark work as completed
         if completed == total:
             await self._work_repo.update_status(work_id, WorkStatus.COMPLETED)
+            self._scheduler.drop(work_id)
             logger.info("Work %s completed (all %d tasks done)", work_id, total)
 
     # ------------------------------------------------------------------
@@ -586,6 +681,7 @@ class JobRunnerService:
                 work_id=work_id,
                 status="cancelled",
             )
+        self.notify_work(work_id)
 
         return cancelled
 
@@ -676,3 +772,9 @@ def get_job_runner() -> JobRunnerService:
     if _job_runner is None:
         _job_runner = JobRunnerService()
     return _job_runner
+
+
+def notify_work_changed(work_id: str) -> None:
+    """Tell the job runner a work item or its tasks were created or changed."""
+    if _job_runner is not None:
+        _job_runner.notify_work(work_id)
@@ -0,0 +1,137 @@
+"""
+Message Coalescer
+
+People on Telegram, WhatsApp and Discord often send a thought as three or
+four short messages in a row. Handled one by one, each becomes its own agent
+build, LLM run and reply. For connections that opt in (``coalesce_messages``
+in the connection config), messages from the same chat that arrive within a
+short window are merged into a single turn.
+
+The first message of a burst waits until the chat has been quiet for the
+window (capped at ``max_wait`` from the first message) while keeping the
+platform's typing indicator alive. Messages that join the burst return
+immediately with no reply; the first one carries the merged text, with the
+attachments of every message, into normal processing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds between typing indicators while a burst is open (most platforms
+# show "typing..." for about five seconds)
+_TYPING_INTERVAL = 4.0
+
+
+@dataclass
+class _Burst:
+    started: float
+    deadline: float
+    messages: list[str] = field(default_factory=list)
+    metadata: list[dict[str, Any]] = field(default_factory=list)
+
+
+def merge_messages(
+    messages: list[str], metadata: list[dict[str, Any]]
+) -> tuple[str, dict[str, Any]]:
+    """Combine a burst into one message and metadata dict.
+
+    Texts are joined by newlines. Metadata comes from the latest message, with
+    every message's attachments, the first reply context and the platform
+    message IDs of the whole burst.
+    """
+    merged = dict(metadata[-1])
+    attachments = [att for meta in metadata for att in meta.get("attachments", [])]
+    if attachments:
+        merged["attachments"] = attachments
+    reply_text = next((m["reply_to_text"] for m in metadata if m.get("reply_to_text")), None)
+    if reply_text:
+        merged["reply_to_text"] = reply_text
+    if len(messages) > 1:
+        merged["coalesced_count"] = len(messages)
+        message_ids = [m["message_id"] for m in metadata if m.get("message_id")]
+        if message_ids:
+            merged["coalesced_message_ids"] = message_ids
+    return "\n".join(text for text in messages if text), merged
+
+
+class MessageCoalescer:
+    """Merges bursts of messages per chat into single turns."""
+
+    def __init__(self, max_wait: float = 6.0) -> None:
+        """
+        Initialize the coalescer.
+
+        Args:
+            max_wait: Longest a burst stays open after its first message (seconds)
+        """
+        self.max_wait = max_wait
+        self._bursts: dict[tuple[str, str], _Burst] = {}
+
+    async def collect(
+        self,
+        connection_id: str,
+        chat_id: str,
+        window: float,
+        message: str,
+        metadata: dict[str, Any],
+        keep_typing: Callable[[], Awaitable[None]] | None = None,
+    ) -> tuple[str, dict[str, Any]] | None:
+        """Add a message to its chat's burst.
+
+        Returns:
+            The merged message and metadata for the first message of a burst,
+            once the burst closes; None for messages that joined an open burst.
+        """
+        key = (connection_id, chat_id)
+        now = time.monotonic()
+        burst = self._bursts.get(key)
+        if burst is not None:
+            burst.messages.append(message)
+            burst.metadata.append(metadata)
+            burst.deadline = min(now + window, burst.started + max(window, self.max_wait))
+            return None
+
+        burst = _Burst(started=now, deadline=now + window, messages=[message], metadata=[metadata])
+        self._bursts[key] = burst
+        next_typing = now
+        try:
+            while (now := time.monotonic()) < burst.deadline:
+                if keep_typing is not None and now >= next_typing:
+                    try:
+                        await keep_typing()
+                    except Exception as e:
+                        logger.debug(f"Failed to send typing indicator: {e}")
+                    next_typing = now + _TYPING_INTERVAL
+                wake = burst.deadline if keep_typing is None else min(burst.deadline, next_typing)
+                await asyncio.sleep(max(0.0, wake - time.monotonic()))
+        finally:
+            self._bursts.pop(key, None)
+
+        if len(burst.messages) > 1:
+            logger.debug(
+                f"Coalesced {len(burst.messages)} messages for connection {connection_id} "
+                f"chat {chat_id}"
+            )
+        return merge_messages(burst.messages, burst.metadata)
+
+
+# Singleton instance
+_coalescer: MessageCoalescer | None = None
+
+
+def get_message_coalescer() -> MessageCoalescer:
+    """Get the shared MessageCoalescer instance (config-aware)."""
+    global _coalescer
+    if _coalescer is None:
+        from cachibot.config import Config
+
+        _coalescer = MessageCoalescer(max_wait=Config.snapshot().messaging.coalesce_max_wait)
+    return _coalescer
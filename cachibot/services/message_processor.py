@@ -17,6 +17,7 @@ from cachibot.models.knowledge import BotMessage
 from cachibot.models.platform import IncomingMedia, PlatformResponse
 from cachibot.models.websocket import WSMessage
 from cachibot.services.agent_factory import build_bot_agent
+from cachibot.services.conversation_summarizer import schedule_chat_summary
 from cachibot.storage.repository import BotRepository, ChatRepository, KnowledgeRepository
 from cachibot.utils.markdown import extract_media_from_steps, extract_media_from_text
 
@@ -175,7 +176,7 @@ class MessageProcessor:
         self._bot_repo = BotRepository()
         self._chat_repo = ChatRepository()
         self._knowledge_repo = KnowledgeRepository()
-        self._config = Config.load()
+        self._config = Config.snapshot()
 
     async def _broadcast_message(
         self,
@@ -359,6 +360,9 @@ class MessageProcessor:
                 "tokens": run_usage.get("total_tokens", 0),
                 "promptTokens": run_usage.get("prompt_tokens", 0),
                 "completionTokens": run_usage.get("completion_tokens", 0),
+                # Prompt tokens served from / written to the provider's prompt cache
+                "cachedPromptTokens": run_usage.get("cached_prompt_tokens", 0),
+                "cacheCreationTokens": run_usage.get("cache_creation_tokens", 0),
                 "cost": run_usage.get("cost", 0.0),
                 "elapsedMs": run_usage.get("total_elapsed_ms", 0.0),
                 "tokensPerSecond": run_usage.get("tokens_per_second", 0.0),
@@ -380,6 +384,7 @@ class MessageProcessor:
                 metadata=usage_metadata,
             )
             await self._knowledge_repo.save_bot_message(assistant_msg)
+            schedule_chat_summary(bot_id, chat_id, bot.models)
 
             # Broadcast assistant message to connected WebSocket clients (with usage metadata)
             await self._broadcast_message(
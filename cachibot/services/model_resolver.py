@@ -40,7 +40,7 @@ def _build_resolver(
     if resolved_env:
         layers.append(attr_layer(resolved_env))
     try:
-        config = Config.load()
+        config = Config.snapshot()
         layers.append(attr_layer(config.agent))
     except Exception:
         pass
@@ -1,12 +1,16 @@
 """
 Platform Manager Service
 
-Manages platform adapter lifecycle and message routing.
+Manages platform adapter lifecycle and message routing. Agent runs for
+incoming messages go through the ``ChatDispatcher``, which keeps each chat's
+messages in order and bounds how many runs are in flight. Connections with
+``coalesce_messages`` enabled first merge bursts of messages into one turn.
 """
 
 import asyncio
 import logging
 from collections.abc import Awaitable, Callable
+from functools import partial
 from typing import Any
 
 from cachibot.models.connection import BotConnection, ConnectionPlatform, ConnectionStatus
@@ -14,7 +18,9 @@ from cachibot.models.platform import PlatformResponse
 from cachibot.models.websocket import WSMessage
 from cachibot.services.adapters.base import BasePlatformAdapter, MessageHandler
 from cachibot.services.adapters.registry import AdapterRegistry
+from cachibot.services.chat_dispatcher import get_chat_dispatcher, hand_off_chat
 from cachibot.services.command_processor import get_command_processor
+from cachibot.services.message_coalescer import get_message_coalescer
 from cachibot.storage.repository import ConnectionRepository
 
 logger = logging.getLogger(__name__)
@@ -26,6 +32,19 @@ BotMessageProcessor = Callable[[str, str, str, dict[str, Any]], Awaitable[Platfo
 # Returns: PlatformResponse with text and optional media
 
 
+def _coalesce_window(connection: BotConnection) -> float:
+    """Seconds to wait for follow-up messages (0 = coalescing off for the connection)."""
+    if connection.config.get("coalesce_messages", "false").lower() != "true":
+        return 0.0
+    from cachibot.config import Config
+
+    default = Config.snapshot().messaging.coalesce_window
+    try:
+        return max(0.0, float(connection.config.get("coalesce_window") or default))
+    except ValueError:
+        return default
+
+
 class PlatformManager:
     """Manages platform adapters for all bot connections.
 
@@ -167,13 +186,34 @@ class PlatformManager:
         # Increment message count
         await self._repo.increment_message_count(connection_id)
 
-        # Process the message through the bot
-        try:
-            return await self._message_processor(
-                connection.bot_id,
+        # From here the coalescer and dispatcher keep the chat's order, so a
+        # queued webhook event for the same chat may start (a burst can merge)
+        hand_off_chat()
+
+        # Merge a burst of quick messages into one turn (opt-in per connection)
+        window = _coalesce_window(connection)
+        if window > 0:
+            merged = await get_message_coalescer().collect(
+                connection_id,
                 chat_id,
+                window,
                 message,
                 metadata,
+                keep_typing=partial(adapter.send_typing, chat_id) if adapter else None,
+            )
+            if merged is None:
+                # Folded into the turn of the burst's first message
+                return PlatformResponse()
+            message, metadata = merged
+
+        # Process the message through the bot (ordered per chat, bounded globally)
+        processor_fn = self._message_processor
+        try:
+            return await get_chat_dispatcher().run(
+                connection_id,
+                chat_id,
+                connection.bot_id,
+                lambda: processor_fn(connection.bot_id, chat_id, message, metadata),
             )
         except Exception as e:
             logger.error(f"Error processing message: {e}")
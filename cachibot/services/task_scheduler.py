@@ -0,0 +1,242 @@
+"""
+Task Scheduler
+
+In-memory dependency index for the job runner. The runner used to wake every
+few seconds, list every bot's active work and load every task of every work
+item to find the ones whose dependencies were complete. The scheduler keeps
+that answer instead:
+
+- per work item, the number of unfinished dependencies of each pending task
+  and the reverse edges (which tasks wait on which)
+- a ready queue per bot, ordered by work priority, work age and task order
+- ``complete`` decrements the dependents of a finished task and queues the
+  ones that reach zero, without touching the database
+- ``load`` (re)builds one work item from fresh rows, after the runner is
+  told the work or its tasks changed
+
+``take`` hands out ready tasks under a fair-share limit: the job slots are
+split evenly between the bots that have work running or waiting, and the bot
+with the fewest running jobs goes first. One busy bot can no longer hold
+every slot while another bot's tasks wait.
+
+A task being retried can be deferred until a not-before time (``defer``);
+it stays out of the ready queues, across reloads, until that time passes.
+
+The scheduler does no I/O; ``JobRunnerService`` owns loading and execution.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from cachibot.models.work import Priority, Task, TaskStatus, Work
+
+# Lower runs first
+_PRIORITY_RANK = {
+    Priority.URGENT: 0,
+    Priority.HIGH: 1,
+    Priority.NORMAL: 2,
+    Priority.LOW: 3,
+}
+
+
+@dataclass
+class _WorkGraph:
+    """Dependency index of one work item."""
+
+    work: Work
+    generation: int
+    tasks: dict[str, Task]
+    # pending task id -> dependencies not completed yet
+    unmet: dict[str, int] = field(default_factory=dict)
+    # task id -> ids of the pending tasks that depend on it
+    dependents: dict[str, list[str]] = field(default_factory=dict)
+
+
+class TaskScheduler:
+    """Dependency counts, per-bot ready queues and fair-share job slots.
+
+    Args:
+        max_jobs: Job slots shared by all bots.
+    """
+
+    def __init__(self, max_jobs: int = 5) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self._graphs: dict[str, _WorkGraph] = {}
+        # bot id -> heap of (sort key, work id, task id, graph generation)
+        self._ready: dict[str, list[tuple[tuple[int, float, int, int], str, str, int]]] = {}
+        # task ids handed out by take() and not released yet, by bot
+        self._running: dict[str, set[str]] = {}
+        self._generations = itertools.count(1)
+        self._arrivals = itertools.count()
+        self._served = itertools.count(1)
+        self._last_served: dict[str, int] = {}
+        # task id -> monotonic time before which it is not dispatched
+        self._not_before: dict[str, float] = {}
+        # heap of (not-before time, work id, task id, graph generation)
+        self._deferred: list[tuple[float, str, str, int]] = []
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def load(self, work: Work, tasks: list[Task]) -> None:
+        """Build (or rebuild) the index of a work item from its current tasks."""
+        graph = _WorkGraph(work=work, generation=next(self._generations), tasks={})
+        self._graphs[work.id] = graph
+        claimed = self._running.get(work.bot_id, set())
+
+        graph.tasks = {task.id: task for task in tasks}
+        completed = {task.id for task in tasks if task.status == TaskStatus.COMPLETED}
+        for task in tasks:
+            if task.status != TaskStatus.PENDING or task.id in claimed:
+                continue
+            unmet = 0
+            for dep_id in task.depends_on:
+                if dep_id not in completed:
+                    unmet += 1
+                    graph.dependents.setdefault(dep_id, []).append(task.id)
+            graph.unmet[task.id] = unmet
+            if unmet == 0:
+                self._push_when_due(graph, task)
+
+    def drop(self, work_id: str) -> None:
+        """Forget a work item (finished, cancelled, failed or deleted)."""
+        self._graphs.pop(work_id, None)
+
+    def reset(self) -> None:
+        """Forget every work item (before a full reload); running jobs and
+        not-before times stay."""
+        self._graphs.clear()
+        self._ready.clear()
+        self._deferred.clear()
+
+    def complete(self, work_id: str, task_id: str) -> None:
+        """Record a completed task and queue the dependents it unblocked."""
+        graph = self._graphs.get(work_id)
+        if graph is None:
+            return
+        graph.unmet.pop(task_id, None)
+        for dependent_id in graph.dependents.pop(task_id, []):
+            if dependent_id not in graph.unmet:
+                continue
+            graph.unmet[dependent_id] -= 1
+            if graph.unmet[dependent_id] == 0:
+                self._push_when_due(graph, graph.tasks[dependent_id])
+
+    def defer(self, task_id: str, delay: float) -> None:
+        """Keep a task out of the ready queues for *delay* seconds (retry backoff).
+
+        Applies the next time the task is loaded or unblocked.
+        """
+        self._not_before[task_id] = time.monotonic() + max(0.0, delay)
+
+    def next_due(self) -> float | None:
+        """Seconds until the earliest deferred task is due (None if there is none)."""
+        if not self._deferred:
+            return None
+        return max(0.0, self._deferred[0][0] - time.monotonic())
+
+    def _push_when_due(self, graph: _WorkGraph, task: Task) -> None:
+        not_before = self._not_before.get(task.id)
+        if not_before is not None and not_before > time.monotonic():
+            heapq.heappush(self._deferred, (not_before, graph.work.id, task.id, graph.generation))
+            return
+        self._not_before.pop(task.id, None)
+        self._push(graph, task)
+
+    def _release_due(self) -> None:
+        """Queue the deferred tasks whose not-before time has passed."""
+        now = time.monotonic()
+        while self._deferred and self._deferred[0][0] <= now:
+            _due, work_id, task_id, generation = heapq.heappop(self._deferred)
+            self._not_before.pop(task_id, None)
+            graph = self._graphs.get(work_id)
+            if graph is not None and graph.generation == generation:
+                self._push(graph, graph.tasks[task_id])
+
+    def _push(self, graph: _WorkGraph, task: Task) -> None:
+        created = graph.work.created_at.timestamp() if graph.work.created_at else 0.0
+        key = (
+            _PRIORITY_RANK.get(graph.work.priority, 2),
+            created,
+            task.order,
+            next(self._arrivals),
+        )
+        heapq.heappush(
+            self._ready.setdefault(graph.work.bot_id, []),
+            (key, graph.work.id, task.id, graph.generation),
+        )
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    @property
+    def running_count(self) -> int:
+        """Tasks handed out and not released yet."""
+        return sum(len(task_ids) for task_ids in self._running.values())
+
+    def bot_limit(self) -> int:
+        """Current fair share: job slots per bot with running or waiting work."""
+        bots = {bot_id for bot_id, task_ids in self._running.items() if task_ids}
+        bots.update(bot_id for bot_id in list(self._ready) if self._peek(bot_id) is not None)
+        return -(-self.max_jobs // max(1, len(bots)))
+
+    def take(self) -> list[tuple[Work, Task]]:
+        """Claim ready tasks for the free job slots, fairly across bots.
+
+        Every returned task counts as running until ``release`` is called.
+        """
+        self._release_due()
+        taken: list[tuple[Work, Task]] = []
+        limit = self.bot_limit()
+        while self.running_count < self.max_jobs:
+            candidates = [
+                bot_id
+                for bot_id in list(self._ready)
+                if len(self._running.get(bot_id, ())) < limit and self._peek(bot_id) is not None
+            ]
+            if not candidates:
+                break
+            # Fewest running jobs first; ties go to the bot served longest ago
+            bot_id = min(
+                candidates,
+                key=lambda b: (len(self._running.get(b, ())), self._last_served.get(b, 0)),
+            )
+            _key, work_id, task_id, _generation = heapq.heappop(self._ready[bot_id])
+            graph = self._graphs[work_id]
+            graph.unmet.pop(task_id, None)
+            self._running.setdefault(bot_id, set()).add(task_id)
+            self._last_served[bot_id] = next(self._served)
+            taken.append((graph.work, graph.tasks[task_id]))
+        return taken
+
+    def release(self, bot_id: str, task_id: str) -> None:
+        """Free the job slot of a task handed out by ``take``."""
+        task_ids = self._running.get(bot_id)
+        if task_ids is None:
+            return
+        task_ids.discard(task_id)
+        if not task_ids:
+            del self._running[bot_id]
+
+    def _peek(self, bot_id: str) -> tuple[str, str] | None:
+        """Head of a bot's ready queue, dropping entries made stale by a reload."""
+        heap = self._ready.get(bot_id)
+        while heap:
+            _key, work_id, task_id, generation = heap[0]
+            graph = self._graphs.get(work_id)
+            if (
+                graph is not None
+                and graph.generation == generation
+                and graph.unmet.get(task_id) == 0
+            ):
+                return work_id, task_id
+            heapq.heappop(heap)
+        if heap is not None:
+            del self._ready[bot_id]
+        return None
@@ -0,0 +1,406 @@
+"""
+In-Memory Vector Index for SQLite Knowledge Search.
+
+Keeps a per-bot, contiguous, pre-normalized float32 matrix of chunk embeddings
+so that similarity search is a single matrix-vector product plus an
+``argpartition`` top-k, instead of decoding and scoring every row per query.
+
+Indexes are built lazily on the first search for a bot and then updated
+incrementally by ``KnowledgeRepository`` whenever chunks are saved or deleted.
+Only used on SQLite; PostgreSQL searches go through pgvector.
+
+For very large bots an optional IVF (inverted file) structure can be trained
+over the matrix: rows are clustered with spherical k-means and a query only
+scores the ``nprobe`` clusters whose centroids are closest to it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of bot indexes held in memory before the least recently
+# used one is evicted (it is rebuilt from the database on next search).
+_MAX_BOTS = 32
+
+# Initial row capacity of a freshly created matrix block
+_INITIAL_CAPACITY = 64
+
+# IVF training: k-means iterations and training-sample rows per cluster
+_IVF_ITERATIONS = 8
+_IVF_SAMPLE_PER_LIST = 64
+
+# Rows scored per matmul when assigning rows to IVF clusters
+_ASSIGN_BATCH = 8192
+
+ANN_MODES = ("exact", "hnsw", "ivfflat")
+
+
+@dataclass(frozen=True)
+class AnnSettings:
+    """Approximate nearest-neighbour settings for one bot's searches."""
+
+    mode: str = "exact"  # "exact", "hnsw", or "ivfflat"
+    ef_search: int = 40  # pgvector HNSW candidate list size
+    nprobe: int = 10  # IVF clusters scanned per query
+    ivf_lists: int = 0  # IVF cluster count (0 = auto)
+    min_chunks: int = 20000  # Exact search for bots below this size
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("hnsw", "ivfflat")
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return *matrix* as contiguous float32 with unit-length rows."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def _assign(rows: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the closest centroid for every row."""
+    out = np.empty(rows.shape[0], dtype=np.int32)
+    for start in range(0, rows.shape[0], _ASSIGN_BATCH):
+        batch = rows[start : start + _ASSIGN_BATCH]
+        out[start : start + len(batch)] = np.argmax(batch @ centroids.T, axis=1)
+    return out
+
+
+def train_ivf(rows: np.ndarray, n_lists: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Cluster unit-length *rows* with spherical k-means.
+
+    Trains on a random sample (``_IVF_SAMPLE_PER_LIST`` rows per list) and
+    then assigns every row. CPU-bound; callers run it in an executor.
+
+    Returns:
+        ``(centroids, assignments)``
+    """
+    rng = np.random.default_rng(seed)
+    n_lists = max(1, min(n_lists, rows.shape[0]))
+    sample_size = min(rows.shape[0], n_lists * _IVF_SAMPLE_PER_LIST)
+    sample = rows[np.sort(rng.choice(rows.shape[0], sample_size, replace=False))]
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+    for _ in range(_IVF_ITERATIONS):
+        labels = _assign(sample, centroids)
+        counts = np.bincount(labels, minlength=n_lists)
+        nonempty = np.flatnonzero(counts)
+        order = np.argsort(labels, kind="stable")
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        sums = np.add.reduceat(sample[order], starts, axis=0)
+        centroids[nonempty] = sums
+        centroids = _normalize_rows(centroids)
+
+    return centroids, _assign(rows, centroids)
+
+
+class _Block:
+    """Growable row-major matrix of embeddings sharing one dimension."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.size = 0
+        self.matrix = np.empty((_INITIAL_CAPACITY, dim), dtype=np.float32)
+        self.chunk_ids: list[str] = []
+        self.document_ids: list[str] = []
+        # Bumped on removal so an in-flight IVF build can detect reindexing
+        self.version = 0
+        # Optional IVF structure (row -> cluster), aligned with ``matrix``
+        self.centroids: np.ndarray | None = None
+        self.assignments = np.empty(_INITIAL_CAPACITY, dtype=np.int32)
+        self.trained_size = 0
+        self.training: asyncio.Task[None] | None = None
+
+    def append(self, chunk_ids: list[str], document_ids: list[str], rows: np.ndarray) -> None:
+        needed = self.size + len(chunk_ids)
+        if needed > self.matrix.shape[0]:
+            capacity = max(needed, self.matrix.shape[0] * 2)
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[: self.size] = self.matrix[: self.size]
+            self.matrix = grown
+            assignments = np.empty(capacity, dtype=np.int32)
+            assignments[: self.size] = self.assignments[: self.size]
+            self.assignments = assignments
+        self.matrix[self.size : needed] = rows
+        if self.centroids is not None:
+            self.assignments[self.size : needed] = _assign(rows, self.centroids)
+        self.chunk_ids.extend(chunk_ids)
+        self.document_ids.extend(document_ids)
+        self.size = needed
+
+    def remove(self, keep: np.ndarray) -> int:
+        """Compact the block to the rows where *keep* is true. Returns rows removed."""
+        removed = int(self.size - keep.sum())
+        if removed == 0:
+            return 0
+        self.matrix = np.ascontiguousarray(self.matrix[: self.size][keep])
+        self.assignments = np.ascontiguousarray(self.assignments[: self.size][keep])
+        self.chunk_ids = [cid for cid, k in zip(self.chunk_ids, keep) if k]
+        self.document_ids = [did for did, k in zip(self.document_ids, keep) if k]
+        self.size = len(self.chunk_ids)
+        self.version += 1
+        return removed
+
+    def needs_ivf(self, settings: AnnSettings) -> bool:
+        """Whether an IVF structure should be (re)trained for *settings*."""
+        if not settings.enabled or self.size < settings.min_chunks or self.training is not None:
+            return False
+        if self.centroids is None:
+            return True
+        # Retrain once the data has drifted far from what the clusters saw
+        return self.size > 2 * self.trained_size or self.size < self.trained_size // 2
+
+    def install_ivf(
+        self, centroids: np.ndarray, assignments: np.ndarray, version: int, trained_size: int
+    ) -> bool:
+        """Attach a trained IVF structure built from the first *trained_size* rows."""
+        if version != self.version:
+            return False  # Rows were removed while training; indices no longer line up
+        self.centroids = centroids
+        self.assignments[:trained_size] = assignments
+        if self.size > trained_size:
+            self.assignments[trained_size : self.size] = _assign(
+                self.matrix[trained_size : self.size], centroids
+            )
+        self.trained_size = trained_size
+        return True
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+        min_score: float,
+        nprobe: int | None = None,
+    ) -> list[tuple[str, float]]:
+        if self.size == 0:
+            return []
+
+        if nprobe is not None and self.centroids is not None:
+            centroid_scores = self.centroids @ query
+            if nprobe < len(centroid_scores):
+                probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            else:
+                probes = np.arange(len(centroid_scores))
+            candidates = np.flatnonzero(np.isin(self.assignments[: self.size], probes))
+            scores = self.matrix[candidates] @ query
+        else:
+            candidates = None
+            scores = self.matrix[: self.size] @ query
+
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        rows = top if candidates is None else candidates[top]
+        return [
+            (self.chunk_ids[row], float(scores[i]))
+            for i, row in zip(top, rows)
+            if scores[i] >= min_score
+        ]
+
+
+class BotVectorIndex:
+    """Pre-normalized embedding matrix for all chunks of a single bot.
+
+    Rows are grouped by embedding dimension so that a bot whose documents were
+    embedded with different models can still be searched; a query only scores
+    rows of its own dimension.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: dict[int, _Block] = {}
+
+    def __len__(self) -> int:
+        return sum(block.size for block in self._blocks.values())
+
+    def add(
+        self,
+        chunk_ids: Sequence[str],
+        document_ids: Sequence[str],
+        embeddings: Sequence[Any],
+    ) -> None:
+        """Add chunk embeddings to the index (normalized on insert)."""
+        by_dim: dict[int, tuple[list[str], list[str], list[Any]]] = {}
+        for chunk_id, document_id, embedding in zip(chunk_ids, document_ids, embeddings):
+            if embedding is None:
+                continue
+            vector = np.asarray(embedding, dtype=np.float32)
+            ids, docs, vectors = by_dim.setdefault(vector.shape[-1], ([], [], []))
+            ids.append(chunk_id)
+            docs.append(document_id)
+            vectors.append(vector)
+
+        for dim, (ids, docs, vectors) in by_dim.items():
+            block = self._blocks.get(dim)
+            if block is None:
+                block = self._blocks[dim] = _Block(dim)
+            block.append(ids, docs, _normalize_rows(np.stack(vectors)))
+
+    def remove_documents(self, document_ids: Iterable[str]) -> int:
+        """Remove every row belonging to the given documents. Returns rows removed."""
+        targets = set(document_ids)
+        removed = 0
+        for block in self._blocks.values():
+            keep = np.fromiter(
+                (doc_id not in targets for doc_id in block.document_ids),
+                dtype=bool,
+                count=block.size,
+            )
+            removed += block.remove(keep)
+        return removed
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        limit: int,
+        min_score: float = 0.0,
+        ann: AnnSettings | None = None,
+    ) -> list[tuple[str, float]]:
+        """Return ``(chunk_id, cosine_similarity)`` pairs, highest first.
+
+        When *ann* is enabled and an IVF structure has been trained for the
+        query's dimension, only the ``ann.nprobe`` closest clusters are scored.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        block = self._blocks.get(query.shape[0])
+        if block is None or limit <= 0:
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+        use_ivf = ann is not None and ann.enabled and block.size >= ann.min_chunks
+        nprobe = ann.nprobe if ann is not None and use_ivf else None
+        return block.search(query / norm, limit, min_score, nprobe=nprobe)
+
+    def prepare_ann(self, ann: AnnSettings) -> None:
+        """Start (re)training IVF structures in the background where needed.
+
+        Training runs in the default executor against an immutable view of the
+        matrix; searches keep using exact scoring until it is installed.
+        """
+        for block in self._blocks.values():
+            if not block.needs_ivf(ann):
+                continue
+            n_lists = ann.ivf_lists or max(1, int(math.sqrt(block.size)))
+            block.training = asyncio.create_task(self._train_block(block, n_lists))
+
+    @staticmethod
+    async def _train_block(block: _Block, n_lists: int) -> None:
+        version, size = block.version, block.size
+        rows = block.matrix[:size]
+        try:
+            loop = asyncio.get_running_loop()
+            centroids, assignments = await loop.run_in_executor(None, train_ivf, rows, n_lists)
+            if block.install_ivf(centroids, assignments, version, size):
+                logger.debug(f"Trained IVF index: {size} rows, {len(centroids)} lists")
+        except Exception as e:
+            logger.warning(f"IVF training failed: {e}")
+        finally:
+            block.training = None
+
+
+class VectorIndexRegistry:
+    """Process-wide cache of ``BotVectorIndex`` objects, keyed by bot ID.
+
+    A monotonically increasing generation counter guards against a race
+    between a lazy (async) build and concurrent chunk writes: an index whose
+    build overlapped a mutation is used for that one query but not cached.
+    """
+
+    def __init__(self, max_bots: int = _MAX_BOTS) -> None:
+        self._max_bots = max_bots
+        self._indexes: OrderedDict[str, BotVectorIndex] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._generation = 0
+
+    def get(self, bot_id: str) -> BotVectorIndex | None:
+        """Return the cached index for a bot, if built."""
+        index = self._indexes.get(bot_id)
+        if index is not None:
+            self._indexes.move_to_end(bot_id)
+        return index
+
+    async def get_or_build(self, bot_id: str) -> BotVectorIndex:
+        """Return the bot's index, building it from the database if needed."""
+        index = self.get(bot_id)
+        if index is not None:
+            return index
+
+        lock = self._locks.setdefault(bot_id, asyncio.Lock())
+        async with lock:
+            index = self.get(bot_id)
+            if index is not None:
+                return index
+
+            from cachibot.storage.repository import KnowledgeRepository
+
+            generation = self._generation
+            rows = await KnowledgeRepository().get_all_embeddings_by_bot(bot_id)
+            index = BotVectorIndex()
+            index.add(
+                [row["id"] for row in rows],
+                [row["document_id"] for row in rows],
+                [row["embedding"] for row in rows],
+            )
+            logger.debug(f"Built vector index for bot {bot_id}: {len(index)} chunks")
+
+            if generation == self._generation:
+                self._indexes[bot_id] = index
+                while len(self._indexes) > self._max_bots:
+                    self._indexes.popitem(last=False)
+            return index
+
+    def on_chunks_added(
+        self,
+        bot_id: str,
+        chunk_ids: Sequence[str],
+        document_ids: Sequence[str],
+        embeddings: Sequence[Any],
+    ) -> None:
+        """Apply newly saved chunks to the bot's index (if it is loaded)."""
+        self._generation += 1
+        index = self._indexes.get(bot_id)
+        if index is not None:
+            index.add(chunk_ids, document_ids, embeddings)
+
+    def on_document_removed(self, document_id: str) -> None:
+        """Drop a document's chunks from whichever loaded index holds them."""
+        self._generation += 1
+        for index in self._indexes.values():
+            if index.remove_documents([document_id]):
+                break
+
+    def discard(self, bot_id: str) -> None:
+        """Forget a bot's index entirely (e.g. the bot was deleted)."""
+        self._generation += 1
+        self._indexes.pop(bot_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached indexes."""
+        self._generation += 1
+        self._indexes.clear()
+
+
+# Singleton instance for shared use
+_registry: VectorIndexRegistry | None = None
+
+
+def get_vector_index_registry() -> VectorIndexRegistry:
+    """Get the shared VectorIndexRegistry instance."""
+    global _registry
+    if _registry is None:
+        _registry = VectorIndexRegistry()
+    return _registry
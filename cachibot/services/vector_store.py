@@ -6,23 +6,33 @@ Uses Prompture embedding drivers (OpenAI, Ollama) as primary backend,
 with fastembed as a fallback for local/offline use.
 
 On PostgreSQL: uses pgvector for native cosine distance search.
-On SQLite: loads embeddings into memory and computes cosine similarity with numpy.
+On SQLite: searches a per-bot in-memory index of pre-normalized embeddings.
+
+With hybrid search enabled, vector hits are merged with full-text (keyword)
+hits using reciprocal rank fusion, so exact terms such as error codes and
+IDs are found even when their embeddings are not close to the query.
 """
 
 import asyncio
+import itertools
+import json
 import logging
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+import time
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
-from sqlalchemy import select
+from sqlalchemy import cast, func, select, text
 
 if TYPE_CHECKING:
     from fastembed import TextEmbedding
     from prompture.drivers.async_embedding_base import AsyncEmbeddingDriver
 
 from cachibot.models.knowledge import DocChunk
+from cachibot.services.embedding_cache import DEFAULT_PERSIST_PATH, QueryEmbeddingCache
+from cachibot.services.vector_index import ANN_MODES, AnnSettings, get_vector_index_registry
 from cachibot.storage import db
+from cachibot.storage.models.env_var import BotSkillConfig
 from cachibot.storage.models.knowledge import DocChunk as DocChunkORM
 from cachibot.storage.repository import KnowledgeRepository
 
@@ -31,6 +41,15 @@ logger = logging.getLogger(__name__)
 # Prefixes that indicate a fastembed model (not a provider/model format)
 _FASTEMBED_PREFIXES = ("BAAI/", "sentence-transformers/", "jinaai/")
 
+# Per-bot ANN overrides live in the bot's "knowledge" skill config
+_ANN_SKILL_NAME = "knowledge"
+
+# Seconds a bot's resolved ANN settings are reused before re-reading overrides
+_ANN_SETTINGS_TTL = 60
+
+# Hybrid search ranks this many candidates per limit slot from each retriever
+_HYBRID_CANDIDATE_FACTOR = 4
+
 
 @dataclass
 class SearchResult:
@@ -49,17 +68,33 @@ class VectorStore:
     Falls back to fastembed for local models (BAAI/*, sentence-transformers/*).
 
     On PostgreSQL: uses pgvector for native cosine distance search.
-    On SQLite: loads embeddings into memory and computes cosine similarity with numpy.
+    On SQLite: searches a per-bot in-memory index of pre-normalized embeddings.
     """
 
     DEFAULT_MODEL = "openai/text-embedding-3-small"
     EMBEDDING_DIM = 1536
 
-    def __init__(self, model_name: str | None = None):
+    def __init__(
+        self,
+        model_name: str | None = None,
+        ann_defaults: AnnSettings | None = None,
+        query_cache: QueryEmbeddingCache | None = None,
+        hybrid: bool = False,
+        rrf_k: int = 60,
+    ):
         self.model_name = model_name or self.DEFAULT_MODEL
+        self.ann_defaults = ann_defaults or AnnSettings()
+        self.query_cache = query_cache
+        self.hybrid = hybrid
+        self.rrf_k = max(1, rrf_k)
         self._embedder: TextEmbedding | None = None  # fastembed fallback
         self._async_driver: AsyncEmbeddingDriver | None = None
         self._repo = KnowledgeRepository()
+        self._ann_cache: dict[str, tuple[float, AnnSettings]] = {}
+        # PostgreSQL: bot id -> (checked at, chunk count capped at min_chunks)
+        self._pg_chunk_counts: dict[str, tuple[float, int]] = {}
+        # PostgreSQL: whether pgvector supports iterative index scans (>= 0.8)
+        self._pg_iterative_scan: bool | None = None
 
     def _is_provider_model(self) -> bool:
         """Check if the model uses provider/model format (not a fastembed model)."""
@@ -119,8 +154,21 @@ class VectorStore:
         return [np.array(e, dtype=np.float32) for e in embeddings]
 
     async def embed_text(self, text: str) -> np.ndarray:
-        """Generate embedding for a single text."""
+        """Generate embedding for a single text.
+
+        Served from the query embedding cache when one is configured; the
+        returned array may then be read-only.
+        """
+        if self.query_cache is not None:
+            cached = await self.query_cache.get(self.model_name, text)
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter()
         embeddings = await self.embed_texts([text])
+        if self.query_cache is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            await self.query_cache.put(self.model_name, text, embeddings[0], elapsed_ms)
         return embeddings[0]
 
     async def embed_texts(self, texts: list[str]) -> list[np.ndarray]:
@@ -157,7 +205,11 @@ class VectorStore:
         Search for chunks similar to the query.
 
         On PostgreSQL: uses pgvector cosine_distance() for O(log N) search.
-        On SQLite: loads embeddings into memory and uses numpy for similarity.
+        On SQLite: vectorized top-k over the bot's in-memory index.
+
+        In hybrid mode, vector and full-text candidates are fused with
+        reciprocal rank fusion. Keyword matches are kept even below
+        *min_score*; every result's score is still its cosine similarity.
 
         Args:
             bot_id: Bot to search within
@@ -166,15 +218,136 @@ class VectorStore:
             min_score: Minimum similarity score (0-1)
 
         Returns:
-            List of SearchResult sorted by similarity (highest first)
+            List of SearchResult sorted by similarity (highest first), or by
+            fused rank in hybrid mode
         """
         # Generate query embedding
         query_embedding = await self.embed_text(query)
+        ann = await self.get_ann_settings(bot_id)
+
+        if not self.hybrid:
+            return await self._search_vectors(bot_id, query_embedding, limit, min_score, ann)
+
+        candidates = limit * _HYBRID_CANDIDATE_FACTOR
+        vector_results, keyword_ids = await asyncio.gather(
+            self._search_vectors(bot_id, query_embedding, candidates, min_score, ann),
+            self._search_keywords(bot_id, query, candidates),
+        )
+        return await self._fuse_results(query_embedding, vector_results, keyword_ids, limit)
 
+    async def _search_vectors(
+        self,
+        bot_id: str,
+        query_embedding: np.ndarray,
+        limit: int,
+        min_score: float,
+        ann: AnnSettings,
+    ) -> list[SearchResult]:
         if db.db_type == "postgresql":
-            return await self._search_pgvector(bot_id, query_embedding, limit, min_score)
+            return await self._search_pgvector(bot_id, query_embedding, limit, min_score, ann)
         else:
-            return await self._search_in_memory(bot_id, query_embedding, limit, min_score)
+            return await self._search_in_memory(bot_id, query_embedding, limit, min_score, ann)
+
+    async def _search_keywords(self, bot_id: str, query: str, limit: int) -> list[str]:
+        """Full-text chunk ids for *query*; empty if the index is unavailable."""
+        try:
+            return await self._repo.keyword_search_chunks(bot_id, query, limit)
+        except Exception as e:
+            logger.debug(f"Keyword search failed for bot {bot_id}: {e}")
+            return []
+
+    async def _fuse_results(
+        self,
+        query_embedding: np.ndarray,
+        vector_results: list[SearchResult],
+        keyword_ids: list[str],
+        limit: int,
+    ) -> list[SearchResult]:
+        """Merge ranked vector and keyword hits with reciprocal rank fusion.
+
+        Each list contributes ``1 / (rrf_k + rank)`` per chunk, so chunks
+        found by both retrievers rise to the top. Keyword-only winners are
+        loaded from the database and scored against the query embedding.
+        """
+        fused: dict[str, float] = {}
+        for ranked_ids in ([r.chunk.id for r in vector_results], keyword_ids):
+            for rank, chunk_id in enumerate(ranked_ids, start=1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (self.rrf_k + rank)
+        top_ids = sorted(fused, key=fused.__getitem__, reverse=True)[:limit]
+
+        by_id = {r.chunk.id: r for r in vector_results}
+        missing = [chunk_id for chunk_id in top_ids if chunk_id not in by_id]
+        if missing:
+            query_norm = float(np.linalg.norm(query_embedding)) or 1.0
+            for chunk in await self._repo.get_chunks_by_ids(missing):
+                score = 0.0
+                vector = np.asarray(
+                    chunk.embedding if chunk.embedding is not None else [], dtype=np.float32
+                )
+                if vector.shape == query_embedding.shape:
+                    norm = float(np.linalg.norm(vector)) or 1.0
+                    score = float(np.dot(query_embedding, vector) / (query_norm * norm))
+                chunk.embedding = None  # Don't return the embedding blob
+                by_id[chunk.id] = SearchResult(chunk=chunk, score=score)
+
+        return [by_id[chunk_id] for chunk_id in top_ids if chunk_id in by_id]
+
+    async def get_ann_settings(self, bot_id: str) -> AnnSettings:
+        """Resolve ANN settings for a bot: config defaults + "knowledge" skill config.
+
+        Recognised per-bot keys: ``ann_mode``, ``ef_search``, ``nprobe``,
+        ``ivf_lists``, ``ann_min_chunks``. Results are cached for a short TTL.
+        """
+        now = time.monotonic()
+        cached = self._ann_cache.get(bot_id)
+        if cached is not None and now - cached[0] < _ANN_SETTINGS_TTL:
+            return cached[1]
+
+        settings = self.ann_defaults
+        try:
+            async with db.ensure_initialized()() as session:
+                result = await session.execute(
+                    select(BotSkillConfig.config_json).where(
+                        BotSkillConfig.bot_id == bot_id,
+                        BotSkillConfig.skill_name == _ANN_SKILL_NAME,
+                    )
+                )
+                raw = result.scalar_one_or_none()
+            if raw:
+                settings = self._apply_ann_overrides(settings, json.loads(raw))
+        except Exception as e:
+            logger.debug(f"Could not load ANN overrides for bot {bot_id}: {e}")
+
+        self._ann_cache[bot_id] = (now, settings)
+        return settings
+
+    def invalidate_ann_settings(self, bot_id: str | None = None) -> None:
+        """Forget cached ANN settings for one bot (or all bots)."""
+        if bot_id is None:
+            self._ann_cache.clear()
+        else:
+            self._ann_cache.pop(bot_id, None)
+
+    @staticmethod
+    def _apply_ann_overrides(settings: AnnSettings, overrides: dict[str, Any]) -> AnnSettings:
+        """Overlay valid per-bot ANN overrides onto *settings*."""
+        changes: dict[str, Any] = {}
+        if overrides.get("ann_mode") in ANN_MODES:
+            changes["mode"] = overrides["ann_mode"]
+        # (override key, settings field, smallest valid value); pgvector rejects
+        # ef_search / probes below 1, ivf_lists 0 means auto
+        for key, field_name, minimum in (
+            ("ef_search", "ef_search", 1),
+            ("nprobe", "nprobe", 1),
+            ("ivf_lists", "ivf_lists", 0),
+            ("ann_min_chunks", "min_chunks", 0),
+        ):
+            if key in overrides:
+                try:
+                    changes[field_name] = max(minimum, int(overrides[key]))
+                except (TypeError, ValueError):
+                    pass
+        return replace(settings, **changes) if changes else settings
 
     async def _search_pgvector(
         self,
@@ -182,13 +355,34 @@ class VectorStore:
         query_embedding: np.ndarray,
         limit: int,
         min_score: float,
+        ann: AnnSettings | None = None,
     ) -> list[SearchResult]:
-        """Search using pgvector's native cosine distance (PostgreSQL only)."""
+        """Search using pgvector's native cosine distance (PostgreSQL only).
+
+        With an ANN mode enabled the distance is computed on the ``halfvec``
+        expression that the HNSW/IVFFlat index is built on (see
+        ``db.ensure_ann_index``), and the bot's ``ef_search`` / ``nprobe``
+        are applied for this transaction only.
+
+        The index covers every bot's chunks and ``bot_id`` is filtered after
+        the index scan, so a bot with few chunks would get short or empty
+        results from the candidates of the others. Bots below ``min_chunks``
+        therefore keep the exact distance (served by the ``bot_id`` index),
+        and on pgvector 0.8+ the index scan is made iterative: it continues
+        until ``limit`` rows of this bot pass the filters.
+        """
         query_embedding_list = query_embedding.tolist()
+        use_index = ann is not None and ann.enabled and await self._pg_bot_is_large(bot_id, ann)
 
         # pgvector cosine distance: 0 = identical, 2 = opposite
         # similarity = 1 - distance
-        cosine_distance = DocChunkORM.embedding.cosine_distance(query_embedding_list)
+        if use_index:
+            from pgvector.sqlalchemy import HALFVEC
+
+            indexed = cast(DocChunkORM.embedding, HALFVEC(DocChunkORM.embedding.type.dim))
+            cosine_distance = indexed.cosine_distance(query_embedding_list)
+        else:
+            cosine_distance = DocChunkORM.embedding.cosine_distance(query_embedding_list)
 
         stmt = (
             select(
@@ -203,6 +397,19 @@ class VectorStore:
         )
 
         async with db.ensure_initialized()() as session:
+            if use_index and ann is not None:
+                # SET LOCAL takes no bind parameters; values are validated ints
+                await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ann.ef_search)}"))
+                await session.execute(text(f"SET LOCAL ivfflat.probes = {int(ann.nprobe)}"))
+                if self._pg_iterative_scan is None:
+                    version = await session.scalar(
+                        text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+                    )
+                    self._pg_iterative_scan = _version_tuple(version) >= (0, 8)
+                if self._pg_iterative_scan:
+                    await session.execute(text("SET LOCAL hnsw.iterative_scan = strict_order"))
+                    # IVFFlat only offers relaxed order; rows are re-sorted below
+                    await session.execute(text("SET LOCAL ivfflat.iterative_scan = relaxed_order"))
             result = await session.execute(stmt)
             rows = result.all()
 
@@ -215,59 +422,84 @@ class VectorStore:
                 chunk_index=row_model.chunk_index,
                 content=row_model.content,
                 embedding=None,  # Don't return the embedding blob
+                page_number=row_model.page_number,
             )
             results.append(SearchResult(chunk=chunk, score=float(similarity)))
 
+        results.sort(key=lambda r: r.score, reverse=True)
         return results
 
+    async def _pg_bot_is_large(self, bot_id: str, ann: AnnSettings) -> bool:
+        """Whether a bot has at least ``ann.min_chunks`` chunks (PostgreSQL).
+
+        Counts at most ``min_chunks`` rows and reuses the answer for a short TTL.
+        """
+        if ann.min_chunks <= 0:
+            return True
+        now = time.monotonic()
+        cached = self._pg_chunk_counts.get(bot_id)
+        if cached is None or now - cached[0] >= _ANN_SETTINGS_TTL:
+            capped = (
+                select(DocChunkORM.id)
+                .where(DocChunkORM.bot_id == bot_id)
+                .limit(ann.min_chunks)
+                .subquery()
+            )
+            async with db.ensure_initialized()() as session:
+                count = await session.scalar(select(func.count()).select_from(capped))
+            cached = (now, int(count or 0))
+            self._pg_chunk_counts[bot_id] = cached
+        return cached[1] >= ann.min_chunks
+
     async def _search_in_memory(
         self,
         bot_id: str,
         query_embedding: np.ndarray,
         limit: int,
         min_score: float,
+        ann: AnnSettings | None = None,
     ) -> list[SearchResult]:
-        """Search using in-memory cosine similarity (SQLite fallback)."""
-        # Load all embeddings for this bot
-        async with db.ensure_initialized()() as session:
-            result = await session.execute(
-                select(DocChunkORM).where(
-                    DocChunkORM.bot_id == bot_id,
-                    DocChunkORM.embedding.isnot(None),
-                )
-            )
-            rows = result.scalars().all()
+        """Search the bot's in-memory vector index (SQLite fallback).
 
-        if not rows:
+        The index is a pre-normalized float32 matrix built once per bot and
+        kept up to date by the repository, so a query is one matmul plus a
+        top-k partition. Only the winning chunks are loaded from the database.
+        With an ANN mode enabled, large bots use an IVF structure trained in
+        the background.
+        """
+        index = await get_vector_index_registry().get_or_build(bot_id)
+        if ann is not None and ann.enabled:
+            index.prepare_ann(ann)
+        top = index.search(query_embedding, limit, min_score, ann=ann)
+        if not top:
             return []
 
-        # Compute cosine similarity in-memory
-        query_norm = query_embedding / (np.linalg.norm(query_embedding) + 1e-10)
-        scored: list[tuple[float, DocChunkORM]] = []
-
-        for row in rows:
-            emb = row.embedding
-            if emb is None:
-                continue
-            emb_array = np.array(emb, dtype=np.float32)
-            emb_norm = emb_array / (np.linalg.norm(emb_array) + 1e-10)
-            similarity = float(np.dot(query_norm, emb_norm))
-            if similarity >= min_score:
-                scored.append((similarity, row))
-
-        # Sort by similarity descending, take top N
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = scored[:limit]
+        async with db.ensure_initialized()() as session:
+            result = await session.execute(
+                select(
+                    DocChunkORM.id,
+                    DocChunkORM.document_id,
+                    DocChunkORM.bot_id,
+                    DocChunkORM.chunk_index,
+                    DocChunkORM.content,
+                    DocChunkORM.page_number,
+                ).where(DocChunkORM.id.in_([chunk_id for chunk_id, _ in top]))
+            )
+            rows = {row[0]: row for row in result.all()}
 
         results: list[SearchResult] = []
-        for similarity, row_model in top:
+        for chunk_id, similarity in top:
+            row = rows.get(chunk_id)
+            if row is None:
+                continue  # Deleted between index lookup and fetch
             chunk = DocChunk(
-                id=row_model.id,
-                document_id=row_model.document_id,
-                bot_id=row_model.bot_id,
-                chunk_index=row_model.chunk_index,
-                content=row_model.content,
+                id=row[0],
+                document_id=row[1],
+                bot_id=row[2],
+                chunk_index=row[3],
+                content=row[4],
                 embedding=None,
+                page_number=row[5],
             )
             results.append(SearchResult(chunk=chunk, score=similarity))
 
@@ -305,12 +537,48 @@ class VectorStore:
 _vector_store: VectorStore | None = None
 
 
+def _version_tuple(version: str | None) -> tuple[int, ...]:
+    """Parse an extension version such as ``"0.8.0"`` (unknown parts count as 0)."""
+    parts = []
+    for part in (version or "").split("."):
+        digits = "".join(itertools.takewhile(str.isdigit, part))
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts)
+
+
 def get_vector_store() -> VectorStore:
     """Get the shared VectorStore instance (config-aware)."""
     global _vector_store
     if _vector_store is None:
         from cachibot.config import Config
 
-        config = Config.load()
-        _vector_store = VectorStore(model_name=config.knowledge.embedding_model)
+        config = Config.snapshot()
+        knowledge = config.knowledge
+        _vector_store = VectorStore(
+            model_name=knowledge.embedding_model,
+            ann_defaults=AnnSettings(
+                mode=knowledge.ann_mode if knowledge.ann_mode in ANN_MODES else "exact",
+                ef_search=knowledge.ef_search,
+                nprobe=knowledge.nprobe,
+                ivf_lists=knowledge.ivf_lists,
+                min_chunks=knowledge.ann_min_chunks,
+            ),
+            query_cache=(
+                QueryEmbeddingCache(
+                    max_entries=knowledge.query_cache_size,
+                    ttl_seconds=knowledge.query_cache_ttl,
+                    persist_path=DEFAULT_PERSIST_PATH if knowledge.query_cache_persist else None,
+                )
+                if knowledge.query_cache_size > 0
+                else None
+            ),
+            hybrid=knowledge.hybrid_search,
+            rrf_k=knowledge.rrf_k,
+        )
     return _vector_store
+
+
+def invalidate_ann_settings(bot_id: str | None = None) -> None:
+    """Drop cached per-bot ANN settings if the shared store has been created."""
+    if _vector_store is not None:
+        _vector_store.invalidate_ann_settings(bot_id)
@@ -0,0 +1,81 @@
+"""Rewrite SQLite JSON-text embeddings as binary float32 BLOBs.
+
+The binary layout (see ``cachibot.storage.embedding_codec``) is an 8-byte
+header -- magic ``b"CV"``, dtype code 1 (float32), a reserved byte and the
+uint32 dimension -- followed by little-endian float32 values.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16
+"""
+
+import json
+import struct
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "012"
+down_revision: str | None = "011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_HEADER = struct.Struct("<2sBxI")
+
+
+def upgrade() -> None:
+    # PostgreSQL stores embeddings in a pgvector column; nothing to convert.
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, embedding FROM doc_chunks WHERE typeof(embedding) = 'text' LIMIT 500"
+            )
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row_id, raw in rows:
+            try:
+                values = [float(v) for v in json.loads(raw)]
+                blob: bytes | None = _HEADER.pack(b"CV", 1, len(values)) + struct.pack(
+                    f"<{len(values)}f", *values
+                )
+            except (TypeError, ValueError):
+                # Unreadable vectors are unusable for search; clear them so the
+                # loop terminates and the chunk can be re-embedded on reindex.
+                blob = None
+            params.append({"id": row_id, "value": blob})
+        bind.execute(sa.text("UPDATE doc_chunks SET embedding = :value WHERE id = :id"), params)
+
+
+def downgrade() -> None:
+    # Older releases can only read JSON text; convert binary rows back.
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, embedding FROM doc_chunks WHERE typeof(embedding) = 'blob' LIMIT 500"
+            )
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row_id, raw in rows:
+            raw = bytes(raw)
+            if raw[:2] == b"CV":
+                _magic, code, dim = _HEADER.unpack_from(raw)
+                fmt = f"<{dim}f" if code == 1 else f"<{dim}e"
+                values = struct.unpack_from(fmt, raw, _HEADER.size)
+            else:
+                # Headerless raw float32 (older exports)
+                values = struct.unpack(f"<{len(raw) // 4}f", raw)
+            params.append({"id": row_id, "value": json.dumps(list(values))})
+        bind.execute(sa.text("UPDATE doc_chunks SET embedding = :value WHERE id = :id"), params)
@@ -0,0 +1,51 @@
+"""Add pgvector HNSW index on a halfvec cast of doc_chunks.embedding.
+
+The 3072-dim embedding column exceeds pgvector's 2000-dim index limit, so
+the index is built on ``embedding::halfvec(3072)``. The index for the
+configured ``knowledge.ann_mode`` is (re)created at startup by
+``db.ensure_ann_index``; this migration provides the default HNSW index.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16
+"""
+
+import logging
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger(__name__)
+
+revision: str = "013"
+down_revision: str | None = "012"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    # Failures (e.g. pgvector too old for halfvec) leave search on a sequential
+    # scan; the savepoint keeps the rest of the migration going.
+    try:
+        with bind.begin_nested():
+            bind.execute(sa.text("DROP INDEX IF EXISTS idx_doc_chunks_embedding_ivfflat"))
+            bind.execute(
+                sa.text(
+                    "CREATE INDEX IF NOT EXISTS idx_doc_chunks_embedding_hnsw ON doc_chunks "
+                    "USING hnsw ((embedding::halfvec(3072)) halfvec_cosine_ops) "
+                    "WITH (m = 16, ef_construction = 64)"
+                )
+            )
+    except Exception as e:
+        logger.warning("Could not create hnsw index on doc_chunks.embedding: %s", e)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_doc_chunks_embedding_hnsw")
+        op.execute("DROP INDEX IF EXISTS idx_doc_chunks_embedding_ivfflat")
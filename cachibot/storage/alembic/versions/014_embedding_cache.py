@@ -0,0 +1,47 @@
+"""Add content-hash embedding cache and per-document reuse counter.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "014"
+down_revision: str | None = "013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.create_table(
+        "embedding_cache",
+        sa.Column("embedding_model", sa.String(), primary_key=True),
+        sa.Column("content_hash", sa.String(), primary_key=True),
+        sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    # Vector column: pgvector on PostgreSQL, binary BLOB on SQLite
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE embedding_cache ADD COLUMN embedding vector(3072) NOT NULL")
+    else:
+        op.add_column("embedding_cache", sa.Column("embedding", sa.LargeBinary(), nullable=False))
+
+    op.add_column(
+        "bot_documents",
+        sa.Column("embeddings_reused", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("bot_documents", "embeddings_reused")
+    op.drop_table("embedding_cache")
@@ -0,0 +1,49 @@
+"""Add ingestion_jobs table for the durable document ingestion queue.
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "015"
+down_revision: str | None = "014"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column(
+            "document_id",
+            sa.String(),
+            sa.ForeignKey("bot_documents.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "bot_id",
+            sa.String(),
+            sa.ForeignKey("bots.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("file_type", sa.String(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="10"),
+        sa.Column(
+            "enqueued_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("idx_ingestion_jobs_order", "ingestion_jobs", ["priority", "enqueued_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_ingestion_jobs_order", table_name="ingestion_jobs")
+    op.drop_table("ingestion_jobs")
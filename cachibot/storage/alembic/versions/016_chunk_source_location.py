@@ -0,0 +1,28 @@
+"""Add page number and character offsets to doc_chunks for citations.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "016"
+down_revision: str | None = "015"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("doc_chunks", sa.Column("page_number", sa.Integer(), nullable=True))
+    op.add_column("doc_chunks", sa.Column("char_start", sa.Integer(), nullable=True))
+    op.add_column("doc_chunks", sa.Column("char_end", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("doc_chunks", "char_end")
+    op.drop_column("doc_chunks", "char_start")
+    op.drop_column("doc_chunks", "page_number")
@@ -0,0 +1,89 @@
+"""Add full-text indexes over doc_chunks and bot_notes for hybrid search.
+
+PostgreSQL gets GIN indexes on ``to_tsvector('simple', ...)`` expressions;
+SQLite gets FTS5 external-content tables kept in sync by triggers (the
+same DDL as ``db.ensure_fulltext_index`` at the time of this revision).
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-16
+"""
+
+import logging
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger(__name__)
+
+revision: str = "017"
+down_revision: str | None = "016"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+_PG_INDEXES = {
+    "idx_doc_chunks_fts": ("doc_chunks", "to_tsvector('simple', content)"),
+    "idx_bot_notes_fts": ("bot_notes", "to_tsvector('simple', title || ' ' || content)"),
+}
+
+# (fts table, source table, indexed columns)
+_SQLITE_TABLES = (
+    ("doc_chunks_fts", "doc_chunks", ("content",)),
+    ("bot_notes_fts", "bot_notes", ("title", "content")),
+)
+
+
+def _sqlite_ddl(fts: str, source: str, columns: tuple[str, ...]) -> list[str]:
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_vals});"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_vals});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+        f"content='{source}', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Failures (e.g. SQLite built without FTS5) leave keyword search on LIKE
+    # scans; the savepoint keeps the rest of the migration going.
+    try:
+        with bind.begin_nested():
+            if bind.dialect.name == "postgresql":
+                for name, (table, expression) in _PG_INDEXES.items():
+                    bind.execute(
+                        sa.text(
+                            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression})"
+                        )
+                    )
+            elif bind.dialect.name == "sqlite":
+                for fts, source, columns in _SQLITE_TABLES:
+                    for ddl in _sqlite_ddl(fts, source, columns):
+                        bind.execute(sa.text(ddl))
+                    # Backfill from the source table; triggers take over from here
+                    bind.execute(sa.text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    except Exception as e:
+        logger.warning("Could not create full-text indexes: %s", e)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_bot_notes_fts")
+        op.execute("DROP INDEX IF EXISTS idx_doc_chunks_fts")
+    elif bind.dialect.name == "sqlite":
+        for fts in ("doc_chunks_fts", "bot_notes_fts"):
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
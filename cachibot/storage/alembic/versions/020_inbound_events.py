@@ -0,0 +1,50 @@
+"""Add inbound_events table for the webhook inbound queue.
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-16
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "020"
+down_revision: str | None = "019"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inbound_events",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column(
+            "connection_id",
+            sa.String(),
+            sa.ForeignKey("bot_connections.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("platform", sa.String(), nullable=False),
+        sa.Column("chat_id", sa.String(), nullable=False),
+        sa.Column("event_key", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "received_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("connection_id", "event_key", name="uq_inbound_events_key"),
+    )
+    op.create_index("idx_inbound_events_status", "inbound_events", ["status", "received_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_inbound_events_status", table_name="inbound_events")
+    op.drop_table("inbound_events")
@@ -0,0 +1,114 @@
+"""Move work job logs from a JSON array column to an append-only table.
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-16
+"""
+
+import json
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "021"
+down_revision: str | None = "020"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "work_job_logs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "job_id",
+            sa.String(),
+            sa.ForeignKey("work_jobs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "timestamp",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("level", sa.String(), nullable=False, server_default="info"),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=True),
+    )
+    op.create_index("idx_work_job_logs_job", "work_job_logs", ["job_id", "id"])
+
+    # Move the entries of every job's logs array into the new table
+    bind = op.get_bind()
+    jobs = sa.table("work_jobs", sa.column("id", sa.String), sa.column("logs", sa.JSON))
+    logs = sa.table(
+        "work_job_logs",
+        sa.column("job_id", sa.String),
+        sa.column("timestamp", sa.DateTime(timezone=True)),
+        sa.column("level", sa.String),
+        sa.column("message", sa.Text),
+        sa.column("data", sa.JSON),
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(jobs.c.id, jobs.c.logs)
+            .where(sa.cast(jobs.c.logs, sa.Text).not_in(["[]", "null"]))
+            .limit(500)
+        ).all()
+        if not rows:
+            break
+        entries = []
+        for job_id, array in rows:
+            for entry in array or []:
+                if not isinstance(entry, dict):
+                    continue
+                timestamp = entry.get("timestamp")
+                if isinstance(timestamp, str):
+                    try:
+                        timestamp = datetime.fromisoformat(timestamp)
+                    except ValueError:
+                        timestamp = None
+                entries.append(
+                    {
+                        "job_id": job_id,
+                        "timestamp": timestamp or datetime.now(timezone.utc),
+                        "level": entry.get("level") or "info",
+                        "message": str(entry.get("message", "")),
+                        "data": entry.get("data"),
+                    }
+                )
+        if entries:
+            bind.execute(sa.insert(logs), entries)
+        bind.execute(
+            sa.update(jobs).where(jobs.c.id.in_([job_id for job_id, _ in rows])).values(logs=[])
+        )
+
+
+def downgrade() -> None:
+    # Fold the entries back into the JSON arrays older releases read
+    bind = op.get_bind()
+    jobs = sa.table("work_jobs", sa.column("id", sa.String), sa.column("logs", sa.JSON))
+    rows = bind.execute(
+        sa.text(
+            "SELECT job_id, timestamp, level, message, data FROM work_job_logs ORDER BY job_id, id"
+        )
+    ).all()
+    by_job: dict[str, list[dict[str, object]]] = {}
+    for job_id, timestamp, level, message, data in rows:
+        if isinstance(data, str):  # raw SQL returns JSON as text on SQLite
+            data = json.loads(data)
+        by_job.setdefault(job_id, []).append(
+            {
+                "timestamp": timestamp if isinstance(timestamp, str) else timestamp.isoformat(),
+                "level": level,
+                "message": message,
+                "data": data,
+            }
+        )
+    for job_id, entries in by_job.items():
+        bind.execute(sa.update(jobs).where(jobs.c.id == job_id).values(logs=entries))
+
+    op.drop_index("idx_work_job_logs_job", table_name="work_job_logs")
+    op.drop_table("work_job_logs")
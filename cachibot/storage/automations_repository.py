@@ -11,7 +11,7 @@ import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, insert, select, update
 
 from cachibot.models.automations import (
     AuthorType,
@@ -357,27 +357,12 @@ class ExecutionLogRepository(BaseRepository[ExecutionLogORM, ExecutionLogModel])
         content: str,
         data: dict[str, Any] | None = None,
     ) -> None:
-        """Append a log line to an execution."""
-        async with self._session() as session:
-            # Get next sequence number
-            result = await session.execute(
-                select(func.coalesce(func.max(ExecutionLogLineORM.seq), 0)).where(
-                    ExecutionLogLineORM.execution_log_id == log_id
-                )
-            )
-            next_seq = (result.scalar() or 0) + 1
+        """Append a single log line to an execution.
 
-            obj = ExecutionLogLineORM(
-                id=str(uuid.uuid4()),
-                execution_log_id=log_id,
-                seq=next_seq,
-                timestamp=datetime.now(timezone.utc),
-                level=level,
-                content=content,
-                data=data,
-            )
-            session.add(obj)
-            await session.commit()
+        Running executions should write through ``ExecutionLogSink``, which
+        allocates sequence numbers in memory and inserts lines in batches.
+        """
+        await ExecutionLogLineRepository().append(log_id, level, content, data)
 
     async def get(self, log_id: str) -> ExecutionLogModel | None:
         """Get an execution log by ID."""
@@ -694,7 +679,7 @@ class ExecutionLogLineRepository:
         content: str,
         data: dict[str, Any] | None = None,
     ) -> None:
-        """Append a log line."""
+        """Append a log line (sequence number computed in the database)."""
         async with db.ensure_initialized()() as session:
             result = await session.execute(
                 select(func.coalesce(func.max(ExecutionLogLineORM.seq), 0)).where(
@@ -715,6 +700,28 @@ class ExecutionLogLineRepository:
             session.add(obj)
             await session.commit()
 
+    async def append_many(self, lines: list[dict[str, Any]]) -> None:
+        """Insert pre-sequenced log lines in one multi-row INSERT.
+
+        Each dict holds ``id``, ``execution_log_id``, ``seq``, ``timestamp``,
+        ``level``, ``content`` and ``data``.
+        """
+        if not lines:
+            return
+        async with db.ensure_initialized()() as session:
+            await session.execute(insert(ExecutionLogLineORM), lines)
+            await session.commit()
+
+    async def get_last_seq(self, log_id: str) -> int:
+        """Highest sequence number stored for an execution (0 if none)."""
+        async with db.ensure_initialized()() as session:
+            result = await session.execute(
+                select(func.coalesce(func.max(ExecutionLogLineORM.seq), 0)).where(
+                    ExecutionLogLineORM.execution_log_id == log_id
+                )
+            )
+            return int(result.scalar() or 0)
+
     async def get_lines(
         self, log_id: str, limit: int = 100, offset: int = 0
     ) -> list[ExecutionLogLineModel]:
@@ -5,7 +5,8 @@ Smart Database Setup — auto-detects and configures the right database.
 - DATABASE_URL set -> use it (PostgreSQL, SQLite, whatever SQLAlchemy supports)
 - Logs clearly which database is being used
 - Auto-creates ~/.cachibot directory
-- Enables WAL mode for SQLite
+- Enables WAL mode for SQLite, optionally with a pool of read-only
+  connections beside the single writer connection
 - Connection pooling for PostgreSQL
 - Helpful error messages for connection failures
 """
@@ -17,6 +18,7 @@ import logging
 import os
 from collections.abc import AsyncGenerator
 from pathlib import Path
+from typing import Any
 
 from sqlalchemy import String, Text, event, inspect, text
 from sqlalchemy.ext.asyncio import (
@@ -25,7 +27,7 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
 logger = logging.getLogger("cachibot.database")
 
@@ -38,6 +40,8 @@ class Base(DeclarativeBase):
 
 # Module-level engine and session maker — initialized lazily via init_db()
 engine: AsyncEngine | None = None
+# SQLite only: read-only connection pool that SELECTs are routed to
+reader_engine: AsyncEngine | None = None
 async_session_maker: async_sessionmaker[AsyncSession] | None = None
 
 # Database dialect: "sqlite" or "postgresql" (set during init_db)
@@ -46,6 +50,9 @@ db_type: str = "sqlite"
 # Set to True when a V1 legacy database is detected (has users but no groups table)
 legacy_db_detected: bool = False
 
+# PostgreSQL only: background build of the configured ANN index (see init_db)
+_ann_index_task: asyncio.Task[None] | None = None
+
 
 def resolve_database_url() -> str:
     """Determine the database URL from config, env vars, or default.
@@ -64,7 +71,7 @@ def resolve_database_url() -> str:
         try:
             from cachibot.config import Config
 
-            config = Config.load()
+            config = Config.snapshot()
             url = config.database.url
         except Exception:
             pass
@@ -94,19 +101,61 @@ def _detect_db_type(url: str) -> str:
     return url.split("://")[0].split("+")[0] if "://" in url else "sqlite"
 
 
+class _SQLiteRoutingSession(Session):
+    """Session that sends reads to the SQLite reader pool.
+
+    SELECTs go to a read-only connection (WAL lets them run while the writer
+    is busy) until the session first writes; from then on everything uses
+    the writer connection so the session reads its own uncommitted changes.
+    """
+
+    _writing = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):  # type: ignore[no-untyped-def]
+        reader = self.info.get("reader")
+        if reader is not None and not self._writing and not self._flushing:
+            if getattr(clause, "is_select", False) or _is_read_only_text(clause):
+                return reader
+        self._writing = True
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def _is_read_only_text(clause: object) -> bool:
+    """Whether *clause* is a raw ``text()`` query that only reads."""
+    sql = getattr(clause, "text", None)
+    if not isinstance(sql, str):
+        return False
+    return sql.lstrip()[:6].upper() == "SELECT"
+
+
+def _is_file_sqlite(url: str) -> bool:
+    """Whether the SQLite URL points at a file (in-memory DBs can't be shared)."""
+    path = url.split("///", 1)[-1] if "///" in url else ""
+    return bool(path) and path != ":memory:" and "mode=memory" not in path
+
+
 def _create_engine_from_url(
     url: str,
     echo: bool = False,
     pool_size: int = 10,
     max_overflow: int = 20,
     pool_recycle: int = 3600,
-) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    sqlite_readers: int = 0,
+    sqlite_synchronous: str = "NORMAL",
+) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession], AsyncEngine | None]:
     """Create engine and session maker configured for the detected dialect.
 
-    SQLite: uses aiosqlite with StaticPool, enables WAL journal mode.
+    SQLite: uses aiosqlite with one writer connection (StaticPool) in WAL
+    journal mode, plus a pool of ``sqlite_readers`` read-only connections
+    that sessions route SELECTs to (0 = the writer serves reads too).
     PostgreSQL: uses asyncpg with connection pooling and pre-ping.
+
+    Returns:
+        The (writer) engine, the session maker and the SQLite reader engine
+        (None when reads are not split off).
     """
     detected = _detect_db_type(url)
+    reader: AsyncEngine | None = None
 
     if detected == "sqlite":
         from sqlalchemy.pool import StaticPool
@@ -119,14 +168,35 @@ def _create_engine_from_url(
             poolclass=StaticPool,
         )
 
-        # Enable WAL mode for better concurrent read performance
+        # Enable WAL mode for better concurrent read performance. In WAL mode
+        # synchronous=NORMAL only syncs at checkpoints, so small commits are cheap.
+        synchronous = sqlite_synchronous.upper()
+
         @event.listens_for(eng.sync_engine, "connect")
         def _set_sqlite_pragma(dbapi_connection, connection_record):  # type: ignore[no-untyped-def]
             cursor = dbapi_connection.cursor()
             cursor.execute("PRAGMA journal_mode=WAL")
             cursor.execute("PRAGMA foreign_keys=ON")
+            if synchronous in ("OFF", "NORMAL", "FULL", "EXTRA"):
+                cursor.execute(f"PRAGMA synchronous={synchronous}")
             cursor.close()
 
+        if sqlite_readers > 0 and _is_file_sqlite(url):
+            reader = create_async_engine(
+                url,
+                echo=echo,
+                future=True,
+                connect_args={"check_same_thread": False},
+                pool_size=sqlite_readers,
+                max_overflow=0,
+            )
+
+            @event.listens_for(reader.sync_engine, "connect")
+            def _set_reader_pragma(dbapi_connection, connection_record):  # type: ignore[no-untyped-def]
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA query_only=ON")
+                cursor.close()
+
     else:
         # PostgreSQL (or other server-based DB)
         eng = create_async_engine(
@@ -139,43 +209,51 @@ def _create_engine_from_url(
             pool_pre_ping=True,
         )
 
-    session_maker = async_sessionmaker(
-        eng,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
+    if reader is not None:
+        session_maker = async_sessionmaker(
+            eng,
+            class_=AsyncSession,
+            sync_session_class=_SQLiteRoutingSession,
+            expire_on_commit=False,
+            info={"reader": reader.sync_engine},
+        )
+    else:
+        session_maker = async_sessionmaker(
+            eng,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+
+    return eng, session_maker, reader
 
-    return eng, session_maker
+
+def _engine_settings() -> dict[str, Any]:
+    """Engine keyword arguments from the [database] config (defaults if unavailable)."""
+    try:
+        from cachibot.config import Config
+
+        db_config = Config.snapshot().database
+        return {
+            "echo": db_config.echo,
+            "pool_size": db_config.pool_size,
+            "max_overflow": db_config.max_overflow,
+            "pool_recycle": db_config.pool_recycle,
+            "sqlite_readers": db_config.sqlite_readers,
+            "sqlite_synchronous": db_config.sqlite_synchronous,
+        }
+    except Exception:
+        return {}
 
 
 def ensure_initialized() -> async_sessionmaker[AsyncSession]:
     """Ensure engine and session maker are initialized. Returns session maker."""
-    global engine, async_session_maker, db_type
+    global engine, reader_engine, async_session_maker, db_type
     if async_session_maker is None:
         url = resolve_database_url()
         db_type = _detect_db_type(url)
-
-        try:
-            from cachibot.config import Config
-
-            config = Config.load()
-            db_config = config.database
-            echo = db_config.echo
-            pool_size = db_config.pool_size
-            max_overflow = db_config.max_overflow
-            pool_recycle = db_config.pool_recycle
-        except Exception:
-            echo = False
-            pool_size = 10
-            max_overflow = 20
-            pool_recycle = 3600
-
-        engine, async_session_maker = _create_engine_from_url(
+        engine, async_session_maker, reader_engine = _create_engine_from_url(
             url,
-            echo=echo,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-            pool_recycle=pool_recycle,
+            **_engine_settings(),
         )
     return async_session_maker
 
@@ -250,6 +328,158 @@ def _reconcile_schema(connection) -> None:  # type: ignore[no-untyped-def]
             connection.execute(text(ddl))
 
 
+# pgvector can only index vector columns up to 2000 dimensions, so the ANN
+# indexes are built on a half-precision cast of the 3072-dim embedding column.
+# Queries must order by the same expression for the planner to use them.
+_ANN_INDEXES = {
+    "hnsw": (
+        "idx_doc_chunks_embedding_hnsw",
+        "USING hnsw ((embedding::halfvec({dim})) halfvec_cosine_ops) "
+        "WITH (m = {m}, ef_construction = {ef_construction})",
+    ),
+    "ivfflat": (
+        "idx_doc_chunks_embedding_ivfflat",
+        "USING ivfflat ((embedding::halfvec({dim})) halfvec_cosine_ops) WITH (lists = {lists})",
+    ),
+}
+
+
+def ensure_ann_index(  # type: ignore[no-untyped-def]
+    connection,
+    mode: str,
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = 0,
+    dim: int = 3072,
+) -> None:
+    """Create the pgvector ANN index for *mode* and drop the other one.
+
+    PostgreSQL only; ``"exact"`` leaves existing indexes untouched. Expects an
+    AUTOCOMMIT connection: the indexes are built and dropped ``CONCURRENTLY``
+    so chunk writes and searches keep running during a long build. An index
+    left invalid by an interrupted build is dropped and built again. Failures
+    (e.g. pgvector too old for ``halfvec``) are logged and search falls back
+    to a sequential scan.
+    """
+    if connection.dialect.name != "postgresql" or mode not in _ANN_INDEXES:
+        return
+
+    name, using = _ANN_INDEXES[mode]
+    ddl = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON doc_chunks " + using.format(
+        dim=int(dim),
+        m=int(m),
+        ef_construction=int(ef_construction),
+        lists=int(lists) or 100,
+    )
+    try:
+        valid = connection.execute(
+            text(
+                "SELECT i.indisvalid FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+            ),
+            {"name": name},
+        ).scalar()
+        if valid is False:
+            connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        if valid is not True:
+            logger.info("Building %s index on doc_chunks.embedding", mode)
+            connection.execute(text(ddl))
+        for other, (other_name, _using) in _ANN_INDEXES.items():
+            if other != mode:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {other_name}"))
+    except Exception as e:
+        logger.warning("Could not create %s index on doc_chunks.embedding: %s", mode, e)
+
+
+async def _build_ann_index() -> None:
+    """Run ``ensure_ann_index`` for the configured mode on its own connection."""
+    from cachibot.config import Config
+
+    knowledge = Config.snapshot().knowledge
+    if engine is None or knowledge.ann_mode not in _ANN_INDEXES:
+        return
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.run_sync(
+            ensure_ann_index,
+            knowledge.ann_mode,
+            knowledge.hnsw_m,
+            knowledge.hnsw_ef_construction,
+            knowledge.ivf_lists,
+        )
+
+
+# Full-text search over chunks and notes. PostgreSQL indexes a tsvector
+# expression (queries must use the identical expression); SQLite keeps FTS5
+# tables in sync with triggers. The "simple" configuration does no stemming
+# or stop-word removal, so identifiers and non-English text match verbatim.
+CHUNK_TSVECTOR = "to_tsvector('simple', content)"
+NOTE_TSVECTOR = "to_tsvector('simple', title || ' ' || content)"
+
+_PG_FTS_INDEXES = {
+    "idx_doc_chunks_fts": ("doc_chunks", CHUNK_TSVECTOR),
+    "idx_bot_notes_fts": ("bot_notes", NOTE_TSVECTOR),
+}
+
+# (fts table, source table, indexed columns)
+_SQLITE_FTS_TABLES = (
+    ("doc_chunks_fts", "doc_chunks", ("content",)),
+    ("bot_notes_fts", "bot_notes", ("title", "content")),
+)
+
+
+def _sqlite_fts_ddl(fts: str, source: str, columns: tuple[str, ...]) -> list[str]:
+    """FTS5 external-content table plus the triggers that keep it in sync."""
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_vals});"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_vals});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+        f"content='{source}', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_fulltext_index(connection) -> None:  # type: ignore[no-untyped-def]
+    """Create the full-text indexes used for keyword and hybrid search.
+
+    Idempotent. On SQLite a newly created FTS5 table is backfilled from its
+    source table; afterwards triggers maintain it incrementally. Failures
+    (e.g. SQLite built without FTS5) are logged and keyword search falls
+    back to ``LIKE`` scans.
+    """
+    dialect = connection.dialect.name
+    try:
+        with connection.begin_nested():
+            if dialect == "postgresql":
+                for name, (table, expression) in _PG_FTS_INDEXES.items():
+                    connection.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression})"
+                        )
+                    )
+            elif dialect == "sqlite":
+                for fts, source, columns in _SQLITE_FTS_TABLES:
+                    exists = connection.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                        {"name": fts},
+                    ).first()
+                    for ddl in _sqlite_fts_ddl(fts, source, columns):
+                        connection.execute(text(ddl))
+                    if exists is None:
+                        connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    except Exception as e:
+        logger.warning("Could not create full-text indexes: %s", e)
+
+
 async def init_db() -> None:
     """Initialize the database connection and create tables if needed.
 
@@ -259,27 +489,11 @@ async def init_db() -> None:
     - Auto-creates all tables for fresh installs (via Base.metadata.create_all)
     - Logs which database backend is being used
     """
-    global engine, async_session_maker, db_type, legacy_db_detected
+    global engine, reader_engine, async_session_maker, db_type, legacy_db_detected, _ann_index_task
 
     url = resolve_database_url()
     db_type = _detect_db_type(url)
 
-    # Load config for pool settings
-    try:
-        from cachibot.config import Config
-
-        config = Config.load()
-        db_config = config.database
-        echo = db_config.echo
-        pool_size = db_config.pool_size
-        max_overflow = db_config.max_overflow
-        pool_recycle = db_config.pool_recycle
-    except Exception:
-        echo = False
-        pool_size = 10
-        max_overflow = 20
-        pool_recycle = 3600
-
     # For SQLite, ensure the parent directory exists
     if db_type == "sqlite":
         # Extract path from URL: sqlite+aiosqlite:///path/to/db
@@ -303,13 +517,7 @@ async def init_db() -> None:
                 safe_url = f"{scheme}//{user}:***@{post_at}"
         logger.info("Using PostgreSQL at %s", safe_url)
 
-    engine, async_session_maker = _create_engine_from_url(
-        url,
-        echo=echo,
-        pool_size=pool_size,
-        max_overflow=max_overflow,
-        pool_recycle=pool_recycle,
-    )
+    engine, async_session_maker, reader_engine = _create_engine_from_url(url, **_engine_settings())
 
     # Import all models so Base.metadata is fully populated
     import cachibot.storage.models  # noqa: F401
@@ -336,12 +544,32 @@ async def init_db() -> None:
                         "User will be prompted to reset or keep the database."
                     )
 
+            # Tables create_all is about to add get their data moved once, below
+            has_job_logs = await conn.run_sync(
+                lambda sync_conn: inspect(sync_conn).has_table("work_job_logs")
+            )
+
             # Create all tables that don't exist yet
             await conn.run_sync(Base.metadata.create_all)
 
             # Add any missing columns to existing tables (schema reconciliation)
             await conn.run_sync(_reconcile_schema)
 
+            # Convert legacy JSON-text embeddings to the binary format (SQLite)
+            if db_type == "sqlite":
+                from cachibot.storage.embedding_codec import rewrite_json_embeddings
+
+                await conn.run_sync(rewrite_json_embeddings)
+
+            # Move legacy work_jobs.logs JSON arrays into the new work_job_logs
+            if not has_job_logs:
+                from cachibot.storage.work_repository import explode_job_log_arrays
+
+                await conn.run_sync(explode_job_log_arrays)
+
+            # Full-text indexes for keyword / hybrid search
+            await conn.run_sync(ensure_fulltext_index)
+
     except Exception as e:
         if db_type == "postgresql":
             logger.error(
@@ -353,13 +581,27 @@ async def init_db() -> None:
             logger.error("Failed to initialize SQLite database: %s", e)
         raise
 
+    # Build the configured approximate-nearest-neighbour index (PostgreSQL) in
+    # the background: on a large doc_chunks table it takes minutes, and search
+    # works (by sequential scan) until it is ready
+    if db_type == "postgresql":
+        _ann_index_task = asyncio.create_task(_build_ann_index())
+
 
 async def close_db() -> None:
-    """Dispose of the database engine and close all connections."""
-    global engine, async_session_maker
+    """Dispose of the database engines and close all connections."""
+    global engine, reader_engine, async_session_maker, _ann_index_task
+    if _ann_index_task is not None:
+        # An interrupted build leaves an invalid index; the next start rebuilds it
+        _ann_index_task.cancel()
+        await asyncio.gather(_ann_index_task, return_exceptions=True)
+        _ann_index_task = None
+    if reader_engine:
+        await reader_engine.dispose()
     if engine:
         await engine.dispose()
     engine = None
+    reader_engine = None
     async_session_maker = None
 
 
@@ -0,0 +1,124 @@
+"""
+Binary embedding encoding for SQLite.
+
+Embeddings are stored as a little-endian float32 BLOB prefixed with a small
+fixed-size header, so they decode zero-copy through ``np.frombuffer``:
+
+    offset  size  field
+    0       2     magic  b"CV"
+    2       1     dtype code (1 = float32, 2 = float16)
+    3       1     reserved (0)
+    4       4     dimension (uint32, little-endian)
+    8       ...   vector data
+
+Rows written before this format existed hold JSON text (``"[0.1, ...]"``);
+``decode_embedding`` still reads those so mixed databases keep working while
+``rewrite_json_embeddings`` converts them in batches.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import struct
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "HEADER_SIZE",
+    "decode_embedding",
+    "encode_embedding",
+    "is_encoded",
+    "rewrite_json_embeddings",
+]
+
+_MAGIC = b"CV"
+_HEADER = struct.Struct("<2sBxI")
+HEADER_SIZE = _HEADER.size
+
+# dtype code -> numpy dtype (always little-endian on disk)
+_DTYPES: dict[int, np.dtype[Any]] = {
+    1: np.dtype("<f4"),
+    2: np.dtype("<f2"),
+}
+_FLOAT32 = 1
+
+
+def encode_embedding(value: Sequence[float] | np.ndarray) -> bytes:
+    """Encode a vector as a headered little-endian float32 BLOB."""
+    array = np.asarray(value, dtype=_DTYPES[_FLOAT32]).ravel()
+    return _HEADER.pack(_MAGIC, _FLOAT32, array.shape[0]) + array.tobytes()
+
+
+def is_encoded(value: Any) -> bool:
+    """Return True if *value* is a BLOB in the headered binary format."""
+    return isinstance(value, bytes | bytearray | memoryview) and bytes(value[:2]) == _MAGIC
+
+
+def decode_embedding(value: bytes | bytearray | memoryview | str) -> np.ndarray:
+    """Decode a stored embedding into a float32 numpy array.
+
+    Binary values are returned as a read-only zero-copy view over the buffer.
+    Legacy JSON text and headerless raw float32 BLOBs are also accepted.
+    """
+    if isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=np.float32)
+
+    if is_encoded(value):
+        _magic, code, dim = _HEADER.unpack_from(value)
+        dtype = _DTYPES.get(code)
+        if dtype is None:
+            raise ValueError(f"Unknown embedding dtype code: {code}")
+        array = np.frombuffer(value, dtype=dtype, count=dim, offset=HEADER_SIZE)
+        return array if code == _FLOAT32 else array.astype(np.float32)
+
+    # Headerless raw float32 (older exports)
+    return np.frombuffer(value, dtype=_DTYPES[_FLOAT32])
+
+
+def rewrite_json_embeddings(
+    connection: Any,
+    table: str = "doc_chunks",
+    column: str = "embedding",
+    batch_size: int = 500,
+) -> int:
+    """Convert JSON-text embeddings to the binary format, one batch per statement.
+
+    Runs on a synchronous SQLite connection (``conn.run_sync`` or Alembic's
+    ``op.get_bind()``). ``typeof()`` only inspects the record header, so the
+    scan for remaining text rows is cheap once everything is converted.
+
+    Returns:
+        Number of rows rewritten.
+    """
+    from sqlalchemy import text
+
+    select_stmt = text(
+        f'SELECT id, "{column}" FROM "{table}" WHERE typeof("{column}") = \'text\' LIMIT :batch'
+    )
+    update_stmt = text(f'UPDATE "{table}" SET "{column}" = :value WHERE id = :id')
+
+    total = 0
+    while True:
+        rows = connection.execute(select_stmt, {"batch": batch_size}).all()
+        if not rows:
+            break
+        params = []
+        for row_id, raw in rows:
+            try:
+                params.append({"id": row_id, "value": encode_embedding(json.loads(raw))})
+            except (TypeError, ValueError):
+                # Unreadable vectors are unusable for search; clear them so the
+                # loop terminates and the chunk can be re-embedded on reindex.
+                logger.warning("Clearing unparseable embedding in %s row %s", table, row_id)
+                params.append({"id": row_id, "value": None})
+        connection.execute(update_stmt, params)
+        total += len(params)
+
+    if total:
+        logger.info("Rewrote %d JSON embeddings in %s to binary format", total, table)
+    return total
@@ -11,6 +11,7 @@ from sqlalchemy import select, update
 from cachibot.models.instruction import InstructionModel, InstructionVersionModel
 from cachibot.storage import db
 from cachibot.storage.models.instruction import InstructionRecord, InstructionVersion
+from cachibot.storage.repository import _invalidate_agent_setup
 
 
 class InstructionRepository:
@@ -74,6 +75,7 @@ class InstructionRepository:
             session.add(version)
             await session.commit()
 
+        _invalidate_agent_setup(bot_id)
         return self._row_to_model(record)
 
     # ------------------------------------------------------------------
@@ -164,6 +166,7 @@ class InstructionRepository:
             await session.commit()
             await session.refresh(record)
 
+        _invalidate_agent_setup(record.bot_id)
         return self._row_to_model(record)
 
     # ------------------------------------------------------------------
@@ -177,9 +180,15 @@ class InstructionRepository:
                 update(InstructionRecord)
                 .where(InstructionRecord.id == instruction_id)
                 .values(is_active=False, updated_at=datetime.now(timezone.utc))
+                .returning(InstructionRecord.bot_id)
             )
+            bot_id = result.scalar_one_or_none()
             await session.commit()
-            return bool(result.rowcount > 0)  # type: ignore[attr-defined]
+
+        if bot_id is None:
+            return False
+        _invalidate_agent_setup(bot_id)
+        return True
 
     # ------------------------------------------------------------------
     # Versions
@@ -259,6 +268,7 @@ class InstructionRepository:
             await session.commit()
             await session.refresh(record)
 
+        _invalidate_agent_setup(record.bot_id)
         return self._row_to_model(record)
 
     # ------------------------------------------------------------------
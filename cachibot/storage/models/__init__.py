@@ -35,7 +35,7 @@ from cachibot.storage.models.automations import (
 )
 from cachibot.storage.models.bot import Bot, BotOwnership
 from cachibot.storage.models.chat import Chat
-from cachibot.storage.models.connection import BotConnection
+from cachibot.storage.models.connection import BotConnection, InboundEvent
 from cachibot.storage.models.contact import BotContact
 from cachibot.storage.models.developer import BotApiKey, BotWebhook
 from cachibot.storage.models.env_var import (
@@ -49,15 +49,30 @@ from cachibot.storage.models.group import BotGroupAccess, Group, GroupMember
 # Custom instructions
 from cachibot.storage.models.instruction import InstructionRecord, InstructionVersion
 from cachibot.storage.models.job import Job
-from cachibot.storage.models.knowledge import BotDocument, BotInstruction, BotNote, DocChunk
-from cachibot.storage.models.message import BotMessage, Message
+from cachibot.storage.models.knowledge import (
+    BotDocument,
+    BotInstruction,
+    BotNote,
+    DocChunk,
+    EmbeddingCacheEntry,
+    IngestionJob,
+)
+from cachibot.storage.models.message import BotMessage, ChatSummary, Message
 from cachibot.storage.models.platform_config import PlatformToolConfig
 from cachibot.storage.models.room import Room, RoomBot, RoomMember, RoomMessage
 from cachibot.storage.models.room_task import RoomTask
 from cachibot.storage.models.room_task_event import RoomTaskEvent
 from cachibot.storage.models.skill import BotSkill, Skill
 from cachibot.storage.models.user import User
-from cachibot.storage.models.work import Function, Schedule, Task, Todo, Work, WorkJob
+from cachibot.storage.models.work import (
+    Function,
+    Schedule,
+    Task,
+    Todo,
+    Work,
+    WorkJob,
+    WorkJobLog,
+)
 
 __all__ = [
     # Base
@@ -67,6 +82,7 @@ __all__ = [
     # Messages
     "Message",
     "BotMessage",
+    "ChatSummary",
     # Jobs
     "Job",
     # Bots
@@ -78,11 +94,14 @@ __all__ = [
     "BotInstruction",
     "BotDocument",
     "DocChunk",
+    "EmbeddingCacheEntry",
+    "IngestionJob",
     "BotNote",
     # Contacts
     "BotContact",
     # Connections
     "BotConnection",
+    "InboundEvent",
     # Environment variables
     "BotEnvironment",
     "PlatformEnvironment",
@@ -99,6 +118,7 @@ __all__ = [
     "Work",
     "Task",
     "WorkJob",
+    "WorkJobLog",
     "Todo",
     # Groups & access
     "Group",
@@ -38,6 +38,9 @@ class Bot(Base):
         sa.JSON, nullable=False, server_default="{}"
     )
     models: Mapped[dict[str, Any] | None] = mapped_column(sa.JSON, nullable=True)
+    # Bumped whenever the bot's resolved environment changes (env vars, skill
+    # configs, platform defaults) so cached resolutions can be revalidated.
+    env_version: Mapped[int] = mapped_column(sa.Integer, nullable=False, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
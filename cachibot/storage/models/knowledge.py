@@ -6,7 +6,6 @@ Uses cross-dialect types so models work on both SQLite and PostgreSQL.
 
 from __future__ import annotations
 
-import json
 from datetime import datetime
 
 import sqlalchemy as sa
@@ -14,18 +13,29 @@ from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from cachibot.storage.db import Base
+from cachibot.storage.embedding_codec import decode_embedding, encode_embedding
 
-__all__ = ["BotInstruction", "BotDocument", "DocChunk", "BotNote", "VectorType"]
+__all__ = [
+    "BotInstruction",
+    "BotDocument",
+    "DocChunk",
+    "EmbeddingCacheEntry",
+    "IngestionJob",
+    "BotNote",
+    "VectorType",
+]
 
 
 class VectorType(sa.types.TypeDecorator[list[float]]):
-    """Vector type that uses pgvector on PostgreSQL and Text on SQLite.
+    """Vector type that uses pgvector on PostgreSQL and a binary BLOB on SQLite.
 
     On PostgreSQL: delegates to pgvector's Vector(dim) for native similarity search.
-    On SQLite: stores embeddings as JSON-encoded text (list of floats).
+    On SQLite: stores embeddings as headered little-endian float32 BLOBs (see
+    ``cachibot.storage.embedding_codec``) and loads them zero-copy as numpy
+    arrays. Legacy JSON-text rows are still readable.
     """
 
-    impl = sa.Text
+    impl = sa.LargeBinary
     cache_ok = True
 
     def __init__(self, dim: int = 384):
@@ -41,24 +51,22 @@ class VectorType(sa.types.TypeDecorator[list[float]]):
             except ImportError:
                 # pgvector not installed, fall back to Text
                 return dialect.type_descriptor(sa.Text())
-        return dialect.type_descriptor(sa.Text())
+        return dialect.type_descriptor(sa.LargeBinary())
 
     def process_bind_param(self, value, dialect):  # type: ignore[no-untyped-def]
         if value is None:
             return None
         if dialect.name != "postgresql":
-            # SQLite: serialize to JSON string
-            if isinstance(value, list | tuple):
-                return json.dumps(list(value))
-            return value
+            # SQLite: serialize to binary float32
+            return encode_embedding(value)
         # PostgreSQL: pgvector handles list[float] natively
         return value
 
     def process_result_value(self, value, dialect):  # type: ignore[no-untyped-def]
         if value is None:
             return None
-        if dialect.name != "postgresql" and isinstance(value, str):
-            return json.loads(value)
+        if dialect.name != "postgresql":
+            return decode_embedding(value)
         return value
 
 
@@ -102,6 +110,8 @@ class BotDocument(Base):
     processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     embedding_model: Mapped[str | None] = mapped_column(String, nullable=True)
     embedding_dimensions: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Chunks whose embedding came from the content-hash cache on last processing
+    embeddings_reused: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
     # Relationships
     chunks: Mapped[list[DocChunk]] = relationship(
@@ -113,13 +123,13 @@ class DocChunk(Base):
     """Document chunk with vector embedding for RAG search.
 
     Uses VectorType which delegates to pgvector on PostgreSQL
-    and stores as JSON text on SQLite. The embedding column stores a
+    and stores as a binary float32 BLOB on SQLite. The embedding column stores a
     vector up to 3072 dimensions (supports OpenAI text-embedding-3-large).
     """
 
     __tablename__ = "doc_chunks"
-    # HNSW index on embedding is PostgreSQL-only (pgvector).
-    # It is created conditionally via DDL in init_db when on PostgreSQL.
+    # HNSW / IVFFlat indexes on embedding are PostgreSQL-only (pgvector).
+    # They are created per knowledge.ann_mode by db.ensure_ann_index.
     __table_args__ = (
         Index("idx_doc_chunks_document", "document_id"),
         Index("idx_doc_chunks_bot", "bot_id"),
@@ -137,11 +147,57 @@ class DocChunk(Base):
     chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     embedding = mapped_column(VectorType(3072), nullable=True)
+    # Source location for citations (offsets into the extracted document text)
+    page_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    char_start: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    char_end: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     # Relationships
     document: Mapped[BotDocument] = relationship("BotDocument", back_populates="chunks")
 
 
+class EmbeddingCacheEntry(Base):
+    """Content-addressed chunk embedding, shared across bots and documents.
+
+    Keyed by (embedding_model, sha256 of the chunk text) so identical chunks
+    (boilerplate, re-uploaded or reindexed documents) are embedded only once.
+    """
+
+    __tablename__ = "embedding_cache"
+
+    embedding_model: Mapped[str] = mapped_column(String, primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String, primary_key=True)
+    embedding = mapped_column(VectorType(3072), nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class IngestionJob(Base):
+    """A document waiting to be processed by the ingestion queue.
+
+    Rows are removed once processing finishes (successfully or not), so
+    whatever is left after a restart is resumed.
+    """
+
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (Index("idx_ingestion_jobs_order", "priority", "enqueued_at"),)
+
+    document_id: Mapped[str] = mapped_column(
+        String, ForeignKey("bot_documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    bot_id: Mapped[str] = mapped_column(
+        String, ForeignKey("bots.id", ondelete="CASCADE"), nullable=False
+    )
+    file_path: Mapped[str] = mapped_column(String, nullable=False)
+    file_type: Mapped[str] = mapped_column(String, nullable=False)
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, server_default="10")
+    enqueued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 class BotNote(Base):
     """Persistent memory notes for a bot."""
 
@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
 import sqlalchemy as sa
-from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from cachibot.storage.db import Base
@@ -16,7 +16,7 @@ from cachibot.storage.db import Base
 if TYPE_CHECKING:
     from cachibot.storage.models.job import Job
 
-__all__ = ["Message", "BotMessage"]
+__all__ = ["Message", "BotMessage", "ChatSummary"]
 
 
 class Message(Base):
@@ -64,3 +64,28 @@ class BotMessage(Base):
         "metadata", sa.JSON, nullable=False, server_default="{}"
     )
     reply_to_id: Mapped[str | None] = mapped_column(String, nullable=True)
+
+
+class ChatSummary(Base):
+    """Rolling summary of a chat's older messages.
+
+    Messages up to and including the watermark (``last_message_at``,
+    ``last_message_id``) have been folded into ``content``; newer ones are
+    still only available raw.
+    """
+
+    __tablename__ = "chat_summaries"
+
+    chat_id: Mapped[str] = mapped_column(
+        String, ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True
+    )
+    bot_id: Mapped[str] = mapped_column(
+        String, ForeignKey("bots.id", ondelete="CASCADE"), nullable=False
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    last_message_id: Mapped[str] = mapped_column(String, nullable=False)
+    last_message_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -1,5 +1,5 @@
 """
-Work management models: Function, Schedule, Work, Task, WorkJob, Todo.
+Work management models: Function, Schedule, Work, Task, WorkJob, WorkJobLog, Todo.
 """
 
 from __future__ import annotations
@@ -23,7 +23,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from cachibot.storage.db import Base
 
-__all__ = ["Function", "Schedule", "Work", "Task", "WorkJob", "Todo"]
+__all__ = ["Function", "Schedule", "Work", "Task", "WorkJob", "WorkJobLog", "Todo"]
 
 
 class Function(Base):
@@ -293,6 +293,7 @@ class WorkJob(Base):
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     result: Mapped[dict[str, Any] | None] = mapped_column(sa.JSON, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Legacy: entries now live in work_job_logs; kept empty for older releases
     logs: Mapped[list[dict[str, Any]]] = mapped_column(sa.JSON, nullable=False, server_default="[]")
 
     # Relationships
@@ -300,6 +301,24 @@ class WorkJob(Base):
     work: Mapped[Work] = relationship("Work", back_populates="work_jobs")
 
 
+class WorkJobLog(Base):
+    """Append-only log entry of a work job (ordered by id)."""
+
+    __tablename__ = "work_job_logs"
+    __table_args__ = (Index("idx_work_job_logs_job", "job_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(
+        String, ForeignKey("work_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    timestamp: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    level: Mapped[str] = mapped_column(String, nullable=False, server_default="info")
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    data: Mapped[Any | None] = mapped_column(sa.JSON, nullable=True)
+
+
 class Todo(Base):
     """Reminder / note that can be converted to work or tasks."""
 
@@ -6,11 +6,12 @@ Migrated from raw aiosqlite queries to PostgreSQL via SQLAlchemy 2.0.
 """
 
 import logging
+import re
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import Insert, and_, delete, func, or_, select, text, true, tuple_, update
 
 from cachibot.models.bot import Bot
 from cachibot.models.capabilities import Contact
@@ -22,6 +23,7 @@ from cachibot.models.knowledge import (
     BotInstruction,
     BotMessage,
     BotNote,
+    ChatSummary,
     DocChunk,
     Document,
     DocumentStatus,
@@ -30,10 +32,12 @@ from cachibot.models.knowledge import (
 from cachibot.models.platform_tools import PlatformToolConfig as PlatformToolConfigSchema
 from cachibot.models.platform_tools import PlatformToolConfigUpdate
 from cachibot.models.skill import BotSkillActivation, SkillDefinition, SkillSource
+from cachibot.storage import db
 from cachibot.storage.base import BaseRepository
 from cachibot.storage.models.bot import Bot as BotModel
 from cachibot.storage.models.chat import Chat as ChatModel
 from cachibot.storage.models.connection import BotConnection as BotConnectionModel
+from cachibot.storage.models.connection import InboundEvent as InboundEventModel
 from cachibot.storage.models.contact import BotContact as BotContactModel
 from cachibot.storage.models.job import Job as JobModel
 from cachibot.storage.models.knowledge import (
@@ -48,20 +52,103 @@ from cachibot.storage.models.knowledge import (
 from cachibot.storage.models.knowledge import (
     DocChunk as DocChunkModel,
 )
+from cachibot.storage.models.knowledge import (
+    EmbeddingCacheEntry as EmbeddingCacheModel,
+)
+from cachibot.storage.models.knowledge import (
+    IngestionJob as IngestionJobModel,
+)
 from cachibot.storage.models.message import BotMessage as BotMessageModel
+from cachibot.storage.models.message import ChatSummary as ChatSummaryModel
 from cachibot.storage.models.message import Message as MessageModel
 from cachibot.storage.models.platform_config import PlatformToolConfig as PlatformToolConfigModel
 from cachibot.storage.models.skill import BotSkill as BotSkillModel
 from cachibot.storage.models.skill import Skill as SkillModel
+from cachibot.storage.write_buffer import get_message_buffer, merge_pending
+
+if TYPE_CHECKING:
+    from cachibot.services.vector_index import VectorIndexRegistry
 
 logger = logging.getLogger("cachibot.storage.repository")
 
 
+def _vector_index() -> "VectorIndexRegistry":
+    """Return the in-memory vector index registry (kept in sync on chunk writes)."""
+    from cachibot.services.vector_index import get_vector_index_registry
+
+    return get_vector_index_registry()
+
+
+def _invalidate_agent_setup(bot_id: str | None) -> None:
+    """Drop cached agent setup and prompt context for a bot (None = every bot).
+
+    Lazy import: storage sits below services.
+    """
+    from cachibot.services.agent_cache import invalidate_agent_setup, invalidate_bot_agent
+
+    if bot_id is None:
+        invalidate_agent_setup()
+    else:
+        invalidate_bot_agent(bot_id)
+
+
 def _escape_like(value: str) -> str:
     """Escape special characters for LIKE patterns."""
     return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
+# Letters/digits only: both FTS5's unicode61 tokenizer and PostgreSQL's parser
+# split on punctuation and underscores, so "ERR_4012" becomes ERR + 4012.
+_FULLTEXT_TERM_RE = re.compile(r"[^\W_]+")
+_FULLTEXT_MAX_TERMS = 32
+
+# source table -> (SQLite FTS5 table, PostgreSQL tsvector expression)
+_FULLTEXT_SOURCES = {
+    "doc_chunks": ("doc_chunks_fts", db.CHUNK_TSVECTOR),
+    "bot_notes": ("bot_notes_fts", db.NOTE_TSVECTOR),
+}
+
+
+def _fulltext_terms(query: str) -> list[str]:
+    """Split *query* into lowercase search terms."""
+    return _FULLTEXT_TERM_RE.findall(query.lower())[:_FULLTEXT_MAX_TERMS]
+
+
+async def _fulltext_search(
+    session: Any, source: str, bot_id: str, query: str, limit: int
+) -> list[str] | None:
+    """Rank rows of *source* for *bot_id* that contain every query term.
+
+    Terms are prefix-matched (so "auth" finds "authentication"). Uses FTS5
+    BM25 on SQLite and ``ts_rank_cd`` over the GIN-indexed tsvector on
+    PostgreSQL. Returns matching ids, best first, or None when the query has
+    no searchable terms.
+    """
+    terms = _fulltext_terms(query)
+    if not terms:
+        return None
+
+    fts_table, tsvector = _FULLTEXT_SOURCES[source]
+    if db.db_type == "postgresql":
+        stmt = text(
+            f"SELECT id FROM {source} "
+            f"WHERE bot_id = :bot_id AND {tsvector} @@ to_tsquery('simple', :query) "
+            f"ORDER BY ts_rank_cd({tsvector}, to_tsquery('simple', :query)) DESC "
+            "LIMIT :limit"
+        )
+        params = {"query": " & ".join(f"{t}:*" for t in terms)}
+    else:
+        stmt = text(
+            f"SELECT s.id FROM {fts_table} JOIN {source} s ON s.rowid = {fts_table}.rowid "
+            f"WHERE {fts_table} MATCH :query AND s.bot_id = :bot_id "
+            f"ORDER BY bm25({fts_table}) LIMIT :limit"
+        )
+        params = {"query": " ".join(f'"{t}"*' for t in terms)}
+
+    result = await session.execute(stmt, {**params, "bot_id": bot_id, "limit": limit})
+    return [row[0] for row in result.all()]
+
+
 class MessageRepository(BaseRepository[MessageModel, ChatMessage]):
     """Repository for chat messages."""
 
@@ -203,40 +290,50 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
     # ===== BOT MESSAGES =====
 
     async def save_bot_message(self, message: BotMessage) -> None:
-        """Save a message to bot's conversation history."""
-        async with self._session() as session:
-            obj = BotMessageModel(
-                id=message.id,
-                bot_id=message.bot_id,
-                chat_id=message.chat_id,
-                role=message.role,
-                content=message.content,
-                timestamp=message.timestamp,
-                meta=message.metadata,
-                reply_to_id=message.reply_to_id,
-            )
-            session.add(obj)
-            await session.commit()
+        """Save a message to bot's conversation history.
+
+        The row goes through the write-behind buffer; reads of the chat see it
+        right away and it is committed within a few milliseconds.
+        """
+        await get_message_buffer().add(
+            BotMessageModel,
+            {
+                "id": message.id,
+                "bot_id": message.bot_id,
+                "chat_id": message.chat_id,
+                "role": message.role,
+                "content": message.content,
+                "timestamp": message.timestamp,
+                "meta": message.metadata,
+                "reply_to_id": message.reply_to_id,
+            },
+        )
 
     async def get_bot_messages(
         self,
         bot_id: str,
         chat_id: str,
         limit: int = 50,
+        after: ChatSummary | None = None,
     ) -> list[BotMessage]:
-        """Get messages for a specific bot and chat."""
+        """Get messages for a specific bot and chat (including unflushed ones).
+
+        With *after*, only messages newer than that summary's watermark.
+        """
         async with self._session() as session:
             result = await session.execute(
                 select(BotMessageModel)
                 .where(
                     BotMessageModel.bot_id == bot_id,
                     BotMessageModel.chat_id == chat_id,
+                    self._after_watermark(after),
                 )
                 .order_by(BotMessageModel.timestamp.desc())
                 .limit(limit)
             )
             rows = result.scalars().all()
 
+        pending = get_message_buffer().pending_rows(BotMessageModel, bot_id=bot_id, chat_id=chat_id)
         return [
             BotMessage(
                 id=row.id,
@@ -248,7 +345,7 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                 metadata=row.meta,
                 reply_to_id=row.reply_to_id,
             )
-            for row in reversed(rows)  # Return in chronological order
+            for row in merge_pending(list(rows), pending, limit)  # Chronological order
         ]
 
     async def get_recent_bot_messages(
@@ -266,6 +363,7 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
             )
             rows = result.scalars().all()
 
+        pending = get_message_buffer().pending_rows(BotMessageModel, bot_id=bot_id)
         return [
             BotMessage(
                 id=row.id,
@@ -277,15 +375,19 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                 metadata=row.meta,
                 reply_to_id=row.reply_to_id,
             )
-            for row in reversed(rows)
+            for row in merge_pending(list(rows), pending, limit)
         ]
 
     async def delete_all_messages_for_bot(self, bot_id: str) -> int:
         """Delete all messages for a bot. Returns number of messages deleted."""
+        await get_message_buffer().flush()
+        await self._delete(delete(ChatSummaryModel).where(ChatSummaryModel.bot_id == bot_id))
         return await self._delete(delete(BotMessageModel).where(BotMessageModel.bot_id == bot_id))
 
     async def delete_messages_for_chat(self, bot_id: str, chat_id: str) -> int:
         """Delete all messages for a specific chat. Returns number deleted."""
+        await get_message_buffer().flush()
+        await self.delete_chat_summary(chat_id)
         return await self._delete(
             delete(BotMessageModel).where(
                 BotMessageModel.bot_id == bot_id,
@@ -295,6 +397,7 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
 
     async def get_message_count_for_bot(self, bot_id: str) -> int:
         """Get the count of messages for a bot."""
+        await get_message_buffer().flush()
         count = await self._scalar(
             select(func.count())
             .select_from(BotMessageModel)
@@ -302,6 +405,111 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
         )
         return int(count or 0)
 
+    # ===== CHAT SUMMARIES =====
+
+    @staticmethod
+    def _after_watermark(summary: ChatSummary | None) -> Any:
+        """Filter for messages newer than the summary's watermark (all when None)."""
+        if summary is None:
+            return true()
+        return or_(
+            BotMessageModel.timestamp > summary.last_message_at,
+            and_(
+                BotMessageModel.timestamp == summary.last_message_at,
+                BotMessageModel.id > summary.last_message_id,
+            ),
+        )
+
+    async def get_chat_summary(self, chat_id: str) -> ChatSummary | None:
+        """Get the rolling summary for a chat."""
+        async with self._session() as session:
+            row = await session.get(ChatSummaryModel, chat_id)
+
+        if row is None:
+            return None
+
+        return ChatSummary(
+            chat_id=row.chat_id,
+            bot_id=row.bot_id,
+            content=row.content,
+            last_message_id=row.last_message_id,
+            last_message_at=row.last_message_at,
+            message_count=row.message_count,
+            updated_at=row.updated_at,
+        )
+
+    async def save_chat_summary(self, summary: ChatSummary) -> None:
+        """Create or replace the rolling summary for a chat."""
+        async with self._session() as session:
+            await session.merge(
+                ChatSummaryModel(
+                    chat_id=summary.chat_id,
+                    bot_id=summary.bot_id,
+                    content=summary.content,
+                    last_message_id=summary.last_message_id,
+                    last_message_at=summary.last_message_at,
+                    message_count=summary.message_count,
+                    updated_at=summary.updated_at,
+                )
+            )
+            await session.commit()
+
+    async def delete_chat_summary(self, chat_id: str) -> None:
+        """Drop a chat's summary (e.g. after its history was cleared)."""
+        await self._delete(delete(ChatSummaryModel).where(ChatSummaryModel.chat_id == chat_id))
+
+    async def count_unsummarized_messages(
+        self, bot_id: str, chat_id: str, summary: ChatSummary | None
+    ) -> int:
+        """Count messages in a chat newer than the summary's watermark."""
+        await get_message_buffer().flush()
+        count = await self._scalar(
+            select(func.count())
+            .select_from(BotMessageModel)
+            .where(
+                BotMessageModel.bot_id == bot_id,
+                BotMessageModel.chat_id == chat_id,
+                self._after_watermark(summary),
+            )
+        )
+        return int(count or 0)
+
+    async def get_unsummarized_messages(
+        self,
+        bot_id: str,
+        chat_id: str,
+        summary: ChatSummary | None,
+        limit: int,
+    ) -> list[BotMessage]:
+        """Get the oldest messages newer than the summary's watermark (oldest first)."""
+        await get_message_buffer().flush()
+        async with self._session() as session:
+            result = await session.execute(
+                select(BotMessageModel)
+                .where(
+                    BotMessageModel.bot_id == bot_id,
+                    BotMessageModel.chat_id == chat_id,
+                    self._after_watermark(summary),
+                )
+                .order_by(BotMessageModel.timestamp, BotMessageModel.id)
+                .limit(limit)
+            )
+            rows = result.scalars().all()
+
+        return [
+            BotMessage(
+                id=row.id,
+                bot_id=row.bot_id,
+                chat_id=row.chat_id,
+                role=row.role,
+                content=row.content,
+                timestamp=row.timestamp,
+                metadata=row.meta,
+                reply_to_id=row.reply_to_id,
+            )
+            for row in rows
+        ]
+
     # ===== BOT INSTRUCTIONS =====
 
     async def get_instructions(self, bot_id: str) -> BotInstruction | None:
@@ -349,6 +557,7 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
 
             await session.commit()
 
+        _invalidate_agent_setup(bot_id)
         return BotInstruction(
             id=instruction_id,
             bot_id=bot_id,
@@ -361,6 +570,7 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
         count = await self._delete(
             delete(BotInstructionModel).where(BotInstructionModel.bot_id == bot_id)
         )
+        _invalidate_agent_setup(bot_id)
         return count > 0
 
     # ===== DOCUMENTS =====
@@ -448,12 +658,21 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
             .values(embedding_model=embedding_model, embedding_dimensions=embedding_dimensions)
         )
 
+    async def update_document_embeddings_reused(self, document_id: str, count: int) -> None:
+        """Record how many of a document's chunks were served from the embedding cache."""
+        await self._update(
+            update(BotDocumentModel)
+            .where(BotDocumentModel.id == document_id)
+            .values(embeddings_reused=count)
+        )
+
     async def delete_document(self, document_id: str) -> bool:
         """Delete a document and its chunks."""
         # Chunks deleted via CASCADE
         count = await self._delete(
             delete(BotDocumentModel).where(BotDocumentModel.id == document_id)
         )
+        _vector_index().on_document_removed(document_id)
         return count > 0
 
     def _row_to_document(self, row: BotDocumentModel) -> Document:
@@ -469,6 +688,7 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
             status=DocumentStatus(row.status),
             uploaded_at=row.uploaded_at,
             processed_at=row.processed_at,
+            embedding_model=row.embedding_model,
         )
 
     # ===== DOCUMENT CHUNKS =====
@@ -488,12 +708,22 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                         chunk_index=chunk.chunk_index,
                         content=chunk.content,
                         embedding=chunk.embedding,
+                        page_number=chunk.page_number,
+                        char_start=chunk.char_start,
+                        char_end=chunk.char_end,
                     )
                     for chunk in chunks
                 ]
             )
             await session.commit()
 
+        _vector_index().on_chunks_added(
+            chunks[0].bot_id,
+            [chunk.id for chunk in chunks],
+            [chunk.document_id for chunk in chunks],
+            [chunk.embedding for chunk in chunks],
+        )
+
     async def get_chunks_by_document(self, document_id: str) -> list[DocChunk]:
         """Get all chunks for a document."""
         async with self._session() as session:
@@ -540,12 +770,149 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
 
     async def delete_chunks_by_document(self, document_id: str) -> int:
         """Delete all chunks for a document."""
-        return await self._delete(
+        count = await self._delete(
             delete(DocChunkModel).where(DocChunkModel.document_id == document_id)
         )
+        _vector_index().on_document_removed(document_id)
+        return count
 
     # ===== KNOWLEDGE STATS =====
 
+    # ===== EMBEDDING CACHE =====
+
+    async def get_cached_embeddings(
+        self, embedding_model: str, content_hashes: list[str]
+    ) -> dict[str, Any]:
+        """Look up cached embeddings by content hash and bump their hit counts."""
+        if not content_hashes:
+            return {}
+
+        async with self._session() as session:
+            result = await session.execute(
+                select(EmbeddingCacheModel.content_hash, EmbeddingCacheModel.embedding).where(
+                    EmbeddingCacheModel.embedding_model == embedding_model,
+                    EmbeddingCacheModel.content_hash.in_(content_hashes),
+                )
+            )
+            found = {row[0]: row[1] for row in result.all()}
+            if found:
+                await session.execute(
+                    update(EmbeddingCacheModel)
+                    .where(
+                        EmbeddingCacheModel.embedding_model == embedding_model,
+                        EmbeddingCacheModel.content_hash.in_(list(found)),
+                    )
+                    .values(hit_count=EmbeddingCacheModel.hit_count + 1)
+                )
+                await session.commit()
+        return found
+
+    async def save_cached_embeddings(
+        self, embedding_model: str, embeddings: dict[str, Any]
+    ) -> None:
+        """Store embeddings by content hash; existing entries are left untouched."""
+        if not embeddings:
+            return
+
+        rows = [
+            {
+                "embedding_model": embedding_model,
+                "content_hash": content_hash,
+                "embedding": embedding,
+                "created_at": datetime.now(timezone.utc),
+            }
+            for content_hash, embedding in embeddings.items()
+        ]
+        stmt: Insert
+        if db.db_type == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            stmt = pg_insert(EmbeddingCacheModel).values(rows).on_conflict_do_nothing()
+        else:
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            stmt = sqlite_insert(EmbeddingCacheModel).values(rows).on_conflict_do_nothing()
+        async with self._session() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def prune_embedding_cache(self, max_entries: int) -> int:
+        """Keep at most *max_entries* cached embeddings, evicting the least used.
+
+        Returns:
+            Number of entries removed.
+        """
+        async with self._session() as session:
+            count = await session.scalar(select(func.count()).select_from(EmbeddingCacheModel))
+            excess = (count or 0) - max_entries
+            if excess <= 0:
+                return 0
+            victims = (
+                select(EmbeddingCacheModel.embedding_model, EmbeddingCacheModel.content_hash)
+                .order_by(EmbeddingCacheModel.hit_count, EmbeddingCacheModel.created_at)
+                .limit(excess)
+            )
+            result = await session.execute(
+                delete(EmbeddingCacheModel).where(
+                    tuple_(
+                        EmbeddingCacheModel.embedding_model, EmbeddingCacheModel.content_hash
+                    ).in_(victims)
+                )
+            )
+            await session.commit()
+            return int(result.rowcount)
+
+    # ===== INGESTION QUEUE =====
+
+    async def save_ingestion_job(
+        self,
+        document_id: str,
+        bot_id: str,
+        file_path: str,
+        file_type: str,
+        priority: int,
+    ) -> None:
+        """Persist (or re-prioritize) a pending ingestion request."""
+        async with self._session() as session:
+            await session.merge(
+                IngestionJobModel(
+                    document_id=document_id,
+                    bot_id=bot_id,
+                    file_path=file_path,
+                    file_type=file_type,
+                    priority=priority,
+                    enqueued_at=datetime.now(timezone.utc),
+                )
+            )
+            await session.commit()
+
+    async def get_pending_ingestion_jobs(self) -> list[dict[str, Any]]:
+        """Get persisted ingestion requests, highest priority (lowest value) first."""
+        async with self._session() as session:
+            result = await session.execute(
+                select(IngestionJobModel).order_by(
+                    IngestionJobModel.priority, IngestionJobModel.enqueued_at
+                )
+            )
+            rows = result.scalars().all()
+
+        return [
+            {
+                "document_id": row.document_id,
+                "bot_id": row.bot_id,
+                "file_path": row.file_path,
+                "file_type": row.file_type,
+                "priority": row.priority,
+            }
+            for row in rows
+        ]
+
+    async def delete_ingestion_job(self, document_id: str) -> None:
+        """Remove a finished ingestion request."""
+        await self._delete(
+            delete(IngestionJobModel).where(IngestionJobModel.document_id == document_id)
+        )
+
     async def get_knowledge_stats(self, bot_id: str) -> dict[str, Any]:
         """Get aggregated knowledge stats for a bot."""
         async with self._session() as session:
@@ -577,6 +944,22 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
             )
             has_instructions = instr_result.scalar_one_or_none() is not None
 
+            # Embedding reuse: this bot's chunks served from the content-hash cache
+            reused_result = await session.execute(
+                select(func.coalesce(func.sum(BotDocumentModel.embeddings_reused), 0)).where(
+                    BotDocumentModel.bot_id == bot_id
+                )
+            )
+            embeddings_reused = reused_result.scalar_one()
+
+            cache_result = await session.execute(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(EmbeddingCacheModel.hit_count), 0),
+                ).select_from(EmbeddingCacheModel)
+            )
+            cache_entries, cache_hits = cache_result.one()
+
         return {
             "total_documents": sum(doc_counts.values()),
             "documents_ready": doc_counts.get("ready", 0),
@@ -585,10 +968,17 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
             "total_chunks": total_chunks,
             "total_notes": total_notes,
             "has_instructions": has_instructions,
+            "embeddings_reused": embeddings_reused,
+            "embedding_cache_entries": cache_entries,
+            "embedding_cache_hits": cache_hits,
         }
 
-    async def reset_document_for_retry(self, document_id: str) -> bool:
-        """Reset a failed document to processing status for retry."""
+    async def reset_document_for_retry(self, document_id: str, keep_chunks: bool = False) -> bool:
+        """Reset a failed document to processing status for retry.
+
+        With ``keep_chunks`` the chunks stored by the failed attempt are kept so
+        processing can resume from them; otherwise they are deleted.
+        """
         async with self._session() as session:
             result = await session.execute(
                 update(BotDocumentModel)
@@ -598,12 +988,14 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                 )
                 .values(status="processing", processed_at=None, chunk_count=0)
             )
-            # Also delete existing chunks
-            await session.execute(
-                delete(DocChunkModel).where(DocChunkModel.document_id == document_id)
-            )
+            if not keep_chunks:
+                await session.execute(
+                    delete(DocChunkModel).where(DocChunkModel.document_id == document_id)
+                )
             await session.commit()
-            return bool(result.rowcount > 0)
+        if not keep_chunks:
+            _vector_index().on_document_removed(document_id)
+        return bool(result.rowcount > 0)
 
     async def get_chunks_by_document_light(self, document_id: str) -> list[dict[str, Any]]:
         """Get chunks for a document without embedding BLOBs."""
@@ -614,6 +1006,9 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                     DocChunkModel.document_id,
                     DocChunkModel.chunk_index,
                     DocChunkModel.content,
+                    DocChunkModel.page_number,
+                    DocChunkModel.char_start,
+                    DocChunkModel.char_end,
                 )
                 .where(DocChunkModel.document_id == document_id)
                 .order_by(DocChunkModel.chunk_index)
@@ -626,6 +1021,9 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                 "document_id": row[1],
                 "chunk_index": row[2],
                 "content": row[3],
+                "page_number": row[4],
+                "char_start": row[5],
+                "char_end": row[6],
             }
             for row in rows
         ]
@@ -673,10 +1071,17 @@ class KnowledgeRepository(BaseRepository[BotMessageModel, BotMessage]):
                 chunk_index=row.chunk_index,
                 content=row.content,
                 embedding=row.embedding,
+                page_number=row.page_number,
             )
             for row in rows
         ]
 
+    async def keyword_search_chunks(self, bot_id: str, query: str, limit: int = 20) -> list[str]:
+        """Full-text search over a bot's chunks; returns chunk ids, best match first."""
+        async with self._session() as session:
+            ids = await _fulltext_search(session, "doc_chunks", bot_id, query, limit)
+        return ids or []
+
 
 class NotesRepository(BaseRepository[BotNoteModel, BotNote]):
     """Repository for bot notes (persistent memory)."""
@@ -802,7 +1207,25 @@ class NotesRepository(BaseRepository[BotNoteModel, BotNote]):
         return sorted(all_tags)
 
     async def search_notes(self, bot_id: str, query: str, limit: int = 10) -> list[BotNote]:
-        """Simple text search on title + content."""
+        """Full-text search on title + content, best match first.
+
+        Falls back to a ``LIKE`` scan when the query has no searchable terms
+        or the full-text index is unavailable.
+        """
+        try:
+            async with self._session() as session:
+                ids = await _fulltext_search(session, "bot_notes", bot_id, query, limit)
+                if ids is not None:
+                    if not ids:
+                        return []
+                    result = await session.execute(
+                        select(BotNoteModel).where(BotNoteModel.id.in_(ids))
+                    )
+                    by_id = {row.id: row for row in result.scalars().all()}
+                    return [self._row_to_entity(by_id[i]) for i in ids if i in by_id]
+        except Exception as e:
+            logger.debug("Full-text note search unavailable, using LIKE: %s", e)
+
         escaped = _escape_like(query)
         stmt = (
             select(BotNoteModel)
@@ -845,6 +1268,7 @@ class ContactsRepository(BaseRepository[BotContactModel, Contact]):
                 updated_at=contact.updated_at,
             )
         )
+        _invalidate_agent_setup(contact.bot_id)
 
     async def get_contact(self, contact_id: str) -> Contact | None:
         """Get a contact by ID."""
@@ -869,10 +1293,15 @@ class ContactsRepository(BaseRepository[BotContactModel, Contact]):
                 updated_at=contact.updated_at,
             )
         )
+        _invalidate_agent_setup(contact.bot_id)
 
     async def delete_contact(self, contact_id: str) -> bool:
         """Delete a contact by ID. Returns True if deleted, False if not found."""
-        return await self.delete_by_id(contact_id)
+        deleted = await self.delete_by_id(contact_id)
+        if deleted:
+            # The owning bot is not known here; contact deletes are rare
+            _invalidate_agent_setup(None)
+        return deleted
 
 
 class ConnectionRepository(BaseRepository[BotConnectionModel, BotConnection]):
@@ -1041,6 +1470,107 @@ class ConnectionRepository(BaseRepository[BotConnectionModel, BotConnection]):
             .values(auto_connect=auto_connect, updated_at=now)
         )
 
+    # ===== INBOUND QUEUE =====
+
+    async def enqueue_inbound_event(
+        self,
+        connection_id: str,
+        platform: str,
+        chat_id: str,
+        event_key: str,
+        payload: dict[str, Any],
+    ) -> str | None:
+        """Persist a verified webhook event.
+
+        Returns:
+            The new event ID, or None if an event with the same key was
+            already received for this connection (a platform redelivery).
+        """
+        event_id = str(uuid.uuid4())
+        row = {
+            "id": event_id,
+            "connection_id": connection_id,
+            "platform": platform,
+            "chat_id": chat_id,
+            "event_key": event_key,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "received_at": datetime.now(timezone.utc),
+        }
+        conflict = ["connection_id", "event_key"]
+        stmt: Insert
+        if db.db_type == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            stmt = (
+                pg_insert(InboundEventModel)
+                .values(row)
+                .on_conflict_do_nothing(index_elements=conflict)
+            )
+        else:
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            stmt = (
+                sqlite_insert(InboundEventModel)
+                .values(row)
+                .on_conflict_do_nothing(index_elements=conflict)
+            )
+        async with self._session() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        return event_id if result.rowcount else None
+
+    async def get_pending_inbound_events(self) -> list[dict[str, Any]]:
+        """Get events not handled yet, oldest first."""
+        async with self._session() as session:
+            result = await session.execute(
+                select(InboundEventModel)
+                .where(InboundEventModel.status == "pending")
+                .order_by(InboundEventModel.received_at)
+            )
+            rows = result.scalars().all()
+
+        return [
+            {
+                "id": row.id,
+                "connection_id": row.connection_id,
+                "platform": row.platform,
+                "chat_id": row.chat_id,
+                "payload": row.payload,
+                "attempts": row.attempts,
+            }
+            for row in rows
+        ]
+
+    async def update_inbound_event(
+        self,
+        event_id: str,
+        status: str,
+        attempts: int,
+        error: str | None = None,
+    ) -> None:
+        """Record the outcome of an attempt ("pending" to retry, "done", "failed")."""
+        await self._update(
+            update(InboundEventModel)
+            .where(InboundEventModel.id == event_id)
+            .values(
+                status=status,
+                attempts=attempts,
+                error=error,
+                processed_at=None if status == "pending" else datetime.now(timezone.utc),
+            )
+        )
+
+    async def prune_inbound_events(self, before: datetime) -> int:
+        """Delete events handled before *before*. Returns the number removed."""
+        return await self._delete(
+            delete(InboundEventModel).where(
+                InboundEventModel.status != "pending",
+                InboundEventModel.processed_at < before,
+            )
+        )
+
 
 class BotRepository(BaseRepository[BotModel, Bot]):
     """Repository for bot configuration (synced from frontend)."""
@@ -1105,7 +1635,9 @@ class BotRepository(BaseRepository[BotModel, Bot]):
 
     async def delete_bot(self, bot_id: str) -> bool:
         """Delete a bot by ID."""
-        return await self.delete_by_id(bot_id)
+        deleted = await self.delete_by_id(bot_id)
+        _vector_index().discard(bot_id)
+        return deleted
 
 
 class ChatRepository(BaseRepository[ChatModel, Chat]):
@@ -1235,16 +1767,17 @@ class ChatRepository(BaseRepository[ChatModel, Chat]):
         return count > 0
 
     async def update_chat_timestamp(self, chat_id: str) -> None:
-        """Update the chat's updated_at timestamp."""
-        now = datetime.now(timezone.utc)
-        await self._update(update(ChatModel).where(ChatModel.id == chat_id).values(updated_at=now))
+        """Update the chat's updated_at timestamp (batched with message writes)."""
+        await get_message_buffer().touch_chat(chat_id, datetime.now(timezone.utc))
 
     async def delete_chat(self, chat_id: str) -> bool:
         """Delete a chat by ID."""
+        await get_message_buffer().flush()
         return await self.delete_by_id(chat_id)
 
     async def delete_all_chats_for_bot(self, bot_id: str) -> int:
         """Delete all chats for a bot. Returns number of chats deleted."""
+        await get_message_buffer().flush()
         return await self._delete(delete(ChatModel).where(ChatModel.bot_id == bot_id))
 
 
@@ -1305,6 +1838,7 @@ class SkillsRepository(BaseRepository[SkillModel, SkillDefinition]):
                     )
                 )
             await session.commit()
+        _invalidate_agent_setup(None)
 
     async def get_skill(self, skill_id: str) -> SkillDefinition | None:
         """Get a skill by ID."""
@@ -1322,7 +1856,9 @@ class SkillsRepository(BaseRepository[SkillModel, SkillDefinition]):
 
     async def delete_skill(self, skill_id: str) -> bool:
         """Delete a skill by ID. Also removes all bot activations."""
-        return await self.delete_by_id(skill_id)
+        deleted = await self.delete_by_id(skill_id)
+        _invalidate_agent_setup(None)
+        return deleted
 
     # ===== BOT SKILL ACTIVATIONS =====
 
@@ -1368,6 +1904,7 @@ class SkillsRepository(BaseRepository[SkillModel, SkillDefinition]):
                     )
                 )
             await session.commit()
+        _invalidate_agent_setup(bot_id)
 
     async def deactivate_skill(self, bot_id: str, skill_id: str) -> bool:
         """Deactivate a skill for a bot."""
@@ -1377,6 +1914,7 @@ class SkillsRepository(BaseRepository[SkillModel, SkillDefinition]):
                 BotSkillModel.skill_id == skill_id,
             )
         )
+        _invalidate_agent_setup(bot_id)
         return count > 0
 
     async def is_skill_activated(self, bot_id: str, skill_id: str) -> bool:
@@ -51,6 +51,7 @@ from cachibot.storage.models.room import (
     RoomPinnedMessage as RoomPinnedMessageModel,
 )
 from cachibot.storage.models.user import User as UserModel
+from cachibot.storage.write_buffer import get_message_buffer, merge_pending
 
 
 class RoomRepository(BaseRepository[RoomModel, Room]):
@@ -114,6 +115,7 @@ class RoomRepository(BaseRepository[RoomModel, Room]):
 
     async def delete_room(self, room_id: str) -> bool:
         """Delete a room (cascades to members, bots, messages)."""
+        await get_message_buffer().flush()
         return await self.delete_by_id(room_id)
 
     def _row_to_entity(self, row: RoomModel) -> Room:
@@ -295,18 +297,19 @@ class RoomMessageRepository(BaseRepository[RoomMessageModel, RoomMessage]):
     _model = RoomMessageModel
 
     async def save_message(self, message: RoomMessage) -> None:
-        """Save a message to the room."""
-        await self._add(
-            RoomMessageModel(
-                id=message.id,
-                room_id=message.room_id,
-                sender_type=message.sender_type.value,
-                sender_id=message.sender_id,
-                sender_name=message.sender_name,
-                content=message.content,
-                meta=message.metadata,
-                timestamp=message.timestamp,
-            )
+        """Save a message to the room (through the write-behind buffer)."""
+        await get_message_buffer().add(
+            RoomMessageModel,
+            {
+                "id": message.id,
+                "room_id": message.room_id,
+                "sender_type": message.sender_type.value,
+                "sender_id": message.sender_id,
+                "sender_name": message.sender_name,
+                "content": message.content,
+                "meta": message.metadata,
+                "timestamp": message.timestamp,
+            },
         )
 
     async def get_messages(
@@ -329,10 +332,15 @@ class RoomMessageRepository(BaseRepository[RoomMessageModel, RoomMessage]):
             result = await session.execute(stmt)
             rows = result.scalars().all()
 
-        return [self._row_to_entity(row) for row in reversed(rows)]
+        # Buffered messages are the newest ones, so older pages never include them
+        pending = (
+            [] if before else get_message_buffer().pending_rows(RoomMessageModel, room_id=room_id)
+        )
+        return [self._row_to_entity(row) for row in merge_pending(list(rows), pending, limit)]
 
     async def get_message_count(self, room_id: str) -> int:
         """Get the number of messages in a room."""
+        await get_message_buffer().flush()
         result = await self._scalar(
             select(func.count())
             .select_from(RoomMessageModel)
@@ -342,6 +350,7 @@ class RoomMessageRepository(BaseRepository[RoomMessageModel, RoomMessage]):
 
     async def delete_messages(self, room_id: str) -> int:
         """Delete all messages in a room."""
+        await get_message_buffer().flush()
         return await self._delete(
             delete(RoomMessageModel).where(RoomMessageModel.room_id == room_id)
         )
@@ -367,6 +376,7 @@ class RoomReactionRepository:
         self, reaction_id: str, room_id: str, message_id: str, user_id: str, emoji: str
     ) -> bool:
         """Add a reaction. Returns False if already exists."""
+        await get_message_buffer().ensure_written(message_id)
         async with db.ensure_initialized()() as session:
             # Check for existing
             existing = await session.execute(
@@ -449,6 +459,7 @@ class RoomPinRepository:
 
     async def pin_message(self, pin_id: str, room_id: str, message_id: str, pinned_by: str) -> bool:
         """Pin a message. Returns False if already pinned."""
+        await get_message_buffer().ensure_written(message_id)
         async with db.ensure_initialized()() as session:
             existing = await session.execute(
                 select(RoomPinnedMessageModel.id).where(
@@ -525,6 +536,7 @@ class RoomBookmarkRepository:
         self, bookmark_id: str, room_id: str, message_id: str, user_id: str
     ) -> bool:
         """Add a bookmark. Returns False if already bookmarked."""
+        await get_message_buffer().ensure_written(message_id)
         async with db.ensure_initialized()() as session:
             existing = await session.execute(
                 select(RoomBookmarkModel.id).where(
@@ -5,10 +5,13 @@ Provides async CRUD operations using SQLAlchemy ORM with AsyncSession.
 Migrated from raw aiosqlite queries to PostgreSQL via SQLAlchemy 2.0.
 """
 
+import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import select, update
+import sqlalchemy as sa
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import aliased
 
 from cachibot.models.work import (
     BotFunction,
@@ -46,6 +49,14 @@ from cachibot.storage.models.work import (
 from cachibot.storage.models.work import (
     WorkJob as WorkJobModel,
 )
+from cachibot.storage.models.work import (
+    WorkJobLog as WorkJobLogModel,
+)
+
+logger = logging.getLogger(__name__)
+
+# Newest log entries embedded in Job.logs; the full history is paginated
+_EMBEDDED_JOB_LOGS = 200
 
 
 class FunctionRepository(BaseRepository[FunctionModel, BotFunction]):
@@ -624,6 +635,36 @@ class TaskRepository(BaseRepository[TaskModel, Task]):
 
         return ready
 
+    async def get_schedulable(
+        self, work_ids: list[str] | None = None
+    ) -> list[tuple[Work, list[Task]]]:
+        """Get active (pending/in_progress) work with all of its tasks, in one query.
+
+        Feeds the job runner's dependency index: at startup for all active
+        work, afterwards for the work items that changed. Work that is not
+        active (or has no tasks) is left out.
+        """
+        stmt = (
+            select(WorkModel, TaskModel)
+            .join(TaskModel, TaskModel.work_id == WorkModel.id)
+            .where(WorkModel.status.in_([WorkStatus.PENDING.value, WorkStatus.IN_PROGRESS.value]))
+            .order_by(TaskModel.work_id, TaskModel.task_order.asc())
+        )
+        if work_ids is not None:
+            stmt = stmt.where(WorkModel.id.in_(work_ids))
+
+        async with self._session() as session:
+            result = await session.execute(stmt)
+            rows = result.all()
+
+        work_repo = WorkRepository()
+        graphs: dict[str, tuple[Work, list[Task]]] = {}
+        for work_row, task_row in rows:
+            if work_row.id not in graphs:
+                graphs[work_row.id] = (work_repo._row_to_entity(work_row), [])
+            graphs[work_row.id][1].append(self._row_to_entity(task_row))
+        return list(graphs.values())
+
     async def get_by_bot(
         self,
         bot_id: str,
@@ -667,33 +708,44 @@ class TaskRepository(BaseRepository[TaskModel, Task]):
 
 
 class WorkJobRepository(BaseRepository[WorkJobModel, Job]):
-    """Repository for work jobs (execution attempts)."""
+    """Repository for work jobs (execution attempts).
+
+    Log entries are rows in ``work_job_logs``. Jobs returned by this repository
+    carry the newest ``_EMBEDDED_JOB_LOGS`` of them in ``Job.logs``; use
+    ``get_logs`` for the full, paginated history.
+    """
 
     _model = WorkJobModel
 
     async def save(self, job: Job) -> None:
         """Save a new job."""
-        await self._add(
-            WorkJobModel(
-                id=job.id,
-                bot_id=job.bot_id,
-                task_id=job.task_id,
-                work_id=job.work_id,
-                chat_id=job.chat_id,
-                status=job.status.value,
-                attempt=job.attempt,
-                progress=job.progress,
-                created_at=job.created_at,
-                started_at=job.started_at,
-                completed_at=job.completed_at,
-                result=job.result,
-                error=job.error,
-                logs=job.logs,
+        async with self._session() as session:
+            session.add(
+                WorkJobModel(
+                    id=job.id,
+                    bot_id=job.bot_id,
+                    task_id=job.task_id,
+                    work_id=job.work_id,
+                    chat_id=job.chat_id,
+                    status=job.status.value,
+                    attempt=job.attempt,
+                    progress=job.progress,
+                    created_at=job.created_at,
+                    started_at=job.started_at,
+                    completed_at=job.completed_at,
+                    result=job.result,
+                    error=job.error,
+                )
             )
-        )
+            if job.logs:
+                await session.flush()
+                await session.execute(
+                    insert(WorkJobLogModel), [_log_row(job.id, entry) for entry in job.logs]
+                )
+            await session.commit()
 
     async def update(self, job: Job) -> None:
-        """Update an existing job."""
+        """Update an existing job (logs are append-only; see ``append_log``)."""
         await self._update(
             update(WorkJobModel)
             .where(WorkJobModel.id == job.id)
@@ -704,7 +756,6 @@ class WorkJobRepository(BaseRepository[WorkJobModel, Job]):
                 completed_at=job.completed_at,
                 result=job.result,
                 error=job.error,
-                logs=job.logs,
             )
         )
 
@@ -741,57 +792,102 @@ class WorkJobRepository(BaseRepository[WorkJobModel, Job]):
         message: str,
         data: Any = None,
     ) -> None:
-        """Append a log entry to a job."""
+        """Append a log entry to a job (a single INSERT)."""
         async with self._session() as session:
-            result = await session.execute(
-                select(WorkJobModel.logs).where(WorkJobModel.id == job_id)
+            await session.execute(
+                insert(WorkJobLogModel).values(
+                    job_id=job_id,
+                    timestamp=datetime.now(timezone.utc),
+                    level=level,
+                    message=message,
+                    data=data,
+                )
             )
-            row = result.scalar_one_or_none()
+            await session.commit()
 
-            if row is not None:
-                logs = row if row else []
-                logs.append(
-                    {
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                        "level": level,
-                        "message": message,
-                        "data": data,
-                    }
-                )
+    async def get_logs(
+        self, job_id: str, limit: int = 100, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        """Get a job's log entries, oldest first, paginated."""
+        async with self._session() as session:
+            result = await session.execute(
+                select(WorkJobLogModel)
+                .where(WorkJobLogModel.job_id == job_id)
+                .order_by(WorkJobLogModel.id)
+                .limit(limit)
+                .offset(offset)
+            )
+            rows = result.scalars().all()
+        return [_log_entry(row) for row in rows]
+
+    async def _with_logs(self, jobs: list[Job]) -> list[Job]:
+        """Fill ``Job.logs`` with each job's newest entries (one query for all jobs)."""
+        if not jobs:
+            return jobs
+        ranked = (
+            select(
+                WorkJobLogModel,
+                func.row_number()
+                .over(partition_by=WorkJobLogModel.job_id, order_by=WorkJobLogModel.id.desc())
+                .label("rn"),
+            )
+            .where(WorkJobLogModel.job_id.in_([job.id for job in jobs]))
+            .subquery()
+        )
+        entry = aliased(WorkJobLogModel, ranked)
+        async with self._session() as session:
+            result = await session.execute(
+                select(entry)
+                .where(ranked.c.rn <= _EMBEDDED_JOB_LOGS)
+                .order_by(entry.job_id, entry.id)
+            )
+            rows = result.scalars().all()
 
-                await session.execute(
-                    update(WorkJobModel).where(WorkJobModel.id == job_id).values(logs=logs)
-                )
-                await session.commit()
+        by_job: dict[str, list[dict[str, Any]]] = {}
+        for row in rows:
+            by_job.setdefault(row.job_id, []).append(_log_entry(row))
+        for job in jobs:
+            job.logs = by_job.get(job.id, [])
+        return jobs
 
     async def get(self, job_id: str) -> Job | None:
         """Get a job by ID."""
-        return await self.get_by_id(job_id)
+        job = await self.get_by_id(job_id)
+        if job is not None:
+            await self._with_logs([job])
+        return job
 
     async def get_by_task(self, task_id: str) -> list[Job]:
         """Get all jobs for a task."""
-        return await self._fetch_all(
-            select(WorkJobModel)
-            .where(WorkJobModel.task_id == task_id)
-            .order_by(WorkJobModel.attempt.asc())
+        return await self._with_logs(
+            await self._fetch_all(
+                select(WorkJobModel)
+                .where(WorkJobModel.task_id == task_id)
+                .order_by(WorkJobModel.attempt.asc())
+            )
         )
 
     async def get_by_work(self, work_id: str) -> list[Job]:
         """Get all jobs for a work item."""
-        return await self._fetch_all(
-            select(WorkJobModel)
-            .where(WorkJobModel.work_id == work_id)
-            .order_by(WorkJobModel.created_at.desc())
+        return await self._with_logs(
+            await self._fetch_all(
+                select(WorkJobModel)
+                .where(WorkJobModel.work_id == work_id)
+                .order_by(WorkJobModel.created_at.desc())
+            )
         )
 
     async def get_latest_for_task(self, task_id: str) -> Job | None:
         """Get the latest job for a task."""
-        return await self._fetch_one(
+        job = await self._fetch_one(
             select(WorkJobModel)
             .where(WorkJobModel.task_id == task_id)
             .order_by(WorkJobModel.attempt.desc())
             .limit(1)
         )
+        if job is not None:
+            await self._with_logs([job])
+        return job
 
     async def get_running(self, bot_id: str | None = None) -> list[Job]:
         """Get all running jobs, optionally filtered by bot."""
@@ -799,14 +895,14 @@ class WorkJobRepository(BaseRepository[WorkJobModel, Job]):
         if bot_id:
             stmt = stmt.where(WorkJobModel.bot_id == bot_id)
         stmt = stmt.order_by(WorkJobModel.started_at.asc())
-        return await self._fetch_all(stmt)
+        return await self._with_logs(await self._fetch_all(stmt))
 
     async def delete(self, job_id: str) -> bool:
         """Delete a job."""
         return await self.delete_by_id(job_id)
 
     def _row_to_entity(self, row: WorkJobModel) -> Job:
-        """Convert database row to Job."""
+        """Convert database row to Job (``logs`` is filled by ``_with_logs``)."""
         return Job(
             id=row.id,
             bot_id=row.bot_id,
@@ -821,10 +917,81 @@ class WorkJobRepository(BaseRepository[WorkJobModel, Job]):
             completed_at=row.completed_at,
             result=row.result,
             error=row.error,
-            logs=row.logs if row.logs else [],
         )
 
 
+def _log_entry(row: WorkJobLogModel) -> dict[str, Any]:
+    """Job log row -> the dict shape ``Job.logs`` has always used."""
+    return {
+        "timestamp": row.timestamp.isoformat(),
+        "level": row.level,
+        "message": row.message,
+        "data": row.data,
+    }
+
+
+def _log_row(job_id: str, entry: dict[str, Any]) -> dict[str, Any]:
+    """Legacy ``Job.logs`` dict -> work_job_logs column values."""
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            timestamp = None
+    return {
+        "job_id": job_id,
+        "timestamp": timestamp or datetime.now(timezone.utc),
+        "level": entry.get("level") or "info",
+        "message": str(entry.get("message", "")),
+        "data": entry.get("data"),
+    }
+
+
+def explode_job_log_arrays(connection: sa.Connection, batch_size: int = 500) -> int:
+    """Move entries of the legacy ``work_jobs.logs`` JSON arrays into work_job_logs.
+
+    Runs on startup when ``create_all`` has just added work_job_logs to an
+    existing database (migration 021 has its own copy); jobs whose array is
+    already empty are skipped.
+
+    Returns:
+        Number of log entries moved.
+    """
+    jobs = sa.table("work_jobs", sa.column("id", sa.String), sa.column("logs", sa.JSON))
+    logs = sa.table(
+        "work_job_logs",
+        sa.column("job_id", sa.String),
+        sa.column("timestamp", sa.DateTime(timezone=True)),
+        sa.column("level", sa.String),
+        sa.column("message", sa.Text),
+        sa.column("data", sa.JSON),
+    )
+    moved = 0
+    while True:
+        rows = connection.execute(
+            select(jobs.c.id, jobs.c.logs)
+            .where(sa.cast(jobs.c.logs, sa.Text).not_in(["[]", "null"]))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        entries = [
+            _log_row(job_id, entry)
+            for job_id, array in rows
+            for entry in (array or [])
+            if isinstance(entry, dict)
+        ]
+        if entries:
+            connection.execute(insert(logs), entries)
+        connection.execute(
+            update(jobs).where(jobs.c.id.in_([job_id for job_id, _ in rows])).values(logs=[])
+        )
+        moved += len(entries)
+    if moved:
+        logger.info("Moved %d job log entries to work_job_logs", moved)
+    return moved
+
+
 class TodoRepository(BaseRepository[TodoModel, Todo]):
     """Repository for todos (reminders/notes)."""
 
@@ -0,0 +1,327 @@
+"""
+Write-behind buffer for chat message persistence.
+
+Every turn used to open a session and commit once per saved message (user
+message, assistant reply, chat ``updated_at`` touch), and room streaming saves
+one row per bot response. On SQLite each commit is a write transaction on the
+single writer connection; on PostgreSQL it is a round-trip.
+
+Repositories now hand message rows to this buffer instead. Rows are written in
+one transaction with a multi-row ``INSERT`` per table once ``interval``
+seconds pass after the first pending row, or as soon as ``max_rows`` rows are
+pending. Until then they stay visible to readers through ``pending_rows`` so a
+chat's history always includes its own unflushed messages. ``close`` flushes
+what is left; the server lifespan calls it on shutdown.
+
+A row the database rejects (e.g. its chat was deleted while it was buffered)
+is dropped. Rows that fail for any other reason — the database unreachable,
+restarting or locked — stay pending and are retried with exponential backoff;
+``flush`` raises so explicit callers see the failure, and ``close`` reports
+the rows it still could not write.
+
+Deletes and FK-dependent writes (reactions, pins, bookmarks) call ``flush`` /
+``ensure_written`` first so they never race a buffered insert.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, StatementError
+
+from cachibot.storage import db
+from cachibot.storage.models.chat import Chat as ChatModel
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["MessageWriteBuffer", "get_message_buffer", "merge_pending"]
+
+# Seconds before the first retry of rows that failed to write (doubles per failure)
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 30.0
+
+# Flush attempts close() makes before giving up on the remaining rows
+_CLOSE_ATTEMPTS = 3
+
+
+def _is_row_error(e: Exception) -> bool:
+    """Whether *e* rejects the row itself (retrying cannot succeed)."""
+    if isinstance(e, (IntegrityError, DataError)):
+        return True
+    # Raised before reaching the database, e.g. a value of the wrong type
+    return isinstance(e, StatementError) and not isinstance(e, DBAPIError)
+
+
+def _sort_key(row: Any) -> tuple[datetime, str]:
+    # SQLite hands back naive UTC timestamps, buffered rows carry aware ones
+    ts = row.timestamp
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts, row.id
+
+
+def merge_pending(rows: list[Any], pending: list[Any], limit: int | None = None) -> list[Any]:
+    """Merge query results with buffered rows: oldest first, the newest *limit* kept.
+
+    Rows present in both (written while the query ran) appear once.
+    """
+    seen = {row.id for row in rows}
+    merged = sorted(rows + [row for row in pending if row.id not in seen], key=_sort_key)
+    if limit is not None and len(merged) > limit:
+        merged = merged[-limit:]
+    return merged
+
+
+class MessageWriteBuffer:
+    """Batches message inserts and chat timestamp updates into few commits."""
+
+    def __init__(self, interval: float = 0.005, max_rows: int = 100) -> None:
+        self.interval = max(0.0, interval)
+        self.max_rows = max(1, max_rows)
+        # row id -> (ORM model, column values), in arrival order
+        self._rows: dict[str, tuple[type[Any], dict[str, Any]]] = {}
+        # chat id -> newest updated_at
+        self._touches: dict[str, datetime] = {}
+        self._timer: asyncio.Task[None] | None = None
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        self._closed = False
+        # Consecutive flushes that left rows pending, and when to try again
+        self._failures = 0
+        self._retry_at = 0.0
+
+        self.flushes = 0
+        self.rows_written = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether writes are buffered (False = written immediately)."""
+        return self.interval > 0 and not self._closed
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    async def add(self, model: type[Any], row: dict[str, Any]) -> None:
+        """Queue one row for insertion into *model*'s table.
+
+        *row* maps ORM attribute names to values and must include ``id``.
+        """
+        self._rows[row["id"]] = (model, row)
+        try:
+            await self._schedule()
+        except Exception:
+            # Written through (buffering off): the caller gets the error instead
+            self._rows.pop(row["id"], None)
+            raise
+
+    async def touch_chat(self, chat_id: str, at: datetime) -> None:
+        """Queue an update of a chat's ``updated_at`` (later touches win)."""
+        previous = self._touches.get(chat_id)
+        if previous is None or at > previous:
+            self._touches[chat_id] = at
+        await self._schedule()
+
+    async def _schedule(self) -> None:
+        if not self.enabled:
+            await self.flush()
+            return
+        loop = asyncio.get_running_loop()
+        # While backing off, rows just wait for the retry timer
+        if len(self._rows) >= self.max_rows and loop.time() >= self._retry_at:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Buffered message write failed, will retry: {e}")
+            return
+        self._start_timer(max(self.interval, self._retry_at - loop.time()))
+
+    def _start_timer(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._timer is None or self._timer.done() or self._timer.get_loop() is not loop:
+            self._timer = loop.create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Rows queued while this flush runs start a new timer
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Buffered message write failed, will retry: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def pending_rows(self, model: type[Any], **filters: Any) -> list[Any]:
+        """Unflushed rows of *model* whose columns equal *filters*, as ORM objects.
+
+        The objects are transient (not attached to a session), so repositories
+        can merge them with query results and convert both the same way.
+        """
+        return [
+            model(**row)
+            for row_model, row in self._rows.values()
+            if row_model is model and all(row.get(k) == v for k, v in filters.items())
+        ]
+
+    async def ensure_written(self, row_id: str) -> None:
+        """Flush if *row_id* is still buffered (before a write that references it)."""
+        if row_id in self._rows:
+            await self.flush()
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def flush(self) -> None:
+        """Write every pending row and chat touch, one transaction per flush.
+
+        Raises:
+            Exception: The last error, if rows or touches could not be written
+                and stay pending for a retry.
+        """
+        async with self._get_lock():
+            rows = dict(self._rows)
+            touches = dict(self._touches)
+            if not rows and not touches:
+                return
+
+            by_model: dict[type[Any], list[dict[str, Any]]] = {}
+            for model, row in rows.values():
+                by_model.setdefault(model, []).append(row)
+
+            kept: set[str] = set()
+            error: Exception | None = None
+            try:
+                async with db.ensure_initialized()() as session:
+                    for model, values in by_model.items():
+                        await session.execute(insert(model), values)
+                    await self._apply_touches(session, touches)
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Batched message write failed, retrying row by row: {e}")
+                kept, error = await self._write_one_by_one(by_model, touches)
+
+            # Drop what was written (or rejected); rows added meanwhile and rows
+            # that hit a transient error wait for the next flush
+            for row_id in rows:
+                if row_id not in kept:
+                    self._rows.pop(row_id, None)
+            if error is None:
+                for chat_id, at in touches.items():
+                    if self._touches.get(chat_id) == at:
+                        del self._touches[chat_id]
+            self.flushes += 1
+            self.rows_written += len(rows) - len(kept)
+
+            if error is None:
+                self._failures = 0
+                self._retry_at = 0.0
+                return
+            self._failures += 1
+            delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** (self._failures - 1))
+            self._retry_at = asyncio.get_running_loop().time() + delay
+            if not self._closed:
+                # The retry replaces a timer due later than the backoff
+                if self._timer is not None and self._timer is not asyncio.current_task():
+                    self._timer.cancel()
+                    self._timer = None
+                self._start_timer(delay)
+            raise error
+
+    async def _write_one_by_one(
+        self,
+        by_model: dict[type[Any], list[dict[str, Any]]],
+        touches: dict[str, datetime],
+    ) -> tuple[set[str], Exception | None]:
+        """Fallback after a failed batch: one commit per row, dropping rejected rows.
+
+        Stops at the first transient error. Returns the ids of the rows to keep
+        pending and that error (None if everything was written or dropped).
+        """
+        rows = [(model, row) for model, values in by_model.items() for row in values]
+        for i, (model, row) in enumerate(rows):
+            try:
+                async with db.ensure_initialized()() as session:
+                    await session.execute(insert(model), [row])
+                    await session.commit()
+            except Exception as e:
+                if not _is_row_error(e):
+                    return {row["id"] for _model, row in rows[i:]}, e
+                # e.g. the chat was deleted while its message was buffered
+                logger.error(f"Dropped {model.__tablename__} row {row['id']}: {e}")
+        try:
+            async with db.ensure_initialized()() as session:
+                await self._apply_touches(session, touches)
+                await session.commit()
+        except Exception as e:
+            return set(), e
+        return set(), None
+
+    @staticmethod
+    async def _apply_touches(session: Any, touches: dict[str, datetime]) -> None:
+        if not touches:
+            return
+        # ORM bulk UPDATE by primary key: one executemany for all chats
+        await session.execute(
+            update(ChatModel),
+            [{"id": chat_id, "updated_at": at} for chat_id, at in touches.items()],
+        )
+
+    async def close(self) -> None:
+        """Flush remaining rows; later writes go straight to the database.
+
+        Retries a failing flush a few times with backoff, then logs the rows
+        that could not be written and re-raises the last error.
+        """
+        self._closed = True
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        for attempt in range(_CLOSE_ATTEMPTS):
+            try:
+                await self.flush()
+                return
+            except Exception:
+                if attempt + 1 == _CLOSE_ATTEMPTS:
+                    unwritten = ", ".join(
+                        f"{model.__tablename__} {row_id}"
+                        for row_id, (model, _row) in self._rows.items()
+                    )
+                    logger.error(
+                        f"{len(self._rows)} buffered message rows could not be written: "
+                        f"{unwritten or '(chat timestamps only)'}"
+                    )
+                    raise
+                await asyncio.sleep(max(0.0, self._retry_at - asyncio.get_running_loop().time()))
+
+
+# Singleton
+_message_buffer: MessageWriteBuffer | None = None
+
+
+def get_message_buffer() -> MessageWriteBuffer:
+    """Get the singleton message write buffer (config-aware)."""
+    global _message_buffer
+    if _message_buffer is None:
+        from cachibot.config import Config
+
+        config = Config.snapshot().database
+        _message_buffer = MessageWriteBuffer(
+            interval=config.write_behind_interval,
+            max_rows=config.write_behind_max_rows,
+        )
+    return _message_buffer
@@ -25,6 +25,7 @@ export interface Connection {
   updated_at: string
   // Safe config values (excludes sensitive data like tokens)
   strip_markdown: boolean
+  coalesce_messages: boolean
   // Custom platform config (safe values only — no api_key)
   custom_config?: {
     base_url: string
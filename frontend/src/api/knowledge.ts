@@ -66,6 +66,9 @@ export interface KnowledgeStats {
   total_chunks: number
   total_notes: number
   has_instructions: boolean
+  embeddings_reused?: number
+  embedding_cache_entries?: number
+  embedding_cache_hits?: number
 }
 
 export interface SearchResult {
@@ -82,6 +85,9 @@ export interface ChunkPreview {
   document_id: string
   chunk_index: number
   content: string
+  page_number?: number | null
+  char_start?: number | null
+  char_end?: number | null
 }
 
 // =============================================================================
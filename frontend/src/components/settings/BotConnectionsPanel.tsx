@@ -213,7 +213,10 @@ export function BotConnectionsPanel({ botId }: BotConnectionsPanelProps) {
       for (const key of meta.required_config) cfg[key] = ''
       for (const key of Object.keys(meta.optional_config)) {
         // Carry over boolean-style options from the connection
-        cfg[key] = connection.strip_markdown && key === 'strip_markdown' ? 'true' : ''
+        const enabled =
+          (key === 'strip_markdown' && connection.strip_markdown) ||
+          (key === 'coalesce_messages' && connection.coalesce_messages)
+        cfg[key] = enabled ? 'true' : ''
       }
     }
     setFormConfig(cfg)
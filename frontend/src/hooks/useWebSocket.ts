@@ -288,6 +288,8 @@ export function useWebSocket() {
               tokens: payload.totalTokens,
               promptTokens: payload.promptTokens,
               completionTokens: payload.completionTokens,
+              cachedPromptTokens: payload.cachedPromptTokens,
+              cacheCreationTokens: payload.cacheCreationTokens,
               cost: payload.totalCost,
               model,
               iterations: payload.iterations,
@@ -297,6 +299,7 @@ export function useWebSocket() {
               errors: payload.errors,
               perModel: payload.perModel,
               latencyStats: payload.latencyStats,
+              context: payload.context,
             })
           }
           break
@@ -162,12 +162,15 @@ export interface MessageMetadata {
   iterations?: number
   promptTokens?: number
   completionTokens?: number
+  cachedPromptTokens?: number
+  cacheCreationTokens?: number
   elapsedMs?: number
   tokensPerSecond?: number
   callCount?: number
   errors?: number
   perModel?: Record<string, { tokens: number; cost: number }>
   latencyStats?: Record<string, number>
+  context?: ContextUsage
 }
 
 export interface ChatMessage {
@@ -546,6 +549,8 @@ export interface UsagePayload {
   totalTokens: number
   promptTokens: number
   completionTokens: number
+  cachedPromptTokens?: number
+  cacheCreationTokens?: number
   totalCost: number
   iterations: number
   elapsedMs: number
@@ -554,6 +559,16 @@ export interface UsagePayload {
   errors: number
   perModel: Record<string, { tokens: number; cost: number }>
   latencyStats: Record<string, number>
+  context?: ContextUsage
+}
+
+/** Token breakdown of the knowledge context packed into the system prompt */
+export interface ContextUsage {
+  budget?: number
+  totalTokens?: number
+  sections?: Record<string, number>
+  droppedItems?: Record<string, number>
+  truncatedItems?: Record<string, number>
 }
 
 export interface PlatformMessagePayload {
@@ -582,6 +597,7 @@ export interface DocumentStatusPayload {
   status: 'processing' | 'ready' | 'failed'
   chunkCount?: number
   filename?: string
+  progress?: number
 }
 
 export interface ConnectionStatusPayload {
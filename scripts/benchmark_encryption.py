@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Encryption Benchmark for CachiBot
+
+Measures the per-request crypto cost of resolving a bot's environment
+(decrypting its provider keys) and of loading connection configs, with and
+without the derived-key cache in ``EncryptionService``.
+
+Usage:
+    python scripts/benchmark_encryption.py
+    python scripts/benchmark_encryption.py --keys 24 --requests 5000
+
+"Cold" derives a key for every value (``key_cache_size=0``, the behaviour
+before the cache existed); "warm" is the steady state once each secret has
+been decrypted once.
+"""
+
+import argparse
+import secrets
+import sys
+import time
+from pathlib import Path
+
+# Allow running from the repo root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cachibot.services.encryption import EncryptionService  # noqa: E402
+
+
+def time_per_request(fn, requests: int) -> float:
+    fn()  # warm-up (fills the cache when enabled)
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark EncryptionService decryption")
+    parser.add_argument("--keys", type=int, default=12, help="Encrypted values per bot")
+    parser.add_argument("--requests", type=int, default=2000, help="Simulated requests")
+    args = parser.parse_args()
+
+    master = secrets.token_bytes(32)
+    writer = EncryptionService(master_key=master)
+    values = [writer.encrypt_value(f"sk-{i:04d}-" + "x" * 40, "bot-1") for i in range(args.keys)]
+    connection = writer.encrypt_connection_config({"bot_token": "123456:" + "y" * 35}, "bot-1")
+
+    cold = EncryptionService(master_key=master, key_cache_size=0)
+    warm = EncryptionService(master_key=master)
+
+    rows = [
+        (
+            f"decrypt_value x{args.keys}",
+            lambda svc: [svc.decrypt_value(*v, bot_id="bot-1") for v in values],
+        ),
+        (f"decrypt_many x{args.keys}", lambda svc: svc.decrypt_many(values, bot_id="bot-1")),
+        ("connection config", lambda svc: svc.decrypt_connection_config(connection, "bot-1")),
+    ]
+
+    print(f"{'operation':<24} {'cold (us)':>10} {'warm (us)':>10} {'speedup':>8}")
+    for name, fn in rows:
+        cold_us = time_per_request(lambda: fn(cold), args.requests)
+        warm_us = time_per_request(lambda: fn(warm), args.requests)
+        print(f"{name:<24} {cold_us:>10.1f} {warm_us:>10.1f} {cold_us / warm_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+SQLite Read Latency Benchmark for CachiBot
+
+Measures chat-history and execution-log read latency while background tasks
+keep writing through ``ExecutionLogRepository.append_line`` and
+``KnowledgeRepository.save_bot_message``, comparing a single shared SQLite
+connection (``sqlite_readers = 0``, the behaviour before the reader pool)
+with the reader pool.
+
+Usage:
+    python scripts/benchmark_sqlite_pool.py
+    python scripts/benchmark_sqlite_pool.py --readers 4 --writers 8 --seconds 10
+
+Each mode runs against a fresh temporary database file.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Allow running from the repo root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cachibot.storage.models  # noqa: E402, F401
+from cachibot.models.knowledge import BotMessage  # noqa: E402
+from cachibot.storage import db  # noqa: E402
+from cachibot.storage.automations_repository import (  # noqa: E402
+    ExecutionLogLineRepository,
+    ExecutionLogRepository,
+)
+from cachibot.storage.models.automations import ExecutionLog  # noqa: E402
+from cachibot.storage.models.bot import Bot  # noqa: E402
+from cachibot.storage.models.chat import Chat  # noqa: E402
+from cachibot.storage.repository import KnowledgeRepository  # noqa: E402
+from cachibot.storage.write_buffer import get_message_buffer  # noqa: E402
+
+BOT_ID = "bench-bot"
+CHAT_ID = "bench-chat"
+LOG_ID = "bench-log"
+
+
+async def seed(history: int) -> None:
+    async with db.ensure_initialized()() as session:
+        session.add(Bot(id=BOT_ID, name="Bench", model="test/model", system_prompt=""))
+        await session.flush()
+        session.add(Chat(id=CHAT_ID, bot_id=BOT_ID, title="Bench"))
+        session.add(
+            ExecutionLog(
+                id=LOG_ID,
+                execution_type="script",
+                source_type="manual",
+                source_name="bench",
+                bot_id=BOT_ID,
+            )
+        )
+        await session.commit()
+
+    knowledge = KnowledgeRepository()
+    for i in range(history):
+        await knowledge.save_bot_message(_message(i))
+
+
+def _message(i: int) -> BotMessage:
+    return BotMessage(
+        id=str(uuid.uuid4()),
+        bot_id=BOT_ID,
+        chat_id=CHAT_ID,
+        role="user" if i % 2 == 0 else "assistant",
+        content=f"message {i} " + "lorem ipsum " * 20,
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+async def writer(stop: asyncio.Event, counter: list[int]) -> None:
+    logs = ExecutionLogRepository()
+    knowledge = KnowledgeRepository()
+    i = 0
+    while not stop.is_set():
+        if i % 4 == 0:
+            await knowledge.save_bot_message(_message(i))
+        else:
+            await logs.append_line(LOG_ID, "info", f"line {i}")
+        counter[0] += 1
+        i += 1
+
+
+async def reader(stop: asyncio.Event, latencies: list[float]) -> None:
+    lines = ExecutionLogLineRepository()
+    knowledge = KnowledgeRepository()
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        if i % 2 == 0:
+            await knowledge.get_bot_messages(BOT_ID, CHAT_ID, limit=50)
+        else:
+            await lines.get_lines(LOG_ID, limit=100)
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+
+
+async def run_mode(path: Path, readers: int, args: argparse.Namespace) -> tuple[list[float], int]:
+    db.engine, db.async_session_maker, db.reader_engine = db._create_engine_from_url(
+        f"sqlite+aiosqlite:///{path}",
+        sqlite_readers=readers,
+        sqlite_synchronous=args.synchronous,
+    )
+    db.db_type = "sqlite"
+    async with db.engine.begin() as conn:
+        await conn.run_sync(db.Base.metadata.create_all)
+    await seed(args.history)
+
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    writes = [0]
+    tasks = [asyncio.create_task(writer(stop, writes)) for _ in range(args.writers)]
+    tasks += [asyncio.create_task(reader(stop, latencies)) for _ in range(args.readers_tasks)]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await get_message_buffer().flush()
+    await db.close_db()
+    return latencies, writes[0]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SQLite reads under write load")
+    parser.add_argument("--readers", type=int, default=4, help="Reader pool size to compare")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent writing tasks")
+    parser.add_argument("--readers-tasks", type=int, default=8, help="Concurrent reading tasks")
+    parser.add_argument("--history", type=int, default=500, help="Messages seeded per chat")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per mode")
+    parser.add_argument(
+        "--synchronous", default="NORMAL", help="PRAGMA synchronous for the writer (NORMAL/FULL)"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<16} {'reads':>7} {'writes':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, readers in (("shared", 0), (f"{args.readers} readers", args.readers)):
+            latencies, writes = await run_mode(Path(tmp) / f"{readers}.db", readers, args)
+            print(
+                f"{name:<16} {len(latencies):>7} {writes:>7} "
+                f"{statistics.median(latencies):>9.2f} {percentile(latencies, 0.95):>9.2f} "
+                f"{max(latencies):>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Vector Index Benchmark for CachiBot
+
+Measures recall@k and query latency of the in-memory knowledge index
+(exact scoring vs. IVF approximate search) across a sweep of ``nprobe``
+values, to help pick ``knowledge.ann_mode`` / ``nprobe`` / ``ivf_lists``.
+
+Usage:
+    python scripts/benchmark_vector_index.py
+    python scripts/benchmark_vector_index.py --rows 200000 --dim 1536 --k 5
+    python scripts/benchmark_vector_index.py --nprobe 1 4 16 64 --lists 512
+
+Data is synthetic (clustered Gaussian), which is closer to real embedding
+distributions than uniform noise.
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Allow running from the repo root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cachibot.services.vector_index import AnnSettings, BotVectorIndex  # noqa: E402
+
+
+def make_data(rows: int, dim: int, clusters: int, queries: int, seed: int):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, rows)
+    data = centers[labels] + 0.3 * rng.standard_normal((rows, dim), dtype=np.float32)
+    picks = rng.integers(0, rows, queries)
+    query_set = data[picks] + 0.1 * rng.standard_normal((queries, dim), dtype=np.float32)
+    return data, query_set
+
+
+def time_queries(index: BotVectorIndex, queries: np.ndarray, k: int, ann: AnnSettings | None):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append([cid for cid, _ in index.search(query, k, -1.0, ann=ann)])
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+
+def recall(truth: list[list[str]], found: list[list[str]]) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / max(1, sum(len(t) for t in truth))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark exact vs IVF vector search")
+    parser.add_argument("--rows", type=int, default=50000, help="Indexed vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--clusters", type=int, default=200, help="Synthetic topic clusters")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to run")
+    parser.add_argument("--k", type=int, default=5, help="Top-k (recall@k)")
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists (0 = sqrt(rows))")
+    parser.add_argument(
+        "--nprobe", type=int, nargs="+", default=[1, 2, 5, 10, 20, 50], help="nprobe sweep"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data, queries = make_data(args.rows, args.dim, args.clusters, args.queries, args.seed)
+    index = BotVectorIndex()
+    index.add([f"c{i}" for i in range(args.rows)], ["bench"] * args.rows, data)
+
+    n_lists = args.lists or max(1, int(math.sqrt(args.rows)))
+    train = AnnSettings(mode="ivfflat", ivf_lists=n_lists, min_chunks=0)
+    start = time.perf_counter()
+    index.prepare_ann(train)
+    await asyncio.gather(*(b.training for b in index._blocks.values() if b.training))
+    print(f"rows={args.rows} dim={args.dim} lists={n_lists}")
+    print(f"IVF training: {time.perf_counter() - start:.2f}s")
+
+    truth, exact_ms = time_queries(index, queries, args.k, None)
+    print(f"\n{'mode':<16}{'recall@' + str(args.k):>10}{'ms/query':>12}")
+    print(f"{'exact':<16}{1.0:>10.3f}{exact_ms:>12.3f}")
+    for nprobe in args.nprobe:
+        ann = AnnSettings(mode="ivfflat", nprobe=nprobe, ivf_lists=n_lists, min_chunks=0)
+        found, ms = time_queries(index, queries, args.k, ann)
+        print(f"{'ivf nprobe=' + str(nprobe):<16}{recall(truth, found):>10.3f}{ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
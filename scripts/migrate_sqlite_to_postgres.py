@@ -21,6 +21,7 @@ Features:
 
 import argparse
 import asyncio
+import json
 import logging
 import struct
 import sys
@@ -424,16 +425,23 @@ BLOB_EMBEDDING_COLUMNS = {
 }
 
 
-def convert_blob_to_vector_literal(blob: bytes | None) -> str | None:
-    """Convert a SQLite BLOB (float32 array) to a pgvector-compatible string literal.
+def convert_blob_to_vector_literal(blob: bytes | str | None) -> str | None:
+    """Convert a SQLite embedding to a pgvector-compatible string literal.
 
-    SQLite stores embeddings as packed float32 arrays. pgvector accepts
-    string literals like '[0.1, 0.2, 0.3]' for vector columns.
+    SQLite stores embeddings as packed float32 arrays, optionally prefixed
+    with an 8-byte ``CV`` header (magic, dtype, dimension). Very old rows may
+    hold JSON text. pgvector accepts string literals like '[0.1, 0.2, 0.3]'.
     """
     if blob is None:
         return None
-    num_floats = len(blob) // 4
-    floats = struct.unpack(f"<{num_floats}f", blob)
+    if isinstance(blob, str):
+        return "[" + ",".join(f"{float(f):.8f}" for f in json.loads(blob)) + "]"
+    if blob[:2] == b"CV":
+        _magic, _dtype, dim = struct.unpack_from("<2sBxI", blob)
+        floats = struct.unpack_from(f"<{dim}f", blob, 8)
+    else:
+        num_floats = len(blob) // 4
+        floats = struct.unpack(f"<{num_floats}f", blob)
     return "[" + ",".join(f"{f:.8f}" for f in floats) + "]"
 
 
@@ -81,6 +81,28 @@ async def pg_db(request):
     db_mod.async_session_maker = original_session_maker
 
 
+@pytest.fixture
+async def sqlite_db(tmp_path, monkeypatch):
+    """Set up a throwaway SQLite database with all tables.
+
+    Patches cachibot.storage.db like pg_db, but needs no server. Tests seed
+    the rows they need themselves.
+    """
+    import cachibot.storage.models  # noqa: F401
+
+    engine, session_maker, _reader = db_mod._create_engine_from_url(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+    )
+    monkeypatch.setattr(db_mod, "engine", engine)
+    monkeypatch.setattr(db_mod, "async_session_maker", session_maker)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield session_maker
+
+    await engine.dispose()
+
+
 # ---------------------------------------------------------------------------
 # Auth service fixture — deterministic JWT secret for testing
 # ---------------------------------------------------------------------------
@@ -0,0 +1,92 @@
+"""Tests for the agent setup cache.
+
+Covers:
+- Hits within the TTL, per-bot and global invalidation
+- TTL of 0 disables caching
+- Loader failures are not cached
+- LRU eviction
+"""
+
+import pytest
+
+from cachibot.services.agent_cache import AgentSetupCache
+
+
+def _counting_loader(value="v"):
+    calls = {"n": 0}
+
+    async def loader():
+        calls["n"] += 1
+        return value
+
+    return loader, calls
+
+
+class TestAgentSetupCache:
+    """Tests for AgentSetupCache."""
+
+    async def test_hit_within_ttl(self):
+        cache = AgentSetupCache(ttl_seconds=60)
+        loader, calls = _counting_loader()
+
+        assert await cache.get_or_load("k", loader) == "v"
+        assert await cache.get_or_load("k", loader) == "v"
+
+        assert calls["n"] == 1
+        assert cache.stats()["hits"] == 1
+
+    async def test_invalidate_bot_is_scoped(self):
+        cache = AgentSetupCache(ttl_seconds=60)
+        loader, calls = _counting_loader()
+
+        await cache.get_or_load(("env", "bot-a"), loader, bot_id="bot-a")
+        await cache.get_or_load(("env", "bot-b"), loader, bot_id="bot-b")
+        cache.invalidate_bot("bot-a")
+        await cache.get_or_load(("env", "bot-a"), loader, bot_id="bot-a")
+        await cache.get_or_load(("env", "bot-b"), loader, bot_id="bot-b")
+
+        assert calls["n"] == 3
+
+    async def test_invalidate_all(self):
+        cache = AgentSetupCache(ttl_seconds=60)
+        loader, calls = _counting_loader()
+
+        await cache.get_or_load("k", loader)
+        await cache.get_or_load(("env", "bot-a"), loader, bot_id="bot-a")
+        cache.invalidate_all()
+        await cache.get_or_load("k", loader)
+        await cache.get_or_load(("env", "bot-a"), loader, bot_id="bot-a")
+
+        assert calls["n"] == 4
+
+    async def test_zero_ttl_disables_cache(self):
+        cache = AgentSetupCache(ttl_seconds=0)
+        loader, calls = _counting_loader()
+
+        await cache.get_or_load("k", loader)
+        await cache.get_or_load("k", loader)
+
+        assert calls["n"] == 2
+        assert cache.stats()["entries"] == 0
+
+    async def test_loader_error_not_cached(self):
+        cache = AgentSetupCache(ttl_seconds=60)
+
+        async def failing():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("k", failing)
+        loader, calls = _counting_loader("ok")
+        assert await cache.get_or_load("k", loader) == "ok"
+        assert calls["n"] == 1
+
+    async def test_lru_eviction(self):
+        cache = AgentSetupCache(ttl_seconds=60, max_entries=2)
+        loader, calls = _counting_loader()
+
+        for key in ("a", "b", "a", "c", "a", "b"):
+            await cache.get_or_load(key, loader)
+
+        # "b" was evicted by "c"; "a" stayed hot
+        assert calls["n"] == 4
@@ -6,6 +6,7 @@ Covers:
 - Missing layers fall through correctly
 - Concurrent requests from Bot A and Bot B -> keys are isolated
 - BotEnvironmentContext async context manager
+- EnvironmentCache reuse and env_version revalidation
 """
 
 import asyncio
@@ -22,8 +23,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from cachibot.services.bot_environment import (
     BotEnvironmentContext,
     BotEnvironmentService,
+    EnvironmentCache,
 )
 from cachibot.services.encryption import EncryptionService
+from cachibot.storage.models.bot import Bot
 from cachibot.storage.models.env_var import (
     BotEnvironment,
     BotSkillConfig,
@@ -109,6 +112,12 @@ async def _seed_skill_config(
     await session.flush()
 
 
+async def _seed_bot(session: AsyncSession, bot_id: str) -> None:
+    """Insert a minimal bot row (carries env_version)."""
+    session.add(Bot(id=bot_id, name=bot_id, model="openai/gpt-4o", system_prompt=""))
+    await session.flush()
+
+
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
@@ -394,3 +403,74 @@ class TestBotEnvironmentContext:
                     # The key should be accessible via ctx.get but NOT in os.environ
                     assert ctx.get("openai") == "sk-never-in-environ"
                     assert os.environ.get("OPENAI_API_KEY") != "sk-never-in-environ"
+
+
+# ---------------------------------------------------------------------------
+# Environment Cache Tests
+# ---------------------------------------------------------------------------
+
+
+class TestEnvironmentCache:
+    """Cached resolution is reused until the bot's env_version changes."""
+
+    async def test_cache_hit_skips_reload(self, pg_db, enc):
+        """A second resolve is served from the cache."""
+        cache = EnvironmentCache(ttl_seconds=60)
+        async with pg_db() as session:
+            await _seed_bot(session, "bot-1")
+            await _seed_bot_env(session, enc, "bot-1", "OPENAI_API_KEY", "sk-cached")
+            await session.commit()
+
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("OPENAI_API_KEY", None)
+            for _ in range(2):
+                async with pg_db() as session:
+                    svc = BotEnvironmentService(session, enc, cache=cache)
+                    env = await svc.resolve("bot-1")
+                    assert env.provider_keys["openai"] == "sk-cached"
+
+        assert cache.stats()["hits"] == 1
+
+    async def test_version_bump_from_other_worker_reloads(self, pg_db, enc):
+        """A change committed elsewhere is detected through env_version."""
+        cache = EnvironmentCache(ttl_seconds=60)
+        async with pg_db() as session:
+            await _seed_bot(session, "bot-1")
+            await _seed_bot_env(session, enc, "bot-1", "OPENAI_API_KEY", "sk-old")
+            await session.commit()
+
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("OPENAI_API_KEY", None)
+            async with pg_db() as session:
+                await BotEnvironmentService(session, enc, cache=cache).resolve("bot-1")
+
+            # Another worker (with its own cache) changes the key
+            async with pg_db() as session:
+                await session.execute(
+                    BotEnvironment.__table__.delete().where(BotEnvironment.bot_id == "bot-1")
+                )
+                await _seed_bot_env(session, enc, "bot-1", "OPENAI_API_KEY", "sk-new")
+                await BotEnvironmentService(session, enc, cache=EnvironmentCache()).invalidate(
+                    "bot-1"
+                )
+                await session.commit()
+
+            async with pg_db() as session:
+                env = await BotEnvironmentService(session, enc, cache=cache).resolve("bot-1")
+
+        assert env.provider_keys["openai"] == "sk-new"
+
+    async def test_request_overrides_not_cached(self, pg_db, enc):
+        """Request overrides apply to a copy and never leak into the cache."""
+        cache = EnvironmentCache(ttl_seconds=60)
+        async with pg_db() as session:
+            await _seed_bot(session, "bot-1")
+            await session.commit()
+
+        async with pg_db() as session:
+            svc = BotEnvironmentService(session, enc, cache=cache)
+            first = await svc.resolve("bot-1", request_overrides={"temperature": 0.1})
+            second = await svc.resolve("bot-1")
+
+        assert first.temperature == 0.1
+        assert second.sources["temperature"] == "global"
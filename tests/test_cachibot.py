@@ -7,7 +7,7 @@ from pathlib import Path
 
 import pytest
 
-from cachibot.config import Config
+from cachibot.config import Config, invalidate_config_snapshots
 
 
 @pytest.fixture
@@ -46,3 +46,42 @@ class TestConfig:
         assert config.should_ignore(".git")
         assert config.should_ignore("test.pyc")
         assert not config.should_ignore("test.py")
+
+
+class TestConfigSnapshot:
+    """Tests for the shared, change-detecting config snapshot."""
+
+    def test_snapshot_is_reused(self, temp_workspace):
+        """Unchanged files and environment return the same instance."""
+        assert Config.snapshot(temp_workspace) is Config.snapshot(temp_workspace)
+
+    def test_snapshot_reloads_on_file_change(self, temp_workspace):
+        """Editing the workspace cachibot.toml produces a new snapshot."""
+        toml_path = temp_workspace / "cachibot.toml"
+        toml_path.write_text("[agent]\nmax_iterations = 7\n")
+        first = Config.snapshot(temp_workspace)
+        assert first.agent.max_iterations == 7
+
+        toml_path.write_text("[agent]\nmax_iterations = 11\n")
+        second = Config.snapshot(temp_workspace)
+        assert second is not first
+        assert second.agent.max_iterations == 11
+
+    def test_snapshot_reloads_after_invalidation(self, temp_workspace, monkeypatch):
+        """Environment changes are picked up once snapshots are invalidated."""
+        monkeypatch.setenv("CACHIBOT_MAX_ITERATIONS", "3")
+        invalidate_config_snapshots()
+        assert Config.snapshot(temp_workspace).agent.max_iterations == 3
+
+        monkeypatch.setenv("CACHIBOT_MAX_ITERATIONS", "4")
+        invalidate_config_snapshots()
+        assert Config.snapshot(temp_workspace).agent.max_iterations == 4
+
+    def test_with_agent_is_copy_on_write(self, config):
+        """Agent overrides leave the original untouched and share other sections."""
+        original_model = config.agent.model
+        override = config.with_agent(model="openai/gpt-4o-mini")
+
+        assert override.agent.model == "openai/gpt-4o-mini"
+        assert config.agent.model == original_model
+        assert override.knowledge is config.knowledge
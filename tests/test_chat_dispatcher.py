@@ -0,0 +1,85 @@
+"""Tests for per-chat ordered, bounded dispatch of platform agent runs."""
+
+import asyncio
+
+from cachibot.services.chat_dispatcher import ChatDispatcher
+
+
+async def test_same_chat_runs_in_order():
+    dispatcher = ChatDispatcher(max_concurrent=4, max_per_bot=4)
+    order: list[int] = []
+
+    async def handle(i: int, delay: float) -> int:
+        await asyncio.sleep(delay)
+        order.append(i)
+        return i
+
+    results = await asyncio.gather(
+        *(
+            dispatcher.run("conn-1", "chat-1", "bot-1", lambda i=i: handle(i, 0.03 - i * 0.01))
+            for i in range(3)
+        )
+    )
+    assert results == [0, 1, 2]
+    assert order == [0, 1, 2]
+    assert dispatcher.stats()["chats"] == 0
+
+
+async def test_global_limit_bounds_parallel_chats():
+    dispatcher = ChatDispatcher(max_concurrent=2, max_per_bot=0)
+    running = 0
+    peak = 0
+
+    async def handle() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(
+        *(dispatcher.run("conn-1", f"chat-{i}", f"bot-{i}", handle) for i in range(6))
+    )
+    assert peak == 2
+    stats = dispatcher.stats()
+    assert stats["dispatched"] == 6
+    assert stats["queued"] == 0
+    assert stats["active"] == 0
+
+
+async def test_per_bot_limit_and_stats():
+    dispatcher = ChatDispatcher(max_concurrent=0, max_per_bot=1)
+    release = asyncio.Event()
+
+    async def handle() -> None:
+        await release.wait()
+
+    tasks = [
+        asyncio.create_task(dispatcher.run("conn-1", f"chat-{i}", "bot-1", handle))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    stats = dispatcher.stats()
+    assert stats["active"] == 1
+    assert stats["queued"] == 2
+    assert stats["bots"]["bot-1"] == {"queued": 2, "active": 1}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert dispatcher.stats()["bots"] == {}
+
+
+async def test_failure_releases_slot():
+    dispatcher = ChatDispatcher(max_concurrent=1, max_per_bot=1)
+
+    async def fail() -> None:
+        raise RuntimeError("boom")
+
+    async def ok() -> str:
+        return "done"
+
+    try:
+        await dispatcher.run("conn-1", "chat-1", "bot-1", fail)
+    except RuntimeError:
+        pass
+    assert await dispatcher.run("conn-1", "chat-1", "bot-1", ok) == "done"
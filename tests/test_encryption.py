@@ -7,6 +7,7 @@ Covers:
 - Master key auto-generation when not set
 - Platform-level (bot_id=None) encryption
 - Connection config encryption/decryption
+- Derived-key cache and batch decryption
 """
 
 import os
@@ -318,3 +319,75 @@ class TestKeyDerivation:
         salt = os.urandom(32)
         derived = EncryptionService.derive_bot_key(master, "bot-1", salt)
         assert len(derived) == 32
+
+
+# ---------------------------------------------------------------------------
+# Derived-Key Cache / Batch Decryption Tests
+# ---------------------------------------------------------------------------
+
+
+class TestDerivedKeyCache:
+    """Repeated decryption of the same secret derives its key only once."""
+
+    def test_repeated_decrypt_derives_once(self):
+        svc = EncryptionService(master_key=_random_master_key())
+        ct, nonce, salt = svc.encrypt_value("sk-cached", bot_id="bot-1")
+
+        with patch.object(
+            EncryptionService, "derive_bot_key", wraps=EncryptionService.derive_bot_key
+        ) as derive:
+            for _ in range(3):
+                assert svc.decrypt_value(ct, nonce, salt, bot_id="bot-1") == "sk-cached"
+
+        assert derive.call_count == 1
+
+    def test_cache_is_scoped_by_bot(self):
+        """A cached key for one bot never decrypts another bot's value."""
+        svc = EncryptionService(master_key=_random_master_key())
+        ct, nonce, salt = svc.encrypt_value("secret-a", bot_id="bot-a")
+        svc.decrypt_value(ct, nonce, salt, bot_id="bot-a")
+
+        with pytest.raises(InvalidTag):
+            svc.decrypt_value(ct, nonce, salt, bot_id="bot-b")
+
+    def test_cache_is_bounded(self):
+        svc = EncryptionService(master_key=_random_master_key(), key_cache_size=2)
+        values = [svc.encrypt_value(f"v{i}", bot_id="bot-1") for i in range(5)]
+        for ct, nonce, salt in values:
+            svc.decrypt_value(ct, nonce, salt, bot_id="bot-1")
+
+        assert len(svc._key_cache) == 2
+
+    def test_cache_disabled(self):
+        svc = EncryptionService(master_key=_random_master_key(), key_cache_size=0)
+        ct, nonce, salt = svc.encrypt_value("v", bot_id="bot-1")
+        assert svc.decrypt_value(ct, nonce, salt, bot_id="bot-1") == "v"
+        assert len(svc._key_cache) == 0
+
+
+class TestDecryptMany:
+    """Tests for bulk decryption."""
+
+    def test_decrypt_many_preserves_order(self):
+        svc = EncryptionService(master_key=_random_master_key())
+        plaintexts = ["sk-one", "sk-two", "sk-three"]
+        values = [svc.encrypt_value(p, bot_id="bot-1") for p in plaintexts]
+
+        assert svc.decrypt_many(values, bot_id="bot-1") == plaintexts
+
+    def test_decrypt_many_platform_level(self):
+        svc = EncryptionService(master_key=_random_master_key())
+        values = [svc.encrypt_value("platform-key")]
+        assert svc.decrypt_many(values) == ["platform-key"]
+
+    def test_decrypt_many_isolates_failures(self):
+        """A value that fails to decrypt yields None without hiding the rest."""
+        svc = EncryptionService(master_key=_random_master_key())
+        good = svc.encrypt_value("good", bot_id="bot-1")
+        foreign = svc.encrypt_value("other-bot", bot_id="bot-2")
+
+        assert svc.decrypt_many([good, foreign, good], bot_id="bot-1") == [
+            "good",
+            None,
+            "good",
+        ]
@@ -0,0 +1,95 @@
+"""Tests for the batched execution log line writer."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cachibot.api import websocket as websocket_module
+from cachibot.services.execution_log_sink import ExecutionLogSink
+
+
+@pytest.fixture
+def ws(monkeypatch):
+    manager = MagicMock()
+    manager.broadcast = AsyncMock()
+    monkeypatch.setattr(websocket_module, "get_ws_manager", lambda: manager)
+    return manager
+
+
+def _sink(**kwargs) -> ExecutionLogSink:
+    sink = ExecutionLogSink("log-1", **kwargs)
+    sink._repo = MagicMock()
+    sink._repo.append_many = AsyncMock()
+    return sink
+
+
+def _stored(sink: ExecutionLogSink) -> list[dict]:
+    return [line for call in sink._repo.append_many.await_args_list for line in call.args[0]]
+
+
+async def test_lines_are_batched_with_sequential_seq(ws):
+    sink = _sink(max_lines=3, flush_interval=60)
+    seqs = [sink.write("info", f"line {i}") for i in range(7)]
+    await sink.close()
+
+    assert seqs == list(range(1, 8))
+    batches = [len(call.args[0]) for call in sink._repo.append_many.await_args_list]
+    assert batches == [3, 3, 1]
+    assert [line["seq"] for line in _stored(sink)] == seqs
+
+
+async def test_lines_are_broadcast_live_in_order(ws):
+    sink = _sink(flush_interval=60)
+    sink.write_output("one\ntwo\nthree")
+    await sink.close()
+
+    payloads = [call.args[0].payload for call in ws.broadcast.await_args_list]
+    assert [p["content"] for p in payloads] == ["one", "two", "three"]
+    assert [p["seq"] for p in payloads] == [1, 2, 3]
+    assert all(p["level"] == "stdout" for p in payloads)
+
+
+async def test_writes_from_threads_get_unique_seq(ws):
+    sink = _sink(broadcast=False, flush_interval=0.01)
+
+    def worker(n: int) -> None:
+        for i in range(50):
+            sink.write("info", f"{n}-{i}")
+
+    await asyncio.gather(*(asyncio.to_thread(worker, n) for n in range(4)))
+    await asyncio.sleep(0)  # let thread-scheduled lines reach the loop
+    await sink.close()
+
+    seqs = sorted(line["seq"] for line in _stored(sink))
+    assert seqs == list(range(1, 201))
+
+
+async def test_thread_lines_are_broadcast_before_later_loop_lines(ws):
+    sink = _sink(flush_interval=60)
+    thread = threading.Thread(target=sink.write, args=("info", "from tool thread"))
+    thread.start()
+    thread.join()  # its line is scheduled on the loop but not taken yet
+    sink.write("info", "from loop")
+    await sink.close()
+
+    payloads = [call.args[0].payload for call in ws.broadcast.await_args_list]
+    assert [(p["seq"], p["content"]) for p in payloads] == [
+        (1, "from tool thread"),
+        (2, "from loop"),
+    ]
+
+
+async def test_resume_continues_after_stored_lines(monkeypatch, ws):
+    from cachibot.services import execution_log_sink as sink_module
+
+    repo = MagicMock()
+    repo.get_last_seq = AsyncMock(return_value=41)
+    monkeypatch.setattr(sink_module, "ExecutionLogLineRepository", lambda: repo)
+
+    sink = await ExecutionLogSink.resume("log-1", broadcast=False)
+    sink._repo = MagicMock()
+    sink._repo.append_many = AsyncMock()
+    assert sink.write("info", "next") == 42
+    await sink.close()
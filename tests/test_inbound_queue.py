@@ -0,0 +1,173 @@
+"""Tests for the durable inbound queue behind platform webhooks."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cachibot.models.platform import PlatformResponse
+from cachibot.services import inbound_queue as inbound_queue_module
+from cachibot.services.adapters.base import InboundReply, WebhookEvent
+from cachibot.services.chat_dispatcher import hand_off_chat
+from cachibot.services.inbound_queue import InboundQueueService
+from cachibot.services.message_coalescer import MessageCoalescer
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = MagicMock()
+    adapter.handled = []
+
+    async def handle(payload):
+        await asyncio.sleep(payload.get("delay", 0))
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        adapter.handled.append(payload["text"])
+        if payload.get("reply"):
+            return InboundReply("chat-1", PlatformResponse(text=payload["reply"]))
+        return None
+
+    adapter.handle_inbound_event = AsyncMock(side_effect=handle)
+    adapter.deliver_inbound_reply = AsyncMock()
+    manager = MagicMock()
+    manager.get_adapter.return_value = adapter
+    monkeypatch.setattr(inbound_queue_module, "get_platform_manager", lambda: manager)
+    monkeypatch.setattr(inbound_queue_module, "_RETRY_DELAY", 0.0)
+    return adapter
+
+
+def _service(seen: set[str] | None = None, **kwargs) -> InboundQueueService:
+    service = InboundQueueService(**kwargs)
+    keys = seen if seen is not None else set()
+
+    async def enqueue(connection_id, platform, chat_id, event_key, payload):
+        if (connection_id, event_key) in keys:
+            return None
+        keys.add((connection_id, event_key))
+        return f"evt-{event_key}"
+
+    service._repo = MagicMock()
+    service._repo.enqueue_inbound_event = AsyncMock(side_effect=enqueue)
+    service._repo.get_pending_inbound_events = AsyncMock(return_value=[])
+    service._repo.update_inbound_event = AsyncMock()
+    service._repo.prune_inbound_events = AsyncMock(return_value=0)
+    return service
+
+
+async def test_redelivery_is_dropped(adapter):
+    service = _service(workers=2)
+    await service.start()
+    event = WebhookEvent(chat_id="chat-1", event_key="wamid.1", payload={"text": "hi"})
+    assert await service.enqueue("conn-1", "whatsapp", event) is True
+    assert await service.enqueue("conn-1", "whatsapp", event) is False
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert adapter.handled == ["hi"]
+    assert service.stats()["duplicates"] == 1
+    service._repo.update_inbound_event.assert_awaited_once_with("evt-wamid.1", "done", 1)
+
+
+async def test_chat_events_stay_in_order(adapter):
+    service = _service(workers=4)
+    await service.start()
+    for i, delay in enumerate([0.03, 0.0, 0.01]):
+        await service.enqueue(
+            "conn-1",
+            "line",
+            WebhookEvent("chat-1", f"m{i}", {"text": str(i), "delay": delay}),
+        )
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert adapter.handled == ["0", "1", "2"]
+
+
+async def test_chat_burst_is_coalesced_through_the_queue(adapter):
+    coalescer = MessageCoalescer()
+    turns = []
+
+    async def handle(payload):
+        # What the platform manager does once a message is ordered in its chat
+        hand_off_chat()
+        merged = await coalescer.collect("conn-1", "chat-1", 0.2, payload["text"], {})
+        if merged is not None:
+            turns.append(merged[0])
+
+    adapter.handle_inbound_event = AsyncMock(side_effect=handle)
+    service = _service(workers=1)
+    await service.start()
+    for i, text in enumerate(["hey", "are you there?"]):
+        await service.enqueue("conn-1", "whatsapp", WebhookEvent("chat-1", f"m{i}", {"text": text}))
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert turns == ["hey\nare you there?"]
+    assert service._repo.update_inbound_event.await_count == 2
+
+
+async def test_failed_turn_is_not_run_again(adapter):
+    service = _service(workers=1, max_attempts=2)
+    await service.start()
+    await service.enqueue("conn-1", "viber", WebhookEvent("chat-1", "t1", {"fail": True}))
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert adapter.handle_inbound_event.await_count == 1
+    statuses = [call.args[1] for call in service._repo.update_inbound_event.await_args_list]
+    assert statuses == ["failed"]
+    assert service.stats()["failed"] == 1
+
+
+async def test_only_the_delivery_is_retried(adapter):
+    adapter.deliver_inbound_reply.side_effect = [RuntimeError("HTTP 503"), None]
+    service = _service(workers=1, max_attempts=3)
+    await service.start()
+    await service.enqueue(
+        "conn-1", "whatsapp", WebhookEvent("chat-1", "d1", {"text": "hi", "reply": "hello"})
+    )
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert adapter.handled == ["hi"]
+    assert adapter.deliver_inbound_reply.await_count == 2
+    assert adapter.deliver_inbound_reply.await_args.args[0].response.text == "hello"
+    statuses = [call.args[1] for call in service._repo.update_inbound_event.await_args_list]
+    assert statuses == ["done"]
+
+
+async def test_undeliverable_reply_marks_the_event_failed(adapter):
+    adapter.deliver_inbound_reply.side_effect = RuntimeError("HTTP 503")
+    service = _service(workers=1, max_attempts=2)
+    await service.start()
+    await service.enqueue(
+        "conn-1", "custom", WebhookEvent("chat-1", "d2", {"text": "hi", "reply": "hello"})
+    )
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert adapter.handle_inbound_event.await_count == 1
+    statuses = [call.args[1] for call in service._repo.update_inbound_event.await_args_list]
+    assert statuses == ["done", "failed"]
+
+
+async def test_pending_events_resume_on_start(adapter):
+    service = _service(workers=1)
+    service._repo.get_pending_inbound_events = AsyncMock(
+        return_value=[
+            {
+                "id": "evt-1",
+                "connection_id": "conn-1",
+                "platform": "custom",
+                "chat_id": "chat-1",
+                "payload": {"text": "left over"},
+                "attempts": 1,
+            }
+        ]
+    )
+    await service.start()
+    await asyncio.wait_for(service._queue.join(), timeout=5)
+    await service.stop()
+
+    assert adapter.handled == ["left over"]
+    service._repo.update_inbound_event.assert_awaited_once_with("evt-1", "done", 2)
@@ -0,0 +1,78 @@
+"""Tests for append-only work job log storage."""
+
+import pytest
+from sqlalchemy import select, update
+
+from cachibot.models.work import Job
+from cachibot.storage import db
+from cachibot.storage import work_repository as work_repository_module
+from cachibot.storage.models.bot import Bot
+from cachibot.storage.models.work import Task, Work, WorkJob
+from cachibot.storage.work_repository import WorkJobRepository, explode_job_log_arrays
+
+
+@pytest.fixture(autouse=True)
+async def task(sqlite_db):
+    async with sqlite_db() as session:
+        session.add(Bot(id="bot-1", name="Bot", model="test/model", system_prompt=""))
+        await session.flush()
+        session.add(Work(id="work-1", bot_id="bot-1", title="Work"))
+        await session.flush()
+        session.add(Task(id="task-1", bot_id="bot-1", work_id="work-1", title="Task"))
+        await session.commit()
+
+
+async def _job(job_id: str = "job-1", **kwargs) -> Job:
+    job = Job(id=job_id, bot_id="bot-1", task_id="task-1", work_id="work-1", **kwargs)
+    await WorkJobRepository().save(job)
+    return job
+
+
+async def test_saving_a_stale_job_keeps_appended_entries(sqlite_db):
+    repo = WorkJobRepository()
+    stale = await _job()
+    for i in range(3):
+        await repo.append_log("job-1", "info", f"entry {i}")
+    stale.progress = 0.5
+    await repo.update(stale)
+
+    logs = await repo.get_logs("job-1")
+    assert [log["message"] for log in logs] == ["entry 0", "entry 1", "entry 2"]
+
+
+async def test_embedded_logs_are_the_newest_entries(sqlite_db, monkeypatch):
+    monkeypatch.setattr(work_repository_module, "_EMBEDDED_JOB_LOGS", 3)
+    repo = WorkJobRepository()
+    await _job(logs=[{"level": "info", "message": "from save"}])
+    for i in range(5):
+        await repo.append_log("job-1", "info", f"entry {i}", {"i": i})
+    await _job("job-2")
+
+    job = await repo.get("job-1")
+    assert [log["message"] for log in job.logs] == ["entry 2", "entry 3", "entry 4"]
+    assert job.logs[-1]["data"] == {"i": 4}
+    jobs = await repo.get_by_task("task-1")
+    assert [len(j.logs) for j in jobs] == [3, 0]
+
+    page = await repo.get_logs("job-1", limit=2, offset=1)
+    assert [log["message"] for log in page] == ["entry 0", "entry 1"]
+
+
+async def test_legacy_arrays_are_exploded(sqlite_db):
+    await _job()
+    legacy = [
+        {"timestamp": "2026-01-01T00:00:00+00:00", "level": "info", "message": "old 1"},
+        {"timestamp": "2026-01-01T00:00:01+00:00", "level": "error", "message": "old 2"},
+    ]
+    async with db.engine.begin() as conn:
+        await conn.execute(update(WorkJob).where(WorkJob.id == "job-1").values(logs=legacy))
+        assert await conn.run_sync(explode_job_log_arrays) == 2
+        assert await conn.run_sync(explode_job_log_arrays) == 0
+        stored = await conn.scalar(select(WorkJob.logs).where(WorkJob.id == "job-1"))
+    assert stored == []
+
+    logs = await WorkJobRepository().get_logs("job-1")
+    assert [(log["level"], log["message"]) for log in logs] == [
+        ("info", "old 1"),
+        ("error", "old 2"),
+    ]
@@ -1,15 +1,48 @@
 """Tests for the Knowledge Base pipeline: document processor, vector store, and context builder."""
 
+import asyncio
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
 import numpy as np
 import pytest
 
-from cachibot.models.knowledge import DocChunk, DocumentStatus
+from cachibot.models.knowledge import (
+    BotMessage,
+    BotNote,
+    ChatSummary,
+    DocChunk,
+    DocumentStatus,
+    NoteSource,
+)
+from cachibot.services.agent_cache import AgentSetupCache
 from cachibot.services.context_builder import ContextBuilder, KnowledgeContext
+from cachibot.services.context_packer import ContextPacker
+from cachibot.services.conversation_summarizer import ConversationSummarizer
 from cachibot.services.document_processor import DocumentProcessor
+from cachibot.services.embedding_cache import QueryEmbeddingCache
+from cachibot.services.ingestion_queue import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    IngestionQueueService,
+)
+from cachibot.services.vector_index import (
+    AnnSettings,
+    BotVectorIndex,
+    VectorIndexRegistry,
+    train_ivf,
+)
 from cachibot.services.vector_store import SearchResult, VectorStore
+from cachibot.storage.embedding_codec import (
+    HEADER_SIZE,
+    decode_embedding,
+    encode_embedding,
+    rewrite_json_embeddings,
+)
+from cachibot.storage.models.knowledge import VectorType
+from cachibot.storage.repository import KnowledgeRepository, NotesRepository
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -145,6 +178,71 @@ class TestDocumentProcessorChunking:
         assert chunks[1] == "d e f"
 
 
+class TestStreamingChunker:
+    """Tests for streamed extraction and chunking with source locations."""
+
+    @staticmethod
+    def _reference_chunks(text, size, overlap):
+        words = text.split()
+        if len(words) <= size:
+            return [" ".join(words)] if words else []
+        chunks, i = [], 0
+        while i < len(words):
+            chunks.append(" ".join(words[i : i + size]))
+            i += size - overlap
+        return chunks
+
+    @pytest.mark.parametrize("size,overlap", [(1, 0), (3, 1), (5, 0), (5, 4), (7, 2)])
+    @pytest.mark.parametrize("n_words", [0, 1, 5, 6, 7, 23])
+    def test_matches_whole_text_chunking(self, size, overlap, n_words):
+        text = " ".join(f"w{i}" for i in range(n_words))
+        segments = [(None, 0, text)]
+        streamed = [c.content for c in DocumentProcessor.iter_chunks(segments, size, overlap)]
+        assert streamed == self._reference_chunks(text, size, overlap)
+
+    def test_offsets_index_into_extracted_text(self, tmp_path):
+        p = tmp_path / "doc.md"
+        p.write_text("# Title\n\nfirst   line here\nsecond line\n", encoding="utf-8")
+        text = DocumentProcessor.extract_text(p, "md")
+
+        chunks = list(
+            DocumentProcessor.iter_document_chunks(p, "md", chunk_size=3, chunk_overlap=1)
+        )
+
+        assert [c.content for c in chunks] == [
+            "# Title first",
+            "first line here",
+            "here second line",
+            "line",
+        ]
+        for chunk in chunks:
+            assert " ".join(text[chunk.char_start : chunk.char_end].split()) == chunk.content
+            assert chunk.page_number is None
+
+    def test_pdf_chunks_record_page_numbers(self, tmp_path):
+        import pymupdf
+
+        p = tmp_path / "pages.pdf"
+        doc = pymupdf.open()
+        for words in ("alpha beta gamma", "", "delta epsilon zeta"):
+            page = doc.new_page()
+            if words:
+                page.insert_text((72, 72), words)
+        doc.save(str(p))
+        doc.close()
+        text = DocumentProcessor.extract_text(p, "pdf")
+
+        chunks = list(
+            DocumentProcessor.iter_document_chunks(p, "pdf", chunk_size=3, chunk_overlap=0)
+        )
+
+        assert [(c.content, c.page_number) for c in chunks] == [
+            ("alpha beta gamma", 1),
+            ("delta epsilon zeta", 3),
+        ]
+        assert text[chunks[1].char_start : chunks[1].char_end] == "delta epsilon zeta"
+
+
 class TestDocumentProcessorPipeline:
     """Tests for the full process_document pipeline."""
 
@@ -153,6 +251,7 @@ class TestDocumentProcessorPipeline:
         processor._repo = MagicMock()
         processor._repo.update_document_status = AsyncMock()
         processor._repo.save_chunks = AsyncMock()
+        processor._repo.get_chunks_by_document_light = AsyncMock(return_value=[])
 
         count = await processor.process_document(
             document_id="doc-1",
@@ -169,6 +268,7 @@ class TestDocumentProcessorPipeline:
             assert chunk.bot_id == "bot-1"
             assert chunk.document_id == "doc-1"
             assert chunk.embedding is not None
+            assert chunk.char_end > chunk.char_start
 
         processor._repo.update_document_status.assert_called_with(
             "doc-1", DocumentStatus.READY, chunk_count=count
@@ -199,6 +299,7 @@ class TestDocumentProcessorPipeline:
         processor._repo = MagicMock()
         processor._repo.update_document_status = AsyncMock()
         processor._repo.save_chunks = AsyncMock(side_effect=RuntimeError("db error"))
+        processor._repo.get_chunks_by_document_light = AsyncMock(return_value=[])
 
         with pytest.raises(RuntimeError, match="db error"):
             await processor.process_document(
@@ -210,6 +311,219 @@ class TestDocumentProcessorPipeline:
 
         processor._repo.update_document_status.assert_called_with("doc-fail", DocumentStatus.FAILED)
 
+    @staticmethod
+    def _batching_processor(mock_vector_store, stored=None):
+        processor = DocumentProcessor(
+            chunk_size=2, chunk_overlap=0, vector_store=mock_vector_store, embed_batch_size=2
+        )
+        processor._repo = MagicMock()
+        processor._repo.update_document_status = AsyncMock()
+        processor._repo.update_document_embedding_info = AsyncMock()
+        processor._repo.save_chunks = AsyncMock()
+        processor._repo.delete_chunks_by_document = AsyncMock()
+        processor._repo.get_document = AsyncMock(return_value=None)
+        processor._repo.get_chunks_by_document_light = AsyncMock(return_value=stored or [])
+        processor._repo.get_cached_embeddings = AsyncMock(return_value={})
+        processor._repo.save_cached_embeddings = AsyncMock()
+        processor._repo.prune_embedding_cache = AsyncMock(return_value=0)
+        processor._repo.update_document_embeddings_reused = AsyncMock()
+        return processor
+
+    async def test_chunks_are_embedded_and_saved_in_batches(self, tmp_path, mock_vector_store):
+        doc = tmp_path / "doc.txt"
+        doc.write_text("a b c d e f g", encoding="utf-8")  # 4 chunks of 2 words
+        processor = self._batching_processor(mock_vector_store)
+
+        count = await processor.process_document("doc-1", "bot-1", doc, "txt")
+
+        assert count == 4
+        assert processor._repo.save_chunks.await_count == 2
+        saved = [c for call in processor._repo.save_chunks.call_args_list for c in call.args[0]]
+        assert sorted(c.chunk_index for c in saved) == [0, 1, 2, 3]
+
+    async def test_chunks_are_embedded_while_the_document_streams(
+        self, tmp_path, mock_vector_store, monkeypatch
+    ):
+        embedded = threading.Event()
+        waited: list[bool] = []
+
+        def segments(file_path, file_type, on_progress=None):
+            yield None, 0, "a b c d e"
+            # The first batch must be embedded before extraction goes on
+            waited.append(embedded.wait(timeout=5))
+            yield None, 10, "f g"
+
+        async def embed(texts):
+            embedded.set()
+            return [np.ones(384, dtype=np.float32) for _ in texts]
+
+        monkeypatch.setattr(DocumentProcessor, "iter_segments", staticmethod(segments))
+        mock_vector_store.embed_texts = AsyncMock(side_effect=embed)
+        processor = self._batching_processor(mock_vector_store)
+
+        assert await processor.process_document("doc-1", "bot-1", tmp_path / "doc.txt", "txt") == 4
+        assert waited == [True]
+        assert processor._repo.save_chunks.await_count == 2
+
+    async def test_progress_is_broadcast_while_streaming(self, tmp_path, mock_vector_store):
+        doc = tmp_path / "doc.txt"
+        doc.write_text("".join(f"w{i} x{i}\n" for i in range(8)), encoding="utf-8")
+        processor = self._batching_processor(mock_vector_store)
+        processor._broadcast_status = AsyncMock()  # type: ignore[method-assign]
+
+        assert await processor.process_document("doc-1", "bot-1", doc, "txt") == 8
+
+        updates = [
+            (c.args[2], c.kwargs.get("progress"))
+            for c in processor._broadcast_status.call_args_list
+            if "chunk_count" in c.kwargs
+        ]
+        processing = [progress for status, progress in updates if status == "processing"]
+        assert len(processing) == 4
+        assert all(0 < p < 100 for p in processing)
+        assert processing == sorted(processing)
+        assert updates[-1] == ("ready", 100)
+
+    async def test_transient_embedding_errors_are_retried(
+        self, tmp_path, mock_vector_store, monkeypatch
+    ):
+        import cachibot.services.document_processor as module
+
+        monkeypatch.setattr(module, "_RETRY_BASE_DELAY", 0)
+        doc = tmp_path / "doc.txt"
+        doc.write_text("a b", encoding="utf-8")
+        processor = self._batching_processor(mock_vector_store)
+        mock_vector_store.embed_texts = AsyncMock(
+            side_effect=[RuntimeError("rate limited"), [np.ones(3, dtype=np.float32)]]
+        )
+
+        assert await processor.process_document("doc-1", "bot-1", doc, "txt") == 1
+        assert mock_vector_store.embed_texts.await_count == 2
+
+    async def test_resume_skips_stored_chunks(self, tmp_path, mock_vector_store):
+        doc = tmp_path / "doc.txt"
+        doc.write_text("a b c d e f", encoding="utf-8")
+        stored = [
+            {"chunk_index": 0, "content": "a b"},
+            {"chunk_index": 1, "content": "c d"},
+        ]
+        processor = self._batching_processor(mock_vector_store, stored=stored)
+
+        assert await processor.process_document("doc-1", "bot-1", doc, "txt") == 3
+        saved = processor._repo.save_chunks.call_args[0][0]
+        assert [c.chunk_index for c in saved] == [2]
+        processor._repo.delete_chunks_by_document.assert_not_called()
+
+    async def test_cached_and_duplicate_chunks_skip_the_provider(self, tmp_path, mock_vector_store):
+        import hashlib
+
+        doc = tmp_path / "doc.txt"
+        doc.write_text("a b a b c d", encoding="utf-8")  # chunks: "a b", "a b", "c d"
+        processor = self._batching_processor(mock_vector_store)
+        processor.embed_batch_size = 3
+        cached_hash = hashlib.sha256(b"c d").hexdigest()
+        processor._repo.get_cached_embeddings = AsyncMock(
+            return_value={cached_hash: np.zeros(384, dtype=np.float32)}
+        )
+        mock_vector_store.embed_texts = AsyncMock(return_value=[np.ones(384, dtype=np.float32)])
+
+        assert await processor.process_document("doc-1", "bot-1", doc, "txt") == 3
+
+        mock_vector_store.embed_texts.assert_awaited_once_with(["a b"])
+        saved_cache = processor._repo.save_cached_embeddings.call_args[0][1]
+        assert list(saved_cache) == [hashlib.sha256(b"a b").hexdigest()]
+        processor._repo.update_document_embeddings_reused.assert_awaited_once_with("doc-1", 2)
+        processor._repo.prune_embedding_cache.assert_awaited_once_with(100000)
+
+    async def test_embedding_cache_evicts_the_least_used_entries(self, sqlite_db):
+        repo = KnowledgeRepository()
+        vector = np.ones(4, dtype=np.float32)
+        await repo.save_cached_embeddings("m", {f"h{i}": vector for i in range(4)})
+        await repo.get_cached_embeddings("m", ["h1", "h3"])
+
+        assert await repo.prune_embedding_cache(2) == 2
+        assert await repo.prune_embedding_cache(2) == 0
+        kept = await repo.get_cached_embeddings("m", [f"h{i}" for i in range(4)])
+        assert sorted(kept) == ["h1", "h3"]
+
+    async def test_stale_chunks_are_discarded(self, tmp_path, mock_vector_store):
+        doc = tmp_path / "doc.txt"
+        doc.write_text("a b c d", encoding="utf-8")
+        processor = self._batching_processor(
+            mock_vector_store, stored=[{"chunk_index": 0, "content": "old text"}]
+        )
+
+        await processor.process_document("doc-1", "bot-1", doc, "txt")
+
+        processor._repo.delete_chunks_by_document.assert_awaited_once_with("doc-1")
+        assert processor._repo.save_chunks.await_count == 1
+
+
+class TestIngestionQueue:
+    """Tests for the prioritized, persisted document ingestion queue."""
+
+    @staticmethod
+    def _service(pending=None):
+        processor = MagicMock()
+        processed: list[str] = []
+
+        async def process(document_id, bot_id, file_path, file_type):
+            processed.append(document_id)
+            return 1
+
+        processor.process_document = AsyncMock(side_effect=process)
+        service = IngestionQueueService(workers=1, extraction_processes=0, processor=processor)
+        service._repo = MagicMock()
+        service._repo.save_ingestion_job = AsyncMock()
+        service._repo.delete_ingestion_job = AsyncMock()
+        service._repo.get_pending_ingestion_jobs = AsyncMock(return_value=pending or [])
+        return service, processed
+
+    async def test_interactive_jobs_run_before_bulk(self, tmp_path):
+        service, processed = self._service()
+        for i in range(3):
+            await service.enqueue(f"bulk-{i}", "bot-1", tmp_path / "f.txt", "txt", PRIORITY_BULK)
+        await service.enqueue("upload", "bot-1", tmp_path / "f.txt", "txt", PRIORITY_INTERACTIVE)
+
+        await service.start()
+        await asyncio.wait_for(service._queue.join(), timeout=5)
+        await service.stop()
+
+        assert processed == ["upload", "bulk-0", "bulk-1", "bulk-2"]
+        assert service._repo.save_ingestion_job.await_count == 4
+        assert service._repo.delete_ingestion_job.await_count == 4
+
+    async def test_requeue_at_higher_priority_runs_once(self, tmp_path):
+        service, processed = self._service()
+        await service.enqueue("doc-1", "bot-1", tmp_path / "f.txt", "txt", PRIORITY_BULK)
+        await service.enqueue("doc-2", "bot-1", tmp_path / "f.txt", "txt", PRIORITY_BULK)
+        await service.enqueue("doc-2", "bot-1", tmp_path / "f.txt", "txt", PRIORITY_INTERACTIVE)
+
+        await service.start()
+        await asyncio.wait_for(service._queue.join(), timeout=5)
+        await service.stop()
+
+        assert processed == ["doc-2", "doc-1"]
+
+    async def test_persisted_jobs_resume_on_start(self, tmp_path):
+        pending = [
+            {
+                "document_id": "doc-1",
+                "bot_id": "bot-1",
+                "file_path": str(tmp_path / "f.pdf"),
+                "file_type": "pdf",
+                "priority": PRIORITY_BULK,
+            }
+        ]
+        service, processed = self._service(pending)
+
+        await service.start()
+        await asyncio.wait_for(service._queue.join(), timeout=5)
+        await service.stop()
+
+        assert processed == ["doc-1"]
+        service._repo.delete_ingestion_job.assert_awaited_once_with("doc-1")
+
 
 # ===========================================================================
 # Vector Store Tests
@@ -251,6 +565,57 @@ class TestVectorStoreSerialization:
         assert serialized == [0.0] * 10
 
 
+class TestEmbeddingCodec:
+    """Tests for the binary SQLite embedding format and JSON migration."""
+
+    def test_roundtrip_is_float32_view(self):
+        original = np.random.RandomState(1).randn(1536).astype(np.float32)
+        blob = encode_embedding(original)
+        assert len(blob) == HEADER_SIZE + 1536 * 4
+        decoded = decode_embedding(blob)
+        assert decoded.dtype == np.float32
+        np.testing.assert_array_equal(decoded, original)
+
+    def test_decodes_legacy_json(self):
+        decoded = decode_embedding("[0.5, -1.0, 2.0]")
+        np.testing.assert_allclose(decoded, [0.5, -1.0, 2.0])
+
+    def test_vector_type_reads_mixed_rows(self):
+        from sqlalchemy.dialects import sqlite
+
+        vt = VectorType(3)
+        dialect = sqlite.dialect()
+        blob = vt.process_bind_param([1.0, 2.0, 3.0], dialect)
+        assert isinstance(blob, bytes)
+        np.testing.assert_allclose(vt.process_result_value(blob, dialect), [1.0, 2.0, 3.0])
+        np.testing.assert_allclose(vt.process_result_value("[1, 2, 3]", dialect), [1.0, 2.0, 3.0])
+
+    def test_rewrite_json_embeddings_in_batches(self):
+        import json
+
+        from sqlalchemy import create_engine, text
+
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE doc_chunks (id TEXT PRIMARY KEY, embedding TEXT)"))
+            conn.execute(
+                text("INSERT INTO doc_chunks VALUES (:id, :embedding)"),
+                [{"id": f"c{i}", "embedding": json.dumps([float(i), 1.0])} for i in range(7)],
+            )
+            conn.execute(
+                text("INSERT INTO doc_chunks VALUES ('bin', :embedding)"),
+                {"embedding": encode_embedding([9.0, 9.0])},
+            )
+
+            assert rewrite_json_embeddings(conn, batch_size=3) == 7
+            assert rewrite_json_embeddings(conn, batch_size=3) == 0
+
+            rows = dict(conn.execute(text("SELECT id, embedding FROM doc_chunks")).all())
+        assert all(isinstance(v, bytes) for v in rows.values())
+        np.testing.assert_allclose(decode_embedding(rows["c4"]), [4.0, 1.0])
+        np.testing.assert_allclose(decode_embedding(rows["bin"]), [9.0, 9.0])
+
+
 class TestCosineSimilarity:
     """Tests for cosine similarity computation (standalone numpy tests)."""
 
@@ -411,11 +776,401 @@ class TestVectorStoreSearch:
         assert results[0].document_filename == "guide.pdf"
 
 
+class TestQueryEmbeddingCache:
+    """Tests for the query embedding LRU/TTL cache."""
+
+    async def test_embed_text_hits_cache(self, mock_vector_store):
+        mock_vector_store.query_cache = QueryEmbeddingCache(max_entries=4)
+        mock_vector_store.embed_texts = AsyncMock(return_value=[np.ones(3, dtype=np.float32)])
+
+        first = await mock_vector_store.embed_text("what is  cachibot?")
+        second = await mock_vector_store.embed_text("  what is cachibot? ")
+
+        mock_vector_store.embed_texts.assert_called_once()
+        np.testing.assert_array_equal(first, second)
+        stats = mock_vector_store.query_cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    async def test_keys_include_model(self):
+        cache = QueryEmbeddingCache()
+        await cache.put("model-a", "hello", np.ones(2))
+        assert await cache.get("model-b", "hello") is None
+        assert await cache.get("model-a", "hello") is not None
+
+    async def test_lru_eviction_and_ttl(self, monkeypatch):
+        cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=10)
+        await cache.put("m", "a", np.ones(2))
+        await cache.put("m", "b", np.ones(2))
+        await cache.get("m", "a")  # refresh "a" so "b" is least recently used
+        await cache.put("m", "c", np.ones(2))
+        assert await cache.get("m", "b") is None
+        assert len(cache) == 2
+
+        import cachibot.services.embedding_cache as module
+
+        now = module.time.time()
+        monkeypatch.setattr(module.time, "time", lambda: now + 11)
+        assert await cache.get("m", "a") is None
+
+    async def test_persistent_store_is_pruned_while_running(self, tmp_path):
+        import sqlite3
+
+        path = tmp_path / "cache.db"
+        cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=0, persist_path=path)
+        for i in range(50):
+            await cache.put("m", f"query {i}", np.ones(2))
+
+        conn = sqlite3.connect(path)
+        (rows,) = conn.execute("SELECT count(*) FROM query_embeddings").fetchone()
+        conn.close()
+        assert rows <= 2 * 8  # max_entries * _PERSIST_FACTOR
+        assert await cache.get("m", "query 49") is not None
+
+    async def test_persistent_store_survives_restart(self, tmp_path):
+        path = tmp_path / "cache.db"
+        await QueryEmbeddingCache(persist_path=path).put("m", "q", np.array([0.5, 0.25]))
+
+        reopened = QueryEmbeddingCache(persist_path=path)
+        vector = await reopened.get("m", "q")
+        np.testing.assert_array_equal(vector, [0.5, 0.25])
+        assert reopened.stats()["persistent_hits"] == 1
+
+
+class TestBotVectorIndex:
+    """Tests for the in-memory per-bot vector index used on SQLite."""
+
+    def test_search_matches_bruteforce_cosine(self):
+        rng = np.random.RandomState(7)
+        matrix = rng.randn(200, 32).astype(np.float32)
+        query = rng.randn(32).astype(np.float32)
+        index = BotVectorIndex()
+        index.add([f"c{i}" for i in range(200)], ["doc-1"] * 200, list(matrix))
+
+        results = index.search(query, limit=5, min_score=-1.0)
+
+        expected = (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)) @ (
+            query / np.linalg.norm(query)
+        )
+        top = np.argsort(-expected)[:5]
+        assert [cid for cid, _ in results] == [f"c{i}" for i in top]
+        np.testing.assert_allclose([s for _, s in results], expected[top], atol=1e-5)
+
+    def test_min_score_filters(self):
+        index = BotVectorIndex()
+        index.add(["a", "b"], ["doc-1", "doc-1"], [[1.0, 0.0], [0.0, 1.0]])
+        results = index.search(np.array([1.0, 0.0]), limit=10, min_score=0.5)
+        assert results == [("a", pytest.approx(1.0))]
+
+    def test_incremental_add_and_remove(self):
+        index = BotVectorIndex()
+        index.add(["a"], ["doc-1"], [[1.0, 0.0]])
+        index.add(["b"], ["doc-2"], [[0.9, 0.1]])
+        assert len(index) == 2
+
+        assert index.remove_documents(["doc-1"]) == 1
+        assert [cid for cid, _ in index.search(np.array([1.0, 0.0]), limit=5)] == ["b"]
+
+    def test_dimension_mismatch_is_ignored(self):
+        index = BotVectorIndex()
+        index.add(["a"], ["doc-1"], [[1.0, 0.0, 0.0]])
+        assert index.search(np.array([1.0, 0.0]), limit=5) == []
+
+    async def test_registry_builds_once_and_applies_updates(self, monkeypatch):
+        from cachibot.storage.repository import KnowledgeRepository
+
+        load = AsyncMock(
+            return_value=[{"id": "a", "document_id": "doc-1", "embedding": [1.0, 0.0]}]
+        )
+        monkeypatch.setattr(KnowledgeRepository, "get_all_embeddings_by_bot", load)
+        registry = VectorIndexRegistry()
+
+        index = await registry.get_or_build("bot-1")
+        assert await registry.get_or_build("bot-1") is index
+        load.assert_called_once_with("bot-1")
+
+        registry.on_chunks_added("bot-1", ["b"], ["doc-2"], [[0.0, 1.0]])
+        assert len(index) == 2
+        registry.on_document_removed("doc-1")
+        assert [cid for cid, _ in index.search(np.array([0.0, 1.0]), limit=5)] == ["b"]
+
+
+class TestIvfIndex:
+    """Tests for the optional IVF (approximate) search on the in-memory index."""
+
+    @staticmethod
+    def _clustered(n_clusters=8, per_cluster=100, dim=16, seed=3):
+        rng = np.random.RandomState(seed)
+        centers = rng.randn(n_clusters, dim).astype(np.float32)
+        rows = np.repeat(centers, per_cluster, axis=0)
+        rows += 0.05 * rng.randn(*rows.shape).astype(np.float32)
+        return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+    def test_train_ivf_assigns_every_row(self):
+        rows = self._clustered()
+        centroids, assignments = train_ivf(rows, 8)
+        assert centroids.shape == (8, 16)
+        assert assignments.shape == (800,)
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+        # Rows of one synthetic cluster land in the same IVF list
+        assert len(set(assignments[:100].tolist())) == 1
+
+    async def test_full_probe_matches_exact(self):
+        rows = self._clustered()
+        ids = [f"c{i}" for i in range(len(rows))]
+        index = BotVectorIndex()
+        index.add(ids, ["doc-1"] * len(rows), list(rows))
+        ann = AnnSettings(mode="ivfflat", nprobe=8, ivf_lists=8, min_chunks=1)
+
+        index.prepare_ann(ann)
+        await asyncio.gather(*(b.training for b in index._blocks.values() if b.training))
+
+        query = rows[5] + 0.01
+        exact = index.search(query, limit=10, min_score=-1.0)
+        approx = index.search(query, limit=10, min_score=-1.0, ann=ann)
+        assert [cid for cid, _ in approx] == [cid for cid, _ in exact]
+
+    async def test_small_bots_stay_exact(self):
+        index = BotVectorIndex()
+        index.add(["a", "b"], ["doc-1", "doc-1"], [[1.0, 0.0], [0.0, 1.0]])
+        index.prepare_ann(AnnSettings(mode="hnsw", min_chunks=1000))
+        assert all(b.training is None and b.centroids is None for b in index._blocks.values())
+
+    def test_skill_config_overrides(self):
+        defaults = AnnSettings()
+        merged = VectorStore._apply_ann_overrides(
+            defaults, {"ann_mode": "ivfflat", "nprobe": "4", "ef_search": "bad", "x": 1}
+        )
+        assert merged == AnnSettings(mode="ivfflat", nprobe=4)
+        assert VectorStore._apply_ann_overrides(defaults, {"ann_mode": "nope"}) is defaults
+
+    def test_zero_and_negative_overrides_are_clamped(self):
+        merged = VectorStore._apply_ann_overrides(
+            AnnSettings(), {"ef_search": 0, "nprobe": -5, "ivf_lists": -1, "ann_min_chunks": -1}
+        )
+        assert (merged.ef_search, merged.nprobe) == (1, 1)
+        assert (merged.ivf_lists, merged.min_chunks) == (0, 0)  # 0 = auto / always ANN
+
+
+class TestPgvectorAnn:
+    """Tests for ANN search on the shared pgvector index (PostgreSQL only)."""
+
+    @pytest.fixture
+    async def two_bots(self, pg_db):
+        """A bot with many chunks near the query and one with a few far from it."""
+        from cachibot.models.knowledge import Document
+        from cachibot.storage import db as db_mod
+        from cachibot.storage.models.bot import Bot
+
+        async with pg_db() as session:
+            for bot_id in ("big", "small"):
+                session.add(Bot(id=bot_id, name=bot_id, model="test/model", system_prompt=""))
+            await session.commit()
+
+        rng = np.random.RandomState(11)
+        query = np.zeros(3072, dtype=np.float32)
+        query[0] = 1.0
+        repo = KnowledgeRepository()
+        for bot_id, count, spread in (("big", 400, 0.1), ("small", 5, 2.0)):
+            await repo.save_document(
+                Document(
+                    id=f"{bot_id}-doc",
+                    bot_id=bot_id,
+                    filename=f"{bot_id}.txt",
+                    file_type="txt",
+                    file_hash=bot_id,
+                    file_size=1,
+                    uploaded_at=datetime.now(timezone.utc),
+                )
+            )
+            vectors = query + spread * rng.randn(count, 3072).astype(np.float32)
+            await repo.save_chunks(
+                [
+                    DocChunk(
+                        id=f"{bot_id}-{i}",
+                        document_id=f"{bot_id}-doc",
+                        bot_id=bot_id,
+                        chunk_index=i,
+                        content=f"{bot_id} {i}",
+                        embedding=vector.tolist(),
+                    )
+                    for i, vector in enumerate(vectors)
+                ]
+            )
+
+        async with db_mod.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.run_sync(db_mod.ensure_ann_index, "hnsw")
+        return query
+
+    async def test_small_bot_below_threshold_uses_exact_search(self, two_bots):
+        store = VectorStore(model_name="test-model")
+        ann = AnnSettings(mode="hnsw", ef_search=10, min_chunks=100)
+
+        small = await store._search_pgvector("small", two_bots, 5, -1.0, ann)
+        big = await store._search_pgvector("big", two_bots, 5, -1.0, ann)
+        assert sorted(r.chunk.id for r in small) == [f"small-{i}" for i in range(5)]
+        assert len(big) == 5 and all(r.chunk.bot_id == "big" for r in big)
+
+    async def test_small_bot_is_not_crowded_out_of_the_index(self, two_bots):
+        store = VectorStore(model_name="test-model")
+        ann = AnnSettings(mode="hnsw", ef_search=10, min_chunks=0)
+
+        small = await store._search_pgvector("small", two_bots, 5, -1.0, ann)
+        if not store._pg_iterative_scan:
+            pytest.skip("pgvector < 0.8 has no iterative index scans")
+        assert sorted(r.chunk.id for r in small) == [f"small-{i}" for i in range(5)]
+        assert [r.score for r in small] == sorted((r.score for r in small), reverse=True)
+
+
 # ===========================================================================
 # Context Builder Tests
 # ===========================================================================
 
 
+class TestHybridSearch:
+    """Tests for full-text indexes and reciprocal rank fusion."""
+
+    @pytest.fixture
+    async def fts_db(self, tmp_path, monkeypatch):
+        """File-backed SQLite database with the full-text indexes installed."""
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+        import cachibot.storage.models  # noqa: F401
+        from cachibot.storage import db as db_mod
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'kb.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(db_mod.Base.metadata.create_all)
+            await conn.run_sync(db_mod.ensure_fulltext_index)
+        monkeypatch.setattr(db_mod, "engine", engine)
+        monkeypatch.setattr(
+            db_mod,
+            "async_session_maker",
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        monkeypatch.setattr(db_mod, "db_type", "sqlite")
+        yield
+        await engine.dispose()
+
+    @staticmethod
+    def _note(note_id: str, title: str, content: str, bot_id: str = "bot-1") -> BotNote:
+        now = datetime.now(timezone.utc)
+        return BotNote(
+            id=note_id,
+            bot_id=bot_id,
+            title=title,
+            content=content,
+            source=NoteSource.USER,
+            created_at=now,
+            updated_at=now,
+        )
+
+    @staticmethod
+    def _result(chunk_id: str, score: float) -> SearchResult:
+        chunk = DocChunk(
+            id=chunk_id, document_id="doc-1", bot_id="bot-1", chunk_index=0, content=chunk_id
+        )
+        return SearchResult(chunk=chunk, score=score)
+
+    async def test_notes_fulltext_is_ranked_and_incremental(self, fts_db):
+        repo = NotesRepository()
+        await repo.save_note(self._note("n1", "Deploy runbook", "Restart workers on ERR_4012."))
+        await repo.save_note(self._note("n2", "Groceries", "Milk, eggs and bread."))
+        await repo.save_note(self._note("n3", "Other bot", "ERR_4012 here too.", bot_id="bot-2"))
+
+        assert [n.id for n in await repo.search_notes("bot-1", "err_4012")] == ["n1"]
+        assert [n.id for n in await repo.search_notes("bot-1", "runb")] == ["n1"]  # prefix
+        assert await repo.search_notes("bot-1", "milk runbook") == []  # all terms required
+
+        await repo.update_note("n2", content="Fix ERR_4012 after groceries.")
+        assert {n.id for n in await repo.search_notes("bot-1", "ERR 4012")} == {"n1", "n2"}
+
+        await repo.delete_note("n1")
+        assert [n.id for n in await repo.search_notes("bot-1", "4012")] == ["n2"]
+
+    async def test_notes_search_without_terms_falls_back_to_like(self, fts_db):
+        repo = NotesRepository()
+        await repo.save_note(self._note("n1", "Symbols", "Use the -> operator"))
+
+        assert [n.id for n in await repo.search_notes("bot-1", "->")] == ["n1"]
+
+    async def test_keyword_search_chunks_filters_by_bot(self, fts_db):
+        repo = KnowledgeRepository()
+        await repo.save_chunks(
+            [
+                DocChunk(
+                    id="c1",
+                    document_id="d1",
+                    bot_id="bot-1",
+                    chunk_index=0,
+                    content="Invoice INV-20931 was refunded.",
+                ),
+                DocChunk(
+                    id="c2",
+                    document_id="d1",
+                    bot_id="bot-1",
+                    chunk_index=1,
+                    content="Nothing to see here.",
+                ),
+            ]
+        )
+        await repo.save_chunks(
+            [
+                DocChunk(
+                    id="c3",
+                    document_id="d2",
+                    bot_id="bot-2",
+                    chunk_index=0,
+                    content="INV-20931 belongs to someone else.",
+                ),
+            ]
+        )
+
+        assert await repo.keyword_search_chunks("bot-1", "inv-20931") == ["c1"]
+        await repo.delete_chunks_by_document("d1")
+        assert await repo.keyword_search_chunks("bot-1", "inv-20931") == []
+
+    async def test_rrf_promotes_chunks_found_by_both(self, mock_vector_store):
+        store = mock_vector_store
+        store.hybrid = True
+        store.embed_text = AsyncMock(return_value=np.array([1.0, 0.0], dtype=np.float32))
+        store._search_in_memory = AsyncMock(
+            return_value=[self._result("a", 0.9), self._result("b", 0.8)]
+        )
+        store._search_pgvector = store._search_in_memory
+        store._repo = MagicMock()
+        store._repo.keyword_search_chunks = AsyncMock(return_value=["b", "c"])
+        keyword_only = DocChunk(
+            id="c",
+            document_id="doc-2",
+            bot_id="bot-1",
+            chunk_index=3,
+            content="ERR_4012",
+            embedding=[0.6, 0.8],
+        )
+        store._repo.get_chunks_by_ids = AsyncMock(return_value=[keyword_only])
+
+        results = await store.search_similar("bot-1", "ERR_4012", limit=3, min_score=0.5)
+
+        assert [r.chunk.id for r in results] == ["b", "a", "c"]
+        assert results[2].score == pytest.approx(0.6)  # cosine, not the fused rank
+        assert results[2].chunk.embedding is None
+        store._repo.keyword_search_chunks.assert_awaited_once_with("bot-1", "ERR_4012", 12)
+
+    async def test_hybrid_disabled_skips_keyword_search(self, mock_vector_store):
+        store = mock_vector_store
+        store.embed_text = AsyncMock(return_value=np.ones(4, dtype=np.float32))
+        store._search_in_memory = AsyncMock(return_value=[self._result("a", 0.9)])
+        store._search_pgvector = store._search_in_memory
+        store._repo = MagicMock()
+        store._repo.keyword_search_chunks = AsyncMock(return_value=["z"])
+
+        results = await store.search_similar("bot-1", "query", limit=3)
+
+        assert [r.chunk.id for r in results] == ["a"]
+        store._repo.keyword_search_chunks.assert_not_called()
+
+
 class TestKnowledgeContext:
     """Tests for KnowledgeContext.to_prompt_section formatting."""
 
@@ -446,7 +1201,8 @@ class TestKnowledgeContext:
             notes="notes",
         )
         result = ctx.to_prompt_section()
-        # Skills should come first, then instructions, notes, contacts, docs, history
+        # Stable sections (skills, instructions, contacts) come before the
+        # message-dependent ones (notes, docs, history)
         skills_pos = result.index("Active Skills")
         instructions_pos = result.index("Custom Instructions")
         notes_pos = result.index("Notes")
@@ -455,11 +1211,28 @@ class TestKnowledgeContext:
         history_pos = result.index("Recent Conversation Summary")
 
         assert skills_pos < instructions_pos
-        assert instructions_pos < notes_pos
-        assert notes_pos < contacts_pos
-        assert contacts_pos < docs_pos
+        assert instructions_pos < contacts_pos
+        assert contacts_pos < notes_pos
+        assert notes_pos < docs_pos
         assert docs_pos < history_pos
 
+    def test_stable_and_volatile_sections(self):
+        ctx = KnowledgeContext(
+            instructions="instructions",
+            relevant_docs="docs",
+            recent_history=None,
+            contacts="contacts",
+            skills=None,
+            notes="notes",
+        )
+        assert ctx.stable_prompt_section() == (
+            "## Custom Instructions\ninstructions\n\n---\n\n## Known Contacts\ncontacts"
+        )
+        assert "Custom Instructions" not in ctx.volatile_prompt_section()
+        assert ctx.to_prompt_section() == (
+            ctx.stable_prompt_section() + "\n\n---\n\n" + ctx.volatile_prompt_section()
+        )
+
     def test_empty_context(self):
         ctx = KnowledgeContext(
             instructions=None,
@@ -675,3 +1448,299 @@ class TestContextBuilderBuildContext:
             user_message="hi",
         )
         assert "You are a helpful AI assistant." in prompt
+
+    @staticmethod
+    def _empty_builder(**kwargs) -> ContextBuilder:
+        builder = ContextBuilder(vector_store=MagicMock(), **kwargs)
+        builder._vector_store.search_with_filenames = AsyncMock(return_value=[])
+        builder._repo = MagicMock()
+        builder._repo.get_instructions = AsyncMock(return_value=None)
+        builder._repo.get_bot_messages = AsyncMock(return_value=[])
+        builder._contacts_repo = MagicMock()
+        builder._contacts_repo.get_contacts_by_bot = AsyncMock(return_value=[])
+        builder._skills_repo = MagicMock()
+        builder._skills_repo.get_bot_skill_definitions = AsyncMock(return_value=[])
+        builder._notes_repo = MagicMock()
+        builder._notes_repo.search_notes = AsyncMock(return_value=[])
+        builder._notes_repo.get_notes_by_bot = AsyncMock(return_value=[])
+        return builder
+
+    async def test_build_context_fetches_sources_concurrently(self):
+        builder = self._empty_builder()
+
+        async def slow_instructions(bot_id):
+            await asyncio.sleep(0.2)
+            return MagicMock(content="Be brief.")
+
+        async def slow_search(**kwargs):
+            await asyncio.sleep(0.2)
+            return []
+
+        builder._repo.get_instructions = slow_instructions
+        builder._vector_store.search_with_filenames = slow_search
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ctx = await builder.build_context("bot-1", "hello")
+        elapsed = loop.time() - started
+
+        assert ctx.instructions == "Be brief."
+        assert elapsed < 0.35
+        assert set(ctx.timings) == {
+            "skills",
+            "instructions",
+            "contacts",
+            "notes",
+            "documents",
+            "summary",
+            "history",
+        }
+        assert ctx.timings["documents"] >= 150
+
+    async def test_build_context_skips_slow_source(self):
+        builder = self._empty_builder(documents_timeout=0.05)
+        instruction_mock = MagicMock()
+        instruction_mock.content = "Always be polite."
+        builder._repo.get_instructions = AsyncMock(return_value=instruction_mock)
+
+        async def hanging_search(**kwargs):
+            await asyncio.sleep(10)
+
+        builder._vector_store.search_with_filenames = hanging_search
+
+        ctx = await asyncio.wait_for(builder.build_context("bot-1", "hello"), 1)
+
+        assert ctx.relevant_docs is None
+        assert ctx.timed_out == ["documents"]
+        assert ctx.instructions == "Always be polite."
+
+    async def test_build_context_failed_source_degrades(self):
+        builder = self._empty_builder(concurrent=False)
+        builder._repo.get_instructions = AsyncMock(side_effect=RuntimeError("db down"))
+        builder._contacts_repo.get_contacts_by_bot = AsyncMock(
+            return_value=[MagicMock(details=None)]
+        )
+        builder._contacts_repo.get_contacts_by_bot.return_value[0].name = "Ana"
+
+        ctx = await builder.build_context("bot-1", "hello", include_contacts=True)
+
+        assert ctx.instructions is None
+        assert ctx.contacts == "- Ana"
+        assert ctx.timed_out == []
+
+    async def test_build_context_packs_into_budget(self):
+        builder = self._empty_builder(max_context_tokens=60, context_window_ratio=0)
+        contacts = [MagicMock(details=None) for _ in range(200)]
+        for i, contact in enumerate(contacts):
+            contact.name = f"Contact number {i}"
+        builder._contacts_repo.get_contacts_by_bot = AsyncMock(return_value=contacts)
+        builder._repo.get_instructions = AsyncMock(return_value=MagicMock(content="Be brief."))
+
+        ctx = await builder.build_context("bot-1", "hello", include_contacts=True)
+
+        assert ctx.instructions == "Be brief."
+        assert ctx.packing is not None
+        assert ctx.packing.total_tokens <= 60
+        assert ctx.packing.dropped["contacts"] > 0
+        assert ctx.contacts is not None
+        assert ctx.contacts.startswith("- Contact number 0")
+
+    async def test_prompt_prefix_is_stable_across_messages(self):
+        builder = self._empty_builder(setup_cache=AgentSetupCache())
+        builder._repo.get_instructions = AsyncMock(return_value=MagicMock(content="Be brief."))
+
+        async def search(bot_id, query, **kwargs):
+            chunk = DocChunk(
+                id="c-1", document_id="d-1", bot_id=bot_id, chunk_index=0, content=query
+            )
+            return [SearchResult(chunk=chunk, score=0.9, document_filename="faq.md")]
+
+        builder._vector_store.search_with_filenames = search
+
+        first = await builder.build_prompt_parts("You are CachiBot.", "bot-1", "first question")
+        second = await builder.build_prompt_parts("You are CachiBot.", "bot-1", "second one")
+
+        assert first.prefix == second.prefix
+        assert "Be brief." in first.prefix
+        assert "first question" in first.suffix
+        assert "second one" in second.suffix
+        assert first.prompt.startswith(first.prefix)
+        # Stable sources come from the setup cache on the second turn
+        assert builder._repo.get_instructions.await_count == 1
+
+    async def test_setup_cache_invalidation_refetches_stable_sources(self):
+        cache = AgentSetupCache()
+        builder = self._empty_builder(setup_cache=cache)
+        builder._repo.get_instructions = AsyncMock(return_value=MagicMock(content="Old."))
+        await builder.build_context("bot-1", "hello")
+
+        builder._repo.get_instructions.return_value = MagicMock(content="New.")
+        cache.invalidate_bot("bot-1")
+        ctx = await builder.build_context("bot-1", "hello")
+
+        assert ctx.instructions == "New."
+
+
+class TestContextPacker:
+    """Tests for token-budgeted context packing."""
+
+    def test_zero_budget_keeps_everything(self):
+        result = ContextPacker().pack({"contacts": ["- a", "- b"], "notes": None}, budget=0)
+        assert result.sections["contacts"] == "- a\n- b"
+        assert result.sections["notes"] is None
+        assert result.dropped == {}
+        assert result.tokens["contacts"] > 0
+
+    def test_lowest_priority_dropped_first(self):
+        instructions = "Follow the house style. " * 5
+        contacts = [f"- Person {i} with a fairly long description" for i in range(50)]
+        budget = 400
+        result = ContextPacker().pack(
+            {"instructions": [instructions], "contacts": contacts}, budget=budget
+        )
+        assert result.sections["instructions"] == instructions
+        assert result.dropped["contacts"] > 0
+        assert result.total_tokens <= budget
+
+    def test_static_sections_ignore_dynamic_items(self):
+        contacts = [f"- Person {i} with a fairly long description" for i in range(50)]
+        packer = ContextPacker()
+        alone = packer.pack({"contacts": contacts}, budget=400)
+        crowded = packer.pack(
+            {"contacts": contacts, "documents": ["doc " * 300], "notes": ["note " * 100]},
+            budget=400,
+        )
+        assert alone.sections["contacts"] == crowded.sections["contacts"]
+        assert crowded.total_tokens <= 400
+
+    def test_history_keeps_newest_messages(self):
+        history = [f"user: message {i} " + "word " * 20 for i in range(20)]
+        result = ContextPacker().pack({"history": history}, budget=120)
+        packed = result.sections["history"]
+        assert packed is not None
+        assert packed.endswith(history[-1])
+        assert "message 0 " not in packed
+        assert result.dropped["history"] > 0
+
+    def test_oversized_instructions_are_truncated(self):
+        instructions = "Rule. " * 2000
+        result = ContextPacker().pack({"instructions": [instructions]}, budget=200)
+        packed = result.sections["instructions"]
+        assert packed is not None
+        assert packed.endswith("...")
+        assert result.total_tokens <= 200
+        assert "instructions" not in result.dropped
+        assert result.truncated == {"instructions": 1}
+
+    def test_items_are_only_truncated_when_the_leftover_budget_is_too_small(self):
+        instructions = "Follow the house style. " * 300  # well over its 15% share
+        result = ContextPacker().pack({"instructions": [instructions]}, budget=6000)
+        assert result.sections["instructions"] == instructions
+        assert result.truncated == {}
+
+        document = "word " * 4000  # over its share, fits once the budget is free
+        result = ContextPacker().pack({"documents": [document]}, budget=6000)
+        assert result.sections["documents"] == document
+        assert result.truncated == {}
+
+    def test_to_dict(self):
+        result = ContextPacker().pack({"notes": ["### Note\nbody"]}, budget=500)
+        data = result.to_dict()
+        assert data["budget"] == 500
+        assert data["totalTokens"] == result.tokens["notes"]
+        assert data["sections"] == {"notes": result.tokens["notes"]}
+        assert data["droppedItems"] == {}
+        assert data["truncatedItems"] == {}
+
+
+class TestConversationSummarizer:
+    """Tests for rolling per-chat conversation summaries."""
+
+    @staticmethod
+    def _messages(count: int) -> list[BotMessage]:
+        return [
+            BotMessage(
+                id=f"m-{i:03d}",
+                bot_id="bot-1",
+                chat_id="chat-1",
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"message {i}",
+                timestamp=datetime(2026, 1, 1, 0, 0, i, tzinfo=timezone.utc),
+            )
+            for i in range(count)
+        ]
+
+    def _summarizer(self, pending: int, **kwargs) -> ConversationSummarizer:
+        summarizer = ConversationSummarizer(**kwargs)
+        summarizer._repo = MagicMock()
+        summarizer._repo.get_chat_summary = AsyncMock(return_value=None)
+        summarizer._repo.count_unsummarized_messages = AsyncMock(return_value=pending)
+        summarizer._repo.get_unsummarized_messages = AsyncMock(
+            side_effect=lambda bot_id, chat_id, summary, limit: self._messages(limit)
+        )
+        summarizer._repo.save_chat_summary = AsyncMock()
+        summarizer._fold = AsyncMock(return_value="They talked.")  # type: ignore[method-assign]
+        return summarizer
+
+    async def test_recent_messages_are_not_folded(self):
+        summarizer = self._summarizer(pending=12, keep_recent=10, min_batch=6)
+        assert await summarizer.summarize("bot-1", "chat-1", "openai/gpt-4o-mini") is False
+        summarizer._fold.assert_not_called()
+        summarizer._repo.save_chat_summary.assert_not_called()
+
+    async def test_folds_older_messages_and_advances_watermark(self):
+        summarizer = self._summarizer(pending=18, keep_recent=10, min_batch=6)
+        # The second pass sees the watermark moved past the folded messages
+        summarizer._repo.count_unsummarized_messages = AsyncMock(side_effect=[18, 10])
+
+        assert await summarizer.summarize("bot-1", "chat-1", "openai/gpt-4o-mini") is True
+        summarizer._repo.get_unsummarized_messages.assert_awaited_once_with(
+            "bot-1", "chat-1", None, limit=8
+        )
+        saved: ChatSummary = summarizer._repo.save_chat_summary.call_args.args[0]
+        assert saved.content == "They talked."
+        assert saved.last_message_id == "m-007"
+        assert saved.message_count == 8
+
+    async def test_builder_includes_summary_before_history(self):
+        builder = ContextBuilder(vector_store=MagicMock())
+        builder._repo = MagicMock()
+        builder._repo.get_instructions = AsyncMock(return_value=None)
+        builder._repo.get_bot_messages = AsyncMock(return_value=self._messages(2))
+        summary = ChatSummary(
+            chat_id="chat-1",
+            bot_id="bot-1",
+            content="Earlier, the user asked about invoices.",
+            last_message_id="m-000",
+            last_message_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            message_count=40,
+            updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        builder._repo.get_chat_summary = AsyncMock(return_value=summary)
+        builder._contacts_repo = MagicMock()
+        builder._contacts_repo.get_contacts_by_bot = AsyncMock(return_value=[])
+        builder._skills_repo = MagicMock()
+        builder._skills_repo.get_bot_skill_definitions = AsyncMock(return_value=[])
+        builder._notes_repo = MagicMock()
+        builder._notes_repo.search_notes = AsyncMock(return_value=[])
+        builder._notes_repo.get_notes_by_bot = AsyncMock(return_value=[])
+        builder._vector_store.search_with_filenames = AsyncMock(return_value=[])
+
+        ctx = await builder.build_context("bot-1", "hello", chat_id="chat-1")
+        assert ctx.conversation_summary == "Earlier, the user asked about invoices."
+        section = ctx.volatile_prompt_section()
+        assert section.index("Earlier Conversation Summary") < section.index("message 1")
+
+    async def test_history_starts_at_the_summary_watermark(self):
+        builder = ContextBuilder(vector_store=MagicMock(), max_history_messages=10)
+        builder._repo = MagicMock()
+        summary = MagicMock()
+        builder._repo.get_chat_summary = AsyncMock(return_value=summary)
+        # 15 messages the summarizer has not folded yet (more than max_history_messages)
+        builder._repo.get_bot_messages = AsyncMock(return_value=self._messages(15))
+
+        history = await builder._get_recent_history("bot-1", "chat-1")
+        assert history is not None and len(history) == 15
+        kwargs = builder._repo.get_bot_messages.await_args.kwargs
+        assert kwargs["after"] is summary
+        assert kwargs["limit"] >= 15
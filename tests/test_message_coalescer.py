@@ -0,0 +1,63 @@
+"""Tests for merging bursts of platform messages into single turns."""
+
+import asyncio
+
+from cachibot.services.message_coalescer import MessageCoalescer, merge_messages
+
+
+async def test_burst_is_merged_into_first_message():
+    coalescer = MessageCoalescer(max_wait=1.0)
+    typing_calls = 0
+
+    async def keep_typing() -> None:
+        nonlocal typing_calls
+        typing_calls += 1
+
+    first = asyncio.create_task(
+        coalescer.collect(
+            "conn-1", "chat-1", 0.05, "hi", {"message_id": "1"}, keep_typing=keep_typing
+        )
+    )
+    await asyncio.sleep(0.01)
+    second = await coalescer.collect(
+        "conn-1", "chat-1", 0.05, "are you there?", {"message_id": "2", "attachments": ["img"]}
+    )
+    assert second is None
+
+    merged = await first
+    assert merged is not None
+    text, metadata = merged
+    assert text == "hi\nare you there?"
+    assert metadata["attachments"] == ["img"]
+    assert metadata["coalesced_count"] == 2
+    assert metadata["coalesced_message_ids"] == ["1", "2"]
+    assert typing_calls >= 1
+
+
+async def test_other_chats_are_not_merged():
+    coalescer = MessageCoalescer()
+    results = await asyncio.gather(
+        coalescer.collect("conn-1", "chat-1", 0.01, "a", {}),
+        coalescer.collect("conn-1", "chat-2", 0.01, "b", {}),
+    )
+    assert [r[0] for r in results if r] == ["a", "b"]
+
+
+async def test_burst_closes_at_max_wait():
+    coalescer = MessageCoalescer(max_wait=0.05)
+    first = asyncio.create_task(coalescer.collect("conn-1", "chat-1", 0.03, "1", {}))
+    for i in range(2, 8):
+        await asyncio.sleep(0.02)
+        await coalescer.collect("conn-1", "chat-1", 0.03, str(i), {})
+    merged = await asyncio.wait_for(first, timeout=0.2)
+    assert merged is not None
+    assert merged[0].startswith("1\n2")
+
+
+def test_merge_keeps_first_reply_context():
+    text, metadata = merge_messages(
+        ["one", "two"],
+        [{"reply_to_text": "earlier", "platform": "telegram"}, {"platform": "telegram"}],
+    )
+    assert text == "one\ntwo"
+    assert metadata["reply_to_text"] == "earlier"
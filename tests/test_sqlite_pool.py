@@ -0,0 +1,56 @@
+"""Tests for the SQLite reader pool / single writer engine mode."""
+
+from sqlalchemy import select, text
+
+from cachibot.storage import db
+
+
+async def test_reads_use_reader_pool_until_session_writes(tmp_path):
+    engine, session_maker, reader = db._create_engine_from_url(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", sqlite_readers=2
+    )
+    assert reader is not None
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+
+        async with session_maker() as session:
+            sync_session = session.sync_session
+            assert sync_session.get_bind(clause=select(1)) is reader.sync_engine
+            assert sync_session.get_bind(clause=text("SELECT 1")) is reader.sync_engine
+
+            await session.execute(text("INSERT INTO items (name) VALUES ('a')"))
+            # After writing, reads stay on the writer and see the uncommitted row
+            assert sync_session.get_bind(clause=select(1)) is engine.sync_engine
+            result = await session.execute(text("SELECT count(*) FROM items"))
+            assert result.scalar() == 1
+            await session.commit()
+
+        async with session_maker() as session:
+            result = await session.execute(text("SELECT name FROM items"))
+            assert result.scalars().all() == ["a"]
+    finally:
+        await reader.dispose()
+        await engine.dispose()
+
+
+async def test_reader_connections_are_read_only(tmp_path):
+    engine, _session_maker, reader = db._create_engine_from_url(
+        f"sqlite+aiosqlite:///{tmp_path / 'ro.db'}", sqlite_readers=1
+    )
+    assert reader is not None
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        async with reader.connect() as conn:
+            result = await conn.execute(text("PRAGMA query_only"))
+            assert result.scalar() == 1
+    finally:
+        await reader.dispose()
+        await engine.dispose()
+
+
+def test_shared_connection_by_default():
+    engine, _session_maker, reader = db._create_engine_from_url("sqlite+aiosqlite:///:memory:")
+    assert reader is None
+    engine.sync_engine.dispose()
@@ -0,0 +1,250 @@
+"""Tests for the job runner's in-memory task scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cachibot.models.work import Priority, Task, TaskStatus, Work, WorkStatus
+from cachibot.services import job_runner as job_runner_module
+from cachibot.services.job_runner import JobRunnerService
+from cachibot.services.task_scheduler import TaskScheduler
+from cachibot.storage.models.bot import Bot
+from cachibot.storage.work_repository import TaskRepository, WorkRepository
+
+_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _work(work_id: str, bot_id: str = "bot-1", **kwargs) -> Work:
+    kwargs.setdefault("created_at", _NOW)
+    return Work(id=work_id, bot_id=bot_id, title=work_id, **kwargs)
+
+
+def _task(task_id: str, work: Work, order: int = 0, **kwargs) -> Task:
+    return Task(
+        id=task_id, bot_id=work.bot_id, work_id=work.id, title=task_id, order=order, **kwargs
+    )
+
+
+def _taken(scheduler: TaskScheduler) -> list[str]:
+    return [task.id for _work, task in scheduler.take()]
+
+
+def test_dependents_run_once_their_dependencies_complete():
+    scheduler = TaskScheduler(max_jobs=5)
+    work = _work("w")
+    scheduler.load(
+        work,
+        [
+            _task("a", work, 0),
+            _task("b", work, 1),
+            _task("c", work, 2, depends_on=["a", "b"]),
+            _task("d", work, 3, depends_on=["c"]),
+        ],
+    )
+
+    assert _taken(scheduler) == ["a", "b"]
+    scheduler.complete("w", "a")
+    scheduler.release("bot-1", "a")
+    assert _taken(scheduler) == []
+
+    scheduler.complete("w", "b")
+    scheduler.release("bot-1", "b")
+    assert _taken(scheduler) == ["c"]
+    scheduler.complete("w", "c")
+    assert _taken(scheduler) == ["d"]
+
+
+def test_load_counts_completed_and_skips_claimed_tasks():
+    scheduler = TaskScheduler(max_jobs=5)
+    work = _work("w")
+    tasks = [
+        _task("a", work, 0, status=TaskStatus.COMPLETED),
+        _task("b", work, 1, depends_on=["a"]),
+        _task("c", work, 2, depends_on=["b"]),
+    ]
+    scheduler.load(work, tasks)
+    assert _taken(scheduler) == ["b"]
+
+    # Reloaded while "b" runs (its row may still say pending): no second run
+    scheduler.load(work, tasks)
+    assert _taken(scheduler) == []
+    scheduler.complete("w", "b")
+    assert _taken(scheduler) == ["c"]
+
+
+def test_dropped_work_is_not_dispatched():
+    scheduler = TaskScheduler(max_jobs=5)
+    work = _work("w")
+    scheduler.load(work, [_task("a", work)])
+    scheduler.drop("w")
+    assert _taken(scheduler) == []
+
+
+def test_deferred_task_waits_for_its_backoff_across_reloads(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("cachibot.services.task_scheduler.time.monotonic", lambda: clock[0])
+    scheduler = TaskScheduler(max_jobs=5)
+    work = _work("w")
+    tasks = [_task("a", work, 0), _task("b", work, 1)]
+    scheduler.load(work, tasks)
+    assert _taken(scheduler) == ["a", "b"]
+
+    # "a" failed and will be retried in 10s; a reload must not queue it early
+    scheduler.defer("a", 10)
+    scheduler.release("bot-1", "a")
+    scheduler.load(work, tasks)
+    assert _taken(scheduler) == []
+    assert scheduler.next_due() == 10
+
+    scheduler.reset()
+    scheduler.load(work, tasks)
+    clock[0] += 9
+    assert _taken(scheduler) == []
+    clock[0] += 1
+    assert _taken(scheduler) == ["a"]
+    assert scheduler.next_due() is None
+
+
+def test_urgent_and_older_work_go_first():
+    scheduler = TaskScheduler(max_jobs=1)
+    old = _work("old")
+    new = _work("new", created_at=_NOW + timedelta(minutes=1))
+    urgent = _work("urgent", created_at=_NOW + timedelta(minutes=2), priority=Priority.URGENT)
+    for work in (new, old, urgent):
+        scheduler.load(work, [_task(f"{work.id}-task", work)])
+
+    order = []
+    for _ in range(3):
+        (task_id,) = _taken(scheduler)
+        order.append(task_id)
+        scheduler.release("bot-1", task_id)
+    assert order == ["urgent-task", "old-task", "new-task"]
+
+
+def test_job_slots_are_shared_fairly_between_bots():
+    scheduler = TaskScheduler(max_jobs=4)
+    busy = _work("busy", bot_id="busy-bot")
+    scheduler.load(busy, [_task(f"busy-{i}", busy, i) for i in range(10)])
+    assert len(_taken(scheduler)) == 4
+
+    # A second bot gets the next free slots until both hold their share
+    quiet = _work("quiet", bot_id="quiet-bot")
+    scheduler.load(quiet, [_task(f"quiet-{i}", quiet, i) for i in range(3)])
+    assert _taken(scheduler) == []
+    scheduler.release("busy-bot", "busy-0")
+    scheduler.release("busy-bot", "busy-1")
+    assert _taken(scheduler) == ["quiet-0", "quiet-1"]
+    assert _taken(scheduler) == []  # every slot taken, 2 per bot
+    scheduler.release("quiet-bot", "quiet-0")
+    assert _taken(scheduler) == ["quiet-2"]
+    scheduler.release("quiet-bot", "quiet-1")
+    assert _taken(scheduler) == []  # busy-bot already holds its share
+
+
+@pytest.fixture
+async def bot(sqlite_db):
+    async with sqlite_db() as session:
+        session.add(Bot(id="bot-1", name="Bot", model="test/model", system_prompt=""))
+        await session.commit()
+
+
+async def test_schedulable_work_is_loaded_in_one_query(bot):
+    work_repo, task_repo = WorkRepository(), TaskRepository()
+    active = _work("active")
+    done = _work("done", status=WorkStatus.COMPLETED)
+    for work in (active, done):
+        await work_repo.save(work)
+    await task_repo.save_batch(
+        [
+            _task("b", active, 1, depends_on=["a"]),
+            _task("a", active, 0),
+            _task("x", done, 0),
+        ]
+    )
+
+    graphs = await task_repo.get_schedulable()
+    assert [(work.id, [task.id for task in tasks]) for work, tasks in graphs] == [
+        ("active", ["a", "b"])
+    ]
+    assert await task_repo.get_schedulable(["done"]) == []
+
+
+class _FakeTaskRepo:
+    """Task rows in memory; every call yields to the event loop like real I/O."""
+
+    def __init__(self, work: Work, tasks: list[Task]) -> None:
+        self.work = work
+        self.tasks = {task.id: task for task in tasks}
+
+    async def get_schedulable(self, work_ids=None):
+        await asyncio.sleep(0)
+        if work_ids is not None and self.work.id not in work_ids:
+            return []
+        return [(self.work, [task.model_copy() for task in self.tasks.values()])]
+
+    async def update_status(self, task_id, status, error=None, result=None):
+        await asyncio.sleep(0)
+        self.tasks[task_id].status = status
+
+    async def increment_retry(self, task_id):
+        await asyncio.sleep(0)
+        self.tasks[task_id].retry_count += 1
+        return self.tasks[task_id].retry_count
+
+    async def get_by_work(self, work_id):
+        await asyncio.sleep(0)
+        return list(self.tasks.values())
+
+
+async def _yield(*args, **kwargs):
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def _yielding_mock() -> MagicMock:
+    repo = MagicMock()
+    for name in ("save", "update_status", "append_log", "complete", "update_progress"):
+        setattr(repo, name, AsyncMock(side_effect=_yield))
+    repo.get = AsyncMock(return_value=None)
+    return repo
+
+
+async def test_failed_task_is_retried_without_waiting_for_a_resync(monkeypatch):
+    monkeypatch.setattr(job_runner_module, "ExecutionLogSink", MagicMock())
+    monkeypatch.setattr(job_runner_module, "_RETRY_BASE_DELAY", 0.1)
+    job_runner_module.ExecutionLogSink.return_value.close = AsyncMock(side_effect=_yield)
+
+    work = _work("w")
+    runner = JobRunnerService()
+    runner._task_repo = _FakeTaskRepo(work, [_task("a", work, max_retries=3)])
+    for name in ("_work_repo", "_job_repo", "_exec_log_repo", "_timeline_repo"):
+        setattr(runner, name, _yielding_mock())
+
+    attempts = 0
+    started: list[float] = []
+
+    async def run_agent(job, task, log_sink):
+        nonlocal attempts
+        attempts += 1
+        started.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(0)
+        if attempts == 1:
+            raise RuntimeError("flaky")
+        return "ok", {}
+
+    runner._run_agent_for_task = run_agent  # type: ignore[method-assign]
+    await runner.start()
+    try:
+        for _ in range(200):
+            if runner._task_repo.tasks["a"].status == TaskStatus.COMPLETED:
+                break
+            await asyncio.sleep(0.005)
+    finally:
+        await runner.stop()
+
+    assert attempts == 2
+    assert runner._task_repo.tasks["a"].status == TaskStatus.COMPLETED
+    # The retry waited for its backoff instead of running straight away
+    assert started[1] - started[0] >= 0.09
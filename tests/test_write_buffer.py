@@ -0,0 +1,138 @@
+"""Tests for write-behind batching of chat messages."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from cachibot.models.knowledge import BotMessage
+from cachibot.storage import db
+from cachibot.storage import write_buffer as write_buffer_module
+from cachibot.storage.models.bot import Bot
+from cachibot.storage.models.chat import Chat
+from cachibot.storage.models.message import BotMessage as BotMessageModel
+from cachibot.storage.repository import ChatRepository, KnowledgeRepository
+from cachibot.storage.write_buffer import MessageWriteBuffer
+
+
+@pytest.fixture(autouse=True)
+async def chat(sqlite_db):
+    async with sqlite_db() as session:
+        session.add(Bot(id="bot-1", name="Bot", model="test/model", system_prompt=""))
+        await session.flush()
+        session.add(Chat(id="chat-1", bot_id="bot-1", title="Chat"))
+        await session.commit()
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    # Long interval: flushes only happen when a test asks for them
+    buffer = MessageWriteBuffer(interval=60, max_rows=3)
+    monkeypatch.setattr(write_buffer_module, "_message_buffer", buffer)
+    return buffer
+
+
+def _message(i: int, chat_id: str = "chat-1") -> BotMessage:
+    return BotMessage(
+        id=str(uuid.uuid4()),
+        bot_id="bot-1",
+        chat_id=chat_id,
+        role="user",
+        content=f"message {i}",
+        timestamp=datetime.now(timezone.utc) + timedelta(milliseconds=i),
+    )
+
+
+async def _stored_count(session_maker) -> int:
+    async with session_maker() as session:
+        return await session.scalar(select(func.count()).select_from(BotMessageModel))
+
+
+async def test_pending_messages_are_visible_before_flush(sqlite_db, buffer):
+    repo = KnowledgeRepository()
+    await repo.save_bot_message(_message(0))
+    await buffer.flush()
+    await repo.save_bot_message(_message(1))
+    await repo.save_bot_message(_message(2, chat_id="other-chat"))
+
+    assert await _stored_count(sqlite_db) == 1
+    history = await repo.get_bot_messages("bot-1", "chat-1", limit=10)
+    assert [m.content for m in history] == ["message 0", "message 1"]
+    history = await repo.get_bot_messages("bot-1", "chat-1", limit=1)
+    assert [m.content for m in history] == ["message 1"]
+    await buffer.close()
+
+
+async def test_rows_are_written_in_one_flush(sqlite_db, buffer):
+    repo = KnowledgeRepository()
+    for i in range(3):  # max_rows
+        await repo.save_bot_message(_message(i))
+    before = (await ChatRepository().get_chat("chat-1")).updated_at
+    await ChatRepository().update_chat_timestamp("chat-1")
+
+    assert await _stored_count(sqlite_db) == 3
+    assert buffer.flushes == 1
+    await buffer.flush()
+    assert buffer.flushes == 2
+    assert (await ChatRepository().get_chat("chat-1")).updated_at > before
+    assert buffer.pending_rows(BotMessageModel) == []
+
+
+async def test_bad_row_is_dropped_without_losing_the_batch(sqlite_db, buffer):
+    repo = KnowledgeRepository()
+    await repo.save_bot_message(_message(0))
+    await repo.save_bot_message(_message(1, chat_id="deleted-chat"))
+    await buffer.flush()
+
+    assert await _stored_count(sqlite_db) == 1
+    assert buffer.pending_rows(BotMessageModel) == []
+
+
+def _unavailable():
+    raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+
+async def test_transient_failure_keeps_rows_and_retries(sqlite_db, buffer, monkeypatch):
+    monkeypatch.setattr(write_buffer_module, "_RETRY_BASE_DELAY", 0.01)
+    repo = KnowledgeRepository()
+    await repo.save_bot_message(_message(0))
+    await repo.save_bot_message(_message(1))
+
+    with monkeypatch.context() as m:
+        m.setattr(db, "ensure_initialized", _unavailable)
+        with pytest.raises(OperationalError):
+            await buffer.flush()
+    assert len(buffer.pending_rows(BotMessageModel)) == 2
+    assert await _stored_count(sqlite_db) == 0
+
+    # The backoff timer writes them once the database is back
+    for _ in range(100):
+        if not buffer.pending_rows(BotMessageModel):
+            break
+        await asyncio.sleep(0.01)
+    assert await _stored_count(sqlite_db) == 2
+    await buffer.close()
+
+
+async def test_close_reports_rows_it_could_not_write(sqlite_db, buffer, monkeypatch, caplog):
+    monkeypatch.setattr(write_buffer_module, "_RETRY_BASE_DELAY", 0.01)
+    message = _message(0)
+    await KnowledgeRepository().save_bot_message(message)
+
+    monkeypatch.setattr(db, "ensure_initialized", _unavailable)
+    with pytest.raises(OperationalError):
+        await buffer.close()
+    assert f"bot_messages {message.id}" in caplog.text
+
+
+async def test_close_flushes_and_writes_through(sqlite_db, buffer):
+    repo = KnowledgeRepository()
+    await repo.save_bot_message(_message(0))
+    await buffer.close()
+    assert await _stored_count(sqlite_db) == 1
+
+    await repo.save_bot_message(_message(1))
+    assert await _stored_count(sqlite_db) == 2